@@ -5,12 +5,31 @@
     AgentLoop      -- the LLM + tool execution loop (one per worker)
     AgentLoader    -- loads agent config from disk, builds pipeline
     DecisionTracker -- records decisions for post-hoc analysis
+
+The core classes are resolved on first attribute access (PEP 562) rather
+than at import time.  Between them they pull in litellm, aiohttp and most
+of the framework, and every ``framework.*`` import -- including the
+``hive`` CLI, whose commands mostly read a few files -- runs this module
+first.  ``tests/test_import_time.py`` holds the per-command budget.
 """
 
-from framework.agent_loop import AgentLoop
-from framework.host import ColonyRuntime
-from framework.loader import AgentLoader
-from framework.tracker import DecisionTracker
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from framework.agent_loop import AgentLoop
+    from framework.host import ColonyRuntime
+    from framework.loader import AgentLoader
+    from framework.tracker import DecisionTracker
+
+_LAZY_EXPORTS = {
+    "ColonyRuntime": "framework.host",
+    "AgentLoader": "framework.loader",
+    "AgentLoop": "framework.agent_loop",
+    "DecisionTracker": "framework.tracker",
+}
 
 __all__ = [
     "ColonyRuntime",
@@ -18,3 +37,16 @@
     "AgentLoop",
     "DecisionTracker",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
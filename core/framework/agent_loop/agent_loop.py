@@ -6505,6 +6505,7 @@ async def _execute_tool_inner(self, tc: ToolCallEvent, timeout: float) -> ToolRe
             tc=tc,
             timeout=timeout,
             skill_dirs=getattr(self, "_skill_dirs", []),
+            spill_dir=self._config.spillover_dir,
         )
         # Cheap post-hoc classification: the timeout handler in
         # execute_tool builds a canned error message we can recognise
@@ -6712,13 +6713,12 @@ async def _truncate_tool_result(
         - Large results (> limit): preview + file reference
         - Errors: pass through unchanged
 
-        For large results this does a synchronous JSON round-trip
-        (``json.loads`` + pretty-print ``json.dumps(indent=2)``) plus a
-        file write. On big payloads — web_search, web_fetch, full-page
-        extractions — this can block the event loop for hundreds of ms
-        per call. We offload to a worker thread so concurrent tool
-        executions keep running while one large result is being
-        pretty-printed and spilled to disk.
+        The spill write itself (pretty-print + disk) happens behind the
+        turn on the spill store's writer thread. Large results still
+        parse their JSON here to build the preview, which on big
+        payloads — web_search, web_fetch, full-page extractions — can
+        block the event loop for tens of ms, so those are offloaded to a
+        worker thread.
         """
         # Fast path: small results don't need thread offload. The
         # function only touches disk / does heavy JSON work when the
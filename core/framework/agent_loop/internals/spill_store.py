@@ -0,0 +1,180 @@
+"""Content-addressed, write-behind store for spilled tool results.
+
+Every non-error tool result is spilled to ``<spillover_dir>/<tool>_<n>.txt``
+(see ``truncate_tool_result``). That used to happen inline on the tool
+turn: ``json.loads`` plus a pure-Python ``json.dumps(indent=2)`` and a
+synchronous write, repeated in full for every copy of a result. Ten
+workers scraping the same page stored — and pretty-printed — it ten times.
+
+Now:
+
+* **Content-addressed.** The raw result bytes are hashed (SHA-256) and
+  the pretty-printed text is written once to
+  ``HIVE_HOME/.spill_blobs/<h[:2]>/<h>.txt``. Each spill file is a hard
+  link to that blob, so repeats cost a directory entry, not the bytes, and
+  skip the JSON round trip entirely. Where a link is impossible (spill dir
+  on another filesystem) the blob is copied instead.
+* **Write-behind.** Hashing, pretty-printing and writing run on a small
+  background pool; the tool turn only computes the path. Pending writes
+  are tracked per spill directory and a loop awaits only its own before
+  its next tool executes (``execute_tool``), so an agent that greps the
+  file it was just pointed at always finds it, without waiting on the
+  spills of every other session in the process.
+* **Plain text on disk.** Spill files are read back by the agent itself
+  (``grep``/``cat`` via terminal_exec, and compaction cites them as the
+  recovery path), so blobs stay uncompressed; compressing cold sessions
+  is the retention janitor's job. Blobs are read-only so an in-place edit
+  of one spill file cannot silently change its siblings.
+
+Blobs whose link count drops to one are garbage: every spill file that
+pointed at them is gone. ``retention.sweep_unreferenced_spill_blobs``
+removes them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any
+
+from framework import config
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR_NAME = ".spill_blobs"
+
+# Sentinel: "the caller did not parse the content" (None is valid JSON).
+UNPARSED: Any = object()
+
+# A few writers: enough that one session's burst does not queue every
+# other session behind it, few enough not to fan out pretty-printers.
+_WORKERS = 4
+
+_EXECUTOR: concurrent.futures.ThreadPoolExecutor | None = None
+_LOCK = threading.Lock()
+# Spill directory -> its writes still in flight.
+_pending: dict[str, set[concurrent.futures.Future]] = {}
+# Striped by digest: two writers of the same content take turns, so the
+# second links to the first one's blob instead of replacing it.
+_BLOB_LOCKS = tuple(threading.Lock() for _ in range(64))
+
+
+def blob_root() -> Path:
+    return config.HIVE_HOME / BLOB_DIR_NAME
+
+
+def _executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_WORKERS, thread_name_prefix="hive-spill")
+        return _EXECUTOR
+
+
+def render_spill_text(content: str, parsed: Any = UNPARSED) -> str:
+    """The on-disk form of a result: JSON pretty-printed so line-based
+    ``grep``/``cat`` reading works, anything else as-is."""
+    if parsed is UNPARSED:
+        if content.lstrip()[:1] not in ("{", "["):
+            return content
+        try:
+            parsed = json.loads(content)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return content
+    try:
+        return json.dumps(parsed, indent=2, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return content
+
+
+def _link_or_copy(blob: Path, dest: Path) -> None:
+    tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(blob, tmp)
+    except FileNotFoundError:
+        raise  # no blob: the caller writes it
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, dest)
+
+
+def write_spill(content: str, dest: Path, parsed: Any = UNPARSED) -> bool:
+    """Store ``content`` and link it at ``dest``. Returns True when the
+    blob already existed (a deduplicated write)."""
+    digest = hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+    blob = blob_root() / digest[:2] / f"{digest}.txt"
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with _BLOB_LOCKS[int(digest[:8], 16) % len(_BLOB_LOCKS)]:
+        # Link first rather than checking exists(): the janitor may sweep
+        # an unreferenced blob between the check and the link. Once
+        # linked, the link count keeps the sweep away.
+        try:
+            _link_or_copy(blob, dest)
+            return True
+        except FileNotFoundError:
+            pass
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(blob) as f:
+            f.write(render_spill_text(content, parsed))
+        if os.name != "nt":
+            blob.chmod(0o444)
+        # A freshly written blob is inside the sweep's grace period.
+        _link_or_copy(blob, dest)
+        return False
+
+
+def _done(key: str, fut: concurrent.futures.Future) -> None:
+    with _LOCK:
+        futures = _pending.get(key)
+        if futures is not None:
+            futures.discard(fut)
+            if not futures:
+                del _pending[key]
+    exc = fut.exception()
+    if exc is not None:
+        logger.warning("Tool result spill write failed: %s", exc)
+
+
+def submit_spill(content: str, dest: Path, parsed: Any = UNPARSED) -> concurrent.futures.Future:
+    """Queue ``write_spill`` on the background writers."""
+    key = str(dest.parent)
+    fut = _executor().submit(write_spill, content, dest, parsed)
+    with _LOCK:
+        _pending.setdefault(key, set()).add(fut)
+    fut.add_done_callback(functools.partial(_done, key))
+    return fut
+
+
+def _pending_for(spill_dir: str | Path | None) -> list[concurrent.futures.Future]:
+    with _LOCK:
+        if spill_dir is None:
+            return [f for futures in _pending.values() for f in futures]
+        return list(_pending.get(str(Path(spill_dir)), ()))
+
+
+def has_pending_spills(spill_dir: str | Path | None = None) -> bool:
+    """Writes still in flight for ``spill_dir`` (any directory when None)."""
+    return bool(_pending_for(spill_dir))
+
+
+def wait_for_spills(timeout: float | None = None, spill_dir: str | Path | None = None) -> None:
+    """Block until the queued spill writes for ``spill_dir`` (all when None) have finished."""
+    concurrent.futures.wait(_pending_for(spill_dir), timeout=timeout)
+
+
+async def drain_spills(spill_dir: str | Path | None = None) -> None:
+    """Await the queued spill writes for ``spill_dir`` (all when None)
+    without blocking the event loop."""
+    pending = _pending_for(spill_dir)
+    if pending:
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in pending), return_exceptions=True)
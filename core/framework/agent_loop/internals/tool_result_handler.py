@@ -18,6 +18,7 @@
 from pathlib import Path
 from typing import Any
 
+from framework.agent_loop.internals.spill_store import UNPARSED, drain_spills, has_pending_spills, submit_spill
 from framework.llm.provider import ToolResult, ToolUse
 from framework.llm.stream_events import ToolCallEvent
 
@@ -278,25 +279,22 @@ def truncate_tool_result(
 
     spill_dir = spillover_dir
     if spill_dir:
-        spill_path = Path(spill_dir)
-        spill_path.mkdir(parents=True, exist_ok=True)
         filename = next_spill_filename_fn(tool_name)
-
-        # Pretty-print JSON content so terminal cat/grep line-based
-        # reading works correctly.
-        write_content = result.content
-        parsed_json: Any = None  # track for metadata extraction
-        try:
-            parsed_json = json.loads(result.content)
-            write_content = json.dumps(parsed_json, indent=2, ensure_ascii=False)
-        except (json.JSONDecodeError, TypeError, ValueError):
-            pass  # Not JSON — write as-is
-
-        file_path = spill_path / filename
-        file_path.write_text(write_content, encoding="utf-8")
+        file_path = Path(spill_dir) / filename
         # Use absolute path so parent agents can find files from subagents
         abs_path = str(file_path.resolve())
 
+        # Parse only when the preview needs it; the spill store
+        # pretty-prints in the background (reusing this parse) and skips
+        # the work entirely for content it has already stored.
+        parsed_json: Any = UNPARSED
+        if limit > 0 and len(result.content) > limit and result.content.lstrip()[:1] in ("{", "["):
+            try:
+                parsed_json = json.loads(result.content)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                pass  # Not JSON — written as-is
+        submit_spill(result.content, file_path, parsed_json)
+
         if limit > 0 and len(result.content) > limit:
             # Large result: build a small, metadata-rich preview so the
             # LLM cannot mistake it for the complete dataset. The
@@ -308,7 +306,7 @@ def truncate_tool_result(
             # Extract structural metadata (array lengths, key names)
             metadata_str = ""
             smart_preview: str | None = None
-            if parsed_json is not None:
+            if parsed_json is not UNPARSED:
                 metadata_str = extract_json_metadata(parsed_json)
                 smart_preview = build_json_preview(parsed_json, max_chars=PREVIEW_CAP)
 
@@ -423,13 +421,15 @@ async def execute_tool(
     tc: ToolCallEvent,
     timeout: float,
     skill_dirs: list[str] | None = None,
+    spill_dir: str | None = None,
 ) -> ToolResult:
     """Execute a tool call, handling both sync and async executors.
 
     Applies ``tool_call_timeout_seconds`` to prevent hung MCP servers
     from blocking the event loop indefinitely.  The initial executor
     call is offloaded to a thread pool so that sync executors don't
-    freeze the event loop.
+    freeze the event loop.  ``spill_dir`` is the calling loop's
+    spillover directory; its pending spill writes are awaited first.
     """
     if tool_executor is None:
         return ToolResult(
@@ -438,6 +438,13 @@ async def execute_tool(
             is_error=True,
         )
 
+    # Spill files are written behind the tool turn; one advertised in an
+    # earlier result must exist before any tool (terminal_exec grep, a
+    # subagent) can go looking for it.  Only this loop's own: other
+    # sessions' spills are none of its business.
+    if spill_dir and has_pending_spills(spill_dir):
+        await drain_spills(spill_dir)
+
     skill_dirs = skill_dirs or []
     skill_read_tools = {"view_file"}
     if tc.tool_name in skill_read_tools and skill_dirs:
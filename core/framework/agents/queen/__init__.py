@@ -1,10 +1,24 @@
-"""Queen -- the agent builder for the Hive framework."""
+"""Queen -- the agent builder for the Hive framework.
 
-from .agent import queen_goal, queen_loop_config
-from .config import AgentMetadata, RuntimeConfig, default_config, metadata
+The agent definition is resolved on first access: most importers want a
+single submodule (``queen_profiles`` for ``hive queen list``,
+``queen_memory_v2`` for the server) and should not load the goal schema
+and orchestrator behind ``agent``.
+"""
+
+import importlib
 
 __version__ = "1.0.0"
 
+_LAZY_EXPORTS = {
+    "queen_goal": ".agent",
+    "queen_loop_config": ".agent",
+    "RuntimeConfig": ".config",
+    "AgentMetadata": ".config",
+    "default_config": ".config",
+    "metadata": ".config",
+}
+
 __all__ = [
     "queen_goal",
     "queen_loop_config",
@@ -13,3 +27,12 @@
     "default_config",
     "metadata",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -16,6 +16,8 @@
 
 import logging
 import re
+import stat
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -147,23 +149,39 @@ def from_path(cls, path: Path) -> MemoryFile:
 # ---------------------------------------------------------------------------
 
 
-def scan_memory_files(memory_dir: Path | None = None) -> list[MemoryFile]:
+def scan_memory_files(
+    memory_dir: Path | None = None,
+    *,
+    known: Mapping[str, MemoryFile] | None = None,
+) -> list[MemoryFile]:
     """Scan *memory_dir* for ``.md`` files, returning up to ``MAX_FILES``.
 
     Files are sorted by modification time (newest first).  Dotfiles and
-    subdirectories are ignored.
+    subdirectories are ignored.  Entries in *known* (keyed by filename)
+    whose mtime still matches are reused as-is instead of re-reading the
+    file — that makes a rescan one ``stat`` per file.
     """
     d = memory_dir or global_memory_dir()
     if not d.is_dir():
         return []
 
-    md_files = sorted(
-        (f for f in d.glob("*.md") if f.is_file() and not f.name.startswith(".")),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-
-    return [MemoryFile.from_path(f) for f in md_files[:MAX_FILES]]
+    stamped: list[tuple[float, Path]] = []
+    for f in d.glob("*.md"):
+        if f.name.startswith("."):
+            continue
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            stamped.append((st.st_mtime, f))
+    stamped.sort(key=lambda item: item[0], reverse=True)
+
+    out: list[MemoryFile] = []
+    for mtime, f in stamped[:MAX_FILES]:
+        prev = known.get(f.name) if known else None
+        out.append(prev if prev is not None and prev.mtime == mtime else MemoryFile.from_path(f))
+    return out
 
 
 def slugify_memory_name(raw: str) -> str:
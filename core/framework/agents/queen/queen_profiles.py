@@ -75,13 +75,17 @@ class ColonySessionSelection:
 
 _QUEEN_DEFAULTS_DIR = Path(__file__).parent / "queen_defaults"
 
+# The defaults are parsed when this module is imported (``hive queen list``
+# and every server start); libyaml's loader is ~10x faster when present.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def _load_default_queens() -> dict[str, dict[str, Any]]:
     """Load every ``queen_defaults/*.yaml`` keyed by filename stem (queen_id)."""
     queens: dict[str, dict[str, Any]] = {}
     for path in sorted(_QUEEN_DEFAULTS_DIR.glob("*.yaml")):
         try:
-            data = yaml.safe_load(path.read_text(encoding="utf-8"))
+            data = yaml.load(path.read_text(encoding="utf-8"), Loader=_YAML_LOADER)
         except (OSError, yaml.YAMLError):
             logger.exception("Failed to read default queen profile %s; skipping", path)
             continue
@@ -0,0 +1,232 @@
+"""Local BM25 index over a memory directory for recall pre-ranking.
+
+The recall selector used to re-read every memory file and send the whole
+manifest to the LLM on every queen turn. This index keeps the parsed
+:class:`MemoryFile` headers and their term frequencies in memory, persisted
+to ``.recall-index.json`` inside the memory directory, and refreshes only
+files whose mtime changed (via ``scan_memory_files(known=...)``).
+
+:meth:`MemoryRecallIndex.rank` scores the query against name, description
+and the header lines of each memory. The selector uses the ranking two
+ways: a *confident* ranking (most query terms hit, clear gap to the rest)
+is returned without an LLM call, and otherwise the LLM sees a shortlist
+ordered by score instead of the full manifest.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from framework.agents.queen.queen_memory_v2 import MemoryFile, scan_memory_files
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".recall-index.json"
+_INDEX_VERSION = 1
+
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+# Name and description are what the writer chose to summarise the memory
+# with, so a hit there counts more than one in the body.
+_TITLE_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_-]*")
+_STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been before being below between both but by
+    can could did do does doing down during each few for from further get got had has have having he her here hers him
+    his how i if in into is it its just let me more most my myself no nor not now of off on once only or other our ours
+    out over own please same she should so some such tell than that the their them then there these they this those
+    through to too under until up very was we were what when where which while who whom why will with would you your
+    yours
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords dropped and plurals folded."""
+    out: list[str] = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        tok = tok.strip("-_")
+        if len(tok) < 2 or tok in _STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        out.append(tok)
+    return out
+
+
+def _document_terms(mf: MemoryFile) -> Counter[str]:
+    title = " ".join(filter(None, (mf.name, mf.description, mf.filename.removesuffix(".md").replace("-", " "))))
+    terms = Counter(tokenize(" ".join(mf.header_lines)))
+    for tok in tokenize(title):
+        terms[tok] += _TITLE_WEIGHT
+    return terms
+
+
+@dataclass
+class RankedMemory:
+    """One scored memory. ``coverage`` is the fraction of query terms it contains."""
+
+    file: MemoryFile
+    score: float
+    coverage: float
+
+
+class MemoryRecallIndex:
+    """Incrementally maintained BM25 index for one memory directory.
+
+    Get instances via :func:`get_recall_index`; one per directory per
+    process so concurrent turns share the parsed headers.
+    """
+
+    def __init__(self, memory_dir: Path) -> None:
+        self.memory_dir = memory_dir
+        self.path = memory_dir / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._files: list[MemoryFile] = []
+        self._terms: dict[str, Counter[str]] = {}
+        self._doc_freq: Counter[str] = Counter()
+        self._avg_len = 0.0
+
+    # ----- maintenance --------------------------------------------------
+
+    def refresh(self) -> list[MemoryFile]:
+        """Sync with the directory and return its files, newest first.
+
+        Only files whose mtime changed since the last refresh are re-read.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            known = {mf.filename: mf for mf in self._files}
+            files = scan_memory_files(self.memory_dir, known=known)
+            changed = len(files) != len(self._files) or any(known.get(mf.filename) is not mf for mf in files)
+            if changed:
+                terms: dict[str, Counter[str]] = {}
+                for mf in files:
+                    cached = self._terms.get(mf.filename)
+                    terms[mf.filename] = cached if cached is not None and known.get(mf.filename) is mf else _document_terms(mf)
+                self._files, self._terms = files, terms
+                self._rebuild_stats()
+                self._save()
+            return list(self._files)
+
+    def _rebuild_stats(self) -> None:
+        self._doc_freq = Counter()
+        total = 0
+        for terms in self._terms.values():
+            self._doc_freq.update(terms.keys())
+            total += sum(terms.values())
+        self._avg_len = total / len(self._terms) if self._terms else 0.0
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict) or raw.get("version") != _INDEX_VERSION:
+            return
+        files: list[MemoryFile] = []
+        terms: dict[str, Counter[str]] = {}
+        try:
+            for entry in raw.get("files", []):
+                mf = MemoryFile(
+                    filename=entry["filename"],
+                    path=self.memory_dir / entry["filename"],
+                    name=entry.get("name"),
+                    type=entry.get("type"),
+                    description=entry.get("description"),
+                    header_lines=list(entry.get("header_lines", [])),
+                    mtime=float(entry["mtime"]),
+                )
+                files.append(mf)
+                terms[mf.filename] = Counter(entry.get("terms", {}))
+        except (KeyError, TypeError, ValueError):
+            logger.debug("recall index: ignoring malformed %s", self.path)
+            return
+        self._files, self._terms = files, terms
+        self._rebuild_stats()
+
+    def _save(self) -> None:
+        if not self.memory_dir.is_dir():
+            return
+        payload = {
+            "version": _INDEX_VERSION,
+            "files": [
+                {
+                    "filename": mf.filename,
+                    "mtime": mf.mtime,
+                    "name": mf.name,
+                    "type": mf.type,
+                    "description": mf.description,
+                    "header_lines": mf.header_lines,
+                    "terms": dict(self._terms.get(mf.filename, {})),
+                }
+                for mf in self._files
+            ],
+        }
+        try:
+            with atomic_write(self.path) as f:
+                json.dump(payload, f, separators=(",", ":"))
+        except OSError as exc:
+            logger.debug("recall index: could not persist %s: %s", self.path, exc)
+
+    # ----- querying -----------------------------------------------------
+
+    def rank(self, query: str) -> list[RankedMemory]:
+        """Score every memory against *query*; best first, ties newest first.
+
+        Memories with no query term get score 0 and keep recency order, so
+        the list doubles as a shortlist when the query has no lexical hit.
+        Call :meth:`refresh` first.
+        """
+        q_terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            files = list(self._files)
+            n = len(files)
+            ranked: list[RankedMemory] = []
+            for mf in files:
+                terms = self._terms.get(mf.filename, Counter())
+                doc_len = sum(terms.values()) or 1
+                score = 0.0
+                hits = 0
+                for t in q_terms:
+                    tf = terms.get(t, 0)
+                    if not tf:
+                        continue
+                    hits += 1
+                    df = self._doc_freq.get(t, 0)
+                    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                    norm = _K1 * (1 - _B + _B * doc_len / (self._avg_len or 1))
+                    score += idf * tf * (_K1 + 1) / (tf + norm)
+                ranked.append(RankedMemory(mf, score, hits / len(q_terms) if q_terms else 0.0))
+        # ``sorted`` is stable, so equal scores keep scan (newest-first) order.
+        return sorted(ranked, key=lambda r: -r.score)
+
+
+_INDEXES: dict[str, MemoryRecallIndex] = {}
+_INDEXES_GUARD = threading.Lock()
+
+
+def get_recall_index(memory_dir: Path) -> MemoryRecallIndex:
+    """Process-wide index for *memory_dir*."""
+    key = os.path.abspath(memory_dir)
+    with _INDEXES_GUARD:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = MemoryRecallIndex(Path(key))
+            _INDEXES[key] = index
+        return index
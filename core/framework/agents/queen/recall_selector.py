@@ -1,10 +1,12 @@
 """Recall selector — pre-turn memory selection for the queen.
 
 Before each conversation turn the system:
-  1. Scans one or more memory directories for ``.md`` files (cap: 200 each).
-  2. Reads headers (frontmatter + first 30 lines).
-  3. Uses an LLM call with structured JSON output to pick the most relevant
-     memories for each scope.
+  1. Refreshes the local recall index for each memory directory (cap: 200
+     files each); only files whose mtime changed are re-read.
+  2. Ranks the memories against the query with BM25 over their headers.
+  3. If the ranking is confident, returns it directly.  Otherwise an LLM
+     call with structured JSON output picks from a ranked shortlist; its
+     answer is cached by query and manifest.
   4. Injects them into the system prompt.
 
 The selector only sees the user's query string — no full conversation
@@ -14,20 +16,37 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
-from framework.config import get_aux_max_tokens
 from framework.agents.queen.queen_memory_v2 import (
     format_memory_manifest,
     global_memory_dir as _default_global_memory_dir,
-    scan_memory_files,
 )
+from framework.agents.queen.recall_index import RankedMemory, get_recall_index, tokenize
+from framework.config import get_aux_max_tokens
 
 logger = logging.getLogger(__name__)
 
+# Directories with more memories than this send the LLM only the top of
+# the local ranking rather than the whole manifest.
+SHORTLIST_SIZE = 40
+
+# The local ranking is used without an LLM call when the best match holds
+# at least this share of the query's terms (and the query has 2+ terms)...
+_CONFIDENT_COVERAGE = 0.6
+# ...and every memory left out scores below this fraction of the best.
+_CONFIDENT_GAP = 0.5
+
+# LLM picks keyed by (model, query, manifest). A repeated question over an
+# unchanged memory set costs no round trip.
+_SELECTION_CACHE_SIZE = 256
+_selection_cache: OrderedDict[str, list[str]] = OrderedDict()
+
 # ---------------------------------------------------------------------------
 # Structured output schema
 # ---------------------------------------------------------------------------
@@ -56,6 +75,30 @@
 # ---------------------------------------------------------------------------
 
 
+def _confident_picks(ranked: list[RankedMemory], query: str, limit: int) -> list[str] | None:
+    """Filenames the local ranking is sure about, or None if it is ambiguous."""
+    if limit <= 0 or not ranked or ranked[0].score <= 0:
+        return None
+    if len(set(tokenize(query))) < 2 or ranked[0].coverage < _CONFIDENT_COVERAGE:
+        return None
+    cutoff = ranked[0].score * _CONFIDENT_GAP
+    picks = [r.file.filename for r in ranked if r.score >= cutoff]
+    return picks if len(picks) <= limit else None
+
+
+def _merge_with_pinned(pinned: list[str], picks: list[str], max_results: int) -> list[str]:
+    merged = list(pinned)
+    for s in picks:
+        if s not in merged:
+            merged.append(s)
+    return merged[:max_results]
+
+
+def _selection_cache_key(llm: Any, query: str, manifest: str) -> str:
+    model = str(getattr(llm, "model", "") or "")
+    return hashlib.sha256(f"{model}\0{query.strip()}\0{manifest}".encode()).hexdigest()
+
+
 async def select_memories(
     query: str,
     llm: Any,
@@ -68,7 +111,8 @@ async def select_memories(
     Returns a list of filenames.  Best-effort: on any error returns ``[]``.
     """
     mem_dir = memory_dir or _default_global_memory_dir()
-    files = scan_memory_files(mem_dir)
+    index = get_recall_index(mem_dir)
+    files = index.refresh()
     if not files:
         logger.debug("recall: no memory files found, skipping selection")
         return []
@@ -78,9 +122,24 @@ async def select_memories(
     # "personal life" but not name every person), so an LLM-only selector
     # misses queries like "who is <partner-name>". Always include them.
     pinned = [f.filename for f in files if (f.type or "").lower() == "profile"][:max_results]
+    if len(pinned) >= max_results:
+        return pinned
+
+    ranked = index.rank(query)
+    confident = _confident_picks(ranked, query, max_results - len(pinned))
+    if confident is not None:
+        result = _merge_with_pinned(pinned, confident, max_results)
+        logger.debug("recall: local ranking is confident, skipping LLM: %s (pinned=%s)", result, pinned)
+        return result
 
-    logger.debug("recall: selecting from %d memories for query: %.100s", len(files), query)
-    manifest = format_memory_manifest(files)
+    shortlist = [r.file for r in ranked[:SHORTLIST_SIZE]] if len(files) > SHORTLIST_SIZE else files
+    logger.debug("recall: selecting from %d/%d memories for query: %.100s", len(shortlist), len(files), query)
+    manifest = format_memory_manifest(shortlist)
+    cache_key = _selection_cache_key(llm, query, manifest)
+    cached = _selection_cache.get(cache_key)
+    if cached is not None:
+        _selection_cache.move_to_end(cache_key)
+        return _merge_with_pinned(pinned, cached, max_results)
     user_msg = f"## User query\n\n{query}\n\n## Available memories\n\n{manifest}"
 
     try:
@@ -132,11 +191,10 @@ async def select_memories(
                 normalized.append(name_aliases[s])
             else:
                 dropped.append(s)
-        merged = list(pinned)
-        for s in normalized:
-            if s not in merged:
-                merged.append(s)
-        result = merged[:max_results]
+        _selection_cache[cache_key] = normalized
+        while len(_selection_cache) > _SELECTION_CACHE_SIZE:
+            _selection_cache.popitem(last=False)
+        result = _merge_with_pinned(pinned, normalized, max_results)
         if not normalized:
             # LLM picked nothing. Log the raw response so the next bug
             # report is diagnosable; we still return pinned memories.
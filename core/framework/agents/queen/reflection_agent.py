@@ -10,8 +10,15 @@
   - **Long reflection**: every 5 short reflections and on CONTEXT_COMPACTED.
     Organises, deduplicates, and trims a memory directory.
 
-Concurrency: an ``asyncio.Lock`` prevents overlapping runs.  If a trigger
-fires while a reflection is already active the event is skipped.
+Short reflections are incremental: a per-session cursor in
+``reflection_state.json`` records the last conversation part reflected on,
+so each run reads and sends only the parts written since, plus a bounded
+rolling digest of what came before.  A long session no longer costs a
+full transcript load (and a 50-message prompt) on every trigger.
+
+Concurrency: turn, interval and compaction triggers feed one debounced
+job per session, so overlapping triggers become a single pass instead of
+racing for a lock or being skipped.
 
 All reflections are fire-and-forget (spawned via ``asyncio.create_task``)
 so they never block the queen's event loop.
@@ -22,6 +29,7 @@
 import asyncio
 import json
 import logging
+import os
 import time
 import traceback
 from datetime import datetime
@@ -40,6 +48,7 @@
 from framework.config import get_aux_max_tokens, get_hive_config
 from framework.llm.provider import LLMResponse, Tool
 from framework.tracker.llm_debug_logger import log_llm_turn
+from framework.utils.io import atomic_write
 
 logger = logging.getLogger(__name__)
 
@@ -589,12 +598,91 @@ def _build_unified_long_reflect_system(queen_id: str | None = None) -> str:
 # ---------------------------------------------------------------------------
 
 
-async def _read_conversation_parts(session_dir: Path) -> list[dict[str, Any]]:
-    """Read conversation parts from the queen session directory."""
+_STATE_FILENAME = "reflection_state.json"
+_TRANSCRIPT_WINDOW = 50
+_TRANSCRIPT_LINE_CHARS = 800
+_DIGEST_LINE_CHARS = 200
+_DIGEST_MAX_CHARS = 2000
+
+
+def _state_path(session_dir: Path) -> Path:
+    return session_dir / _STATE_FILENAME
+
+
+def _load_reflection_state(session_dir: Path, log_label: str) -> dict[str, Any]:
+    """Return the persisted cursor and digest for one reflection kind."""
+    try:
+        state = json.loads(_state_path(session_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    entry = state.get(log_label) if isinstance(state, dict) else None
+    if not isinstance(entry, dict):
+        entry = {}
+    return {
+        "cursor": int(entry.get("cursor", -1)),
+        "digest": str(entry.get("digest", "")),
+        "reflected_parts": int(entry.get("reflected_parts", 0)),
+    }
+
+
+def _save_reflection_state(session_dir: Path, log_label: str, entry: dict[str, Any]) -> None:
+    path = _state_path(session_dir)
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(state, dict):
+            state = {}
+    except (OSError, ValueError):
+        state = {}
+    state[log_label] = {**entry, "updated_at": datetime.now().isoformat(timespec="seconds")}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        json.dump(state, f)
+
+
+async def _read_new_conversation_parts(session_dir: Path, cursor: int) -> tuple[list[dict[str, Any]], int]:
+    """Read the parts written after *cursor*; returns (parts, effective_cursor).
+
+    A cursor above the newest stored part means the conversation was
+    cleared and restarted, so it is reset and everything is read again.
+    """
     from framework.storage.conversation_store import FileConversationStore
 
     store = FileConversationStore(session_dir / "conversations")
-    return await store.read_parts()
+    parts = await store.read_parts_after(cursor)
+    if not parts and cursor >= 0:
+        last = await store.last_part_seq()
+        if last is not None and last < cursor:
+            cursor = -1
+            parts = await store.read_parts_after(cursor)
+    return parts, cursor
+
+
+def _transcript_lines(messages: list[dict[str, Any]], max_chars: int) -> list[str]:
+    lines: list[str] = []
+    for msg in messages:
+        role = msg.get("role", "")
+        content = str(msg.get("content", "")).strip()
+        if role == "tool" or not content:
+            continue
+        label = "user" if role == "user" else "assistant"
+        if len(content) > max_chars:
+            content = content[:max_chars] + "…"
+        lines.append(f"[{label}]: {content}")
+    return lines
+
+
+def _roll_digest(digest: str, messages: list[dict[str, Any]]) -> str:
+    """Fold *messages* into the digest, keeping only its most recent tail."""
+    lines = digest.splitlines() if digest else []
+    lines.extend(line.replace("\n", " ") for line in _transcript_lines(messages, _DIGEST_LINE_CHARS))
+    kept: list[str] = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > _DIGEST_MAX_CHARS:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
 
 
 async def run_short_reflection(
@@ -671,39 +759,57 @@ async def _run_short_reflection_with_prompt(
     log_label: str,
     queen_id: str | None,
 ) -> None:
-    """Run a short reflection with a scope-specific system prompt."""
+    """Run a short reflection with a scope-specific system prompt.
+
+    Only the parts written since this reflection kind last ran for the
+    session are read and sent; earlier turns reach the LLM through a
+    bounded rolling digest kept next to the cursor.  The cursor only
+    advances when the reflection loop completes, so a failed run is
+    retried over the same parts next time.
+    """
     mem_dir = memory_dir
 
-    messages = await _read_conversation_parts(session_dir)
+    state = _load_reflection_state(session_dir, log_label)
+    messages, cursor = await _read_new_conversation_parts(session_dir, state["cursor"])
+    if cursor != state["cursor"]:
+        state = {"cursor": cursor, "digest": "", "reflected_parts": 0}
     if not messages:
-        logger.info("reflect: no conversation parts found in %s, skipping", session_dir)
+        logger.info("reflect: no new conversation parts in %s since seq %d, skipping", session_dir, cursor)
         return
 
-    transcript_lines: list[str] = []
-    for msg in messages[-50:]:
-        role = msg.get("role", "")
-        content = str(msg.get("content", "")).strip()
-        if role == "tool" or not content:
-            continue
-        label = "user" if role == "user" else "assistant"
-        if len(content) > 800:
-            content = content[:800] + "…"
-        transcript_lines.append(f"[{label}]: {content}")
+    new_cursor = max(int(m.get("seq", cursor)) for m in messages)
+    transcript_lines = _transcript_lines(messages[-_TRANSCRIPT_WINDOW:], _TRANSCRIPT_LINE_CHARS)
+    reflected_parts = state["reflected_parts"] + len(messages)
 
     if not transcript_lines:
         logger.info("reflect: no transcript lines after filtering, skipping")
+        _save_reflection_state(
+            session_dir,
+            log_label,
+            {"cursor": new_cursor, "digest": state["digest"], "reflected_parts": reflected_parts},
+        )
         return
 
     transcript = "\n".join(transcript_lines)
-    user_msg = f"## Recent conversation ({len(messages)} messages total)\n\n{transcript}\n\nTimestamp: {datetime.now().isoformat(timespec='minutes')}"
+    sections = []
+    if state["digest"]:
+        sections.append(f"## Earlier in this session (digest of {state['reflected_parts']} messages already reflected on)\n\n{state['digest']}")
+    sections.append(f"## Recent conversation ({len(messages)} new messages, {reflected_parts} total)\n\n{transcript}")
+    user_msg = "\n\n".join(sections) + f"\n\nTimestamp: {datetime.now().isoformat(timespec='minutes')}"
 
-    _, changed, reason = await _reflection_loop(
+    success, changed, reason = await _reflection_loop(
         llm,
         system_prompt,
         user_msg,
         mem_dir,
         queen_id=queen_id,
     )
+    if success:
+        _save_reflection_state(
+            session_dir,
+            log_label,
+            {"cursor": new_cursor, "digest": _roll_digest(state["digest"], messages), "reflected_parts": reflected_parts},
+        )
     if changed:
         logger.info("reflect: %s short reflection done, changed files: %s", log_label, changed)
     else:
@@ -826,6 +932,14 @@ async def run_shutdown_reflection(
 _LONG_REFLECT_INTERVAL = 5
 _SHORT_REFLECT_TURN_INTERVAL = 3
 _SHORT_REFLECT_COOLDOWN_SEC = 300.0
+_REFLECT_DEBOUNCE_SEC = 2.0
+
+
+def _debounce_seconds() -> float:
+    try:
+        return max(0.0, float(os.environ.get("HIVE_REFLECTION_DEBOUNCE_SEC", _REFLECT_DEBOUNCE_SEC)))
+    except ValueError:
+        return _REFLECT_DEBOUNCE_SEC
 
 
 async def subscribe_reflection_triggers(
@@ -835,20 +949,31 @@ async def subscribe_reflection_triggers(
     global_memory_dir: Path | None = None,
     queen_memory_dir: Path | None = None,
     queen_id: str | None = None,
+    *,
+    debounce_sec: float | None = None,
 ) -> list[str]:
     """Subscribe to queen turn events and return subscription IDs.
 
     Call this once during queen setup.  Returns a list of event-bus
     subscription IDs for cleanup during session teardown.
+
+    Turn, interval and compaction triggers only mark work as pending;
+    one background job waits *debounce_sec* (``HIVE_REFLECTION_DEBOUNCE_SEC``,
+    default 2s) and then runs at most one short and one long reflection
+    for everything that accumulated.  Triggers that land while the job is
+    running are folded into a single follow-up pass instead of being
+    dropped or queued one by one.
     """
     from framework.host.event_bus import EventType
 
     global_mem_dir = global_memory_dir or _default_global_memory_dir()
     queen_mem_dir = queen_memory_dir
-    _lock = asyncio.Lock()
+    delay = _debounce_seconds() if debounce_sec is None else max(0.0, debounce_sec)
     _short_count = 0
     _short_has_run = False
     _last_short_time: float = 0.0
+    _pending = {"short": False, "long": False}
+    _job: asyncio.Task | None = None
     _background_tasks: set[asyncio.Task] = set()
 
     async def _run_with_error_capture(coro: Any, *, context: str, memory_dir: Path) -> None:
@@ -858,20 +983,25 @@ async def _run_with_error_capture(coro: Any, *, context: str, memory_dir: Path)
             logger.warning("reflect: %s failed", context, exc_info=True)
             _write_error(context, memory_dir)
 
-    async def _do_turn_reflect(is_interval: bool, count: int) -> None:
-        async with _lock:
-            await _run_with_error_capture(
-                run_unified_short_reflection(
-                    session_dir,
-                    llm,
-                    global_memory_dir=global_mem_dir,
-                    queen_memory_dir=queen_mem_dir,
-                    queen_id=queen_id,
-                ),
-                context="unified short reflection",
-                memory_dir=global_mem_dir,
-            )
-            if is_interval:
+    async def _drain() -> None:
+        while _pending["short"] or _pending["long"]:
+            if delay:
+                await asyncio.sleep(delay)
+            run_short, run_long = _pending["short"], _pending["long"]
+            _pending["short"] = _pending["long"] = False
+            if run_short:
+                await _run_with_error_capture(
+                    run_unified_short_reflection(
+                        session_dir,
+                        llm,
+                        global_memory_dir=global_mem_dir,
+                        queen_memory_dir=queen_mem_dir,
+                        queen_id=queen_id,
+                    ),
+                    context="unified short reflection",
+                    memory_dir=global_mem_dir,
+                )
+            if run_long:
                 await _run_with_error_capture(
                     run_unified_long_reflection(
                         llm,
@@ -883,24 +1013,17 @@ async def _do_turn_reflect(is_interval: bool, count: int) -> None:
                     memory_dir=global_mem_dir,
                 )
 
-    async def _do_compaction_reflect() -> None:
-        async with _lock:
-            await _run_with_error_capture(
-                run_unified_long_reflection(
-                    llm,
-                    global_memory_dir=global_mem_dir,
-                    queen_memory_dir=queen_mem_dir,
-                    queen_id=queen_id,
-                ),
-                context="unified compaction reflection",
-                memory_dir=global_mem_dir,
-            )
-
-    def _fire_and_forget(coro: Any) -> None:
-        """Spawn a background task and prevent GC before it finishes."""
-        task = asyncio.create_task(coro)
-        _background_tasks.add(task)
-        task.add_done_callback(_background_tasks.discard)
+    def _schedule(*, short: bool = False, long: bool = False) -> None:
+        """Mark work pending and make sure exactly one drain job is alive."""
+        nonlocal _job
+        _pending["short"] = _pending["short"] or short
+        _pending["long"] = _pending["long"] or long
+        if _job is not None and not _job.done():
+            logger.debug("reflect: coalesced into the pending job (short=%s, long=%s)", short, long)
+            return
+        _job = asyncio.create_task(_drain())
+        _background_tasks.add(_job)
+        _job.add_done_callback(_background_tasks.discard)
 
     async def _on_turn_complete(event: Any) -> None:
         nonlocal _short_count, _short_has_run, _last_short_time
@@ -931,10 +1054,6 @@ async def _on_turn_complete(event: Any) -> None:
                 )
                 return
 
-        if _lock.locked():
-            logger.debug("reflect: skipping, already running (count=%d)", _short_count)
-            return
-
         _short_has_run = True
         _last_short_time = time.monotonic()
 
@@ -944,16 +1063,13 @@ async def _on_turn_complete(event: Any) -> None:
             is_interval,
             stop_reason,
         )
-        _fire_and_forget(_do_turn_reflect(is_interval, _short_count))
+        _schedule(short=True, long=is_interval)
 
     async def _on_compaction(event: Any) -> None:
         if getattr(event, "stream_id", None) != "queen":
             return
-        if _lock.locked():
-            logger.debug("reflect: skipping compaction trigger, already running")
-            return
         logger.debug("reflect: compaction triggered long reflection")
-        _fire_and_forget(_do_compaction_reflect())
+        _schedule(long=True)
 
     sub_ids: list[str] = []
 
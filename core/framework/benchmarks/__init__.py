@@ -0,0 +1,36 @@
+"""End-to-end performance benchmarks for the framework's hot paths.
+
+Scenarios drive real framework code — ``AgentLoop`` turns,
+``EventBus.publish``, ``FileConversationStore`` writes, SSE fan-out
+through the aiohttp handler, ``ColonyRuntime`` spawning and MCP tool
+calls — with only the LLM simulated by ``MockLLMProvider`` (scripted
+tool calls, token streams and latencies) and MCP servers replaced by a
+local stdio stand-in.  Each reports throughput, p50/p99 latencies and
+RSS; ``baseline.py`` compares a run against stored baselines.
+
+    hive bench run --profile quick      # compare with baselines.json
+    hive bench run --save-baseline      # re-record after an intended change
+"""
+
+import importlib
+
+# Names are resolved on first access: ``hive`` registers the ``bench``
+# subcommand through ``framework.benchmarks.cli`` on every invocation, and
+# the runner pulls in psutil, ``framework.llm`` and every scenario.
+_LAZY_EXPORTS = {
+    "ScenarioResult": "framework.benchmarks.metrics",
+    "SuiteResult": "framework.benchmarks.runner",
+    "run_scenario": "framework.benchmarks.runner",
+    "run_suite": "framework.benchmarks.runner",
+}
+
+__all__ = ["ScenarioResult", "SuiteResult", "run_scenario", "run_suite"]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
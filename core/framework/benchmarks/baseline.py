@@ -0,0 +1,128 @@
+"""Stored baselines and regression thresholds.
+
+A baseline file holds, per profile, the metrics of a reference run plus
+the params they were measured with.  Comparison is per metric: a metric
+regresses when it is worse than the baseline by more than its tolerance
+(a fraction of the baseline value) *and* by more than a small absolute
+slack, so sub-millisecond jitter and allocator noise don't fail a run.
+
+Tolerances come from the file's ``thresholds`` map, looked up as
+``"<scenario>.<metric>"``, then ``"<metric>"``, then ``"default"``.
+Scenarios whose params differ from the baseline's are reported as
+``params-changed`` and never fail — re-record the baseline instead.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from framework.benchmarks.runner import SuiteResult
+from framework.utils.io import atomic_write
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_TOLERANCE = 0.30
+_ABS_SLACK = {"_ms": 0.05, "_mb": 16.0, "_per_sec": 0.0}
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec")
+
+
+def _slack(metric: str) -> float:
+    for suffix, slack in _ABS_SLACK.items():
+        if metric.endswith(suffix):
+            return slack
+    return 0.0
+
+
+@dataclass
+class Comparison:
+    scenario: str
+    metric: str
+    baseline: float | None
+    current: float | None
+    tolerance: float
+    status: str  # ok | regressed | improved | new | params-changed
+
+    @property
+    def change(self) -> float | None:
+        """Signed fractional change; positive means worse."""
+        if not self.baseline or self.current is None:
+            return None
+        delta = (self.current - self.baseline) / self.baseline
+        return -delta if higher_is_better(self.metric) else delta
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scenario": self.scenario,
+            "metric": self.metric,
+            "baseline": self.baseline,
+            "current": self.current,
+            "change": None if self.change is None else round(self.change, 4),
+            "tolerance": self.tolerance,
+            "status": self.status,
+        }
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE_PATH) -> dict[str, Any] | None:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def save_baseline(suite: SuiteResult, path: Path = DEFAULT_BASELINE_PATH) -> None:
+    """Record *suite* as the baseline for its profile, keeping other profiles and thresholds."""
+    data = load_baseline(path) or {"thresholds": {"default": DEFAULT_TOLERANCE}, "profiles": {}}
+    record = suite.to_dict()
+    data.setdefault("profiles", {})[suite.profile] = {
+        "recorded_at": record["started_at"],
+        "machine": record["machine"],
+        "scenarios": {name: {"params": r["params"], "metrics": r["metrics"]} for name, r in record["scenarios"].items() if r["metrics"]},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def tolerance_for(thresholds: dict[str, float], scenario: str, metric: str, default: float = DEFAULT_TOLERANCE) -> float:
+    for key in (f"{scenario}.{metric}", metric, "default"):
+        if key in thresholds:
+            return float(thresholds[key])
+    return default
+
+
+def compare(suite: SuiteResult, baseline: dict[str, Any], *, default_tolerance: float | None = None) -> list[Comparison]:
+    thresholds = dict(baseline.get("thresholds") or {})
+    if default_tolerance is not None:
+        thresholds["default"] = default_tolerance
+    reference = ((baseline.get("profiles") or {}).get(suite.profile) or {}).get("scenarios") or {}
+    out: list[Comparison] = []
+    for result in suite.results:
+        if result.skipped or result.error:
+            continue
+        ref = reference.get(result.name)
+        for metric, current in result.metrics.items():
+            tol = tolerance_for(thresholds, result.name, metric)
+            if ref is None or metric not in ref.get("metrics", {}):
+                out.append(Comparison(result.name, metric, None, current, tol, "new"))
+                continue
+            base = float(ref["metrics"][metric])
+            if ref.get("params") != result.params:
+                out.append(Comparison(result.name, metric, base, current, tol, "params-changed"))
+                continue
+            worse_by = (base - current) if higher_is_better(metric) else (current - base)
+            if worse_by > abs(base) * tol and worse_by > _slack(metric):
+                status = "regressed"
+            elif -worse_by > abs(base) * tol and -worse_by > _slack(metric):
+                status = "improved"
+            else:
+                status = "ok"
+            out.append(Comparison(result.name, metric, base, current, tol, status))
+    return out
@@ -0,0 +1,114 @@
+"""CLI for the performance benchmarks.
+
+    hive bench list
+    hive bench run [--profile quick|full|smoke] [--scenario NAME ...]
+                   [--baseline PATH] [--tolerance 0.3] [--no-compare]
+                   [--save-baseline] [--json PATH]
+
+``run`` prints every metric next to the stored baseline and exits 1 when
+any metric regressed past its threshold or a scenario failed, so it can
+gate CI.  ``--save-baseline`` records the run as the new baseline for
+its profile instead of comparing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+# ``scenarios.PROFILES``, spelled out so registering the subcommand (on
+# every ``hive`` invocation) does not import the scenarios.
+PROFILES = ("smoke", "quick", "full")
+
+
+def register_bench_commands(subparsers: argparse._SubParsersAction) -> None:
+    p = subparsers.add_parser(
+        "bench",
+        help="Run performance benchmarks against stored baselines",
+        description="Drive agent loops, the event bus, conversation storage, SSE fan-out, colonies and MCP tools against the mock LLM.",
+    )
+    sub = p.add_subparsers(dest="bench_command", required=True)
+
+    run = sub.add_parser("run", help="Run scenarios and compare with the baseline")
+    run.add_argument("--profile", choices=PROFILES, default="quick", help="Scenario sizes (default: quick)")
+    run.add_argument("--scenario", action="append", dest="scenarios", metavar="NAME", help="Scenario to run (repeatable; default: all)")
+    run.add_argument("--baseline", type=Path, default=None, help="Baseline file (default: the one shipped with the framework)")
+    run.add_argument("--tolerance", type=float, default=None, help="Override the default regression tolerance (fraction, e.g. 0.3)")
+    run.add_argument("--no-compare", action="store_true", help="Only report metrics")
+    run.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline for its profile")
+    run.add_argument("--json", type=Path, default=None, dest="json_path", help="Also write results + comparison as JSON")
+    run.set_defaults(func=cmd_bench_run)
+
+    ls = sub.add_parser("list", help="List scenarios and their params per profile")
+    ls.set_defaults(func=cmd_bench_list)
+
+
+def cmd_bench_list(args: argparse.Namespace) -> int:
+    from framework.benchmarks.scenarios import SCENARIOS
+
+    for scenario in SCENARIOS.values():
+        print(f"{scenario.name:<20} {scenario.description}")
+        for profile, params in scenario.profiles.items():
+            print(f"    {profile:<6} {json.dumps(params, sort_keys=True)}")
+    return 0
+
+
+def _fmt(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.3f}" if abs(value) < 10 else f"{value:.1f}"
+
+
+def cmd_bench_run(args: argparse.Namespace) -> int:
+    from framework.benchmarks.baseline import DEFAULT_BASELINE_PATH, compare, load_baseline, save_baseline
+    from framework.benchmarks.runner import run_suite
+
+    try:
+        suite = run_suite(args.scenarios, args.profile)
+    except ValueError as exc:
+        print(str(exc))
+        return 2
+
+    baseline_path = args.baseline or DEFAULT_BASELINE_PATH
+    comparisons = []
+    if not args.no_compare and not args.save_baseline:
+        baseline = load_baseline(baseline_path)
+        if baseline is None:
+            print(f"no baseline at {baseline_path}; reporting metrics only")
+        else:
+            comparisons = compare(suite, baseline, default_tolerance=args.tolerance)
+    by_key = {(c.scenario, c.metric): c for c in comparisons}
+
+    print(f"benchmark profile: {suite.profile}")
+    for result in suite.results:
+        if result.skipped:
+            print(f"\n{result.name}: SKIPPED ({result.skipped})")
+            continue
+        if result.error:
+            print(f"\n{result.name}: FAILED ({result.error})")
+            continue
+        print(f"\n{result.name}  ({result.wall_seconds:.2f}s)")
+        for metric, value in result.metrics.items():
+            c = by_key.get((result.name, metric))
+            if c is None:
+                print(f"  {metric:<22} {_fmt(value):>12}")
+                continue
+            change = "" if c.change is None else f"{c.change * 100:+6.1f}%"
+            print(f"  {metric:<22} {_fmt(value):>12}   baseline {_fmt(c.baseline):>12} {change:>8}  {c.status}")
+
+    regressions = [c for c in comparisons if c.status == "regressed"]
+    if args.json_path:
+        payload = {**suite.to_dict(), "comparison": [c.to_dict() for c in comparisons]}
+        args.json_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        save_baseline(suite, baseline_path)
+        print(f"\nbaseline for profile {suite.profile!r} written to {baseline_path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed past their threshold:")
+        for c in regressions:
+            print(f"  {c.scenario}.{c.metric}: {_fmt(c.baseline)} -> {_fmt(c.current)} (tolerance {c.tolerance:.0%})")
+    if suite.failed:
+        print(f"\n{len(suite.failed)} scenario(s) failed")
+    return 1 if regressions or suite.failed else 0
@@ -0,0 +1,117 @@
+"""Measurement primitives shared by the benchmark scenarios.
+
+Latencies are collected as raw samples and reduced to p50/p99 once per
+scenario; RSS is sampled from a background thread so the peak reflects
+what the scenario held at its worst, not just where it ended.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import psutil
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class LatencyRecorder:
+    """Collects latency samples in seconds; reports milliseconds."""
+
+    samples: list[float] = field(default_factory=list)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self, prefix: str) -> dict[str, float]:
+        return {
+            f"{prefix}_p50_ms": round(percentile(self.samples, 50) * 1000, 3),
+            f"{prefix}_p99_ms": round(percentile(self.samples, 99) * 1000, 3),
+        }
+
+
+class RssSampler:
+    """Samples this process's RSS every *interval* seconds while active."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self._interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.start_bytes = 0
+        self.peak_bytes = 0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+
+    def __enter__(self) -> RssSampler:
+        self.start_bytes = self.peak_bytes = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "rss_peak_mb": round(self.peak_bytes / 2**20, 1),
+            "rss_growth_mb": round((self.peak_bytes - self.start_bytes) / 2**20, 1),
+        }
+
+
+@dataclass
+class ScenarioResult:
+    """One scenario run: its parameters and the metrics it produced.
+
+    Metric names carry their direction: ``*_per_sec`` is better when
+    higher, ``*_ms`` and ``*_mb`` when lower.  ``skipped`` holds the
+    reason a scenario could not run here (e.g. a missing optional
+    dependency) and ``error`` why it failed; neither has metrics.
+    """
+
+    name: str
+    params: dict[str, Any]
+    metrics: dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    skipped: str | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"params": self.params, "metrics": self.metrics, "wall_seconds": round(self.wall_seconds, 3)}
+        if self.skipped:
+            out["skipped"] = self.skipped
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+def rate(count: float, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds > 0 else 0.0
+
+
+class Stopwatch:
+    """``with Stopwatch() as sw: ...`` then ``sw.seconds``."""
+
+    def __enter__(self) -> Stopwatch:
+        self._t0 = time.perf_counter()
+        self.seconds = 0.0
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.seconds = time.perf_counter() - self._t0
@@ -0,0 +1,87 @@
+"""Run benchmark scenarios in isolated scratch directories.
+
+Each scenario gets its own temporary directory (removed afterwards) and
+runs on the caller's event loop.  A scenario that raises is recorded
+with its error rather than aborting the suite, so one broken hot path
+doesn't hide numbers for the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from framework.benchmarks.metrics import ScenarioResult
+from framework.benchmarks.scenarios import PROFILES, SCENARIOS, ScenarioSkipped
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SuiteResult:
+    profile: str
+    results: list[ScenarioResult] = field(default_factory=list)
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    @property
+    def failed(self) -> list[ScenarioResult]:
+        return [r for r in self.results if r.error]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "started_at": self.started_at,
+            "machine": machine_info(),
+            "scenarios": {r.name: r.to_dict() for r in self.results},
+        }
+
+
+def machine_info() -> dict[str, Any]:
+    import os
+
+    return {
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+async def run_scenario(name: str, profile: str = "quick", overrides: dict[str, Any] | None = None) -> ScenarioResult:
+    """Run one scenario with the profile's params (plus *overrides*)."""
+    scenario = SCENARIOS[name]
+    params = {**scenario.profiles[profile], **(overrides or {})}
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=f"hive-bench-{name}-") as tmp:
+        try:
+            return await scenario.run(params, Path(tmp))
+        except ScenarioSkipped as exc:
+            return ScenarioResult(name, params, skipped=str(exc))
+        except Exception as exc:
+            logger.warning("benchmark scenario %s failed", name, exc_info=True)
+            return ScenarioResult(name, params, wall_seconds=time.perf_counter() - t0, error=f"{type(exc).__name__}: {exc}")
+
+
+async def run_suite_async(names: list[str] | None = None, profile: str = "quick") -> SuiteResult:
+    if profile not in PROFILES:
+        raise ValueError(f"unknown profile {profile!r} (choose from {', '.join(PROFILES)})")
+    unknown = [n for n in names or [] if n not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"unknown scenario(s): {', '.join(unknown)}")
+    suite = SuiteResult(profile)
+    for name in names or list(SCENARIOS):
+        suite.results.append(await run_scenario(name, profile))
+    return suite
+
+
+def run_suite(names: list[str] | None = None, profile: str = "quick") -> SuiteResult:
+    """Synchronous entry point (CLI): runs the suite on a fresh event loop."""
+    return asyncio.run(run_suite_async(names, profile))
@@ -0,0 +1,684 @@
+"""Benchmark scenarios: each drives one hot path with real framework code.
+
+Only the LLM is simulated — ``MockLLMProvider`` scripts the tool calls,
+token stream and latencies — and external MCP servers are replaced by a
+local stdio stand-in.  Every scenario takes a params dict (see
+``PROFILES``) and a scratch directory, and returns a ``ScenarioResult``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from framework.benchmarks.metrics import LatencyRecorder, RssSampler, ScenarioResult, Stopwatch, rate
+from framework.llm.mock import MockLLMProvider
+
+ScenarioFn = Callable[[dict[str, Any], Path], Awaitable[ScenarioResult]]
+
+
+class ScenarioSkipped(Exception):
+    """Raised when a scenario cannot run here (missing optional dependency)."""
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    run: ScenarioFn
+    profiles: dict[str, dict[str, Any]]
+
+
+class _TimedMockLLM(MockLLMProvider):
+    """Mock provider that records when each ``stream()`` call starts."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.call_starts: list[float] = []
+
+    async def stream(self, messages: list[dict[str, Any]], *args: Any, **kwargs: Any):
+        self.call_starts.append(time.perf_counter())
+        async for event in super().stream(messages, *args, **kwargs):
+            yield event
+
+
+class _PromptSizeMockLLM(MockLLMProvider):
+    """Mock provider that records the estimated tokens of each ``acomplete`` prompt."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.prompt_tokens: list[float] = []
+
+    async def acomplete(self, messages: list[dict[str, Any]], system: str = "", **kwargs: Any):
+        chars = len(system) + sum(len(str(m.get("content", ""))) for m in messages)
+        self.prompt_tokens.append(chars / 4)
+        return await super().acomplete(messages, system, **kwargs)
+
+
+def _mock_llm(params: dict[str, Any], turns: list[dict[str, Any]]) -> _TimedMockLLM:
+    return _TimedMockLLM(
+        model="bench-mock",
+        delay=params.get("llm_delay_ms", 0) / 1000.0,
+        tokens_per_response=params.get("tokens", 32),
+        token_delay=params.get("token_delay_ms", 0) / 1000.0,
+        turns=turns,
+    )
+
+
+def _tool_turns(turns: int, calls_per_turn: int, *, tool: str = "echo", extra: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    """``turns`` tool-calling turns followed by a ``report_to_parent``."""
+    script: list[dict[str, Any]] = [
+        {"tool_calls": [{"name": tool, "input": {"text": f"step {t}.{c}", **(extra or {})}} for c in range(calls_per_turn)]} for t in range(turns)
+    ]
+    script.append({"tool_calls": [{"name": "report_to_parent", "input": {"status": "success", "summary": "benchmark done", "data": {}}}]})
+    return script
+
+
+def _echo_tool():
+    from framework.llm.provider import Tool
+
+    return Tool(
+        name="echo",
+        description="Echo the text back.",
+        parameters={"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
+    )
+
+
+def _echo_executor(tool_use):
+    from framework.llm.provider import ToolResult
+
+    return ToolResult(tool_use_id=tool_use.id, content=str(tool_use.input.get("text", "")))
+
+
+def _turn_gaps(starts: list[float], end: float) -> list[float]:
+    marks = [*starts, end]
+    return [b - a for a, b in zip(marks, marks[1:], strict=False)]
+
+
+async def _run_worker_loop(
+    llm: MockLLMProvider,
+    workdir: Path,
+    *,
+    tools: list[Any],
+    tool_executor: Callable[..., Any],
+    event_bus: Any,
+    stream_id: str,
+    max_iterations: int,
+) -> float:
+    """Run one AgentLoop as a parallel worker until it reports; returns its end time."""
+    from framework.agent_loop.agent_loop import AgentLoop
+    from framework.agent_loop.internals.types import LoopConfig
+    from framework.orchestrator.node import DataBuffer, NodeContext, NodeSpec
+    from framework.storage.conversation_store import FileConversationStore
+    from framework.tracker.decision_tracker import DecisionTracker
+
+    spec = NodeSpec(
+        id="bench_worker",
+        name="Benchmark worker",
+        description="Scripted worker driven by the mock LLM.",
+        node_type="event_loop",
+        output_keys=[],
+        system_prompt="You are a benchmark worker. Call the tools you are given, then report.",
+    )
+    ctx = NodeContext(
+        runtime=DecisionTracker(workdir / "runtime"),
+        node_id=spec.id,
+        node_spec=spec,
+        buffer=DataBuffer(),
+        input_data={"task": "run the benchmark script"},
+        llm=llm,
+        available_tools=tools,
+        stream_id=stream_id,
+    )
+    loop = AgentLoop(
+        event_bus=event_bus,
+        config=LoopConfig(max_iterations=max_iterations),
+        tool_executor=tool_executor,
+        conversation_store=FileConversationStore(workdir / "conversations"),
+    )
+    result = await loop.execute(ctx)
+    if not result.success:
+        raise RuntimeError(f"benchmark agent loop failed: {result.error}")
+    return time.perf_counter()
+
+
+_warmed = False
+
+
+async def _warm_up(workdir: Path) -> None:
+    """Pay one-time import and cache costs (litellm, pydantic models) off the clock."""
+    global _warmed
+    if _warmed:
+        return
+    from framework.host.event_bus import EventBus
+
+    llm = _mock_llm({"tokens": 4}, _tool_turns(1, 1))
+    await _run_worker_loop(
+        llm,
+        workdir / "warmup",
+        tools=[_echo_tool()],
+        tool_executor=_echo_executor,
+        event_bus=EventBus(),
+        stream_id="worker:warmup",
+        max_iterations=5,
+    )
+    _warmed = True
+
+
+def _count_events(bus: Any) -> dict[str, int]:
+    from framework.host.event_bus import EventType
+
+    counter = {"events": 0}
+
+    async def _count(event: Any) -> None:
+        counter["events"] += 1
+
+    bus.subscribe(event_types=list(EventType), handler=_count)
+    return counter
+
+
+# ── scenarios ────────────────────────────────────────────────────────
+
+
+async def agent_loop_turns(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Concurrent worker AgentLoops, each running scripted tool turns."""
+    from framework.host.event_bus import EventBus
+
+    await _warm_up(workdir)
+    bus = EventBus()
+    counter = _count_events(bus)
+    loops, turns = params["loops"], params["turns"]
+    llms = [_mock_llm(params, _tool_turns(turns, params["calls_per_turn"])) for _ in range(loops)]
+
+    with RssSampler() as rss, Stopwatch() as sw:
+        ends = await asyncio.gather(
+            *(
+                _run_worker_loop(
+                    llm,
+                    workdir / f"loop{i}",
+                    tools=[_echo_tool()],
+                    tool_executor=_echo_executor,
+                    event_bus=bus,
+                    stream_id=f"worker:bench{i}",
+                    max_iterations=turns + 5,
+                )
+                for i, llm in enumerate(llms)
+            )
+        )
+
+    latency = LatencyRecorder()
+    for llm, end in zip(llms, ends, strict=True):
+        for gap in _turn_gaps(llm.call_starts, end):
+            latency.add(gap)
+    llm_turns = sum(len(llm.call_starts) for llm in llms)
+    metrics = {
+        "turns_per_sec": rate(llm_turns, sw.seconds),
+        "events_per_sec": rate(counter["events"], sw.seconds),
+        **latency.summary("turn"),
+        **rss.summary(),
+    }
+    return ScenarioResult("agent_loop", params, metrics, sw.seconds)
+
+
+async def event_bus_publish(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Publish a realistic mix of streaming events to many filtered subscribers."""
+    from framework.host.event_bus import AgentEvent, EventBus, EventType
+
+    bus = EventBus(max_history=1000)
+    if params.get("session_log"):
+        bus.set_session_log(workdir / "events.jsonl")
+    deliveries = {"n": 0}
+
+    async def _handler(event: Any) -> None:
+        deliveries["n"] += 1
+
+    streams = [f"worker:{i}" for i in range(params["streams"])]
+    mix = [EventType.LLM_TEXT_DELTA] * 6 + [EventType.TOOL_CALL_STARTED, EventType.TOOL_CALL_COMPLETED, EventType.LLM_TURN_COMPLETE]
+    for i in range(params["subscribers"]):
+        if i % 2:
+            bus.subscribe(event_types=list(set(mix)), handler=_handler, filter_stream=streams[i % len(streams)])
+        else:
+            bus.subscribe(event_types=list(set(mix)), handler=_handler)
+
+    latency = LatencyRecorder()
+    total = params["events"]
+    with RssSampler() as rss, Stopwatch() as sw:
+        for i in range(total):
+            event_type = mix[i % len(mix)]
+            data: dict[str, Any] = {"iteration": i // len(mix)}
+            if event_type == EventType.LLM_TEXT_DELTA:
+                data.update(content=" token", snapshot="…")
+            else:
+                data.update(tool_use_id=f"tu_{i // len(mix)}", tool_name="echo")
+            event = AgentEvent(type=event_type, stream_id=streams[i % len(streams)], execution_id=f"exec_{i % 4}", data=data)
+            t = time.perf_counter()
+            await bus.publish(event)
+            latency.add(time.perf_counter() - t)
+    if params.get("session_log"):
+        bus.close_session_log()
+
+    metrics = {
+        "events_per_sec": rate(total, sw.seconds),
+        "deliveries_per_sec": rate(deliveries["n"], sw.seconds),
+        **latency.summary("publish"),
+        **rss.summary(),
+    }
+    return ScenarioResult("event_bus", params, metrics, sw.seconds)
+
+
+async def conversation_store_writes(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Append conversation parts the way a long session does, then reload them."""
+    from framework.storage.conversation_store import FileConversationStore
+
+    store = FileConversationStore(workdir / "conversations")
+    body = "x" * params["part_bytes"]
+    latency = LatencyRecorder()
+    total = params["parts"]
+    with RssSampler() as rss, Stopwatch() as sw:
+        for seq in range(total):
+            part = {"seq": seq, "role": "assistant" if seq % 2 else "user", "content": body, "phase_id": "bench"}
+            t = time.perf_counter()
+            await store.write_part(seq, part)
+            latency.add(time.perf_counter() - t)
+            if seq % 10 == 9:
+                await store.write_cursor({"iteration": seq // 10})
+        with Stopwatch() as read:
+            parts = await store.read_parts()
+    if len(parts) != total:
+        raise RuntimeError(f"conversation store returned {len(parts)} of {total} parts")
+
+    metrics = {
+        "writes_per_sec": rate(total, sw.seconds - read.seconds),
+        **latency.summary("write"),
+        "read_all_ms": round(read.seconds * 1000, 3),
+        **rss.summary(),
+    }
+    return ScenarioResult("conversation_store", params, metrics, sw.seconds)
+
+
+async def sse_fanout(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Fan global-bus events out to SSE clients through the real aiohttp handler."""
+    try:
+        import aiohttp
+        from aiohttp import web
+    except ImportError as exc:  # server extra not installed
+        raise ScenarioSkipped(f"aiohttp not installed ({exc})") from exc
+
+    from framework.host.event_bus import AgentEvent, EventType, publish_global
+    from framework.server.routes_events import handle_global_events
+
+    app = web.Application()
+    app.router.add_get("/events", handle_global_events)
+    # The streams only end when a keepalive write fails, so cleanup would
+    # wait on them; cancel whatever is still open almost at once.
+    runner = web.AppRunner(app, shutdown_timeout=0.5)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    port = runner.addresses[0][1]
+
+    n_clients, total, batch = params["clients"], params["events"], params["batch"]
+    received = [0] * n_clients
+    latency = LatencyRecorder()
+    progress = asyncio.Event()
+
+    async def _client(index: int, response: aiohttp.ClientResponse) -> None:
+        async for raw in response.content:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data: "):
+                continue
+            payload = json.loads(line[6:]).get("data", {})
+            if "bench_t" in payload:
+                latency.add(time.perf_counter() - payload["bench_t"])
+                received[index] += 1
+                progress.set()
+
+    session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None))
+    responses: list[aiohttp.ClientResponse] = []
+    readers: list[asyncio.Task] = []
+    try:
+        for i in range(n_clients):
+            response = await session.get(f"http://127.0.0.1:{port}/events")
+            responses.append(response)
+            readers.append(asyncio.create_task(_client(i, response)))
+
+        with RssSampler() as rss, Stopwatch() as sw:
+            sent = 0
+            while sent < total:
+                for _ in range(min(batch, total - sent)):
+                    await publish_global(
+                        AgentEvent(
+                            type=EventType.CRM_CHANGED,
+                            stream_id="global",
+                            data={"entities": [], "bench_seq": sent, "bench_t": time.perf_counter()},
+                        )
+                    )
+                    sent += 1
+                deadline = time.monotonic() + 30
+                while min(received) < sent:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"SSE clients stalled at {min(received)}/{sent} events")
+                    progress.clear()
+                    try:
+                        await asyncio.wait_for(progress.wait(), timeout=1.0)
+                    except TimeoutError:
+                        pass
+    finally:
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        for response in responses:
+            response.close()
+        await session.close()
+        await runner.cleanup()
+
+    metrics = {
+        "deliveries_per_sec": rate(sum(received), sw.seconds),
+        **latency.summary("delivery"),
+        **rss.summary(),
+    }
+    return ScenarioResult("sse_fanout", params, metrics, sw.seconds)
+
+
+async def reflection_long_session(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Short reflections every few turns of a growing queen session."""
+    from framework.agents.queen.reflection_agent import run_unified_short_reflection
+    from framework.storage.conversation_store import FileConversationStore
+
+    session_dir = workdir / "session"
+    store = FileConversationStore(session_dir / "conversations")
+    llm = _PromptSizeMockLLM(model="bench-mock")
+    filler = "lorem ipsum " * params["words"]
+    latency = LatencyRecorder()
+    seconds: list[float] = []
+    turns, every = params["turns"], params["every"]
+    with RssSampler() as rss, Stopwatch() as sw:
+        for start in range(0, turns, every):
+            for turn in range(start, min(start + every, turns)):
+                for offset, role in enumerate(("user", "assistant")):
+                    await store.write_part(2 * turn + offset, {"role": role, "content": f"turn {turn} {role} {filler}"})
+            t = time.perf_counter()
+            await run_unified_short_reflection(session_dir, llm, global_memory_dir=workdir / "memory")
+            seconds.append(time.perf_counter() - t)
+            latency.add(seconds[-1])
+    if not llm.prompt_tokens:
+        raise RuntimeError("no reflection reached the LLM")
+
+    # The last tenth shows whether a reflection still costs the same late in the session.
+    tail = seconds[-max(1, len(seconds) // 10) :]
+    metrics = {
+        "reflections_per_sec": rate(len(seconds), sum(seconds)),
+        **latency.summary("reflect"),
+        "late_reflect_ms": round(sum(tail) / len(tail) * 1000, 3),
+        "prompt_tokens_per_reflection": round(sum(llm.prompt_tokens) / len(llm.prompt_tokens), 1),
+        **rss.summary(),
+    }
+    return ScenarioResult("reflection", params, metrics, sw.seconds)
+
+
+async def colony_spawn(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Spawn a batch of colony workers and wait for every report."""
+    from framework.agent_loop.types import AgentSpec
+    from framework.host.colony_runtime import ColonyRuntime
+    from framework.host.event_bus import EventBus
+    from framework.schemas.goal import Goal
+
+    await _warm_up(workdir)
+    bus = EventBus()
+    counter = _count_events(bus)
+    llm = _mock_llm(params, _tool_turns(params["turns"], 1))
+    storage = workdir / "colony"
+    storage.mkdir(parents=True, exist_ok=True)
+    colony = ColonyRuntime(
+        agent_spec=AgentSpec(
+            id="bench_colony_agent",
+            name="Benchmark colony agent",
+            description="Scripted colony worker driven by the mock LLM.",
+            system_prompt="You are a benchmark worker.",
+            agent_type="event_loop",
+            output_keys=[],
+            tool_access_policy="all",
+        ),
+        goal=Goal(id="bench-goal", name="Benchmark", description="Measure colony spawning."),
+        storage_path=storage,
+        llm=llm,
+        tools=[_echo_tool()],
+        tool_executor=_echo_executor,
+        event_bus=bus,
+        stream_id="bench_colony",
+        pipeline_stages=[],
+    )
+    await colony.start()
+    workers = params["workers"]
+    try:
+        with RssSampler() as rss, Stopwatch() as sw:
+            with Stopwatch() as spawn:
+                ids = await colony.spawn_batch(tasks=[{"task": f"benchmark task {i}"} for i in range(workers)])
+            reports = await colony.wait_for_worker_reports(ids, timeout=params.get("timeout_sec", 300.0))
+    finally:
+        await colony.stop()
+
+    failed = [r for r in reports if r.get("status") != "success"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} colony workers did not succeed: {failed[0]}")
+    latency = LatencyRecorder()
+    for report in reports:
+        latency.add(float(report.get("duration_seconds") or 0.0))
+    metrics = {
+        "workers_per_sec": rate(workers, sw.seconds),
+        "turns_per_sec": rate(len(llm.call_starts), sw.seconds),
+        "events_per_sec": rate(counter["events"], sw.seconds),
+        "spawn_batch_ms": round(spawn.seconds * 1000, 3),
+        **latency.summary("worker"),
+        **rss.summary(),
+    }
+    return ScenarioResult("colony_spawn", params, metrics, sw.seconds)
+
+
+async def mcp_tool_calls(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Agent loop turns whose tool calls go to a local stdio MCP stand-in."""
+    try:
+        import mcp.server.fastmcp  # noqa: F401
+    except ImportError as exc:
+        raise ScenarioSkipped(f"mcp not installed ({exc})") from exc
+
+    from framework.benchmarks.stand_ins import mcp_server_config
+    from framework.host.event_bus import EventBus
+    from framework.loader.tool_registry import ToolRegistry
+
+    await _warm_up(workdir)
+    registry = ToolRegistry()
+    with Stopwatch() as connect:
+        registered = await asyncio.to_thread(registry.register_mcp_server, mcp_server_config(workdir), False)
+    if not registered:
+        raise RuntimeError("stand-in MCP server registered no tools")
+
+    dispatch = registry.get_executor()
+    calls = LatencyRecorder()
+
+    def _timed_executor(tool_use):
+        t = time.perf_counter()
+        result = dispatch(tool_use)
+        if asyncio.iscoroutine(result) or asyncio.isfuture(result):
+
+            async def _await():
+                try:
+                    return await result
+                finally:
+                    calls.add(time.perf_counter() - t)
+
+            return _await()
+        calls.add(time.perf_counter() - t)
+        return result
+
+    extra = {"delay_ms": params["server_delay_ms"], "pad": params["payload_bytes"]}
+    llm = _mock_llm(params, _tool_turns(params["turns"], 1, extra=extra))
+    try:
+        with RssSampler() as rss, Stopwatch() as sw:
+            end = await _run_worker_loop(
+                llm,
+                workdir / "mcp_loop",
+                tools=list(registry.get_tools().values()),
+                tool_executor=_timed_executor,
+                event_bus=EventBus(),
+                stream_id="worker:bench_mcp",
+                max_iterations=params["turns"] + 5,
+            )
+    finally:
+        await asyncio.to_thread(registry.cleanup)
+
+    turns = LatencyRecorder(_turn_gaps(llm.call_starts, end))
+    metrics = {
+        "tool_calls_per_sec": rate(len(calls.samples), sw.seconds),
+        **calls.summary("tool_call"),
+        **turns.summary("turn"),
+        "connect_ms": round(connect.seconds * 1000, 3),
+        **rss.summary(),
+    }
+    return ScenarioResult("mcp_tools", params, metrics, sw.seconds)
+
+
+async def csv_sql_queries(params: dict[str, Any], workdir: Path) -> ScenarioResult:
+    """Repeated csv_sql queries over one CSV through the Parquet cache."""
+    try:
+        import duckdb  # noqa: F401
+        from aden_tools.tools.csv_tool import cache
+    except ImportError as exc:  # tools package or duckdb not installed
+        raise ScenarioSkipped(f"csv_sql cache unavailable ({exc})") from exc
+
+    csv_path = workdir / "orders.csv"
+    rng = random.Random(0)
+    regions = ("north", "south", "east", "west")
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("id,region,product,amount,quantity\n")
+        for i in range(params["rows"]):
+            f.write(f"{i},{rng.choice(regions)},p{rng.randrange(500)},{rng.random() * 1000:.2f},{rng.randrange(100)}\n")
+    queries = [
+        "SELECT COUNT(*) FROM data",
+        "SELECT region, SUM(amount) FROM data GROUP BY region",
+        "SELECT * FROM data WHERE amount > 990 ORDER BY id LIMIT 20",
+        "SELECT product, COUNT(*) FROM data GROUP BY product ORDER BY 2 DESC LIMIT 5",
+    ]
+
+    previous_dir, previous_min = os.environ.get("HIVE_CSV_CACHE_DIR"), cache._MIN_BYTES
+    os.environ["HIVE_CSV_CACHE_DIR"] = str(workdir / "csv_cache")
+    cache._MIN_BYTES = 0  # always go through the cache, whatever the profile's size
+    latency = LatencyRecorder()
+    try:
+        with RssSampler() as rss, Stopwatch() as sw:
+            # The first query pays for building the Parquet entry.
+            with Stopwatch() as first:
+                await asyncio.to_thread(cache.run_query, str(csv_path), queries[0])
+            for i in range(params["queries"]):
+                t = time.perf_counter()
+                await asyncio.to_thread(cache.run_query, str(csv_path), queries[i % len(queries)])
+                latency.add(time.perf_counter() - t)
+    finally:
+        cache._MIN_BYTES = previous_min
+        if previous_dir is None:
+            os.environ.pop("HIVE_CSV_CACHE_DIR", None)
+        else:
+            os.environ["HIVE_CSV_CACHE_DIR"] = previous_dir
+
+    metrics = {
+        "queries_per_sec": rate(params["queries"], sw.seconds - first.seconds),
+        "first_query_ms": round(first.seconds * 1000, 3),
+        **latency.summary("query"),
+        **rss.summary(),
+    }
+    return ScenarioResult("csv_sql", params, metrics, sw.seconds)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario(
+            "agent_loop",
+            "Concurrent AgentLoop workers running scripted tool turns (turns/sec, turn latency, bus events).",
+            agent_loop_turns,
+            {
+                "smoke": {"loops": 1, "turns": 3, "calls_per_turn": 1, "tokens": 8},
+                "quick": {"loops": 2, "turns": 20, "calls_per_turn": 1, "tokens": 64},
+                "full": {"loops": 4, "turns": 100, "calls_per_turn": 2, "tokens": 256},
+            },
+        ),
+        Scenario(
+            "event_bus",
+            "EventBus.publish of a streaming event mix to filtered subscribers, with the session log on.",
+            event_bus_publish,
+            {
+                "smoke": {"events": 300, "subscribers": 4, "streams": 2, "session_log": True},
+                "quick": {"events": 5000, "subscribers": 10, "streams": 4, "session_log": True},
+                "full": {"events": 50000, "subscribers": 40, "streams": 16, "session_log": True},
+            },
+        ),
+        Scenario(
+            "conversation_store",
+            "FileConversationStore part writes plus a full reload.",
+            conversation_store_writes,
+            {
+                "smoke": {"parts": 50, "part_bytes": 512},
+                "quick": {"parts": 500, "part_bytes": 2048},
+                "full": {"parts": 5000, "part_bytes": 4096},
+            },
+        ),
+        Scenario(
+            "sse_fanout",
+            "Global-bus events fanned out to SSE clients over HTTP (delivery latency).",
+            sse_fanout,
+            {
+                "smoke": {"clients": 2, "events": 40, "batch": 20},
+                "quick": {"clients": 10, "events": 500, "batch": 50},
+                "full": {"clients": 50, "events": 2000, "batch": 100},
+            },
+        ),
+        Scenario(
+            "reflection",
+            "Incremental short reflection every few turns of a long session (prompt tokens, reflection latency).",
+            reflection_long_session,
+            {
+                "smoke": {"turns": 30, "every": 3, "words": 10},
+                "quick": {"turns": 300, "every": 3, "words": 40},
+                "full": {"turns": 1000, "every": 3, "words": 40},
+            },
+        ),
+        Scenario(
+            "csv_sql",
+            "Repeated csv_sql queries against one CSV through the Parquet cache (first build, query latency).",
+            csv_sql_queries,
+            {
+                "smoke": {"rows": 2000, "queries": 8},
+                "quick": {"rows": 100_000, "queries": 40},
+                "full": {"rows": 1_000_000, "queries": 200},
+            },
+        ),
+        Scenario(
+            "colony_spawn",
+            "ColonyRuntime.spawn_batch of scripted workers until every report lands.",
+            colony_spawn,
+            {
+                "smoke": {"workers": 2, "turns": 1, "tokens": 8},
+                "quick": {"workers": 10, "turns": 3, "tokens": 32},
+                "full": {"workers": 50, "turns": 5, "tokens": 64},
+            },
+        ),
+        Scenario(
+            "mcp_tools",
+            "Agent loop tool calls through a local stdio MCP stand-in server.",
+            mcp_tool_calls,
+            {
+                "smoke": {"turns": 3, "server_delay_ms": 0, "payload_bytes": 64, "tokens": 8},
+                "quick": {"turns": 30, "server_delay_ms": 0, "payload_bytes": 1024, "tokens": 32},
+                "full": {"turns": 100, "server_delay_ms": 5, "payload_bytes": 16384, "tokens": 64},
+            },
+        ),
+    )
+}
+
+PROFILES = ("smoke", "quick", "full")
@@ -0,0 +1,47 @@
+"""Local stand-ins for external services the benchmarks talk to.
+
+The MCP stand-in is a real FastMCP stdio server, written to the
+benchmark's scratch directory and launched with the current
+interpreter, so tool calls cross the same process boundary and JSON-RPC
+framing as a production MCP server without touching the network.
+"""
+
+from __future__ import annotations
+
+import sys
+import textwrap
+from pathlib import Path
+from typing import Any
+
+_MCP_SERVER_SOURCE = textwrap.dedent(
+    """
+    import anyio
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("bench-echo")
+
+
+    @mcp.tool()
+    async def echo(text: str, delay_ms: float = 0.0, pad: int = 0) -> str:
+        \"\"\"Return text after delay_ms, padded with pad bytes.\"\"\"
+        if delay_ms:
+            await anyio.sleep(delay_ms / 1000.0)
+        return text + ("." * pad)
+
+
+    mcp.run()
+    """
+)
+
+
+def mcp_server_config(workdir: Path, name: str = "bench-echo") -> dict[str, Any]:
+    """Write the stand-in MCP server and return a ToolRegistry server config."""
+    script = workdir / "bench_mcp_server.py"
+    script.write_text(_MCP_SERVER_SOURCE, encoding="utf-8")
+    return {
+        "name": name,
+        "transport": "stdio",
+        "command": sys.executable,
+        "args": [str(script)],
+        "description": "Benchmark stand-in MCP server",
+    }
@@ -84,6 +84,11 @@ def main() -> None:
 
     register_janitor_commands(subparsers)
 
+    # Performance benchmarks against stored baselines
+    from framework.benchmarks.cli import register_bench_commands
+
+    register_bench_commands(subparsers)
+
     args = parser.parse_args()
 
     if hasattr(args, "func"):
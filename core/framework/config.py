@@ -1023,6 +1023,8 @@ class RetentionConfig:
     enabled: bool = True  # master kill switch
     mode: str = "archive"  # "archive" | "delete" — disposal for tiers 2/3
     archive_dir: str = ""  # default: $HIVE_HOME/archive
+    archive_compression: str = "auto"  # "auto" (zstd when installed) | "zstd" | "gzip"
+    archive_workers: int = 0  # archiving processes; 0 = half the CPUs, max 4
     # Tier 1 — debug stores, always plain-deleted (no corpus value).
     event_logs_days: int = 7
     llm_logs_days: int = 7
@@ -1036,7 +1038,8 @@ class RetentionConfig:
     events_rewrite_min_bytes: int = 1_000_000
     # Safety / pacing.
     active_grace_hours: int = 48
-    io_sleep_ms: int = 10
+    io_budget_mb_per_sec: int = 50  # bytes disposed per second, averaged; 0 = unpaced
+    io_sleep_ms: int = 0  # extra fixed sleep per item, on top of the budget
     batch_size: int = 200
     junk_min_bytes: int = 50_000_000
 
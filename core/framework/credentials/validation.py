@@ -523,24 +523,29 @@ def _check_credential(
     # Phase 2: health-check present credentials
     if to_verify:
         try:
-            from aden_tools.credentials import check_credential_health
+            from aden_tools.credentials import check_credentials_health
         except ImportError:
-            check_credential_health = None  # type: ignore[assignment]
+            check_credentials_health = None  # type: ignore[assignment]
 
-        if check_credential_health is not None:
+        if check_credentials_health is not None:
+            batch = []
             for idx in to_verify:
                 status = all_credentials[idx]
                 spec = CREDENTIAL_SPECS[status.credential_name]
                 value = store.get(status.credential_id)
                 if not value:
                     continue
+                kwargs = {
+                    "health_check_endpoint": spec.health_check_endpoint,
+                    "health_check_method": spec.health_check_method,
+                }
+                batch.append((status, (status.credential_name, value, kwargs)))
+            # Checked concurrently; see aden_tools.credentials.health_check.
+            results = check_credentials_health([request for _, request in batch], return_exceptions=True)
+            for (status, _request), result in zip(batch, results, strict=True):
                 try:
-                    result = check_credential_health(
-                        status.credential_name,
-                        value,
-                        health_check_endpoint=spec.health_check_endpoint,
-                        health_check_method=spec.health_check_method,
-                    )
+                    if isinstance(result, BaseException):
+                        raise result
                     status.valid = result.valid
                     status.validation_message = result.message
                     if result.valid:
@@ -1,15 +1,32 @@
-"""Host layer -- how agents are triggered and hosted."""
-
-from framework.host.colony_runtime import (  # noqa: F401
-    ColonyConfig,
-    ColonyRuntime,
-    StreamEventBus,
-    TriggerSpec,
-)
-from framework.host.event_bus import AgentEvent, EventBus, EventType  # noqa: F401
-from framework.host.worker import (  # noqa: F401
-    Worker,
-    WorkerInfo,
-    WorkerResult,
-    WorkerStatus,
-)
+"""Host layer -- how agents are triggered and hosted.
+
+Exports are resolved on first access.  Light submodules such as
+``colony_binding`` and ``triggers`` are imported on their own (by the
+session manager, ``hive session list --cold``) and should not load the
+colony runtime, the agent loop and the LLM providers with them.
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    "ColonyConfig": "framework.host.colony_runtime",
+    "ColonyRuntime": "framework.host.colony_runtime",
+    "StreamEventBus": "framework.host.colony_runtime",
+    "TriggerSpec": "framework.host.colony_runtime",
+    "AgentEvent": "framework.host.event_bus",
+    "EventBus": "framework.host.event_bus",
+    "EventType": "framework.host.event_bus",
+    "Worker": "framework.host.worker",
+    "WorkerInfo": "framework.host.worker",
+    "WorkerResult": "framework.host.worker",
+    "WorkerStatus": "framework.host.worker",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
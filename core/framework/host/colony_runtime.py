@@ -12,6 +12,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
 import os
@@ -25,6 +26,7 @@
 from framework.agent_loop.types import AgentContext, AgentSpec
 from framework.host.colony_binding import ColonyBinding
 from framework.host.event_bus import AgentEvent, EventBus, EventType
+from framework.host.trigger_scheduler import TriggerFire, TriggerScheduler, default_trigger_scheduler
 from framework.host.triggers import TriggerDefinition
 from framework.host.worker import (
     STOP_TIMEOUT_SEC as WORKER_STOP_TIMEOUT_SEC,
@@ -478,7 +480,7 @@ def __init__(
         # Timer/webhook infrastructure
         self._event_subscriptions: list[str] = []
         self._timer_tasks: list[asyncio.Task] = []
-        self._timer_next_fire: dict[str, float] = {}
+        self._trigger_scheduler: TriggerScheduler | None = None
         self._webhook_server: Any = None
         # Background tasks owned by the runtime that aren't timers —
         # e.g. the per-spawn soft/hard timeout watchers kicked off by
@@ -1293,6 +1295,7 @@ async def start(self) -> None:
                 wh_config = WebhookServerConfig(
                     host=self._config.webhook_host,
                     port=self._config.webhook_port,
+                    journal_dir=self._storage_path / "webhooks",
                 )
                 self._webhook_server = WebhookServer(self._event_bus, wh_config)
                 for rc in self._config.webhook_routes:
@@ -2715,10 +2718,9 @@ def get_entry_points(self) -> list[TriggerSpec]:
         return list(self._triggers.values())
 
     def get_timer_next_fire_in(self, trigger_id: str) -> float | None:
-        mono = self._timer_next_fire.get(trigger_id)
-        if mono is not None:
-            return max(0.0, mono - time.monotonic())
-        return None
+        if self._trigger_scheduler is None:
+            return None
+        return self._trigger_scheduler.next_fire_in(self._timer_key(trigger_id))
 
     def get_worker_result(self, worker_id: str) -> WorkerResult | None:
         return self._execution_results.get(worker_id)
@@ -2844,59 +2846,70 @@ def _prune_idempotency_keys(self) -> None:
                 old_key, _ = self._idempotency_keys.popitem(last=False)
                 self._idempotency_times.pop(old_key, None)
 
+    def _timer_key(self, trigger_id: str) -> str:
+        return f"colony:{self._stream_id}:{trigger_id}"
+
     async def _start_timers(self) -> None:
+        """Register timer triggers with the process-wide trigger scheduler.
+
+        Each registration is held by a task in ``_timer_tasks``;
+        cancelling it (as ``stop()`` does) unregisters the trigger.
+        """
         for trig_id, spec in self._triggers.items():
             if spec.trigger_type != "timer":
                 continue
             tc = spec.trigger_config
             _raw_interval = tc.get("interval_minutes")
             interval = float(_raw_interval) if _raw_interval is not None else None
-            run_immediately = tc.get("run_immediately", False)
+            cron_expr = tc.get("cron")
+            if not cron_expr and not (interval and interval > 0):
+                continue
 
-            if interval and interval > 0 and self._running:
-                task = asyncio.create_task(
-                    self._timer_loop(trig_id, interval, run_immediately),
-                    name=f"timer:{trig_id}",
+            if self._trigger_scheduler is None:
+                self._trigger_scheduler = default_trigger_scheduler()
+            try:
+                task = self._trigger_scheduler.schedule_task(
+                    self._timer_key(trig_id),
+                    functools.partial(self._on_timer_fire, trig_id),
+                    interval_seconds=interval * 60 if interval else None,
+                    cron=cron_expr,
+                    run_immediately=bool(tc.get("run_immediately", False)),
+                    jitter_seconds=float(tc.get("jitter_seconds") or 0.0),
                 )
-                task.add_done_callback(self._on_timer_task_done)
-                self._timer_tasks.append(task)
+            except ValueError as exc:
+                logger.warning("Timer trigger '%s' not scheduled: %s", trig_id, exc)
+                continue
+            task.add_done_callback(self._on_timer_task_done)
+            self._timer_tasks.append(task)
 
-    async def _timer_loop(
+    async def _on_timer_fire(
         self,
         trigger_id: str,
-        interval_minutes: float,
-        immediate: bool,
+        fire: TriggerFire,
         idle_timeout: float = 300,
     ) -> None:
-        interval_secs = interval_minutes * 60
-        if not immediate:
-            self._timer_next_fire[trigger_id] = time.monotonic() + interval_secs
-            await asyncio.sleep(interval_secs)
-
-        while self._running:
-            if self._timers_paused:
-                self._timer_next_fire[trigger_id] = time.monotonic() + interval_secs
-                await asyncio.sleep(interval_secs)
-                continue
-
-            idle = self.agent_idle_seconds
-            if idle < idle_timeout:
-                logger.debug("Timer '%s': agent active, skipping", trigger_id)
-                self._timer_next_fire[trigger_id] = time.monotonic() + interval_secs
-                await asyncio.sleep(interval_secs)
-                continue
+        if not self._running or self._timers_paused:
+            return
 
-            self._timer_next_fire.pop(trigger_id, None)
-            try:
-                await self.trigger(
-                    trigger_id,
-                    {"event": {"source": "timer", "reason": "scheduled"}},
-                )
-            except Exception:
-                logger.error("Timer trigger failed for '%s'", trigger_id, exc_info=True)
+        idle = self.agent_idle_seconds
+        if idle < idle_timeout:
+            logger.debug("Timer '%s': agent active, skipping", trigger_id)
+            return
 
-            self._timer_next_fire[trigger_id] = time.monotonic() + interval_secs
-            await asyncio.sleep(interval_secs)
+        try:
+            await self.trigger(
+                trigger_id,
+                {
+                    "event": {
+                        "source": "timer",
+                        "reason": "scheduled",
+                        "scheduled_at": fire.scheduled_at,
+                        "missed_ticks": fire.missed,
+                    }
+                },
+            )
+        except Exception:
+            logger.error("Timer trigger failed for '%s'", trigger_id, exc_info=True)
 
     async def cancel_all_tasks_async(self) -> bool:
         cancelled = False
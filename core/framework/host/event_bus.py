@@ -649,8 +649,9 @@ def _write_session_log_event(self, event: AgentEvent) -> None:
             )
 
         line = json.dumps(_event_to_disk_dict(event), default=str)
+        ts = event.timestamp.timestamp()
         for sink in self._sinks_for(event):
-            sink.write(line)
+            sink.write(line, timestamp=ts)
 
         # A worker's log is closed on its terminal report — the one event every
         # worker is guaranteed to emit exactly once.
@@ -686,8 +687,9 @@ def _flush_pending_snapshots(
                 line = json.dumps(_event_to_disk_dict(evt), default=str)
                 # Coalesced deltas are per-stream, so they route per-stream too —
                 # a worker's prose snapshot belongs in the worker's log.
+                ts = evt.timestamp.timestamp()
                 for sink in self._sinks_for(evt):
-                    sink.write(line)
+                    sink.write(line, timestamp=ts)
                     flushed.append(sink)
             except Exception:
                 pass
@@ -0,0 +1,347 @@
+"""Fixed-width sidecar index for append-only ``events.jsonl`` logs.
+
+Every event log gets an ``<name>.idx`` file next to it holding one 24-byte
+record per non-blank line, in file order::
+
+    offset     u64   byte offset of the line's first byte
+    length     u32   line length in bytes, excluding the trailing ``\\n``
+    crc        u32   crc32 of the line bytes (staleness check)
+    watermark  f64   running max of event timestamps up to this line (epoch)
+
+Record ``i`` is the event with 1-based sequence number ``i + 1`` — the same
+absolute line index the events/history route already stamps as ``seq``.
+That gives O(1) totals (index size / record size), O(1) seeks by sequence
+number, and O(log n) seeks by time: ``watermark`` is monotonic even though
+raw timestamps are not (coalesced streaming snapshots keep the timestamp of
+their *first* delta but are written at turn end).
+
+:class:`~framework.host.event_log.EventLogFile` appends a record for each line
+it writes. Lines that reach the log any other way (the routes that append a
+marker directly, or logs written before the index existed) leave the index
+behind the log; readers call :meth:`EventLogIndex.sync`, which catches the
+index up from its last covered byte. The writer never rebuilds or waits —
+if a reader holds the lock, the writer skips the record and the next
+``sync`` fills the gap. A log that was truncated or rewritten in place is
+detected by the last record's offset and crc and re-indexed from scratch.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import struct
+import threading
+import weakref
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import IO
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+
+_MAGIC = b"HIVEIDX1"
+_RECORD = struct.Struct("<QIId")
+_RECORD_SIZE = _RECORD.size
+_SCAN_CHUNK_BYTES = 1 << 20
+
+# The top-level ``timestamp`` is serialised after ``data`` by
+# ``AgentEvent.to_dict``, so the LAST match on a line is the event's own
+# (a nested ``data.timestamp`` would come first). Tolerates both the bus's
+# ``": "`` and the janitor's compact ``":"`` separators.
+_TIMESTAMP_RE = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+
+def index_path_for(log_path: Path) -> Path:
+    """Sidecar path for ``log_path`` (``events.jsonl`` → ``events.jsonl.idx``)."""
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def _parse_timestamp(line: bytes) -> float | None:
+    matches = _TIMESTAMP_RE.findall(line)
+    if not matches:
+        return None
+    try:
+        return datetime.fromisoformat(matches[-1].decode("ascii", errors="replace")).timestamp()
+    except ValueError:
+        return None
+
+
+class EventLogIndex:
+    """Sidecar index for one event log. Get instances via :meth:`for_log`.
+
+    One instance per log per process, so the bus's writer and the history
+    route's reader threads share the same lock and cached tail state.
+    """
+
+    _registry: weakref.WeakValueDictionary[str, EventLogIndex] = weakref.WeakValueDictionary()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.path = index_path_for(log_path)
+        self._lock = threading.Lock()
+        self._fh: IO[bytes] | None = None
+        # Cached tail state, valid only while ``_loaded``.
+        self._loaded = False
+        self._count = 0
+        self._end = 0  # first log byte not covered by the index
+        self._watermark = 0.0
+
+    @classmethod
+    def for_log(cls, log_path: Path) -> EventLogIndex:
+        key = os.path.abspath(log_path)
+        with cls._registry_lock:
+            idx = cls._registry.get(key)
+            if idx is None:
+                idx = cls(Path(key))
+                cls._registry[key] = idx
+            return idx
+
+    @classmethod
+    def discard(cls, log_path: Path) -> None:
+        """Drop the sidecar for a log that was rewritten out of band.
+
+        Used by the janitor after it replaces ``events.jsonl`` — offsets into
+        the old inode mean nothing for the new one.
+        """
+        idx = cls.for_log(log_path)
+        with idx._lock:
+            idx._close_fh()
+            idx._loaded = False
+            try:
+                idx.path.unlink(missing_ok=True)
+            except OSError as err:
+                logger.debug("could not remove event index %s: %s", idx.path, err)
+
+    # ------------------------------------------------------------------
+    # Writer path
+    # ------------------------------------------------------------------
+
+    def append(self, offset: int, line: bytes, timestamp: float | None) -> None:
+        """Record ``line`` (no trailing newline) written at ``offset``.
+
+        Called by :class:`EventLogFile` after every write. Never blocks on a
+        reader and never raises: if the lock is busy, or ``offset`` is not
+        where the index currently ends (something else appended to the log),
+        the record is skipped and the next :meth:`sync` picks the line up
+        from the log itself.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if not self._loaded:
+                self._load()
+            if offset != self._end:
+                return
+            self._write_records([(offset, line, timestamp)])
+        except OSError as err:
+            logger.debug("event index append failed for %s: %s", self.path, err)
+            self._loaded = False
+        finally:
+            self._lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_fh()
+
+    # ------------------------------------------------------------------
+    # Reader path
+    # ------------------------------------------------------------------
+
+    def sync(self) -> int:
+        """Bring the index up to date with the log and return the event count.
+
+        Indexes any lines past the last covered byte (or the whole log when
+        the sidecar is missing, stale or corrupt). A final line without a
+        trailing newline is counted but not recorded — it may be a write
+        still in flight.
+        """
+        with self._lock:
+            # Always re-validate: the cached tail may predate a rewrite.
+            self._load()
+            try:
+                size = self.log_path.stat().st_size
+            except FileNotFoundError:
+                self._reset()
+                return 0
+            if size < self._end:
+                self._reset()
+            pending: list[tuple[int, bytes, float | None]] = []
+            tail = 0
+            with open(self.log_path, "rb") as fb:
+                fb.seek(self._end)
+                pos = self._end
+                carry = b""
+                while pos < size:
+                    chunk = fb.read(min(_SCAN_CHUNK_BYTES, size - pos))
+                    if not chunk:
+                        break
+                    pos += len(chunk)
+                    buf = carry + chunk
+                    base = pos - len(buf)
+                    start = 0
+                    while True:
+                        nl = buf.find(b"\n", start)
+                        if nl < 0:
+                            break
+                        pending.append((base + start, buf[start:nl], None))
+                        start = nl + 1
+                    carry = buf[start:]
+                    if len(pending) >= 4096:
+                        self._write_records(pending, parse=True)
+                        pending = []
+                if carry.strip():
+                    tail = 1
+            if pending:
+                self._write_records(pending, parse=True)
+            return self._count + tail
+
+    def count(self) -> int:
+        """Indexed event count without touching the log (call :meth:`sync` first)."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._count
+
+    def offset_of(self, seq: int) -> int:
+        """Byte offset of the event with 1-based sequence number ``seq``.
+
+        ``seq`` past the indexed range maps to the end of the indexed region,
+        so it is always a valid ``before_offset`` cursor.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if seq <= 1:
+                return 0
+            if seq > self._count:
+                return self._end
+            return self._read_record(seq - 1)[0]
+
+    def seq_at_or_after(self, timestamp: float) -> int:
+        """1-based sequence number of the first event at or after ``timestamp``.
+
+        Binary search over the watermark column. Returns ``count + 1`` when
+        every indexed event is older.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            lo, hi = 0, self._count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._read_record(mid)[3] < timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo + 1
+
+    def byte_range(self, first_seq: int, last_seq: int) -> tuple[int, int]:
+        """``[start, end)`` byte span of events ``first_seq..last_seq`` inclusive.
+
+        Each span is a single contiguous read, so callers can split a large
+        range into sub-ranges and read them concurrently.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            first = max(1, first_seq)
+            last = min(self._count, last_seq)
+            if self._count == 0 or first > last:
+                return self._end, self._end
+            start = self._read_record(first - 1)[0]
+            off, length, _crc, _wm = self._read_record(last - 1)
+            return start, off + length + 1
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds ``_lock``)
+    # ------------------------------------------------------------------
+
+    def _read_record(self, i: int) -> tuple[int, int, int, float]:
+        with open(self.path, "rb") as fb:
+            fb.seek(len(_MAGIC) + i * _RECORD_SIZE)
+            return _RECORD.unpack(fb.read(_RECORD_SIZE))
+
+    def _load(self) -> bool:
+        """Read the tail record and check it still describes the log.
+
+        O(1): one record and one log line are read. On any mismatch the
+        sidecar is reset to empty and ``False`` is returned; the next
+        :meth:`sync` rebuilds it.
+        """
+        self._loaded = True
+        try:
+            idx_size = self.path.stat().st_size
+        except FileNotFoundError:
+            return self._reset()
+        body = idx_size - len(_MAGIC)
+        if body < 0 or body % _RECORD_SIZE:
+            return self._reset()
+        try:
+            with open(self.path, "rb") as fb:
+                if fb.read(len(_MAGIC)) != _MAGIC:
+                    return self._reset()
+                count = body // _RECORD_SIZE
+                if count == 0:
+                    self._count, self._end, self._watermark = 0, 0, 0.0
+                    return True
+                fb.seek(len(_MAGIC) + (count - 1) * _RECORD_SIZE)
+                off, length, crc, watermark = _RECORD.unpack(fb.read(_RECORD_SIZE))
+            with open(self.log_path, "rb") as lf:
+                lf.seek(off)
+                line = lf.read(length + 1)
+        except OSError:
+            return self._reset()
+        if len(line) != length + 1 or line[-1:] != b"\n" or zlib.crc32(line[:-1]) != crc:
+            return self._reset()
+        self._count, self._end, self._watermark = count, off + length + 1, watermark
+        return True
+
+    def _reset(self) -> bool:
+        self._close_fh()
+        self._count, self._end, self._watermark = 0, 0, 0.0
+        self._loaded = True
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as fb:
+                fb.write(_MAGIC)
+        except OSError as err:
+            logger.debug("could not reset event index %s: %s", self.path, err)
+        return False
+
+    def _write_records(self, rows: list[tuple[int, bytes, float | None]], *, parse: bool = False) -> None:
+        out = bytearray()
+        watermark = self._watermark
+        for offset, line, ts in rows:
+            if not line.strip():
+                continue
+            if ts is None and parse:
+                ts = _parse_timestamp(line)
+            if ts is not None and ts > watermark:
+                watermark = ts
+            out += _RECORD.pack(offset, len(line), zlib.crc32(line), watermark)
+            self._count += 1
+            self._end = offset + len(line) + 1
+        if rows:
+            last_off, last_line, _ = rows[-1]
+            self._end = max(self._end, last_off + len(last_line) + 1)
+        self._watermark = watermark
+        if not out:
+            return
+        if self._fh is None:
+            self._fh = open(self.path, "ab")  # noqa: SIM115
+        self._fh.write(out)
+        self._fh.flush()
+
+    def _close_fh(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+        finally:
+            self._fh = None
@@ -9,14 +9,21 @@
 left a closed handle in place and every subsequent event was silently dropped
 for the rest of the session — ``parts/`` kept growing while the desktop's chat
 view froze mid-session (the 2026-07-02 01:04:30 incident).
+
+Each successful write also appends a record to the log's sidecar
+:class:`~framework.host.event_index.EventLogIndex`, so readers get totals and
+seeks without scanning the file.
 """
 
 from __future__ import annotations
 
 import logging
+import os
 from pathlib import Path
 from typing import IO
 
+from framework.host.event_index import EventLogIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +41,7 @@ def __init__(self, path: Path) -> None:
         # the WARN so a persistently broken handle doesn't spam the runtime log
         # on every publish. A successful reopen resets it.
         self._broken = False
+        self.index = EventLogIndex.for_log(path)
         self._open()
 
     @property
@@ -54,13 +62,18 @@ def _reopen(self) -> None:
             self._fh = None
         self._open()
 
-    def write(self, line: str) -> None:
-        """Append ``line`` (newline added) and flush. Never raises."""
+    def write(self, line: str, *, timestamp: float | None = None) -> None:
+        """Append ``line`` (newline added) and flush. Never raises.
+
+        ``timestamp`` (epoch seconds) feeds the sidecar index's time column;
+        callers that don't have one can omit it.
+        """
         if self._fh is None:
             return
         try:
             self._fh.write(line + "\n")
             self._fh.flush()
+            self._index_line(line, timestamp)
             return
         except (ValueError, OSError):
             # ValueError: I/O operation on closed file — the specific 01:04:30
@@ -72,6 +85,7 @@ def write(self, line: str) -> None:
             self._reopen()
             self._fh.write(line + "\n")  # type: ignore[union-attr]
             self._fh.flush()  # type: ignore[union-attr]
+            self._index_line(line, timestamp)
             if self._broken:
                 logger.info("Event log recovered → %s", self.path)
             self._broken = False
@@ -83,6 +97,21 @@ def write(self, line: str) -> None:
                 self._broken = True
                 logger.warning("Event log reopen failed for %s: %s", self.path, second_err)
 
+    def _index_line(self, line: str, timestamp: float | None) -> None:
+        """Record the line just written in the sidecar index.
+
+        The append-mode position after the flush is the end of *our* write
+        even if another writer appended in between, so the line's start is
+        derived backwards from it. Text mode translates ``\n`` to
+        ``os.linesep``; the index stores exactly the bytes on disk.
+        """
+        try:
+            data = (line + os.linesep).encode("utf-8")
+            end = self._fh.tell()  # type: ignore[union-attr]
+        except (ValueError, OSError):
+            return
+        self.index.append(end - len(data), data[:-1], timestamp)
+
     def flush(self) -> None:
         if self._fh is None:
             return
@@ -92,6 +121,7 @@ def flush(self) -> None:
             pass
 
     def close(self) -> None:
+        self.index.close()
         if self._fh is None:
             return
         try:
@@ -0,0 +1,477 @@
+"""
+Trigger Scheduler - One deadline heap for every timer trigger in the process.
+
+Timer triggers used to run one asyncio task each, sleeping the interval
+after every fire, so a schedule drifted by the runtime of each fire and
+thousands of triggers meant thousands of sleeping tasks.  Here every
+trigger is an entry in a single min-heap keyed on its next deadline,
+served by one task per event loop:
+
+* Deadlines are absolute.  An interval trigger's ticks sit on the grid
+  ``anchor + k * interval`` and a cron trigger's on its matches, so a
+  slow fire never pushes later ticks back.  Optional per-trigger jitter
+  is added to each deadline but never to the grid.
+* Ticks that pass while a trigger is still running, or while the
+  process was down, are caught up according to the entry's policy:
+  ``"latest"`` fires once for all of them, ``"all"`` fires each (up to
+  ``max_catch_up``), and ``"skip"`` drops any older than
+  ``grace_seconds``.
+* At most ``max_concurrent`` callbacks run at once; when many triggers
+  fall due together the rest wait in deadline order.
+* Next deadlines are saved to ``state_path`` (``HIVE_HOME/triggers/
+  schedule.json`` for the default scheduler), so a restarted trigger
+  keeps its phase and its missed ticks can be caught up.
+
+Times are wall-clock epoch seconds from an injectable ``clock``, which
+is what tests replace to drive the scheduler without sleeping.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from framework.host.triggers import cron_is_valid
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = int(os.environ.get("HIVE_TRIGGER_MAX_CONCURRENT", "32"))
+
+CATCH_UP_POLICIES = ("latest", "all", "skip")
+
+# Longest the run loop sleeps before re-reading the clock, so wall-clock
+# jumps (NTP, suspend/resume) are noticed.
+_MAX_SLEEP = 30.0
+
+# Stop counting missed cron ticks past this many; the next deadline is
+# then found from the current time instead.
+_MAX_CRON_WALK = 10_000
+
+# Saved deadlines of triggers nobody has registered for this long are
+# dropped when the state file is loaded.
+_STATE_TTL_SECONDS = 30 * 24 * 3600
+
+
+@dataclass
+class TriggerFire:
+    """What a callback is told about the tick it is running for."""
+
+    key: str
+    scheduled_at: float  # the tick's deadline, without jitter
+    fired_at: float
+    missed: int = 0  # earlier ticks folded into this fire
+    next_at: float | None = None  # the following tick, without jitter
+
+
+TriggerCallback = Callable[[TriggerFire], Awaitable[None]]
+
+
+@dataclass
+class TriggerSchedulerStats:
+    fired: int = 0
+    coalesced: int = 0
+    skipped: int = 0
+    failed: int = 0
+    max_inflight: int = 0
+
+
+@dataclass
+class _Entry:
+    key: str
+    callback: TriggerCallback
+    interval: float | None
+    cron: str | None
+    jitter: float
+    catch_up: str
+    base: float = 0.0  # next tick, without jitter
+    deadline: float = 0.0
+    generation: int = 0
+    running: bool = False
+    # One croniter per cron entry, kept positioned at ``cron_at`` so
+    # each tick is a single get_next() rather than a fresh parse.
+    cron_iter: Any = None
+    cron_at: float | None = None
+
+    @property
+    def schedule(self) -> str:
+        return f"cron:{self.cron}" if self.cron else f"interval:{self.interval!r}"
+
+    def first_after(self, t: float) -> float:
+        """First tick strictly after ``t``."""
+        if self.interval:
+            return t + self.interval
+        self._seek(t)
+        self.cron_at = self.cron_iter.get_next(float)
+        return self.cron_at
+
+    def _seek(self, t: float) -> None:
+        from croniter import croniter
+
+        self.cron_iter = croniter(self.cron, datetime.fromtimestamp(t, tz=UTC))
+        self.cron_at = t
+
+    def due_ticks(self, now: float) -> tuple[int, float, float]:
+        """Walk the ticks from ``base`` that are at or before ``now``:
+        returns ``(count, last of them, the tick after it)``.  A cron
+        walk stops after ``_MAX_CRON_WALK`` ticks."""
+        if self.interval:
+            count = max(1, math.floor((now - self.base) / self.interval) + 1)
+            latest = self.base + self.interval * (count - 1)
+            return count, latest, latest + self.interval
+        if self.cron_at != self.base:
+            self._seek(self.base)
+        count, latest, nxt = 1, self.base, self.cron_iter.get_next(float)
+        while nxt <= now and count < _MAX_CRON_WALK:
+            count, latest, nxt = count + 1, nxt, self.cron_iter.get_next(float)
+        self.cron_at = nxt
+        return count, latest, nxt
+
+
+class TriggerScheduler:
+    """Fire timer triggers from one heap of absolute deadlines.
+
+    ``schedule()`` registers a callback under a key (replacing any entry
+    with that key) and ``cancel()`` removes it.  ``start()`` runs the
+    scheduler on the current event loop; without it, ``run_due()``
+    fires whatever is due at a given time, which is how tests drive it.
+    """
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.time,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        state_path: Path | None = None,
+        grace_seconds: float = 60.0,
+        max_catch_up: int = 100,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._clock = clock
+        self.max_concurrent = max(1, max_concurrent)
+        self.state_path = state_path
+        self.grace_seconds = grace_seconds
+        self.max_catch_up = max(1, max_catch_up)
+        self._rng = rng or random.Random()
+        self.stats = TriggerSchedulerStats()
+
+        self._entries: dict[str, _Entry] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._generation = 0
+        self._ready: deque[tuple[_Entry, TriggerFire]] = deque()
+        self._inflight: set[asyncio.Task] = set()
+        self._idle: asyncio.Event | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+        self._autostart = False
+
+        self._saved: dict[str, dict[str, Any]] = self._load_state()
+        self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def schedule(
+        self,
+        key: str,
+        callback: TriggerCallback,
+        *,
+        interval_seconds: float | None = None,
+        cron: str | None = None,
+        run_immediately: bool = False,
+        jitter_seconds: float = 0.0,
+        catch_up: str = "latest",
+    ) -> None:
+        """Register ``callback`` to run on an interval or cron schedule.
+
+        A saved deadline for ``key`` with the same schedule is resumed
+        (and caught up if it has passed); otherwise the first tick is
+        one interval (or the next cron match) from now, or now when
+        ``run_immediately`` is set.
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}, got {catch_up!r}")
+        if cron:
+            if not cron_is_valid(cron):
+                raise ValueError(f"Invalid cron expression: {cron!r}")
+            interval_seconds = None
+        elif not interval_seconds or interval_seconds <= 0:
+            raise ValueError("A trigger needs a cron expression or a positive interval")
+
+        self.cancel(key)
+        entry = _Entry(key, callback, interval_seconds, cron, max(0.0, jitter_seconds), catch_up)
+        now = self._clock()
+        saved = self._saved.get(key)
+        if saved and saved.get("schedule") == entry.schedule:
+            entry.base = float(saved["next_at"])
+        elif run_immediately:
+            entry.base = now
+        else:
+            entry.base = entry.first_after(now)
+        self._entries[key] = entry
+        self._push(entry)
+        self._remember(entry)
+        self._ensure_runner()
+
+    def cancel(self, key: str) -> bool:
+        """Unregister ``key``.  Its saved deadline is kept, so registering
+        it again with the same schedule resumes the same phase."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.generation = -1  # invalidates its heap item
+        return True
+
+    def schedule_task(self, key: str, callback: TriggerCallback, **schedule: Any) -> asyncio.Task:
+        """``schedule()`` and return a task that keeps the entry registered
+        until it is cancelled -- a drop-in for a per-trigger timer task
+        that callers already know how to cancel and await."""
+        self.schedule(key, callback, **schedule)
+        return asyncio.create_task(self._hold(key), name=f"trigger:{key}")
+
+    async def _hold(self, key: str) -> None:
+        entry = self._entries.get(key)
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if self._entries.get(key) is entry:
+                self.cancel(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def next_fire_at(self, key: str) -> float | None:
+        """Epoch seconds of ``key``'s next tick (jitter included once it
+        is queued), or None when it is not registered."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.base if entry.running else entry.deadline
+
+    def next_fire_in(self, key: str) -> float | None:
+        at = self.next_fire_at(key)
+        return None if at is None else max(0.0, at - self._clock())
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def _push(self, entry: _Entry) -> None:
+        self._generation += 1
+        entry.generation = self._generation
+        entry.deadline = entry.base + (self._rng.uniform(0.0, entry.jitter) if entry.jitter else 0.0)
+        heapq.heappush(self._heap, (entry.deadline, entry.generation, entry.key))
+        if self._wakeup is not None and self._heap[0][1] == entry.generation:
+            self._wakeup.set()
+
+    def dispatch_due(self, now: float | None = None) -> int:
+        """Queue a fire for every entry whose deadline is at or before
+        ``now``; returns how many were queued."""
+        now = self._clock() if now is None else now
+        queued = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry.generation != generation:
+                continue  # cancelled or rescheduled
+            fire = self._next_fire(entry, now)
+            self._remember(entry)
+            if fire is None:
+                self._push(entry)
+                continue
+            entry.running = True
+            self._ready.append((entry, fire))
+            queued += 1
+        self._pump()
+        return queued
+
+    def _next_fire(self, entry: _Entry, now: float) -> TriggerFire | None:
+        """Apply the entry's catch-up policy to the ticks due at ``now``
+        and advance ``entry.base``; None when nothing should fire."""
+        first = entry.base
+        count, latest, nxt = entry.due_ticks(now)
+        if entry.catch_up == "all" and 1 < count <= self.max_catch_up:
+            # Replay oldest first; the rest stay due and follow at once.
+            entry.base = entry.first_after(first)
+            return TriggerFire(key=entry.key, scheduled_at=first, fired_at=now, next_at=entry.base)
+
+        # Fire once for everything due (a backlog past ``max_catch_up``
+        # is not replayed tick by tick either).
+        entry.base = nxt if nxt > now else entry.first_after(now)
+        missed = count - 1
+        if entry.catch_up == "skip" and now - latest > self.grace_seconds and nxt > now:
+            self.stats.skipped += count
+            return None
+        self.stats.coalesced += missed
+        return TriggerFire(key=entry.key, scheduled_at=latest, fired_at=now, missed=missed, next_at=entry.base)
+
+    def _pump(self) -> None:
+        while self._ready and len(self._inflight) < self.max_concurrent:
+            entry, fire = self._ready.popleft()
+            task = asyncio.create_task(self._run_callback(entry, fire), name=f"trigger-fire:{entry.key}")
+            self._inflight.add(task)
+            task.add_done_callback(self._on_fire_done)
+        self.stats.max_inflight = max(self.stats.max_inflight, len(self._inflight))
+        if self._idle is not None:
+            if self._ready or self._inflight:
+                self._idle.clear()
+            else:
+                self._idle.set()
+
+    async def _run_callback(self, entry: _Entry, fire: TriggerFire) -> None:
+        try:
+            await entry.callback(fire)
+            self.stats.fired += 1
+        except Exception:
+            self.stats.failed += 1
+            logger.error("Trigger '%s' failed", entry.key, exc_info=True)
+        finally:
+            entry.running = False
+            if self._entries.get(entry.key) is entry:
+                self._push(entry)
+
+    def _on_fire_done(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._pump()
+
+    async def wait_idle(self) -> None:
+        """Wait until every queued and running callback has finished."""
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._pump()
+        await self._idle.wait()
+
+    async def run_due(self, now: float | None = None) -> int:
+        """Fire everything due at ``now`` and wait for the callbacks."""
+        queued = self.dispatch_due(now)
+        await self.wait_idle()
+        return queued
+
+    # ------------------------------------------------------------------
+    # Run loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Serve deadlines on the running event loop from now on.  The
+        loop task exits while nothing is registered and comes back with
+        the next ``schedule()``."""
+        self._autostart = True
+        self._ensure_runner()
+
+    def _ensure_runner(self) -> None:
+        if not self._autostart or (self._runner is not None and not self._runner.done()):
+            return
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(), name="trigger-scheduler")
+
+    async def stop(self) -> None:
+        """Stop the run loop and cancel queued and running fires."""
+        self._autostart = False
+        for entry, _ in self._ready:
+            entry.running = False
+            self._push(entry)
+        self._ready.clear()
+        tasks = [t for t in (self._runner, *self._inflight) if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        self._save_if_dirty()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        wakeup = self._wakeup
+        while self._autostart and (self._entries or self._inflight or self._ready):
+            while self._heap and self._entries.get(self._heap[0][2]) is None:
+                heapq.heappop(self._heap)
+            delay = self._heap[0][0] - self._clock() if self._heap else _MAX_SLEEP
+            if delay > 0:
+                # A timer handle rather than wait_for(): no task per sleep,
+                # and a cancel from stop() is never swallowed.
+                wakeup.clear()
+                handle = loop.call_later(min(delay, _MAX_SLEEP), wakeup.set)
+                try:
+                    await wakeup.wait()
+                finally:
+                    handle.cancel()
+                continue
+            self.dispatch_due()
+            if self._dirty:
+                await asyncio.to_thread(self._save_if_dirty)
+        self._save_if_dirty()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _remember(self, entry: _Entry) -> None:
+        if self.state_path is None:
+            return
+        self._saved[entry.key] = {"schedule": entry.schedule, "next_at": entry.base, "updated": self._clock()}
+        self._dirty = True
+
+    def _load_state(self) -> dict[str, dict[str, Any]]:
+        if self.state_path is None:
+            return {}
+        try:
+            raw = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Trigger schedule %s is unreadable; starting fresh", self.state_path)
+            return {}
+        horizon = self._clock() - _STATE_TTL_SECONDS
+        return {k: v for k, v in raw.get("triggers", {}).items() if isinstance(v, dict) and v.get("updated", 0) >= horizon and "next_at" in v}
+
+    def _save_if_dirty(self) -> None:
+        if not self._dirty or self.state_path is None:
+            return
+        self._dirty = False
+        snapshot = dict(self._saved)
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.state_path) as f:
+                json.dump({"triggers": snapshot}, f, separators=(",", ":"))
+        except OSError:
+            self._dirty = True
+            logger.warning("Failed to save trigger schedule %s", self.state_path, exc_info=True)
+
+    def save(self) -> None:
+        """Write pending deadline changes to ``state_path`` now."""
+        self._save_if_dirty()
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TriggerScheduler]" = weakref.WeakKeyDictionary()
+_schedulers_lock = threading.Lock()
+
+
+def default_trigger_scheduler() -> TriggerScheduler:
+    """The running event loop's scheduler, saving to
+    ``HIVE_HOME/triggers/schedule.json`` and shared by every colony and
+    queen session on that loop."""
+    from framework import config
+
+    loop = asyncio.get_running_loop()
+    with _schedulers_lock:
+        scheduler = _schedulers.get(loop)
+        if scheduler is None:
+            scheduler = TriggerScheduler(state_path=config.HIVE_HOME / "triggers" / "schedule.json")
+            _schedulers[loop] = scheduler
+    scheduler.start()
+    return scheduler
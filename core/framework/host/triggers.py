@@ -1,9 +1,10 @@
 """Trigger definitions and missed-fire math for queen-level heartbeats.
 
 A trigger's runtime is managed by ``framework.tools.queen_lifecycle_tools``
-(``_start_trigger_timer`` / ``_start_trigger_webhook``); this module
-holds the persistent shape and the pure helpers used to reconstruct
-what ticks would have fired during a session-closed gap.
+(``_start_trigger_timer`` / ``_start_trigger_webhook``), with timers
+fired by ``framework.host.trigger_scheduler``; this module holds the
+persistent shape and the pure helpers used to reconstruct what ticks
+would have fired during a session-closed gap.
 
 The session-load path in ``framework.server.session_manager`` calls
 ``compute_missed`` on every load and emits ``EventType.MISSED_TRIGGERS``
@@ -12,6 +13,7 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import time
 from dataclasses import dataclass, field
@@ -90,21 +92,30 @@ def _parse_iso(ts: str | None) -> datetime | None:
     return dt.astimezone(UTC)
 
 
+@functools.lru_cache(maxsize=1024)
+def cron_is_valid(cron_expr: str) -> bool:
+    """Whether ``cron_expr`` parses; cached, since every schedule check
+    and every missed-tick computation asks again for the same few
+    expressions. False when croniter is not installed."""
+    try:
+        from croniter import croniter
+    except ImportError:
+        logger.warning("croniter not installed; cron triggers are disabled")
+        return False
+    return bool(croniter.is_valid(cron_expr))
+
+
 def _missed_for_cron(cron_expr: str, since: datetime, now: datetime) -> tuple[int, list[str], str | None]:
     """Return (count, ticks_iso, next_due_iso) for a cron trigger.
 
     Counts how many cron matches lie strictly after ``since`` and at-or-
     before ``now``. ``next_due_at`` is the first match strictly after
-    ``now`` (i.e. the next future fire).
+    ``now`` (i.e. the next future fire) -- the match that ends the walk.
     """
-    try:
-        from croniter import croniter
-    except ImportError:
-        logger.warning("croniter not installed; cannot compute missed cron ticks")
+    if not cron_is_valid(cron_expr):
         return 0, [], None
 
-    if not croniter.is_valid(cron_expr):
-        return 0, [], None
+    from croniter import croniter
 
     ticks: list[str] = []
     count = 0
@@ -117,9 +128,7 @@ def _missed_for_cron(cron_expr: str, since: datetime, now: datetime) -> tuple[in
         if len(ticks) < _MAX_REPORTED_TICKS:
             ticks.append(nxt.astimezone(UTC).isoformat())
 
-    future = croniter(cron_expr, now).get_next(datetime)
-    next_due = future.astimezone(UTC).isoformat()
-    return count, ticks, next_due
+    return count, ticks, nxt.astimezone(UTC).isoformat()
 
 
 def _missed_for_interval(interval_minutes: float, since: datetime, now: datetime) -> tuple[int, list[str], str | None]:
@@ -0,0 +1,317 @@
+"""
+Webhook Journal - Append-only, group-committed log of accepted webhooks.
+
+The webhook server acknowledges a delivery only once it is in this
+journal, and publishes to the EventBus from the journal afterwards.  A
+burst from a provider then costs one fsync per batch of requests rather
+than a full trip through the bus per request, and a restart mid-burst
+replays what was acknowledged but not yet published.
+
+Layout under ``root``::
+
+    journal-<first seq>.jsonl   # one JSON record per line, rotated by size
+    cursor.json                 # highest seq published to the bus
+    dead-letter.jsonl           # deliveries that never published, kept for replay by hand
+
+Appends made while a write is in flight are written and fsynced together
+by the next write (group commit), so throughput grows with concurrency
+instead of being capped at one fsync per request.  Publishing is
+at-least-once: a crash between publishing and saving the cursor replays
+those records on the next start.  A delivery that still fails after the
+server's retries is copied to ``dead-letter.jsonl`` so the cursor can move
+past it; one stuck record would otherwise hold the cursor, and with it
+the backlog limit and segment cleanup, for the life of the process.
+
+Deliveries are deduplicated on the provider's delivery ID header for
+``dedup_window_seconds``.  Without one, a delivery is only deduplicated
+on a hash of its path and body when its route opts in -- identical pings
+and heartbeats are legitimately repeated -- and never when the body is
+empty.  A segment is deleted once everything in it is published and
+older than that window, so the keys can be rebuilt from the journal
+after a restart.
+
+Credentials and signatures are redacted from the headers before a record
+is written, so the journal never holds them at rest.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Headers providers use to identify a delivery, so redeliveries of one
+# event share a key (checked in order, case-insensitively).
+DELIVERY_ID_HEADERS = (
+    "X-GitHub-Delivery",
+    "X-Gitlab-Event-UUID",
+    "X-Shopify-Webhook-Id",
+    "Webhook-Id",  # Standard Webhooks (Svix, Resend, ...)
+    "X-Webhook-Id",
+    "X-Delivery-Id",
+    "Idempotency-Key",
+)
+
+
+# Header names (lowercase) whose values are secrets, and substrings that
+# mark provider-specific signature / token headers.
+_SECRET_HEADERS = frozenset({"authorization", "proxy-authorization", "cookie", "set-cookie"})
+_SECRET_HEADER_PARTS = ("signature", "token", "secret", "api-key", "apikey", "hmac")
+REDACTED = "[redacted]"
+
+
+def delivery_key(path: str, headers: Any, body: bytes, *, hash_body: bool = False) -> str | None:
+    """Deduplication key for a delivery: its provider delivery ID when
+    present; else, if ``hash_body`` and the body is non-empty, a hash of
+    the path and body; else None (never deduplicated)."""
+    for name in DELIVERY_ID_HEADERS:
+        value = headers.get(name)
+        if value:
+            return f"id:{path}:{value}"
+    if not hash_body or not body:
+        return None
+    digest = hashlib.sha256(path.encode("utf-8") + b"\0" + body).hexdigest()
+    return f"sha256:{digest}"
+
+
+def redact_headers(headers: Any) -> dict[str, str]:
+    """Copy of ``headers`` with credential and signature values replaced."""
+    out = {}
+    for name, value in headers.items():
+        lower = name.lower()
+        secret = lower in _SECRET_HEADERS or any(part in lower for part in _SECRET_HEADER_PARTS)
+        out[name] = REDACTED if secret else value
+    return out
+
+
+@dataclass
+class _Segment:
+    path: Path
+    first_seq: int
+    last_seq: int = 0
+    last_ts: float = 0.0
+    size: int = 0
+
+
+@dataclass
+class WebhookJournal:
+    """Durable ingestion log with group commit, deduplication and a
+    publish cursor.  Create it, ``open()`` it (which returns the records
+    to replay), then ``append()``/``commit_cursor()``; ``close()`` when
+    done.
+
+    ``on_commit`` is called with each group of records, in seq order,
+    as soon as it is durable -- independently of whether the appending
+    request is still waiting for it.
+    """
+
+    root: Path
+    fsync: bool = True
+    segment_max_bytes: int = 8 * 1024 * 1024
+    dedup_window_seconds: float = 3600.0
+    dedup_max_entries: int = 100_000
+    on_commit: Callable[[list[dict[str, Any]]], None] | None = None
+
+    _next_seq: int = field(default=1, init=False)
+    _cursor: int = field(default=0, init=False)
+    _segments: list[_Segment] = field(default_factory=list, init=False)
+    _file: Any = field(default=None, init=False, repr=False)
+    _file_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _pending: list[tuple[dict[str, Any], bytes, asyncio.Future]] = field(default_factory=list, init=False, repr=False)
+    _flush_task: asyncio.Task | None = field(default=None, init=False, repr=False)
+    _seen: "OrderedDict[str, float]" = field(default_factory=OrderedDict, init=False, repr=False)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def open(self) -> list[dict[str, Any]]:
+        """Load the journal; returns acknowledged records not yet published,
+        oldest first."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._cursor = self._read_cursor()
+        replay: list[dict[str, Any]] = []
+        horizon = time.time() - self.dedup_window_seconds
+        for path in sorted(self.root.glob("journal-*.jsonl")):
+            segment = _Segment(path=path, first_seq=int(path.stem.split("-", 1)[1]))
+            with open(path, "rb+") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A torn final line from a crash mid-write was never
+                        # acked; drop it so the next append starts a clean line.
+                        f.truncate(f.tell() - len(line))
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    segment.last_seq, segment.last_ts = record["seq"], record.get("ts", 0)
+                    if record["seq"] > self._cursor:
+                        replay.append(record)
+                    if record.get("ts", 0) >= horizon and record.get("key"):
+                        self._remember(record["key"], record["ts"])
+            segment.size = path.stat().st_size
+            self._segments.append(segment)
+            self._next_seq = max(self._next_seq, segment.last_seq + 1)
+        self._next_seq = max(self._next_seq, self._cursor + 1)
+        self._start_segment()
+        self._drop_published_segments()
+        if replay:
+            logger.info("Webhook journal %s: replaying %d unpublished deliveries", self.root, len(replay))
+        return replay
+
+    async def close(self) -> None:
+        """Wait for in-flight appends and close the journal file."""
+        if self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------
+    # Deduplication
+    # ------------------------------------------------------------------
+
+    def is_duplicate(self, key: str) -> bool:
+        """True if ``key`` was accepted within the dedup window."""
+        ts = self._seen.get(key)
+        return ts is not None and ts >= time.time() - self.dedup_window_seconds
+
+    def _remember(self, key: str, ts: float) -> None:
+        self._seen[key] = ts
+        self._seen.move_to_end(key)
+        horizon = ts - self.dedup_window_seconds
+        while self._seen and (len(self._seen) > self.dedup_max_entries or next(iter(self._seen.values())) < horizon):
+            self._seen.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Appending
+    # ------------------------------------------------------------------
+
+    async def append(self, record: dict[str, Any], key: str | None = None) -> dict[str, Any]:
+        """Assign ``record`` a seq and return it once it is durable.
+
+        ``key`` is remembered for deduplication immediately, so a
+        concurrent redelivery is rejected while this one is in flight;
+        it is forgotten again if the write fails.
+        """
+        now = time.time()
+        record = {"seq": self._next_seq, "ts": now, "key": key, **record}
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._next_seq += 1
+        if key:
+            self._remember(key, now)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, line, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        try:
+            await asyncio.shield(future)
+        except Exception:
+            if key:
+                self._seen.pop(key, None)
+            raise
+        return record
+
+    async def _flush_loop(self) -> None:
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    last = batch[-1][0]
+                    await asyncio.to_thread(self._write, b"".join(line for _, line, _ in batch), last["seq"], last["ts"])
+                except Exception as exc:
+                    logger.error("Webhook journal %s: write failed", self.root, exc_info=True)
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                if self.on_commit is not None:
+                    self.on_commit([record for record, _, _ in batch])
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+        finally:
+            self._flush_task = None
+
+    def _write(self, data: bytes, last_seq: int, last_ts: float) -> None:
+        with self._file_lock:
+            segment = self._segments[-1]
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            segment.size += len(data)
+            segment.last_seq, segment.last_ts = last_seq, last_ts
+            if segment.size >= self.segment_max_bytes:
+                self._file.close()
+                self._start_segment()
+
+    def _start_segment(self) -> None:
+        path = self.root / f"journal-{self._next_seq:012d}.jsonl"
+        self._file = open(path, "ab")  # noqa: SIM115 - held open across appends
+        if not self._segments or self._segments[-1].path != path:
+            self._segments.append(_Segment(path=path, first_seq=self._next_seq))
+
+    # ------------------------------------------------------------------
+    # Publish cursor
+    # ------------------------------------------------------------------
+
+    @property
+    def cursor(self) -> int:
+        """Highest seq published to the bus."""
+        return self._cursor
+
+    @property
+    def backlog(self) -> int:
+        """Acknowledged deliveries not yet published."""
+        return self._next_seq - 1 - self._cursor
+
+    def commit_cursor(self, seq: int) -> None:
+        """Record that every delivery up to ``seq`` was published, and
+        delete segments that hold nothing newer or still deduplicating."""
+        if seq <= self._cursor:
+            return
+        self._cursor = seq
+        with atomic_write(self.root / "cursor.json") as f:
+            json.dump({"seq": seq}, f)
+        self._drop_published_segments()
+
+    def dead_letter(self, records: list[dict[str, Any]]) -> None:
+        """Durably set aside deliveries that could not be published, so
+        the cursor may be committed past them."""
+        data = b"".join(json.dumps(r, separators=(",", ":")).encode("utf-8") + b"\n" for r in records)
+        with open(self.root / "dead-letter.jsonl", "ab") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _read_cursor(self) -> int:
+        try:
+            return int(json.loads((self.root / "cursor.json").read_text(encoding="utf-8"))["seq"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def _drop_published_segments(self) -> None:
+        horizon = time.time() - self.dedup_window_seconds
+        with self._file_lock:
+            keep = []
+            for segment in self._segments[:-1]:
+                if segment.last_seq <= self._cursor and segment.last_ts < horizon:
+                    segment.path.unlink(missing_ok=True)
+                else:
+                    keep.append(segment)
+            self._segments = keep + self._segments[-1:]
@@ -3,17 +3,32 @@
 
 Only starts if webhook-type entry points are registered. Uses aiohttp for
 a lightweight embedded HTTP server that runs within the existing asyncio loop.
+
+A request is acknowledged (202) once it is durable in the server's
+``WebhookJournal``, not once the bus has handled it.  A drainer task
+publishes journaled deliveries to the bus in batches with bounded
+concurrency, so a burst from a provider queues in the journal instead of
+stalling its requests on bus subscribers, and deliveries acknowledged
+before a restart are published after it.  A failed publish is retried;
+one that keeps failing is dead-lettered in the journal, and the cursor
+then moves past it, so later deliveries keep committing.
+Redeliveries (same provider delivery ID, or same body on routes with
+``dedup_body``) are acknowledged without being published again.
 """
 
+import asyncio
 import hashlib
 import hmac
 import json
 import logging
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
 from aiohttp import web
 
 from framework.host.event_bus import EventBus
+from framework.host.webhook_journal import WebhookJournal, delivery_key, redact_headers
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +41,9 @@ class WebhookRoute:
     path: str
     methods: list[str]
     secret: str | None = None  # For HMAC-SHA256 signature verification
+    # Treat identical non-empty bodies without a delivery ID as redeliveries.
+    # Off by default: pings and heartbeats legitimately repeat their body.
+    dedup_body: bool = False
 
 
 @dataclass
@@ -34,6 +52,20 @@ class WebhookServerConfig:
 
     host: str = "127.0.0.1"
     port: int = 8080
+    # Ingestion journal directory (default: HIVE_HOME/webhooks/<host>_<port>)
+    journal_dir: str | Path | None = None
+    journal_fsync: bool = True
+    dedup_window_seconds: float = 3600.0
+    # Drainer: deliveries published per batch, and concurrently. Publishes
+    # start in seq order; 1 also makes subscribers finish in seq order.
+    drain_batch_size: int = 64
+    drain_concurrency: int = 8
+    # Attempts per delivery before it is dead-lettered, and the first
+    # retry delay (doubled per attempt)
+    publish_attempts: int = 3
+    publish_retry_delay: float = 0.2
+    # Journaled-but-unpublished deliveries above which requests get 503
+    max_backlog: int = 10_000
 
 
 class WebhookServer:
@@ -41,7 +73,7 @@ class WebhookServer:
     Embedded HTTP server that receives webhook requests and publishes
     them as WEBHOOK_RECEIVED events on the EventBus.
 
-    The server's only job is: receive HTTP -> publish AgentEvent.
+    The server's only job is: receive HTTP -> journal -> publish AgentEvent.
     Subscribers decide what to do with the event.
 
     Lifecycle:
@@ -63,6 +95,9 @@ def __init__(
         self._app: web.Application | None = None
         self._runner: web.AppRunner | None = None
         self._site: web.TCPSite | None = None
+        self._journal: WebhookJournal | None = None
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._drainer: asyncio.Task | None = None
 
     def add_route(self, route: WebhookRoute) -> None:
         """Register a webhook route."""
@@ -74,6 +109,8 @@ async def start(self) -> None:
             logger.debug("No webhook routes registered, skipping server start")
             return
 
+        await self._open_journal()
+
         self._app = web.Application()
 
         for path, route in self._routes.items():
@@ -90,14 +127,124 @@ async def start(self) -> None:
         await self._site.start()
         logger.info(f"Webhook server started on {self._config.host}:{self._config.port} with {len(self._routes)} route(s)")
 
-    async def stop(self) -> None:
-        """Stop the HTTP server gracefully."""
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """Stop the HTTP server gracefully.
+
+        Stops accepting requests, then gives the drainer ``drain_timeout``
+        seconds to publish what was already journaled; anything left is
+        published on the next start.
+        """
         if self._runner:
             await self._runner.cleanup()
             self._runner = None
             self._app = None
             self._site = None
             logger.info("Webhook server stopped")
+        if self._journal is not None:
+            await self._journal.close()
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_timeout)
+            except TimeoutError:
+                logger.warning("Webhook server: %d deliveries left for the next start", self._queue.qsize())
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+            self._journal = self._queue = self._drainer = None
+
+    # ------------------------------------------------------------------
+    # Journal and drainer
+    # ------------------------------------------------------------------
+
+    async def _open_journal(self) -> None:
+        cfg = self._config
+        if cfg.journal_dir is not None:
+            root = Path(cfg.journal_dir)
+        else:
+            from framework import config
+
+            root = config.HIVE_HOME / "webhooks" / f"{cfg.host}_{cfg.port}"
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+        def enqueue(records: list[dict[str, Any]]) -> None:
+            for record in records:
+                queue.put_nowait(record)
+
+        journal = WebhookJournal(
+            root=root,
+            fsync=cfg.journal_fsync,
+            dedup_window_seconds=cfg.dedup_window_seconds,
+            on_commit=enqueue,
+        )
+        for record in await asyncio.to_thread(journal.open):
+            queue.put_nowait(record)
+        self._journal, self._queue = journal, queue
+        self._drainer = asyncio.create_task(self._drain(), name="webhook_drainer")
+
+    async def _drain(self) -> None:
+        """Publish journaled deliveries in seq order, a batch at a time.
+
+        Up to ``drain_concurrency`` publishes are in flight; each is
+        started (and so admitted to the bus) in seq order.  Deliveries
+        that fail all their retries are dead-lettered before the cursor
+        moves past them; while that write fails, the cursor stops just
+        before the oldest of them.
+        """
+        queue, journal = self._queue, self._journal
+        cfg = self._config
+        limit = asyncio.Semaphore(max(1, cfg.drain_concurrency))
+        exhausted: list[dict[str, Any]] = []  # failed for good, not yet dead-lettered; seq order
+
+        async def publish(record: dict[str, Any]) -> bool:
+            try:
+                delay = cfg.publish_retry_delay
+                for attempt in range(1, max(1, cfg.publish_attempts) + 1):
+                    try:
+                        await self._event_bus.emit_webhook_received(
+                            source_id=record["source_id"],
+                            path=record["path"],
+                            method=record["method"],
+                            headers=record["headers"],
+                            payload=record["payload"],
+                            query_params=record["query_params"],
+                        )
+                        return True
+                    except Exception:
+                        if attempt >= cfg.publish_attempts:
+                            logger.exception("Webhook server: publishing delivery %s failed; dead-lettering it", record["seq"])
+                            return False
+                        logger.warning("Webhook server: publishing delivery %s failed (attempt %d), retrying", record["seq"], attempt)
+                        await asyncio.sleep(delay)
+                        delay *= 2
+                return False
+            finally:
+                limit.release()
+
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < cfg.drain_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                tasks = []
+                for record in batch:
+                    # Acquire here, not inside the task, so publishes start in seq order.
+                    await limit.acquire()
+                    tasks.append(asyncio.create_task(publish(record)))
+                exhausted.extend(record for record, ok in zip(batch, await asyncio.gather(*tasks), strict=True) if not ok)
+                if exhausted:
+                    try:
+                        await asyncio.to_thread(journal.dead_letter, exhausted)
+                        exhausted = []
+                    except OSError:
+                        logger.exception("Webhook server: dead-lettering %d deliveries failed", len(exhausted))
+                upto = exhausted[0]["seq"] - 1 if exhausted else batch[-1]["seq"]
+                await asyncio.to_thread(journal.commit_cursor, upto)
+            except Exception:
+                logger.exception("Webhook server: saving the journal cursor failed")
+            finally:
+                for _ in batch:
+                    queue.task_done()
 
     async def _handle_request(self, request: web.Request) -> web.Response:
         """Handle an incoming webhook request."""
@@ -121,21 +268,32 @@ async def _handle_request(self, request: web.Request) -> web.Response:
             if not self._verify_signature(request, body, route.secret):
                 return web.json_response({"error": "Invalid signature"}, status=401)
 
+        journal = self._journal
+        key = delivery_key(path, request.headers, body, hash_body=route.dedup_body)
+        if key is not None and journal.is_duplicate(key):
+            return web.json_response({"status": "duplicate"}, status=202)
+        if journal.backlog >= self._config.max_backlog:
+            return web.json_response({"error": "Backlogged, retry later"}, status=503, headers={"Retry-After": "1"})
+
         # Parse body as JSON (fall back to raw text for non-JSON)
         try:
             payload = json.loads(body) if body else {}
         except (json.JSONDecodeError, ValueError):
             payload = {"raw_body": body.decode("utf-8", errors="replace")}
 
-        # Publish event to bus
-        await self._event_bus.emit_webhook_received(
-            source_id=route.source_id,
-            path=path,
-            method=request.method,
-            headers=dict(request.headers),
-            payload=payload,
-            query_params=dict(request.query),
-        )
+        # Acknowledge once durable; the drainer publishes it to the bus
+        record = {
+            "source_id": route.source_id,
+            "path": path,
+            "method": request.method,
+            "headers": redact_headers(request.headers),
+            "payload": payload,
+            "query_params": dict(request.query),
+        }
+        try:
+            await journal.append(record, key=key)
+        except (OSError, TypeError, ValueError):
+            return web.json_response({"error": "Failed to persist webhook"}, status=503)
 
         return web.json_response({"status": "accepted"}, status=202)
 
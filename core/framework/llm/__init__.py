@@ -1,5 +1,7 @@
 """LLM provider abstraction."""
 
+import importlib
+
 from framework.llm.provider import LLMProvider, LLMResponse
 from framework.llm.stream_events import (
     FinishEvent,
@@ -27,23 +29,24 @@
     "StreamErrorEvent",
 ]
 
-try:
-    from framework.llm.anthropic import AnthropicProvider  # noqa: F401
-
-    __all__.append("AnthropicProvider")
-except ImportError:
-    pass
-
-try:
-    from framework.llm.litellm import LiteLLMProvider  # noqa: F401
-
-    __all__.append("LiteLLMProvider")
-except ImportError:
-    pass
-
-try:
-    from framework.llm.mock import MockLLMProvider  # noqa: F401
-
-    __all__.append("MockLLMProvider")
-except ImportError:
-    pass
+# Providers import their SDKs (litellm alone takes seconds), so they are
+# resolved on first access.  A provider whose dependencies are missing
+# raises AttributeError, as the old guarded imports left it undefined.
+_LAZY_PROVIDERS = {
+    "AnthropicProvider": "framework.llm.anthropic",
+    "LiteLLMProvider": "framework.llm.litellm",
+    "MockLLMProvider": "framework.llm.mock",
+}
+__all__ += list(_LAZY_PROVIDERS)
+
+
+def __getattr__(name: str):
+    module = _LAZY_PROVIDERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module), name)
+    except ImportError as e:
+        raise AttributeError(f"{name} is unavailable: {e}") from e
+    globals()[name] = value
+    return value
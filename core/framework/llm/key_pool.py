@@ -1,19 +1,83 @@
-"""Thread-safe API key pool with round-robin rotation and health tracking.
+"""Thread-safe API key pool with load-, latency- and quota-aware selection.
 
-When multiple API keys are configured, the pool rotates through them on each
-request.  Keys that hit rate limits are temporarily cooled-down so the next
+When multiple API keys are configured, the pool spreads requests across
+them.  Keys that hit rate limits are temporarily cooled-down so the next
 call automatically uses a healthy key -- no sleep required.
+
+Plain round-robin treated every key as interchangeable: a key whose quota
+was nearly spent, or whose upstream was answering slowly, got the same
+share of traffic as an idle one, and the pool only learnt about it from
+the 429.  Keys are now picked by *power of two choices*: sample two
+healthy keys and take the one with the lower expected cost, where cost is
+
+    (in-flight requests + 1) x EWMA latency of successful calls
+
+scaled up as the key's remaining request quota (from the provider's
+``x-ratelimit-remaining-requests`` / ``anthropic-ratelimit-requests-*``
+headers) runs low.  A key whose reported quota is exhausted is skipped
+until the reported reset, before it ever returns a 429.  Sampling two
+rather than scanning all keys keeps concurrent callers working off the
+same slightly-stale stats from herding onto one "best" key.
+
+Callers that want this should use leases:
+
+    lease = await pool.acquire_async(max_wait=...)
+    try:
+        response = await call(api_key=lease.key)
+        pool.record_success(lease, headers)
+    except RateLimitError as e:
+        pool.record_rate_limit(lease, retry_after, headers)
+    finally:
+        pool.release(lease)
+
+When every key is cooling down, ``acquire`` / ``acquire_async`` wait (up
+to ``max_wait``) for the first key to come back -- or for an in-flight
+call to finish and free quota -- instead of firing a request that is
+certain to be rejected.  All state lives behind one ``threading.Lock``
+held only for O(keys) bookkeeping, so the sync retry path (running on
+worker threads) and the async path (on any event loop) share one pool;
+async waiters are woken with ``call_soon_threadsafe`` on their own loop.
+
+``get_key`` / ``mark_success`` / ``mark_rate_limited`` remain for callers
+that do not track leases.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import re
 import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Weight of the newest sample in the per-key latency average.
+_EWMA_ALPHA = 0.3
+# Remaining-quota level below which a key's cost starts to rise.
+_QUOTA_LOW_WATER = 4
+# Cooldown applied on a 429 that carries no usable reset information.
+DEFAULT_COOLDOWN = 60.0
+
+_REMAINING_HEADERS = (
+    "x-ratelimit-remaining-requests",
+    "anthropic-ratelimit-requests-remaining",
+    "x-ratelimit-remaining",
+    "ratelimit-remaining",
+)
+_RESET_HEADERS = (
+    "x-ratelimit-reset-requests",
+    "anthropic-ratelimit-requests-reset",
+    "x-ratelimit-reset",
+    "ratelimit-reset",
+)
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
 
 @dataclass
 class KeyHealth:
@@ -23,56 +87,282 @@ class KeyHealth:
     consecutive_errors: int = 0
     total_requests: int = 0
     total_successes: int = 0
+    total_rate_limits: int = 0
+    in_flight: int = 0
+    latency_ewma: float | None = None  # seconds, successful calls only
+    quota_remaining: int | None = None  # last reported, None = unknown
+    quota_reset_at: float = 0.0  # monotonic timestamp
+
+
+@dataclass
+class KeyLease:
+    """One in-flight use of a key, handed out by ``acquire``."""
+
+    key: str
+    started: float = field(default_factory=time.monotonic)
+    released: bool = False
+
+
+def _normalise_headers(headers: Any) -> dict[str, str]:
+    """Lower-case header names and drop LiteLLM's ``llm_provider-`` prefix."""
+    if not isinstance(headers, Mapping):
+        return {}
+    out: dict[str, str] = {}
+    for name, value in headers.items():
+        if not isinstance(name, str) or value is None:
+            continue
+        name = name.lower()
+        if name.startswith("llm_provider-"):
+            name = name[len("llm_provider-") :]
+        out.setdefault(name, str(value))
+    return out
+
+
+def _parse_reset(value: str) -> float | None:
+    """Seconds until a reset given as a number, a Go-style duration
+    (``1m30s``, ``250ms`` -- OpenAI) or an RFC 3339 timestamp (Anthropic)."""
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # Some providers send an epoch timestamp rather than a delta.
+        return max(seconds - time.time(), 0.0) if seconds > 1e9 else max(seconds, 0.0)
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset.tzinfo is None:
+        return None
+    return max((reset - datetime.now(reset.tzinfo)).total_seconds(), 0.0)
+
+
+def parse_quota_headers(headers: Any) -> tuple[int | None, float | None]:
+    """``(remaining requests, seconds until reset)`` from rate-limit
+    response headers; either is None when not reported."""
+    h = _normalise_headers(headers)
+    remaining = None
+    for name in _REMAINING_HEADERS:
+        if name in h:
+            try:
+                remaining = max(int(float(h[name])), 0)
+                break
+            except ValueError:
+                continue
+    reset = None
+    for name in _RESET_HEADERS:
+        if name in h:
+            reset = _parse_reset(h[name])
+            if reset is not None:
+                break
+    return remaining, reset
+
+
+def _wake_future(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
 
 
 class KeyPool:
-    """Round-robin key pool with health tracking.
+    """Key pool with power-of-two-choices selection and health tracking.
 
     Thread-safe: all mutations protected by a lock so concurrent LLM calls
     (e.g. parallel tool execution in EventLoopNode) don't race.
     """
 
-    def __init__(self, keys: list[str]) -> None:
+    def __init__(self, keys: list[str], rng: random.Random | None = None) -> None:
         if not keys:
             raise ValueError("KeyPool requires at least one key")
         self._keys = list(keys)
-        self._index = 0
         self._health: dict[str, KeyHealth] = {k: KeyHealth() for k in keys}
         self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._rng = rng or random.Random()
 
     @property
     def size(self) -> int:
         return len(self._keys)
 
+    # -- selection (lock held) ------------------------------------------
+
+    def _available_locked(self, key: str, now: float) -> bool:
+        health = self._health[key]
+        if health.rate_limited_until > now:
+            return False
+        if health.quota_remaining is not None and health.quota_reset_at <= now:
+            # The reported window has rolled over; quota is unknown again.
+            health.quota_remaining = None
+        if health.quota_remaining is not None and health.quota_remaining - health.in_flight <= 0:
+            return False
+        return True
+
+    def _cost_locked(self, key: str, default_latency: float) -> float:
+        health = self._health[key]
+        latency = health.latency_ewma if health.latency_ewma is not None else default_latency
+        cost = (health.in_flight + 1) * latency
+        if health.quota_remaining is not None:
+            headroom = max(health.quota_remaining - health.in_flight, 1)
+            if headroom < _QUOTA_LOW_WATER:
+                cost *= _QUOTA_LOW_WATER / headroom
+        return cost
+
+    def _pick_locked(self, now: float) -> str | None:
+        """Best available key by power of two choices, or None when every
+        key is cooling down or out of quota."""
+        candidates = [k for k in self._keys if self._available_locked(k, now)]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        # Keys without a latency sample yet are priced at the pool mean so
+        # they get tried rather than starved (or stampeded).
+        known = [h.latency_ewma for h in self._health.values() if h.latency_ewma is not None]
+        default_latency = sum(known) / len(known) if known else 1.0
+        a, b = self._rng.sample(candidates, 2)
+        return a if self._cost_locked(a, default_latency) <= self._cost_locked(b, default_latency) else b
+
+    def _next_available_at_locked(self, now: float) -> float:
+        """Monotonic time at which some key may become available."""
+        times = []
+        for health in self._health.values():
+            t = health.rate_limited_until
+            if health.quota_remaining is not None and health.quota_remaining - health.in_flight <= 0:
+                t = max(t, health.quota_reset_at)
+            times.append(t)
+        return max(min(times), now)
+
+    def _soonest_locked(self) -> str:
+        return min(self._keys, key=lambda k: self._health[k].rate_limited_until)
+
+    def _lease_locked(self, key: str) -> KeyLease:
+        health = self._health[key]
+        health.total_requests += 1
+        health.in_flight += 1
+        return KeyLease(key)
+
+    def _wake_locked(self) -> None:
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_future, fut)
+            except RuntimeError:  # loop closed
+                pass
+
+    # -- leases -----------------------------------------------------------
+
+    def acquire(self, max_wait: float = 0.0) -> KeyLease:
+        """Lease the best available key, blocking up to *max_wait* seconds
+        if every key is cooling down.  On timeout, leases the key whose
+        cooldown expires soonest."""
+        deadline = time.monotonic() + max_wait
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                key = self._pick_locked(now)
+                if key is None and now >= deadline:
+                    key = self._soonest_locked()
+                if key is not None:
+                    return self._lease_locked(key)
+                self._cond.wait(min(self._next_available_at_locked(now), deadline) - now)
+
+    async def acquire_async(self, max_wait: float = 0.0) -> KeyLease:
+        """Async ``acquire``: waits on the event loop, not a thread."""
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                key = self._pick_locked(now)
+                if key is None and now >= deadline:
+                    key = self._soonest_locked()
+                if key is not None:
+                    return self._lease_locked(key)
+                timeout = min(self._next_available_at_locked(now), deadline) - now
+                fut = loop.create_future()
+                self._async_waiters.append((loop, fut))
+            try:
+                await asyncio.wait((fut,), timeout=timeout)
+            finally:
+                if not fut.done():
+                    fut.cancel()
+                    with self._lock:
+                        try:
+                            self._async_waiters.remove((loop, fut))
+                        except ValueError:
+                            pass
+
+    def release(self, lease: KeyLease) -> None:
+        """Return a lease to the pool.  Idempotent."""
+        with self._lock:
+            if lease.released:
+                return
+            lease.released = True
+            health = self._health.get(lease.key)
+            if health:
+                health.in_flight = max(health.in_flight - 1, 0)
+            self._wake_locked()
+
+    def record_success(self, lease: KeyLease, headers: Any = None) -> None:
+        """Record a successful call: latency sample plus any quota headers."""
+        latency = time.monotonic() - lease.started
+        with self._lock:
+            health = self._health.get(lease.key)
+            if not health:
+                return
+            health.consecutive_errors = 0
+            health.total_successes += 1
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma += _EWMA_ALPHA * (latency - health.latency_ewma)
+            self._apply_quota_locked(health, headers)
+
+    def record_rate_limit(self, lease: KeyLease, retry_after: float | None = None, headers: Any = None) -> None:
+        """Record a 429 on the leased key.  The cooldown is *retry_after*
+        if given, else the reported quota reset, else ``DEFAULT_COOLDOWN``.
+        The (fast) rejection is deliberately not a latency sample."""
+        if retry_after is None:
+            _remaining, retry_after = parse_quota_headers(headers)
+        self.mark_rate_limited(lease.key, DEFAULT_COOLDOWN if retry_after is None else retry_after)
+
+    def _apply_quota_locked(self, health: KeyHealth, headers: Any) -> None:
+        remaining, reset = parse_quota_headers(headers)
+        if remaining is None:
+            return
+        health.quota_remaining = remaining
+        # Without a reset time, trust the count for one cooldown period.
+        health.quota_reset_at = time.monotonic() + (reset if reset is not None else DEFAULT_COOLDOWN)
+
+    # -- lease-free API -------------------------------------------------
+
     def get_key(self) -> str:
-        """Return the next healthy key (round-robin).
+        """Return the best available key without tracking it as in flight.
 
         If every key is currently rate-limited, returns the one whose cooldown
         expires soonest so the caller can proceed with minimal delay.
         """
         with self._lock:
-            now = time.monotonic()
-            for _ in range(len(self._keys)):
-                key = self._keys[self._index]
-                self._index = (self._index + 1) % len(self._keys)
-                health = self._health[key]
-                if health.rate_limited_until <= now:
-                    health.total_requests += 1
-                    return key
-            # All rate-limited -- pick the one that expires soonest.
-            soonest = min(self._keys, key=lambda k: self._health[k].rate_limited_until)
-            self._health[soonest].total_requests += 1
-            return soonest
-
-    def mark_rate_limited(self, key: str, retry_after: float = 60.0) -> None:
+            key = self._pick_locked(time.monotonic()) or self._soonest_locked()
+            self._health[key].total_requests += 1
+            return key
+
+    def mark_rate_limited(self, key: str, retry_after: float = DEFAULT_COOLDOWN) -> None:
         """Mark *key* as rate-limited for *retry_after* seconds."""
         with self._lock:
             health = self._health.get(key)
             if health:
                 health.rate_limited_until = time.monotonic() + retry_after
                 health.consecutive_errors += 1
+                health.total_rate_limits += 1
                 logger.info(
-                    "[key-pool] Key ...%s rate-limited for %.0fs (errors=%d)",
+                    "[key-pool] Key ...%s rate-limited for %.1fs (errors=%d)",
                     key[-6:],
                     retry_after,
                     health.consecutive_errors,
@@ -95,7 +385,11 @@ def get_stats(self) -> dict[str, dict]:
                     "healthy": self._health[k].rate_limited_until <= now,
                     "requests": self._health[k].total_requests,
                     "successes": self._health[k].total_successes,
+                    "rate_limits": self._health[k].total_rate_limits,
                     "consecutive_errors": self._health[k].consecutive_errors,
+                    "in_flight": self._health[k].in_flight,
+                    "latency_ms": None if self._health[k].latency_ewma is None else round(self._health[k].latency_ewma * 1000, 1),
+                    "quota_remaining": self._health[k].quota_remaining,
                 }
                 for k in self._keys
             }
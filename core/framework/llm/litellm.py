@@ -26,7 +26,7 @@
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    from framework.llm.key_pool import KeyPool
+    from framework.llm.key_pool import KeyLease, KeyPool
 
 try:
     import litellm
@@ -1164,6 +1164,18 @@ def _exception_headers(exception: BaseException) -> Any:
     return None
 
 
+def _response_headers(response: Any) -> Any:
+    """Return the upstream response headers LiteLLM attached to a
+    successful response (``llm_provider-`` prefixed), or None."""
+    hidden = getattr(response, "_hidden_params", None)
+    if isinstance(hidden, dict):
+        headers = hidden.get("additional_headers")
+        if isinstance(headers, dict) and headers:
+            return headers
+    headers = getattr(response, "_response_headers", None)
+    return headers if isinstance(headers, dict) and headers else None
+
+
 def _parse_retry_after(headers: Any, max_delay: float) -> float | None:
     """Parse retry-after-ms / retry-after from a header mapping.
 
@@ -1670,10 +1682,14 @@ def _completion_with_rate_limit_retry(self, max_retries: int | None = None, **kw
         model = kwargs.get("model", self.model)
         retries = max_retries if max_retries is not None else RATE_LIMIT_MAX_RETRIES
         for attempt in range(retries + 1):
-            # Rotate key from pool when available.
+            # Lease a key from the pool when available. With every key
+            # cooling down this waits for the first one back rather than
+            # sending a request that is sure to 429.
             current_key: str | None = None
+            lease: KeyLease | None = None
             if self._key_pool:
-                current_key = self._key_pool.get_key()
+                lease = self._key_pool.acquire(max_wait=RATE_LIMIT_MAX_DELAY)
+                current_key = lease.key
                 kwargs["api_key"] = current_key
             # Token fingerprint at the moment of the call. When the Hive
             # proxy rejects a token, we cross-reference this fp against
@@ -1768,13 +1784,15 @@ def _completion_with_rate_limit_retry(self, max_retries: int | None = None, **kw
                     time.sleep(wait)
                     continue
 
-                if self._key_pool and current_key:
-                    self._key_pool.mark_success(current_key)
+                if self._key_pool and lease:
+                    self._key_pool.record_success(lease, _response_headers(response))
                 return response
             except RateLimitError as e:
                 # Key pool: mark the offending key and rotate immediately.
-                if self._key_pool and current_key:
-                    self._key_pool.mark_rate_limited(current_key, retry_after=60.0)
+                if self._key_pool and lease:
+                    headers = _exception_headers(e)
+                    retry_after = _parse_retry_after(headers, RATE_LIMIT_MAX_DELAY) if headers is not None else None
+                    self._key_pool.record_rate_limit(lease, retry_after, headers)
                     # When we have other healthy keys, skip the sleep -- the
                     # next iteration will pick a different key automatically.
                     if attempt < retries:
@@ -1828,6 +1846,9 @@ def _completion_with_rate_limit_retry(self, max_retries: int | None = None, **kw
                         str(auth_exc)[:200],
                     )
                 raise
+            finally:
+                if self._key_pool and lease:
+                    self._key_pool.release(lease)
         # unreachable, but satisfies type checker
         raise RuntimeError("Exhausted rate limit retries")
 
@@ -1957,10 +1978,12 @@ async def _acompletion_with_rate_limit_retry(self, max_retries: int | None = Non
         model = kwargs.get("model", self.model)
         retries = max_retries if max_retries is not None else RATE_LIMIT_MAX_RETRIES
         for attempt in range(retries + 1):
-            # Rotate key from pool when available.
+            # Lease a key from the pool when available (see the sync path).
             current_key: str | None = None
+            lease: KeyLease | None = None
             if self._key_pool:
-                current_key = self._key_pool.get_key()
+                lease = await self._key_pool.acquire_async(max_wait=RATE_LIMIT_MAX_DELAY)
+                current_key = lease.key
                 kwargs["api_key"] = current_key
             try:
                 _install_request_holder()
@@ -2081,13 +2104,15 @@ async def _acompletion_with_rate_limit_retry(self, max_retries: int | None = Non
                     await asyncio.sleep(wait)
                     continue
 
-                if self._key_pool and current_key:
-                    self._key_pool.mark_success(current_key)
+                if self._key_pool and lease:
+                    self._key_pool.record_success(lease, _response_headers(response))
                 return response
             except RateLimitError as e:
                 # Key pool: mark the offending key and rotate immediately.
-                if self._key_pool and current_key:
-                    self._key_pool.mark_rate_limited(current_key, retry_after=60.0)
+                if self._key_pool and lease:
+                    headers = _exception_headers(e)
+                    retry_after = _parse_retry_after(headers, RATE_LIMIT_MAX_DELAY) if headers is not None else None
+                    self._key_pool.record_rate_limit(lease, retry_after, headers)
                     if attempt < retries:
                         logger.info(
                             "[async-retry] Key pool rotating away from ...%s on 429",
@@ -2120,6 +2145,9 @@ async def _acompletion_with_rate_limit_retry(self, max_retries: int | None = Non
                     f"(attempt {attempt + 1}/{retries})"
                 )
                 await asyncio.sleep(wait)
+            finally:
+                if self._key_pool and lease:
+                    self._key_pool.release(lease)
         raise RuntimeError("Exhausted rate limit retries")
 
     async def acomplete(
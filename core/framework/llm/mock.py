@@ -1,5 +1,6 @@
 """Mock LLM Provider for testing and structural validation without real LLM calls."""
 
+import asyncio
 import json
 import re
 from collections.abc import AsyncIterator
@@ -11,8 +12,16 @@
     StreamEvent,
     TextDeltaEvent,
     TextEndEvent,
+    ToolCallEvent,
 )
 
+_SYNTHETIC_VOCAB = (
+    "the agent reads file checks result plan next step tool output looks fine "
+    "retry parse json value missing update config run tests pass fail error "
+    "summary report data row column query index cache memory stream event queue "
+    "worker colony spawn task goal done wait progress status ok because then"
+).split()
+
 
 class MockLLMProvider(LLMProvider):
     """
@@ -32,14 +41,47 @@ class MockLLMProvider(LLMProvider):
         # Returns: {"name": "mock_value", "age": "mock_value"}
     """
 
-    def __init__(self, model: str = "mock-model"):
+    def __init__(
+        self,
+        model: str = "mock-model",
+        delay: float = 0.0,
+        *,
+        tokens_per_response: int = 0,
+        token_delay: float = 0.0,
+        turns: list[dict[str, Any]] | None = None,
+    ):
         """
         Initialize the mock LLM provider.
 
         Args:
             model: Model name to report in responses (default: "mock-model")
+            delay: Seconds each async call sleeps before answering, to stand
+                in for a real round trip in latency benchmarks (default: 0)
+            tokens_per_response: When set, ``stream()`` emits this many
+                one-token text deltas instead of the fixed mock sentence
+            token_delay: Seconds ``stream()`` sleeps between text deltas
+            turns: Scripted ``stream()`` turns.  Entry *k* answers the call
+                that already has *k* assistant messages in its history, so
+                concurrent conversations sharing one provider each walk the
+                script from the start.  An entry is ``{"tool_calls": [{"name":
+                ..., "input": {...}}, ...]}`` and/or ``{"text": "..."}``; calls
+                past the end of the script get a plain text answer.
         """
         self.model = model
+        self.delay = delay
+        self.tokens_per_response = tokens_per_response
+        self.token_delay = token_delay
+        self.turns = list(turns or [])
+
+    def _synthetic_text(self, turn_index: int) -> str:
+        """``tokens_per_response`` words that differ from turn to turn.
+
+        Varying the text keeps the agent loop's stall detector (which
+        flags near-identical consecutive responses) out of the way of
+        long scripted runs.
+        """
+        vocab = _SYNTHETIC_VOCAB
+        return " ".join(vocab[(turn_index * 7919 + i * 104729 + i * i) % len(vocab)] for i in range(self.tokens_per_response))
 
     def _extract_output_keys(self, system: str) -> list[str]:
         """
@@ -157,7 +199,9 @@ async def acomplete(
         max_retries: int | None = None,
         system_dynamic_suffix: str | None = None,
     ) -> LLMResponse:
-        """Async mock completion (no I/O, returns immediately)."""
+        """Async mock completion (no I/O; returns after ``delay`` seconds)."""
+        if self.delay:
+            await asyncio.sleep(self.delay)
         if system_dynamic_suffix:
             system = f"{system}\n\n{system_dynamic_suffix}" if system else system_dynamic_suffix
         return self.complete(
@@ -182,18 +226,52 @@ async def stream(
 
         Splits the mock response into words and yields each as a separate
         TextDeltaEvent with an accumulating snapshot, exercising the full
-        streaming pipeline without any API calls.
+        streaming pipeline without any API calls.  ``turns`` scripts tool
+        calls per turn; ``tokens_per_response`` and ``token_delay`` shape
+        the text stream.
         """
+        if self.delay:
+            await asyncio.sleep(self.delay)
         if system_dynamic_suffix:
             system = f"{system}\n\n{system_dynamic_suffix}" if system else system_dynamic_suffix
-        content = self._generate_mock_response(system=system, json_mode=False)
-        words = content.split(" ")
-        accumulated = ""
 
+        turn_index = sum(1 for m in messages if m.get("role") == "assistant")
+        turn = self.turns[turn_index] if turn_index < len(self.turns) else {}
+        tool_calls = turn.get("tool_calls") or []
+        if "text" in turn:
+            content = turn["text"]
+        elif self.tokens_per_response:
+            content = self._synthetic_text(turn_index)
+        elif tool_calls:
+            content = ""
+        else:
+            content = self._generate_mock_response(system=system, json_mode=False)
+
+        words = content.split(" ") if content else []
+        accumulated = ""
         for i, word in enumerate(words):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
             chunk = word if i == 0 else " " + word
             accumulated += chunk
             yield TextDeltaEvent(content=chunk, snapshot=accumulated)
+        if words:
+            yield TextEndEvent(full_text=accumulated)
 
-        yield TextEndEvent(full_text=accumulated)
-        yield FinishEvent(stop_reason="mock_complete", model=self.model)
+        for i, call in enumerate(tool_calls):
+            yield ToolCallEvent(
+                tool_use_id=f"mock_{turn_index}_{i}",
+                tool_name=call["name"],
+                tool_input=dict(call.get("input") or {}),
+            )
+
+        if not tool_calls and not self.turns and not self.tokens_per_response:
+            yield FinishEvent(stop_reason="mock_complete", model=self.model)
+            return
+        prompt_chars = len(system) + sum(len(str(m.get("content") or "")) for m in messages)
+        yield FinishEvent(
+            stop_reason="tool_calls" if tool_calls else "stop",
+            input_tokens=prompt_chars // 4,
+            output_tokens=len(words) + 16 * len(tool_calls),
+            model=self.model,
+        )
@@ -1,4 +1,17 @@
-"""Loader layer -- agent loading from disk (JSON config, MCP, credentials)."""
+"""Loader layer -- agent loading from disk (JSON config, MCP, credentials).
 
-from framework.loader.agent_loader import AgentLoader  # noqa: F401
-from framework.loader.tool_registry import ToolRegistry  # noqa: F401
+``AgentLoader`` and ``ToolRegistry`` are resolved on first access: the
+``hive`` CLI commands live in this package and should not pay for the
+agent host and provider imports behind the loader.
+"""
+
+import importlib
+
+
+def __getattr__(name: str):
+    if name in ("AgentLoader", "ToolRegistry"):
+        module = "framework.loader.agent_loader" if name == "AgentLoader" else "framework.loader.tool_registry"
+        value = getattr(importlib.import_module(module), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,155 @@
+"""Incremental size/mtime catalog for the retention janitor.
+
+Measuring a tree used to mean a full ``rglob`` + stat of every file, for
+every candidate, on every run — a dry run followed by the real run
+walked everything twice, and the leftover sweep walked all of HIVE_HOME
+twice more.  The catalog remembers, per directory, its mtime plus the
+count/bytes of its direct files and the names of its subdirectories.
+A later walk stats each directory once and re-lists only those whose
+mtime moved: creating, deleting or renaming an entry (including the
+temp+rename every store writes through) bumps the parent's mtime.
+
+Limits: a file rewritten *in place* (append, truncate) leaves its
+directory's mtime alone, so its old size is reported until something
+else in that directory changes.  So the catalog only sizes targets
+already chosen by age or layout (the bytes a report claims); the junk
+scan, where size is the criterion, walks for real.  Directories modified within
+``_RACY_WINDOW_NS`` of the scan are not cached, since a same-tick write
+would be invisible to the mtime check.
+
+Entries are keyed by absolute path and dropped after ``_MAX_IDLE_RUNS``
+runs that never visited them, so the file tracks the live layout.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import stat
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+_CATALOG_VERSION = 1
+_RACY_WINDOW_NS = 2_000_000_000
+_MAX_IDLE_RUNS = 10
+
+# Entry layout (a list keeps the JSON compact for large trees).
+_MTIME, _FILES, _BYTES, _SUBDIRS, _MARKED, _SEEN = range(6)
+
+
+class SizeCatalog:
+    """Per-directory (mtime, files, bytes, subdirs) cache with incremental walks.
+
+    ``mark`` is a name predicate evaluated while a directory is listed;
+    the matching entry names are cached with it so ``marked()`` can find
+    them again without re-listing unchanged directories.
+    """
+
+    def __init__(self, path: Path | None = None, *, mark: Callable[[str], bool] | None = None) -> None:
+        self.path = path
+        self._mark = mark
+        self._dirs: dict[str, list] = {}
+        self._run = 1
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, *, mark: Callable[[str], bool] | None = None) -> SizeCatalog:
+        catalog = cls(path, mark=mark)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return catalog
+        if isinstance(data, dict) and data.get("version") == _CATALOG_VERSION and isinstance(data.get("dirs"), dict):
+            catalog._dirs = data["dirs"]
+            catalog._run = int(data.get("run") or 0) + 1
+        return catalog
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        dirs = {k: v for k, v in self._dirs.items() if self._run - v[_SEEN] <= _MAX_IDLE_RUNS}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as f:
+            json.dump({"version": _CATALOG_VERSION, "run": self._run, "dirs": dirs}, f, separators=(",", ":"))
+
+    def _entry(self, d: str) -> list | None:
+        try:
+            st = os.stat(d, follow_symlinks=False)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        entry = self._dirs.get(d)
+        if entry is not None and entry[_MTIME] == st.st_mtime_ns:
+            self.hits += 1
+            entry[_SEEN] = self._run
+            return entry
+
+        self.misses += 1
+        files = total = 0
+        subdirs: list[str] = []
+        marked: list[str] = []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if self._mark is not None and self._mark(e.name):
+                        marked.append(e.name)
+                    try:
+                        if e.is_symlink():
+                            continue
+                        if e.is_dir():
+                            subdirs.append(e.name)
+                        elif e.is_file():
+                            files += 1
+                            total += e.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        entry = [st.st_mtime_ns, files, total, subdirs, marked, self._run]
+        if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+            self._dirs[d] = entry
+        else:
+            self._dirs.pop(d, None)
+        return entry
+
+    def _walk(self, root: Path, *, descend_marked: bool = True) -> Iterator[tuple[str, list]]:
+        stack = [os.path.abspath(root)]
+        while stack:
+            d = stack.pop()
+            entry = self._entry(d)
+            if entry is None:
+                continue
+            yield d, entry
+            skip = set(entry[_MARKED]) if not descend_marked else ()
+            stack.extend(os.path.join(d, name) for name in entry[_SUBDIRS] if name not in skip)
+
+    def dir_size(self, path: Path) -> tuple[int, int]:
+        """(file_count, total_bytes) for a tree, like ``retention._dir_size``."""
+        files = total = 0
+        for _, entry in self._walk(path):
+            files += entry[_FILES]
+            total += entry[_BYTES]
+        return files, total
+
+    def marked(self, root: Path) -> Iterator[Path]:
+        """Every entry under ``root`` whose name matched ``mark`` (not descending into them)."""
+        for d, entry in self._walk(root, descend_marked=False):
+            for name in entry[_MARKED]:
+                yield Path(d) / name
+
+    def forget(self, path: Path) -> None:
+        """Drop a disposed tree's entries (its parent re-lists on its own)."""
+        stack = [os.path.abspath(path)]
+        while stack:
+            d = stack.pop()
+            entry = self._dirs.pop(d, None)
+            if entry is not None:
+                stack.extend(os.path.join(d, name) for name in entry[_SUBDIRS])
@@ -17,6 +17,7 @@
 
 from framework import config
 from framework.maintenance import retention
+from framework.maintenance.catalog import SizeCatalog
 from framework.maintenance.retention import (
     DeleteDisposer,
     DryRunDisposer,
@@ -31,6 +32,7 @@
 _GLOBAL_LOCK_TTL_S = 2 * 3600.0
 _REPORT_FILENAME = "last_janitor_report.json"
 _SERVER_MARKER_FILENAME = "server.lock"
+_CATALOG_FILENAME = "size_catalog.json"
 
 
 def _pid_alive(pid: int) -> bool:
@@ -95,6 +97,37 @@ def live_server_owns_hive_home() -> bool:
     return isinstance(pid, int) and pid != os.getpid() and _pid_alive(pid)
 
 
+class IOBudget:
+    """Token bucket over bytes disposed: a run averages at most ``bytes_per_sec``.
+
+    Pacing by item count (a fixed sleep per item) throttled a thousand
+    1 KB spill files as hard as one 2 GB transcript; charging bytes keeps
+    the janitor's disk pressure on a live server predictable either way.
+    Up to one second of budget may be spent in a burst.
+    """
+
+    def __init__(self, bytes_per_sec: float, *, clock=time.monotonic, sleep=time.sleep) -> None:
+        self.rate = float(bytes_per_sec)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.rate
+        self._last = clock()
+        self.slept = 0.0
+
+    def charge(self, nbytes: int) -> None:
+        if self.rate <= 0 or nbytes <= 0:
+            return
+        now = self._clock()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate) - nbytes
+        self._last = now
+        if self._tokens < 0:
+            delay = -self._tokens / self.rate
+            self._sleep(delay)
+            self.slept += delay
+            self._tokens = 0.0
+            self._last = self._clock()
+
+
 @dataclass
 class JanitorReport:
     started_at: float
@@ -188,16 +221,21 @@ def _write_manifest(manifest: Manifest, started_at: float) -> str:
     return str(path)
 
 
-def _build_disposer(cfg, execute: bool):
+def _build_disposer(cfg, execute: bool, catalog: SizeCatalog | None = None):
     """Disposer for tiers 2/3 + one-time targets (tier 1 always deletes)."""
     if not execute:
-        return DryRunDisposer()
+        return DryRunDisposer(catalog)
     if cfg.mode == "archive":
-        from framework.maintenance.archive import ArchiveDisposer
+        from framework.maintenance.archive import ArchiveDisposer, default_workers
 
         archive_dir = Path(cfg.archive_dir).expanduser() if cfg.archive_dir else None
-        return ArchiveDisposer(archive_dir=archive_dir)
-    return DeleteDisposer()
+        return ArchiveDisposer(
+            archive_dir=archive_dir,
+            workers=cfg.archive_workers or default_workers(),
+            compression=cfg.archive_compression,
+            catalog=catalog,
+        )
+    return DeleteDisposer(catalog)
 
 
 def run_once(
@@ -241,11 +279,14 @@ def run_once(
         return report
 
     manifest = Manifest()
-    tier1_disposer = DeleteDisposer() if execute else DryRunDisposer()
+    # Tree sizes and residue locations from earlier runs; only directories
+    # whose mtime moved since then are listed again.
+    catalog = SizeCatalog.load(maintenance_dir() / _CATALOG_FILENAME, mark=retention.is_janitor_residue)
+    tier1_disposer = DeleteDisposer(catalog) if execute else DryRunDisposer(catalog)
     try:
         # Built BEFORE the global lock: a failing archive-dir setup must
         # not leave a 2h lockout behind.
-        disposer = _build_disposer(cfg, execute)
+        disposer = _build_disposer(cfg, execute, catalog)
     except (OSError, ValueError) as exc:
         report.error = f"disposer setup failed: {exc}"
         report.finished_at = time.time()
@@ -261,13 +302,18 @@ def run_once(
         report.finished_at = time.time()
         return report
 
-    def pace() -> None:
+    budget = IOBudget(cfg.io_budget_mb_per_sec * 1_000_000)
+
+    def pace(nbytes: int = 0) -> None:
+        # A dry run only stats; there is no disposal I/O to budget.
+        if execute:
+            budget.charge(nbytes)
         if cfg.io_sleep_ms > 0:
             time.sleep(cfg.io_sleep_ms / 1000.0)
 
     try:
         if execute:
-            report.targets.append(retention.sweep_janitor_leftovers(manifest))
+            report.targets.append(retention.sweep_janitor_leftovers(manifest, catalog))
 
         if 1 in tiers:
             hive_home = config.HIVE_HOME
@@ -298,21 +344,30 @@ def pace() -> None:
 
         if 2 in tiers:
             tier2 = TargetReport(name="worker_deep_clean", tier=2)
-            for colony_id, worker_id, wdir in retention.iter_worker_sessions():
+
+            def worker_prunable(wdir: Path) -> bool:
                 ok, _reason = safety.is_safe_to_prune(wdir, min_age_days=cfg.worker_deep_clean_days)
                 if not ok:
-                    tier2.skipped += 1
-                    continue
+                    return False
                 # A live spawning queen may still resume this worker.
                 meta = retention._read_json(wdir / "meta.json")
-                if meta.get("queen_session_id") in safety.protected_session_ids:
+                return meta.get("queen_session_id") not in safety.protected_session_ids
+
+            workers = list(retention.iter_worker_sessions())
+            prefetch = getattr(disposer, "prefetch", None)
+            if callable(prefetch):
+                # Lets an archiving disposer compress ahead in its pool; the
+                # gate below is re-checked right before each worker's deletes.
+                prefetch(p for _, worker_id, wdir in workers if worker_prunable(wdir) for p in retention.worker_dispose_targets(worker_id, wdir))
+            for colony_id, worker_id, wdir in workers:
+                if not worker_prunable(wdir):
                     tier2.skipped += 1
                     continue
                 sub = retention.deep_clean_worker(colony_id, worker_id, wdir, disposer=disposer, manifest=manifest)
                 tier2.files += sub.files
                 tier2.bytes_freed += sub.bytes_freed
                 tier2.errors.extend(sub.errors)
-                pace()
+                pace(sub.bytes_freed)
             report.targets.append(tier2)
 
         if 3 in tiers or include_legacy:
@@ -336,11 +391,13 @@ def pace() -> None:
                 tier3.bytes_freed += sub.bytes_freed
                 tier3.skipped += sub.skipped
                 tier3.errors.extend(sub.errors)
-                pace()
+                pace(sub.bytes_freed)
             report.targets.append(tier3)
 
         if include_legacy:
-            report.targets.append(retention.sweep_orphan_message_index(DeleteDisposer() if execute else DryRunDisposer(), manifest))
+            report.targets.append(retention.sweep_orphan_message_index(DeleteDisposer(catalog) if execute else DryRunDisposer(catalog), manifest))
+
+        report.targets.append(retention.sweep_unreferenced_spill_blobs(DeleteDisposer(catalog) if execute else DryRunDisposer(catalog), manifest))
 
         junk = retention.find_junk_entries(cfg.junk_min_bytes)
         junk_report = TargetReport(name="junk", tier=0)
@@ -384,6 +441,10 @@ def pace() -> None:
                 report.archive_path = str(archive_path)
         if execute:
             _release_global_lock()
+        try:
+            catalog.save()
+        except OSError:
+            logger.warning("janitor: failed to save size catalog", exc_info=True)
 
     report.finished_at = time.time()
     report.manifest_path = _write_manifest(manifest, report.started_at)
@@ -396,4 +457,5 @@ def pace() -> None:
         report.tiers,
         report.mode,
     )
+    logger.debug("janitor: size catalog reused %d dirs, listed %d; paced %.1fs", catalog.hits, catalog.misses, budget.slept)
     return report
@@ -35,10 +35,12 @@
 from typing import TYPE_CHECKING, Protocol
 
 from framework import config
+from framework.host.event_index import EventLogIndex
 from framework.server import compaction_status
 from framework.utils.io import atomic_write
 
 if TYPE_CHECKING:
+    from framework.maintenance.catalog import SizeCatalog
     from framework.server.session_manager import SessionManager
 
 try:
@@ -82,6 +84,7 @@
         "failed_requests",
         "logs",
         ".message_index",
+        ".spill_blobs",
         ".janitor",
     }
 )
@@ -100,7 +103,7 @@
 _EVENTS_TMP_SUFFIX = ".janitor-tmp"
 
 # Worker session-root files that survive a deep-clean.
-_WORKER_KEEP_FILES = frozenset({"meta.json", "tasks.json", "result.json"})
+_WORKER_KEEP_FILES = frozenset({"meta.json", "tasks.json", "tasks.log", ".tasks.lock", "result.json"})
 
 _TOMBSTONE_SUMMARY_CAP = 1000
 
@@ -152,6 +155,15 @@ def _dir_size(path: Path) -> tuple[int, int]:
     return files, total
 
 
+def _tree_size(path: Path, catalog: SizeCatalog | None) -> tuple[int, int]:
+    return catalog.dir_size(path) if catalog is not None else _dir_size(path)
+
+
+def is_janitor_residue(name: str) -> bool:
+    """Crash residue of a prior run: ``*.janitor-tmp`` rewrites, ``*.jtrash-*`` trees."""
+    return name.endswith(_EVENTS_TMP_SUFFIX) or ".jtrash-" in name
+
+
 def assert_safe_target(path: Path) -> None:
     """Refuse to dispose anything under a KEEP_ALWAYS top-level entry."""
     hive_home = config.HIVE_HOME.resolve()
@@ -251,6 +263,9 @@ class DryRunDisposer:
 
     dry_run = True
 
+    def __init__(self, catalog: SizeCatalog | None = None) -> None:
+        self._catalog = catalog
+
     def dispose_file(self, path: Path) -> int:
         try:
             return path.stat().st_size
@@ -258,12 +273,15 @@ def dispose_file(self, path: Path) -> int:
             return 0
 
     def dispose_dir(self, path: Path) -> tuple[int, int]:
-        return _dir_size(path)
+        return _tree_size(path, self._catalog)
 
 
 class DeleteDisposer:
     dry_run = False
 
+    def __init__(self, catalog: SizeCatalog | None = None) -> None:
+        self._catalog = catalog
+
     def dispose_file(self, path: Path) -> int:
         assert_safe_target(path)
         try:
@@ -275,7 +293,7 @@ def dispose_file(self, path: Path) -> int:
 
     def dispose_dir(self, path: Path) -> tuple[int, int]:
         assert_safe_target(path)
-        files, total = _dir_size(path)
+        files, total = _tree_size(path, self._catalog)
         # Rename first so a crash mid-rmtree leaves an obviously-dead tree
         # a later run can sweep, instead of a half-valid session dir.
         trash = path.with_name(f"{path.name}.jtrash-{int(time.time())}")
@@ -284,6 +302,8 @@ def dispose_dir(self, path: Path) -> tuple[int, int]:
         except OSError:
             trash = path  # cross-device or already gone: delete in place
         shutil.rmtree(trash, ignore_errors=True)
+        if self._catalog is not None:
+            self._catalog.forget(path)
         return files, total
 
 
@@ -491,7 +511,7 @@ def prune_aged_dir(
     keep_newest: int = 1,
     process_start_ts: float | None = None,
     now: float | None = None,
-    pace: Callable[[], None] | None = None,
+    pace: Callable[[int], None] | None = None,
 ) -> TargetReport:
     """Delete files in a flat debug dir older than the window.
 
@@ -499,7 +519,8 @@ def prune_aged_dir(
     keeps the ``keep_newest`` most recent entries and anything modified
     since ``process_start_ts`` — the runtime holds one file per dir open
     for its whole lifetime (llm_debug_logger.py when enabled /
-    event_bus.py).
+    event_bus.py). ``pace`` is called with the bytes each deletion
+    touched.
     """
     report = TargetReport(name=target, tier=1)
     now = now if now is not None else time.time()
@@ -549,7 +570,7 @@ def prune_aged_dir(
             report.errors.append(f"{p.name}: {exc}")
         manifest.add(item)
         if pace:
-            pace()
+            pace(item.bytes)
     return report
 
 
@@ -609,6 +630,16 @@ def _extract_worker_summary(wdir: Path) -> tuple[str, str]:
     return "unknown", ""
 
 
+def _message_index_subtrees(session_id: str) -> list[Path]:
+    index_root = config.HIVE_HOME / ".message_index"
+    subs: list[Path] = []
+    for tree in ("events", "data", "meta"):
+        base = index_root / tree
+        if base.is_dir():
+            subs.extend(base.glob(f"*/*/{session_id}"))
+    return subs
+
+
 def _delete_message_index_subtrees(session_id: str, disposer: Disposer, manifest: Manifest, tier: int, target: str) -> int:
     """Remove .message_index/{events,data,meta}/*/*/<session_id> subtrees.
 
@@ -616,32 +647,52 @@ def _delete_message_index_subtrees(session_id: str, disposer: Disposer, manifest
     so leaving it behind both strands bytes and serves ghost results
     from search_messages after the source is pruned.
     """
-    index_root = config.HIVE_HOME / ".message_index"
     freed = 0
-    for tree in ("events", "data", "meta"):
-        base = index_root / tree
-        if not base.is_dir():
-            continue
-        for sub in base.glob(f"*/*/{session_id}"):
-            item = PruneItem(
-                path=str(sub),
-                bytes=0,
-                tier=tier,
-                target=target,
-                action="delete",
-                reason="message index copy of pruned session",
-            )
-            try:
-                _, item.bytes = disposer.dispose_dir(sub)
-                item.outcome = "candidate" if disposer.dry_run else "done"
-                freed += item.bytes
-            except (OSError, ValueError) as exc:
-                item.outcome = "error"
-                item.error = str(exc)
-            manifest.add(item)
+    for sub in _message_index_subtrees(session_id):
+        item = PruneItem(
+            path=str(sub),
+            bytes=0,
+            tier=tier,
+            target=target,
+            action="delete",
+            reason="message index copy of pruned session",
+        )
+        try:
+            _, item.bytes = disposer.dispose_dir(sub)
+            item.outcome = "candidate" if disposer.dry_run else "done"
+            freed += item.bytes
+        except (OSError, ValueError) as exc:
+            item.outcome = "error"
+            item.error = str(exc)
+        manifest.add(item)
     return freed
 
 
+def _worker_transcript_targets(wdir: Path) -> list[Path]:
+    targets: list[Path] = []
+    for sub in ("conversations", "data"):
+        p = wdir / sub
+        if p.exists():
+            targets.append(p)
+    try:
+        for p in wdir.iterdir():
+            if p.is_file() and p.name not in _WORKER_KEEP_FILES:
+                targets.append(p)
+    except OSError:
+        pass
+    return targets
+
+
+def worker_dispose_targets(worker_id: str, wdir: Path) -> list[Path]:
+    """Everything ``deep_clean_worker`` would dispose, in disposal order.
+
+    Lets an archiving disposer start compressing ahead of the deletes.
+    """
+    if (wdir / "result.json").exists() and not (wdir / "conversations").exists():
+        return []
+    return _message_index_subtrees(worker_id) + _worker_transcript_targets(wdir)
+
+
 def deep_clean_worker(
     colony_id: str,
     worker_id: str,
@@ -694,19 +745,7 @@ def deep_clean_worker(
 
     report.bytes_freed += _delete_message_index_subtrees(worker_id, disposer, manifest, 2, "worker_deep_clean")
 
-    targets: list[Path] = []
-    for sub in ("conversations", "data"):
-        p = wdir / sub
-        if p.exists():
-            targets.append(p)
-    try:
-        for p in wdir.iterdir():
-            if p.is_file() and p.name not in _WORKER_KEEP_FILES:
-                targets.append(p)
-    except OSError:
-        pass
-
-    for p in targets:
+    for p in _worker_transcript_targets(wdir):
         item = PruneItem(
             path=str(p),
             bytes=0,
@@ -902,6 +941,9 @@ def rewrite_events_jsonl(
             manifest.add(item)
             return 0
         os.replace(tmp, events_path)
+        # Byte offsets in the sidecar index point into the old inode; the
+        # next history read rebuilds it from the rewritten file.
+        EventLogIndex.discard(events_path)
     except OSError as exc:
         tmp.unlink(missing_ok=True)
         item.outcome = "error"
@@ -1042,45 +1084,56 @@ def prune_queen_session(
 # ---------------------------------------------------------------------------
 
 
-def sweep_janitor_leftovers(manifest: Manifest) -> TargetReport:
-    """Remove crash residue from prior runs: *.janitor-tmp, *.jtrash-*."""
+def _residue_paths(hive_home: Path) -> list[Path]:
+    matches: list[Path] = []
+    for pattern in ("*.janitor-tmp", "*.jtrash-*"):
+        try:
+            matches.extend(hive_home.rglob(pattern))
+        except OSError:
+            continue
+    return matches
+
+
+def sweep_janitor_leftovers(manifest: Manifest, catalog: SizeCatalog | None = None) -> TargetReport:
+    """Remove crash residue from prior runs: *.janitor-tmp, *.jtrash-*.
+
+    With a ``catalog`` (built with ``mark=is_janitor_residue``) only
+    directories that changed since the last run are re-listed.
+    """
     report = TargetReport(name="leftover_sweep", tier=0)
     hive_home = config.HIVE_HOME
     if not hive_home.is_dir():
         return report
-    patterns = ("*.janitor-tmp", "*.jtrash-*")
-    for pattern in patterns:
+    matches = list(catalog.marked(hive_home)) if catalog is not None else _residue_paths(hive_home)
+    for p in matches:
+        # Only sweep residue that's had time to be finished by its owner.
+        if time.time() - _safe_stat_mtime(p) < _SESSION_LOCK_TTL_S:
+            continue
         try:
-            matches = list(hive_home.rglob(pattern))
+            size = 0
+            if p.is_dir():
+                _, size = _tree_size(p, catalog)
+                shutil.rmtree(p, ignore_errors=True)
+                if catalog is not None:
+                    catalog.forget(p)
+            else:
+                size = p.stat().st_size
+                p.unlink(missing_ok=True)
+            report.files += 1
+            report.bytes_freed += size
+            manifest.add(
+                PruneItem(
+                    path=str(p),
+                    bytes=size,
+                    tier=0,
+                    target="leftover_sweep",
+                    action="delete",
+                    reason="crash residue from prior janitor run",
+                    outcome="done",
+                )
+            )
         except OSError:
             continue
-        for p in matches:
-            # Only sweep residue that's had time to be finished by its owner.
-            if time.time() - _safe_stat_mtime(p) < _SESSION_LOCK_TTL_S:
-                continue
-            try:
-                size = 0
-                if p.is_dir():
-                    _, size = _dir_size(p)
-                    shutil.rmtree(p, ignore_errors=True)
-                else:
-                    size = p.stat().st_size
-                    p.unlink(missing_ok=True)
-                report.files += 1
-                report.bytes_freed += size
-                manifest.add(
-                    PruneItem(
-                        path=str(p),
-                        bytes=size,
-                        tier=0,
-                        target="leftover_sweep",
-                        action="delete",
-                        reason="crash residue from prior janitor run",
-                        outcome="done",
-                    )
-                )
-            except OSError:
-                continue
     return report
 
 
@@ -1134,6 +1187,51 @@ def sweep_orphan_message_index(disposer: Disposer, manifest: Manifest) -> Target
     return report
 
 
+# A blob younger than this may be between its write and its first link.
+_SPILL_BLOB_GRACE_S = 3600.0
+
+
+def sweep_unreferenced_spill_blobs(disposer: Disposer, manifest: Manifest, *, now: float | None = None) -> TargetReport:
+    """Delete spill blobs no spill file links to any more.
+
+    Spill files are hard links into HIVE_HOME/.spill_blobs (see
+    agent_loop/internals/spill_store.py), so once every session that
+    spilled a result is pruned the blob's link count is back to one —
+    the blob itself — and nothing can reach it.
+    """
+    report = TargetReport(name="spill_blob_sweep", tier=0)
+    root = config.HIVE_HOME / ".spill_blobs"
+    if not root.is_dir():
+        return report
+    cutoff = (now if now is not None else time.time()) - _SPILL_BLOB_GRACE_S
+    for blob in sorted(root.glob("*/*.txt")):
+        try:
+            st = blob.stat()
+        except OSError:
+            continue
+        if st.st_nlink > 1 or st.st_mtime >= cutoff:
+            continue
+        item = PruneItem(
+            path=str(blob),
+            bytes=st.st_size,
+            tier=0,
+            target="spill_blob_sweep",
+            action="delete",
+            reason="no spill file links to this blob",
+        )
+        try:
+            item.bytes = disposer.dispose_file(blob)
+            item.outcome = "candidate" if disposer.dry_run else "done"
+            report.files += 1
+            report.bytes_freed += item.bytes
+        except (OSError, ValueError) as exc:
+            item.outcome = "error"
+            item.error = str(exc)
+            report.errors.append(f"{blob}: {exc}")
+        manifest.add(item)
+    return report
+
+
 def iter_legacy_queen_sessions() -> Iterator[Path]:
     """Queen session dirs under the pre-v3 HIVE_HOME/agents/queens tree.
 
@@ -1152,7 +1250,11 @@ def iter_legacy_queen_sessions() -> Iterator[Path]:
 
 
 def find_junk_entries(min_bytes: int) -> list[tuple[Path, int]]:
-    """Top-level HIVE_HOME entries outside the known layout, above a size floor."""
+    """Top-level HIVE_HOME entries outside the known layout, above a size floor.
+
+    Sizes come from a real walk, never the size catalog: they decide what
+    gets disposed, and the catalog misses files rewritten in place.
+    """
     hive_home = config.HIVE_HOME
     out: list[tuple[Path, int]] = []
     if not hive_home.is_dir():
@@ -73,6 +73,7 @@ class GraphContext:
     dynamic_memory_provider: Any = None
     iteration_metadata_provider: Any = None
     loop_config: dict[str, Any] = field(default_factory=dict)
+    node_cache: Any = None  # NodeResultCache | None (None = process default)
     path: list[str] = field(default_factory=list)
     node_visit_counts: dict[str, int] = field(default_factory=dict)
     _path_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
@@ -97,7 +98,7 @@ def build_scoped_buffer(buffer: DataBuffer, node_spec: NodeSpec) -> DataBuffer:
     if read_keys or write_keys:
         from framework.skills.defaults import DATA_BUFFER_KEYS as _skill_keys
 
-        existing_underscore = [k for k in buffer._data if k.startswith("_")]
+        existing_underscore = [k for k in buffer.keys() if k.startswith("_")]
         extra_keys = set(_skill_keys) | set(existing_underscore)
 
         for key in extra_keys:
@@ -30,7 +30,7 @@
 from pydantic import BaseModel, Field, model_validator
 
 from framework.config import get_aux_max_tokens
-from framework.orchestrator.safe_eval import safe_eval
+from framework.orchestrator.safe_eval import compile_expression
 
 logger = logging.getLogger(__name__)
 
@@ -180,20 +180,23 @@ def _evaluate_condition(
         }
 
         try:
-            # Safe evaluation using AST-based whitelist
-            result = bool(safe_eval(self.condition_expr, context))
-            # Log the evaluation for visibility
-            # Extract the variable names used in the expression for debugging
-            expr_vars = {
-                k: repr(context[k]) for k in context if k not in ("output", "buffer", "result", "true", "false") and k in self.condition_expr
-            }
-            logger.info(
-                "  Edge %s: condition '%s' → %s  (vars: %s)",
-                self.id,
-                self.condition_expr,
-                result,
-                expr_vars or "none matched",
-            )
+            # Safe evaluation using AST-based whitelist, compiled once per
+            # expression string.
+            compiled = compile_expression(self.condition_expr)
+            result = bool(compiled.evaluate(context))
+            if logger.isEnabledFor(logging.INFO):
+                # Log the evaluation for visibility, with the variables the
+                # expression actually reads.
+                expr_vars = {
+                    k: repr(context[k]) for k in sorted(compiled.names) if k in context and k not in ("output", "buffer", "result", "true", "false")
+                }
+                logger.info(
+                    "  Edge %s: condition '%s' → %s  (vars: %s)",
+                    self.id,
+                    self.condition_expr,
+                    result,
+                    expr_vars or "none matched",
+                )
             return result
         except Exception as e:
             logger.warning(f"      ⚠ Condition evaluation failed: {self.condition_expr}")
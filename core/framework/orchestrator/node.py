@@ -19,6 +19,7 @@
 import json
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -184,6 +185,20 @@ class NodeSpec(BaseModel):
         ),
     )
 
+    # Result memoization across runs (see framework.orchestrator.node_cache)
+    cache_results: bool = Field(
+        default=False,
+        description=(
+            "Replay this node's last result instead of executing it when its spec, "
+            "prompt context, tools and readable buffer values are unchanged. "
+            "Only for nodes whose output is a function of those inputs."
+        ),
+    )
+    cache_ttl_seconds: float | None = Field(
+        default=None,
+        description="Maximum age of a replayed result. None keeps it until evicted.",
+    )
+
     model_config = {"extra": "allow", "arbitrary_types_allowed": True}
 
     def is_queen_node(self) -> bool:
@@ -227,6 +242,100 @@ class DataBufferWriteError(Exception):
     pass
 
 
+# Substrings that mark a long buffer write as likely hallucinated code.
+# Indicators that contain another one are left out ("async def " always
+# contains "def "), since they can never change the answer.
+_CODE_INDICATORS = (
+    # Python
+    "```python",
+    "def ",
+    "class ",
+    "import ",
+    "from ",
+    # JavaScript/TypeScript
+    "function ",
+    "const ",
+    "let ",
+    "=> {",
+    "require(",
+    "export ",
+    # SQL
+    "SELECT ",
+    "INSERT ",
+    "UPDATE ",
+    "DELETE ",
+    "DROP ",
+    # HTML/Script injection
+    "<script",
+    "<?php",
+    "<%",
+)
+
+
+@dataclass
+class _BufferStore:
+    """State shared by a buffer and its permission-scoped views.
+
+    Every write bumps ``version`` and records it per key, so callers can
+    ask what changed since a version they saw.  ``data`` is copy-on-write:
+    a snapshot takes a reference to it and marks it shared, and the next
+    write copies the dict before changing it.  An overlay store reads
+    through to ``base`` (a snapshot of its parent) for keys it has not
+    written itself.
+    """
+
+    data: dict[str, Any] = field(default_factory=dict)
+    base: "BufferSnapshot | None" = None
+    version: int = 0
+    key_versions: dict[str, int] = field(default_factory=dict)
+    shared: bool = False
+
+    def get(self, key: str) -> Any:
+        if key in self.data or self.base is None:
+            return self.data.get(key)
+        return self.base.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        if self.shared:
+            self.data = dict(self.data)
+            self.shared = False
+        self.version += 1
+        self.data[key] = value
+        self.key_versions[key] = self.version
+
+    def snapshot(self) -> "BufferSnapshot":
+        if self.base is not None:
+            return BufferSnapshot({**self.base, **self.data}, self.version)
+        self.shared = True
+        return BufferSnapshot(self.data, self.version)
+
+
+class BufferSnapshot(Mapping[str, Any]):
+    """Read-only view of a buffer's contents at one version.
+
+    Taking one is O(1): it shares the buffer's dict, which the buffer
+    copies before its next write instead.
+    """
+
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data: dict[str, Any], version: int) -> None:
+        self._data = data
+        self.version = version
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"BufferSnapshot(version={self.version}, keys={list(self._data)!r})"
+
+
 @dataclass
 class DataBuffer:
     """
@@ -235,11 +344,18 @@ class DataBuffer:
     Nodes read and write to the data buffer using typed keys.
     The buffer is scoped to a single run.
 
-    For parallel execution, use write_async() which provides per-key locking
-    to prevent race conditions when multiple nodes write concurrently.
+    The buffer is versioned: ``snapshot()`` is O(1) and
+    ``changes_since()`` lists the keys written after a given version, so
+    progress files and checkpoints only re-encode what changed.  Parallel
+    branches each write to their own ``overlay()`` and are merged back
+    with ``merge_overlay()``, which detects keys written by more than one
+    branch.
+
+    For concurrent writers to one buffer, use write_async() which provides
+    per-key locking to prevent race conditions.
     """
 
-    _data: dict[str, Any] = field(default_factory=dict)
+    _store: _BufferStore = field(default_factory=_BufferStore)
     _allowed_read: set[str] = field(default_factory=set)
     _allowed_write: set[str] = field(default_factory=set)
     # Locks for thread-safe parallel execution
@@ -251,11 +367,16 @@ def __post_init__(self) -> None:
         if self._lock is None:
             self._lock = asyncio.Lock()
 
+    @property
+    def version(self) -> int:
+        """Number of writes made to this buffer (or its overlay) so far."""
+        return self._store.version
+
     def read(self, key: str) -> Any:
         """Read a value from the data buffer."""
         if self._allowed_read and key not in self._allowed_read:
             raise PermissionError(f"Node not allowed to read key: {key}")
-        return self._data.get(key)
+        return self._store.get(key)
 
     def write(self, key: str, value: Any, validate: bool = True) -> None:
         """
@@ -274,20 +395,9 @@ def write(self, key: str, value: Any, validate: bool = True) -> None:
             raise PermissionError(f"Node not allowed to write key: {key}")
 
         if validate and isinstance(value, str):
-            # Check for obviously hallucinated content
-            if len(value) > 5000:
-                # Long strings that look like code are suspicious
-                if self._contains_code_indicators(value):
-                    logger.warning(
-                        f"⚠ Suspicious write to key '{key}': appears to be code ({len(value)} chars). Consider using validate=False if intended."
-                    )
-                    raise DataBufferWriteError(
-                        f"Rejected suspicious content for key '{key}': "
-                        f"appears to be hallucinated code ({len(value)} chars). "
-                        "If this is intentional, use validate=False."
-                    )
-
-        self._data[key] = value
+            self._check_suspicious(key, value)
+
+        self._store.set(key, value)
 
     async def write_async(self, key: str, value: Any, validate: bool = True) -> None:
         """
@@ -318,17 +428,22 @@ async def write_async(self, key: str, value: Any, validate: bool = True) -> None
         # Acquire per-key lock and write
         async with self._key_locks[key]:
             if validate and isinstance(value, str):
-                if len(value) > 5000:
-                    if self._contains_code_indicators(value):
-                        logger.warning(
-                            f"⚠ Suspicious write to key '{key}': appears to be code ({len(value)} chars). Consider using validate=False if intended."
-                        )
-                        raise DataBufferWriteError(
-                            f"Rejected suspicious content for key '{key}': "
-                            f"appears to be hallucinated code ({len(value)} chars). "
-                            "If this is intentional, use validate=False."
-                        )
-            self._data[key] = value
+                self._check_suspicious(key, value)
+            self._store.set(key, value)
+
+    def _check_suspicious(self, key: str, value: str) -> None:
+        # Check for obviously hallucinated content
+        if len(value) > 5000:
+            # Long strings that look like code are suspicious
+            if self._contains_code_indicators(value):
+                logger.warning(
+                    f"⚠ Suspicious write to key '{key}': appears to be code ({len(value)} chars). Consider using validate=False if intended."
+                )
+                raise DataBufferWriteError(
+                    f"Rejected suspicious content for key '{key}': "
+                    f"appears to be hallucinated code ({len(value)} chars). "
+                    "If this is intentional, use validate=False."
+                )
 
     def _contains_code_indicators(self, value: str) -> bool:
         """
@@ -336,7 +451,10 @@ def _contains_code_indicators(self, value: str) -> bool:
 
         For strings under 10KB, checks the entire content.
         For longer strings, samples at strategic positions to balance
-        performance with detection accuracy.
+        performance with detection accuracy.  The samples are joined and
+        scanned once, so each indicator costs one search rather than one
+        per sample.  No indicator contains a newline, so the joins cannot
+        create a match that was not in a sample.
 
         Args:
             value: The string to check for code indicators
@@ -344,58 +462,37 @@ def _contains_code_indicators(self, value: str) -> bool:
         Returns:
             True if code indicators are found, False otherwise
         """
-        code_indicators = [
-            # Python
-            "```python",
-            "def ",
-            "class ",
-            "import ",
-            "async def ",
-            "from ",
-            # JavaScript/TypeScript
-            "function ",
-            "const ",
-            "let ",
-            "=> {",
-            "require(",
-            "export ",
-            # SQL
-            "SELECT ",
-            "INSERT ",
-            "UPDATE ",
-            "DELETE ",
-            "DROP ",
-            # HTML/Script injection
-            "<script",
-            "<?php",
-            "<%",
-        ]
-
-        # For strings under 10KB, check the entire content
-        if len(value) < 10000:
-            return any(indicator in value for indicator in code_indicators)
-
-        # For longer strings, sample at strategic positions
-        sample_positions = [
-            0,  # Start
-            len(value) // 4,  # 25%
-            len(value) // 2,  # 50%
-            3 * len(value) // 4,  # 75%
-            max(0, len(value) - 2000),  # Near end
-        ]
-
-        for pos in sample_positions:
-            chunk = value[pos : pos + 2000]
-            if any(indicator in chunk for indicator in code_indicators):
-                return True
-
-        return False
+        n = len(value)
+        if n >= 10000:
+            # Start, 25%, 50%, 75% and near the end
+            positions = (0, n // 4, n // 2, 3 * n // 4, max(0, n - 2000))
+            value = "\n".join(value[pos : pos + 2000] for pos in positions)
+        return any(indicator in value for indicator in _CODE_INDICATORS)
 
     def read_all(self) -> dict[str, Any]:
         """Read all accessible data."""
+        snapshot = self._store.snapshot()
         if self._allowed_read:
-            return {k: v for k, v in self._data.items() if k in self._allowed_read}
-        return dict(self._data)
+            return {k: v for k, v in snapshot.items() if k in self._allowed_read}
+        return dict(snapshot)
+
+    def keys(self) -> list[str]:
+        """All keys in the buffer, regardless of read permissions."""
+        return list(self._store.snapshot())
+
+    def snapshot(self) -> BufferSnapshot:
+        """Read-only view of the whole buffer at its current version, in O(1).
+
+        Later writes do not show through: the buffer copies its dict on
+        the next write instead of the snapshot copying it now.
+        """
+        return self._store.snapshot()
+
+    def changes_since(self, version: int) -> dict[str, Any]:
+        """Keys written after ``version`` (see ``version``), with their
+        current values."""
+        store = self._store
+        return {k: store.get(k) for k, v in store.key_versions.items() if v > version}
 
     def with_permissions(
         self,
@@ -408,13 +505,60 @@ def with_permissions(
         enabling thread-safe parallel execution across scoped views.
         """
         return DataBuffer(
-            _data=self._data,
+            _store=self._store,
             _allowed_read=set(read_keys) if read_keys else set(),
             _allowed_write=set(write_keys) if write_keys else set(),
             _lock=self._lock,  # Share lock for thread safety
             _key_locks=self._key_locks,  # Share key locks
         )
 
+    def overlay(self) -> "DataBuffer":
+        """Branch-local buffer for a parallel branch.
+
+        Reads see this buffer as of now plus the branch's own writes;
+        writes stay in the overlay until ``merge_overlay()``, so branches
+        never observe each other's partial state and need no locks.
+        """
+        return DataBuffer(_store=_BufferStore(base=self._store.snapshot()))
+
+    def merge_overlay(
+        self,
+        overlay: "DataBuffer",
+        *,
+        branch_id: str,
+        written_by: dict[str, str],
+        conflict_strategy: str = "last_wins",
+    ) -> list[str]:
+        """Apply the writes made in ``overlay`` to this buffer.
+
+        ``written_by`` maps each key merged so far to the branch that
+        wrote it, and is updated here.  A key already written by another
+        branch is a conflict, resolved by ``conflict_strategy``:
+        ``"last_wins"`` overwrites, ``"first_wins"`` keeps the earlier
+        value and ``"error"`` raises ``RuntimeError`` before anything from
+        this overlay is applied.
+
+        Returns:
+            The keys written to this buffer.
+        """
+        changes = overlay.changes_since(0)
+        conflicts = {k: written_by[k] for k in changes if written_by.get(k, branch_id) != branch_id}
+        if conflicts and conflict_strategy == "error":
+            key, prior_branch = next(iter(conflicts.items()))
+            raise RuntimeError(f"Buffer conflict: key '{key}' already written by branch '{prior_branch}', conflicting write from '{branch_id}'")
+        merged = []
+        for key, value in changes.items():
+            prior_branch = conflicts.get(key)
+            if prior_branch and conflict_strategy == "first_wins":
+                logger.debug(f"      ⚠ Skipping write to '{key}' (first_wins: already set by {prior_branch})")
+                continue
+            if prior_branch:
+                logger.debug(f"      ⚠ Key '{key}' overwritten (last_wins: {prior_branch} -> {branch_id})")
+            written_by[key] = branch_id
+            self._store.set(key, value)
+            merged.append(key)
+        return merged
+
 
 @dataclass
 class NodeContext:
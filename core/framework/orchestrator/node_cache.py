@@ -0,0 +1,253 @@
+"""Opt-in memoization of node results across graph runs.
+
+A resumed, retried or re-run graph executes every node again, including
+deterministic upstream nodes whose inputs have not changed.  A node whose
+spec sets ``cache_results=True`` is looked up here first; on a hit its
+recorded ``NodeResult`` and buffer writes are replayed instead of running
+it.
+
+The key is a SHA-256 over everything the node's behaviour depends on:
+
+* the node id and its spec (system prompt, model, keys, tools, ...);
+* the prompt context the orchestrator adds (goal, accounts, identity,
+  narrative, memory, skills and protocols);
+* the resolved tool set (name, description, parameter schema) and model;
+* the canonical JSON of the buffer values the node is allowed to read,
+  and its input data.
+
+Anything that cannot be keyed soundly is never cached: a context with
+dynamic prompt/tool/memory providers (the prompt changes under the
+node), continuous-conversation graphs (the result carries a live
+conversation), nodes without declared output keys (their buffer view is
+unrestricted, so writes made concurrently by other nodes cannot be told
+apart from their own), values that are not JSON-serializable, and failed
+results.
+
+Entries are JSON files under ``HIVE_HOME/node_cache/<k[:2]>/<k>.json``.
+They expire after the node's ``cache_ttl_seconds`` when it sets one.
+The least recently used entries are evicted once the store exceeds
+``HIVE_NODE_CACHE_MAX_BYTES`` (default 256 MiB).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from framework.orchestrator.node import NodeContext, NodeResult, NodeSpec
+from framework.utils.io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.environ.get("HIVE_NODE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Bump when the key derivation or the entry format changes.
+_FORMAT = 1
+
+# NodeSpec fields that configure caching rather than behaviour.
+_SPEC_EXCLUDE = {"cache_results", "cache_ttl_seconds"}
+
+# NodeResult fields persisted in an entry (``conversation`` is live state).
+_RESULT_FIELDS = ("success", "output", "error", "next_node", "route_reason", "tokens_used", "latency_ms", "validation_errors")
+
+
+def _canonical(value: Any) -> str:
+    """Deterministic JSON; raises TypeError for values JSON cannot hold."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class CachedNodeResult:
+    """A replayable entry: the result and the buffer writes made while
+    producing it (beyond ``result.output``)."""
+
+    result: NodeResult
+    buffer_writes: dict[str, Any]
+
+
+@dataclass
+class NodeCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    tokens_saved: int = 0
+    latency_saved_ms: int = 0
+
+
+@dataclass
+class NodeResultCache:
+    """Disk-backed node result store with TTL and size-bounded LRU eviction."""
+
+    root: Path
+    max_bytes: int = DEFAULT_MAX_BYTES
+    stats: NodeCacheStats = field(default_factory=NodeCacheStats)
+    _size: int | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def key_for(self, node_spec: NodeSpec, ctx: NodeContext) -> str | None:
+        """Cache key for running ``node_spec`` in ``ctx``, or None when the
+        run cannot be keyed soundly (see the module docstring)."""
+        if ctx.continuous_mode or ctx.inherited_conversation is not None:
+            return None
+        if ctx.dynamic_tools_provider or ctx.dynamic_prompt_provider or ctx.dynamic_memory_provider:
+            return None
+        try:
+            tools = sorted(
+                ([getattr(t, "name", ""), getattr(t, "description", ""), getattr(t, "parameters", {})] for t in ctx.available_tools),
+                key=_canonical,
+            )
+            material = _canonical(
+                {
+                    "format": _FORMAT,
+                    "node": node_spec.id,
+                    "spec": node_spec.model_dump(mode="json", exclude=_SPEC_EXCLUDE),
+                    "prompt": [
+                        ctx.goal_context,
+                        ctx.accounts_prompt,
+                        ctx.identity_prompt,
+                        ctx.narrative,
+                        ctx.memory_prompt,
+                        ctx.skills_catalog_prompt,
+                        ctx.protocols_prompt,
+                    ],
+                    "model": node_spec.model or getattr(ctx.llm, "model", None),
+                    "tools": tools,
+                    "buffer": ctx.buffer.read_all(),
+                    "input": ctx.input_data,
+                }
+            )
+        except (TypeError, ValueError):
+            logger.debug("Node %s: inputs are not JSON-serializable, not caching", node_spec.id)
+            return None
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, ttl_seconds: float | None = None) -> CachedNodeResult | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+        if ttl_seconds is not None and time.time() - entry.get("created", 0) > ttl_seconds:
+            self._remove(path)
+            self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        result = NodeResult(**entry["result"])
+        self.stats.hits += 1
+        self.stats.tokens_saved += result.tokens_used
+        self.stats.latency_saved_ms += result.latency_ms
+        # The replay itself spent nothing.
+        result.tokens_used = 0
+        result.latency_ms = 0
+        return CachedNodeResult(result=result, buffer_writes=entry.get("buffer_writes", {}))
+
+    def put(self, key: str, result: NodeResult, buffer_writes: dict[str, Any]) -> bool:
+        """Store a successful result; returns False when it is not cacheable."""
+        if not result.success:
+            return False
+        entry = {
+            "created": time.time(),
+            "result": {name: getattr(result, name) for name in _RESULT_FIELDS},
+            "buffer_writes": buffer_writes,
+        }
+        try:
+            data = json.dumps(entry, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return False
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path) as f:
+            f.write(data)
+        self.stats.stores += 1
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+        self._maybe_evict()
+        return True
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*.json"):
+            self._remove(path)
+        with self._lock:
+            self._size = 0
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _maybe_evict(self) -> None:
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            # Oldest first, down to 90% so the next few stores do not rescan.
+            entries.sort()
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.stats.evictions += 1
+        with self._lock:
+            self._size = total
+
+
+_default: NodeResultCache | None = None
+_default_lock = threading.Lock()
+
+
+def default_node_cache() -> NodeResultCache:
+    """The process-wide cache under ``HIVE_HOME/node_cache``."""
+    global _default
+    from framework import config
+
+    root = config.HIVE_HOME / "node_cache"
+    with _default_lock:
+        if _default is None or _default.root != root:
+            _default = NodeResultCache(root=root)
+        return _default
@@ -301,8 +301,8 @@ async def _execute_self(self) -> None:
             # Build context
             ctx = self._build_node_context()
 
-            # Execute with retry
-            result = await self._execute_with_retries(node_impl, ctx)
+            # Execute with retry, or replay a memoized result
+            result = await self._execute_or_replay(node_impl, ctx)
 
             # Handle result
             if result.success:
@@ -345,6 +345,43 @@ async def _execute_self(self) -> None:
             self._last_activations = []
             await self._publish_failure(error)
 
+    async def _execute_or_replay(self, node_impl: NodeProtocol, ctx: NodeContext) -> NodeResult:
+        """Run the node, going through the node result cache when its spec
+        opts in with ``cache_results``."""
+        gc = self._gc
+        node_spec = self.node_spec
+        if not node_spec.cache_results or gc.is_continuous:
+            return await self._execute_with_retries(node_impl, ctx)
+
+        from framework.orchestrator.node_cache import default_node_cache
+
+        # An unrestricted buffer view cannot tell this node's writes from
+        # those of nodes running alongside it, so there is nothing sound to record.
+        writable = ctx.buffer._allowed_write
+        if not writable:
+            return await self._execute_with_retries(node_impl, ctx)
+
+        cache = gc.node_cache or default_node_cache()
+        key = cache.key_for(node_spec, ctx)
+        if key is None:
+            return await self._execute_with_retries(node_impl, ctx)
+
+        cached = cache.get(key, ttl_seconds=node_spec.cache_ttl_seconds)
+        if cached is not None:
+            for buf_key, value in cached.buffer_writes.items():
+                gc.buffer.write(buf_key, value, validate=False)
+            logger.info("Worker %s: replayed cached result (%s)", node_spec.id, key[:12])
+            return cached.result
+
+        # Writes the node makes itself (beyond result.output) are replayed
+        # on a hit, so record which of its writable keys it wrote.
+        start = gc.buffer.version
+        result = await self._execute_with_retries(node_impl, ctx)
+        if result.success:
+            writes = {k: v for k, v in gc.buffer.changes_since(start).items() if k in writable}
+            cache.put(key, result, writes)
+        return result
+
     async def _execute_with_retries(self, node_impl: NodeProtocol, ctx: NodeContext) -> NodeResult:
         """Execute node with exponential backoff retry."""
         gc = self._gc
@@ -48,6 +48,22 @@ def _default_max_context_tokens() -> int:
         return 32_000
 
 
+# Buffer values whose encoded JSON can be reused while their key is not
+# rewritten.  Containers can be mutated in place, so they are re-encoded.
+_IMMUTABLE_VALUES = (str, int, float, bool, type(None))
+
+
+@dataclass
+class _ProgressState:
+    """What ``_write_progress`` last wrote to state.json."""
+
+    buffer: Any
+    version: int
+    fragments: dict[str, str]  # buffer key -> JSON of its value
+    state: dict[str, Any]  # state.json without data_buffer
+    stat: tuple[int, int]  # (mtime_ns, size) right after the write
+
+
 @dataclass
 class ExecutionResult:
     """Result of executing a graph."""
@@ -158,6 +174,7 @@ def __init__(
         skills_catalog_prompt: str = "",
         protocols_prompt: str = "",
         skill_dirs: list[str] | None = None,
+        node_cache: Any = None,
     ):
         """
         Initialize the executor.
@@ -188,6 +205,8 @@ def __init__(
             skills_catalog_prompt: Available skills catalog for system prompt
             protocols_prompt: Default skill operational protocols for system prompt
             skill_dirs: Skill base directories for Tier 3 resource access
+            node_cache: NodeResultCache for nodes with ``cache_results``
+                (defaults to the process-wide cache under HIVE_HOME)
         """
         self.runtime = runtime
         self.llm = llm
@@ -220,6 +239,7 @@ def __init__(
         self.skills_catalog_prompt = skills_catalog_prompt
         self.protocols_prompt = protocols_prompt
         self.skill_dirs: list[str] = skill_dirs or []
+        self.node_cache = node_cache
         if protocols_prompt:
             self.logger.info(
                 "GraphExecutor[%s] received protocols_prompt (%d chars)",
@@ -239,6 +259,9 @@ def __init__(
         # Pause/resume control
         self._pause_requested = asyncio.Event()
 
+        # Last state.json progress write, for incremental rewrites
+        self._progress_state: _ProgressState | None = None
+
         # Track the currently executing node for external injection routing
         self.current_node_id: str | None = None
 
@@ -257,6 +280,11 @@ def _write_progress(
         current progress, not stale initial values.
 
         The write is synchronous and best-effort: never blocks execution.
+
+        Writes are incremental: buffer values are encoded once and reused
+        until their key is written again (see ``DataBuffer.changes_since``),
+        and state.json is only re-read when something else rewrote it since
+        the last progress write.
         """
         if not self._storage_path:
             return
@@ -265,10 +293,19 @@ def _write_progress(
             import json as _json
             from datetime import datetime
 
-            if state_path.exists():
+            last = self._progress_state
+            try:
+                st = state_path.stat()
+                on_disk = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                on_disk = None
+            if last is not None and on_disk == last.stat:
+                state_data = last.state
+            elif on_disk is not None:
                 state_data = _json.loads(state_path.read_text(encoding="utf-8"))
             else:
                 state_data = {}
+            state_data.pop("data_buffer", None)
 
             # Patch progress fields
             progress = state_data.setdefault("progress", {})
@@ -283,14 +320,32 @@ def _write_progress(
 
             # Persist full buffer so state.json is sufficient for resume
             # even if the process dies before the final write.
-            buffer_snapshot = buffer.read_all()
-            state_data["data_buffer"] = buffer_snapshot
-            state_data["buffer_keys"] = list(buffer_snapshot.keys())
+            buffer_snapshot = buffer.snapshot()
+            state_data["buffer_keys"] = list(buffer_snapshot)
             if self._run_id:
                 state_data["current_run_id"] = self._run_id
 
+            reuse = last is not None and last.buffer is buffer
+            changed = buffer.changes_since(last.version) if reuse else {}
+            fragments: dict[str, str] = {}
+            for key, value in buffer_snapshot.items():
+                text = last.fragments.get(key) if reuse and key not in changed and isinstance(value, _IMMUTABLE_VALUES) else None
+                fragments[key] = text if text is not None else _json.dumps(value)
+
+            # state_data always holds progress and timestamps, so the dump
+            # ends in "\n}" and the buffer is spliced in before it.
+            body = ",\n".join(f"    {_json.dumps(key)}: {text}" for key, text in fragments.items())
+            text = _json.dumps(state_data, indent=2)[:-2] + ',\n  "data_buffer": {\n' + body + "\n  }\n}"
             with atomic_write(state_path, encoding="utf-8") as f:
-                _json.dump(state_data, f, indent=2)
+                f.write(text)
+            st = state_path.stat()
+            self._progress_state = _ProgressState(
+                buffer=buffer,
+                version=buffer_snapshot.version,
+                fragments=fragments,
+                state=state_data,
+                stat=(st.st_mtime_ns, st.st_size),
+            )
         except Exception:
             logger.warning(
                 "Failed to persist progress state to %s",
@@ -943,9 +998,10 @@ async def _execute_parallel_branches(
                 edge=edge,
             )
 
-        # Track which branch wrote which key for buffer conflict detection
+        # Track which branch wrote which key for buffer conflict detection.
+        # Branches write to their own overlays, merged one at a time as they
+        # finish, so no locking is needed.
         fanout_written_keys: dict[str, str] = {}  # key -> branch_id that wrote it
-        fanout_keys_lock = asyncio.Lock()
 
         self.logger.info(f"   ⑂ Fan-out: executing {len(branches)} branches in parallel")
         for branch in branches.values():
@@ -983,7 +1039,8 @@ async def execute_single_branch(
                 # Map inputs via edge
                 mapped = branch.edge.map_inputs(source_result.output, buffer.read_all())
                 for key, value in mapped.items():
-                    await buffer.write_async(key, value)
+                    buffer.write(key, value)
+                branch_buffer = buffer.overlay()
 
                 # Execute with retries
                 last_result = None
@@ -994,7 +1051,7 @@ async def execute_single_branch(
                     ctx = build_node_context(
                         runtime=self.runtime,
                         node_spec=node_spec,
-                        buffer=buffer,
+                        buffer=branch_buffer,
                         goal=goal,
                         llm=self.llm,
                         tools=self.tools,
@@ -1054,26 +1111,16 @@ async def execute_single_branch(
                         )
 
                     if result.success:
-                        # Write outputs to shared buffer with conflict detection
-                        conflict_strategy = self._parallel_config.buffer_conflict_strategy
+                        # Merge the branch's writes and outputs into the shared
+                        # buffer with conflict detection
                         for key, value in result.output.items():
-                            async with fanout_keys_lock:
-                                prior_branch = fanout_written_keys.get(key)
-                                if prior_branch and prior_branch != branch.branch_id:
-                                    if conflict_strategy == "error":
-                                        raise RuntimeError(
-                                            f"Buffer conflict: key '{key}' already written "
-                                            f"by branch '{prior_branch}', "
-                                            f"conflicting write from '{branch.branch_id}'"
-                                        )
-                                    elif conflict_strategy == "first_wins":
-                                        self.logger.debug(f"      ⚠ Skipping write to '{key}' (first_wins: already set by {prior_branch})")
-                                        continue
-                                    else:
-                                        # last_wins (default): write and log
-                                        self.logger.debug(f"      ⚠ Key '{key}' overwritten (last_wins: {prior_branch} -> {branch.branch_id})")
-                                fanout_written_keys[key] = branch.branch_id
-                            await buffer.write_async(key, value)
+                            branch_buffer.write(key, value)
+                        buffer.merge_overlay(
+                            branch_buffer,
+                            branch_id=branch.branch_id,
+                            written_by=fanout_written_keys,
+                            conflict_strategy=self._parallel_config.buffer_conflict_strategy,
+                        )
 
                         branch.result = result
                         branch.status = "completed"
@@ -1205,7 +1252,7 @@ def _create_checkpoint(
             run_id=self._run_id or None,
             current_node=current_node,
             execution_path=execution_path,
-            data_buffer=buffer.read_all(),
+            data_buffer=buffer.snapshot(),
             next_node=next_node,
             is_clean=is_clean,
         )
@@ -1272,6 +1319,7 @@ async def _execute_with_workers(
             dynamic_memory_provider=self.dynamic_memory_provider,
             iteration_metadata_provider=self.iteration_metadata_provider,
             loop_config=self._loop_config,
+            node_cache=self.node_cache,
             node_visit_counts=dict(node_visit_counts),
         )
 
@@ -1,9 +1,24 @@
+"""Sandboxed evaluation of edge-condition expressions.
+
+An expression is parsed once, checked against a whitelist of AST nodes,
+rewritten so that every call and ``**`` goes through a guard, and compiled
+to a code object.  Compiled expressions are cached by source string, so an
+edge that is traversed many times pays for parsing and validation once and
+afterwards runs as ordinary bytecode against the caller's context.
+
+Evaluation does not use signals: ``SIGALRM`` timers only work on the main
+thread and cost two syscalls per call.  The budget is counted instead.
+An expression has no loops, so its steps are bounded by its size
+(``MAX_EXPRESSION_NODES``, enforced at compile time); the only steps of
+unbounded cost are calls, and the guard reads the clock before and after
+each one.  This works the same from any thread.
+"""
+
 import ast
+import functools
 import operator
-import signal
 import threading
 import time
-from contextlib import contextmanager
 from typing import Any
 
 # Power operations can allocate extremely large integers. Keep conservative
@@ -12,9 +27,11 @@
 MAX_POWER_RESULT_BITS = 4_096
 # Typical edge-condition evaluations in this repo complete well under 1ms.
 # 100ms leaves ample headroom for legitimate checks while failing fast on abuse.
-# On Windows (where SIGALRM is unavailable) the fallback relies on periodic
-# perf_counter polling which is less precise, so we use a wider margin.
-DEFAULT_TIMEOUT_MS = 100 if hasattr(signal, "SIGALRM") else 500
+DEFAULT_TIMEOUT_MS = 100
+# Step budget: an expression evaluates each of its AST nodes at most once.
+MAX_EXPRESSION_NODES = 1_000
+# Distinct expressions kept compiled; edge conditions are a small, fixed set.
+COMPILE_CACHE_SIZE = 1_024
 
 
 def _safe_pow(base: Any, exp: Any) -> Any:
@@ -41,46 +58,6 @@ def _check_timeout(deadline: float | None, timeout_ms: int | None) -> None:
         raise TimeoutError(_timeout_message(timeout_ms))
 
 
-@contextmanager
-def _execution_timeout(timeout_ms: int | None):
-    if timeout_ms is None:
-        yield
-        return
-
-    if timeout_ms <= 0:
-        raise ValueError("timeout_ms must be greater than 0")
-
-    can_use_alarm = (
-        hasattr(signal, "SIGALRM")
-        and hasattr(signal, "ITIMER_REAL")
-        and hasattr(signal, "getitimer")
-        and hasattr(signal, "setitimer")
-        and threading.current_thread() is threading.main_thread()
-    )
-    if not can_use_alarm:
-        yield
-        return
-
-    current_delay, current_interval = signal.getitimer(signal.ITIMER_REAL)
-    if current_delay > 0 or current_interval > 0:
-        # safe_eval runs inside a shared framework process, so it must not
-        # replace a timer another subsystem already owns.
-        yield
-        return
-
-    def _handle_timeout(signum, frame):
-        raise TimeoutError(_timeout_message(timeout_ms))
-
-    old_handler = signal.getsignal(signal.SIGALRM)
-    signal.signal(signal.SIGALRM, _handle_timeout)
-    old_delay, old_interval = signal.setitimer(signal.ITIMER_REAL, timeout_ms / 1000)
-    try:
-        yield
-    finally:
-        signal.signal(signal.SIGALRM, old_handler)
-        signal.setitimer(signal.ITIMER_REAL, old_delay, old_interval)
-
-
 # Safe operators whitelist
 SAFE_OPERATORS = {
     ast.Add: operator.add,
@@ -131,188 +108,231 @@ def _handle_timeout(signum, frame):
     "any": any,
 }
 
+# Methods that may be called on values from the context.
+SAFE_METHODS = frozenset({"get", "keys", "values", "items", "lower", "upper", "strip", "split"})
+
+# ---------------------------------------------------------------------------
+# Runtime guards
+# ---------------------------------------------------------------------------
+
+# The deadline of the evaluation running on this thread, read by the call
+# guards.  Evaluation never yields, so one slot per thread is enough.
+_local = threading.local()
+
+_SAFE_FUNCTION_VALUES = tuple(SAFE_FUNCTIONS.values())
+
+
+def _guarded_call(func: Any, /, *args: Any, **kwargs: Any) -> Any:
+    deadline = getattr(_local, "deadline", None)
+    if deadline is None:
+        return func(*args, **kwargs)
+    _check_timeout(deadline, _local.timeout_ms)
+    result = func(*args, **kwargs)
+    _check_timeout(deadline, _local.timeout_ms)
+    return result
+
+
+def _checked_call(func: Any, /, *args: Any, **kwargs: Any) -> Any:
+    # A call through a context variable: allowed only when the value is
+    # one of the whitelisted builtins.
+    if func not in _SAFE_FUNCTION_VALUES:
+        raise ValueError("Call to function/method is not allowed")
+    return _guarded_call(func, *args, **kwargs)
+
+
+# Internal names the rewritten code refers to.  A user expression cannot
+# name them: the validator rejects identifiers with this prefix.
+_PREFIX = "__hive_"
+_GLOBALS: dict[str, Any] = {
+    "__builtins__": {},
+    f"{_PREFIX}call": _guarded_call,
+    f"{_PREFIX}checked_call": _checked_call,
+    f"{_PREFIX}pow": _safe_pow,
+    **{f"{_PREFIX}{name}": func for name, func in SAFE_FUNCTIONS.items()},
+}
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+
+def _ref(name: str) -> ast.Name:
+    return ast.Name(id=f"{_PREFIX}{name}", ctx=ast.Load())
+
+
+class _Validator(ast.NodeTransformer):
+    """Rejects every node outside the whitelist and rewrites the rest.
+
+    * names of ``SAFE_FUNCTIONS`` refer to the builtins even when the
+      context defines the same name;
+    * ``a ** b`` becomes a call to the size-checked power;
+    * every call goes through a guard that enforces the deadline, and calls
+      that are not statically a whitelisted function or method are checked
+      when they run;
+    * ``{**spread}`` entries in dict displays are dropped.
+    """
 
-class SafeEvalVisitor(ast.NodeVisitor):
-    def __init__(
-        self,
-        context: dict[str, Any],
-        *,
-        deadline: float | None = None,
-        timeout_ms: int | None = None,
-    ):
-        self.context = context
-        self.deadline = deadline
-        self.timeout_ms = timeout_ms
+    def __init__(self) -> None:
+        self.names: set[str] = set()
 
     def visit(self, node: ast.AST) -> Any:
-        _check_timeout(self.deadline, self.timeout_ms)
-        # Override visit to prevent default behavior and ensure only explicitly allowed nodes work
         method = "visit_" + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        return getattr(self, method, self.generic_visit)(node)
 
-    def generic_visit(self, node: ast.AST):
+    def generic_visit(self, node: ast.AST) -> Any:
         raise ValueError(f"Use of {node.__class__.__name__} is not allowed")
 
-    def visit_Expression(self, node: ast.Expression) -> Any:
-        return self.visit(node.body)
+    def _visit_all(self, nodes: list[ast.expr]) -> list[ast.expr]:
+        return [self.visit(n) for n in nodes]
 
-    def visit_Expr(self, node: ast.Expr) -> Any:
-        return self.visit(node.value)
+    def visit_Expression(self, node: ast.Expression) -> ast.Expression:
+        node.body = self.visit(node.body)
+        return node
 
-    def visit_Constant(self, node: ast.Constant) -> Any:
-        return node.value
+    def visit_Constant(self, node: ast.Constant) -> ast.Constant:
+        return node
 
     # --- Data Structures ---
-    def visit_List(self, node: ast.List) -> list:
-        return [self.visit(elt) for elt in node.elts]
+    def visit_List(self, node: ast.List) -> ast.List:
+        node.elts = self._visit_all(node.elts)
+        return node
 
-    def visit_Tuple(self, node: ast.Tuple) -> tuple:
-        return tuple(self.visit(elt) for elt in node.elts)
+    def visit_Tuple(self, node: ast.Tuple) -> ast.Tuple:
+        node.elts = self._visit_all(node.elts)
+        return node
 
-    def visit_Dict(self, node: ast.Dict) -> dict:
-        return {self.visit(k): self.visit(v) for k, v in zip(node.keys, node.values, strict=False) if k is not None}
+    def visit_Dict(self, node: ast.Dict) -> ast.Dict:
+        pairs = [(k, v) for k, v in zip(node.keys, node.values, strict=False) if k is not None]
+        node.keys = [self.visit(k) for k, _ in pairs]
+        node.values = [self.visit(v) for _, v in pairs]
+        return node
 
     # --- Operations ---
-    def visit_BinOp(self, node: ast.BinOp) -> Any:
-        op_func = SAFE_OPERATORS.get(type(node.op))
-        if op_func is None:
-            raise ValueError(f"Operator {type(node.op).__name__} is not allowed")
-        return op_func(self.visit(node.left), self.visit(node.right))
-
-    def visit_UnaryOp(self, node: ast.UnaryOp) -> Any:
-        op_func = SAFE_OPERATORS.get(type(node.op))
-        if op_func is None:
-            raise ValueError(f"Operator {type(node.op).__name__} is not allowed")
-        return op_func(self.visit(node.operand))
-
-    def visit_Compare(self, node: ast.Compare) -> Any:
-        left = self.visit(node.left)
-        for op, comparator in zip(node.ops, node.comparators, strict=False):
-            op_func = SAFE_OPERATORS.get(type(op))
-            if op_func is None:
-                raise ValueError(f"Operator {type(op).__name__} is not allowed")
-            right = self.visit(comparator)
-            if not op_func(left, right):
-                return False
-            left = right  # Chain comparisons
-        return True
-
-    def visit_BoolOp(self, node: ast.BoolOp) -> Any:
-        # Short-circuit evaluation to match Python semantics.
-        # Previously all operands were eagerly evaluated, which broke
-        # guard patterns like: ``x is not None and x.get("key")``
-        if isinstance(node.op, ast.And):
-            result = True
-            for v in node.values:
-                result = self.visit(v)
-                if not result:
-                    return result
-            return result
-        elif isinstance(node.op, ast.Or):
-            result = False
-            for v in node.values:
-                result = self.visit(v)
-                if result:
-                    return result
-            return result
-        raise ValueError(f"Boolean operator {type(node.op).__name__} is not allowed")
-
-    def visit_IfExp(self, node: ast.IfExp) -> Any:
-        # Ternary: true_val if test else false_val
-        if self.visit(node.test):
-            return self.visit(node.body)
-        else:
-            return self.visit(node.orelse)
+    def _check_op(self, op: ast.AST) -> None:
+        if type(op) not in SAFE_OPERATORS:
+            raise ValueError(f"Operator {type(op).__name__} is not allowed")
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self._check_op(node.op)
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(node.op, ast.Pow):
+            return ast.Call(func=_ref("pow"), args=[left, right], keywords=[])
+        node.left, node.right = left, right
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.UnaryOp:
+        self._check_op(node.op)
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.Compare:
+        for op in node.ops:
+            self._check_op(op)
+        node.left = self.visit(node.left)
+        node.comparators = self._visit_all(node.comparators)
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.BoolOp:
+        # Compiled as Python's own short-circuiting and/or, so guard
+        # patterns like ``x is not None and x.get("key")`` work.
+        node.values = self._visit_all(node.values)
+        return node
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.IfExp:
+        node.test = self.visit(node.test)
+        node.body = self.visit(node.body)
+        node.orelse = self.visit(node.orelse)
+        return node
 
     # --- Variables and Attributes ---
-    def visit_Name(self, node: ast.Name) -> Any:
-        if isinstance(node.ctx, ast.Load):
-            if node.id in self.context:
-                return self.context[node.id]
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        if not isinstance(node.ctx, ast.Load):
+            raise ValueError("Only reading variables is allowed")
+        if node.id.startswith(_PREFIX):
             raise NameError(f"Name '{node.id}' is not defined")
-        raise ValueError("Only reading variables is allowed")
-
-    def visit_Subscript(self, node: ast.Subscript) -> Any:
-        # value[slice]
-        val = self.visit(node.value)
-        idx = self.visit(node.slice)
-        return val[idx]
-
-    def visit_Attribute(self, node: ast.Attribute) -> Any:
-        # value.attr
-        # STRICT CHECK: No access to private attributes (starting with _)
+        if node.id in SAFE_FUNCTIONS:
+            return ast.copy_location(_ref(node.id), node)
+        self.names.add(node.id)
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.Subscript:
+        node.value = self.visit(node.value)
+        node.slice = self.visit(node.slice)
+        return node
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.Attribute:
+        # STRICT CHECK: No access to private attributes (starting with _),
+        # which covers __class__, __dict__, __globals__ and friends.
         if node.attr.startswith("_"):
             raise ValueError(f"Access to private attribute '{node.attr}' is not allowed")
+        node.value = self.visit(node.value)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.Call:
+        if any(kw.arg is None for kw in node.keywords):
+            raise ValueError("Use of ** arguments is not allowed")
+        func = node.func
+        safe = (isinstance(func, ast.Name) and func.id in SAFE_FUNCTIONS) or (isinstance(func, ast.Attribute) and func.attr in SAFE_METHODS)
+        args = [self.visit(func), *self._visit_all(node.args)]
+        for kw in node.keywords:
+            kw.value = self.visit(kw.value)
+        node.func = _ref("call" if safe else "checked_call")
+        node.args = args
+        return node
+
+
+class CompiledExpression:
+    """A validated expression, ready to evaluate against any context.
+
+    ``names`` holds the context variables the expression reads.
+    """
 
-        val = self.visit(node.value)
+    __slots__ = ("expr", "names", "_code")
 
-        # Safe attribute access: only allow if it's in the dict (if val is dict)
-        # or it's a safe property of a basic type?
-        # Actually, for flexibility, people often use dot access for dicts in these expressions.
-        # But standard Python dict doesn't support dot access.
-        # If val is a dict, Attribute access usually fails in Python unless wrapped.
-        # If the user context provides objects, we might want to allow attribute access.
-        # BUT we must be careful not to allow access to dangerous things like __class__ etc.
-        # The check starts_with("_") covers __class__, __init__, etc.
+    def __init__(self, expr: str, code: Any, names: frozenset[str]) -> None:
+        self.expr = expr
+        self.names = names
+        self._code = code
 
+    def evaluate(self, context: dict[str, Any] | None = None, *, timeout_ms: int | None = DEFAULT_TIMEOUT_MS) -> Any:
+        """Evaluate against ``context``; see :func:`safe_eval`."""
+        if timeout_ms is not None and timeout_ms <= 0:
+            raise ValueError("timeout_ms must be greater than 0")
+        deadline = None if timeout_ms is None else time.perf_counter() + (timeout_ms / 1000)
+        _check_timeout(deadline, timeout_ms)
+
+        outer = getattr(_local, "deadline", None), getattr(_local, "timeout_ms", None)
+        _local.deadline, _local.timeout_ms = deadline, timeout_ms
         try:
-            return getattr(val, node.attr)
-        except AttributeError:
-            # Fallback: maybe it's a dict and they want dot access?
-            # (Only if we want to support that sugar, usually not standard python)
-            # Let's stick to standard python behavior + strict private check.
-            pass
-
-        raise AttributeError(f"Object has no attribute '{node.attr}'")
-
-    def visit_Call(self, node: ast.Call) -> Any:
-        _check_timeout(self.deadline, self.timeout_ms)
-        # Only allow calling whitelisted functions
-        func = self.visit(node.func)
-
-        # Check if the function object itself is in our whitelist values
-        # This is tricky because `func` is the actual function object,
-        # but we also want to verify it came from a safe place.
-        # Easier: Check if node.func is a Name and that name is in SAFE_FUNCTIONS.
-
-        is_safe = False
-        if isinstance(node.func, ast.Name):
-            if node.func.id in SAFE_FUNCTIONS:
-                is_safe = True
-
-        # Also allow methods on objects if they are safe?
-        # E.g. "somestring".lower() or list.append() (if we allowed mutation, but we don't for now)
-        # For now, restrict to SAFE_FUNCTIONS whitelist for global calls and deny method calls
-        # unless we explicitly add safe methods.
-        # Allowing method calls on strings/lists (split, join, get) is commonly needed.
-
-        if isinstance(node.func, ast.Attribute):
-            # Method call.
-            # Allow basic safe methods?
-            # For security, start strict. Only helper functions.
-            # Re-visiting: User might want 'output.get("key")'.
-            method_name = node.func.attr
-            if method_name in [
-                "get",
-                "keys",
-                "values",
-                "items",
-                "lower",
-                "upper",
-                "strip",
-                "split",
-            ]:
-                is_safe = True
-
-        if not is_safe and func not in SAFE_FUNCTIONS.values():
-            raise ValueError("Call to function/method is not allowed")
-
-        args = [self.visit(arg) for arg in node.args]
-        keywords = {kw.arg: self.visit(kw.value) for kw in node.keywords}
-
-        _check_timeout(self.deadline, self.timeout_ms)
-        return func(*args, **keywords)
+            return eval(self._code, _GLOBALS, context if context is not None else {})  # noqa: S307 - validated, no builtins
+        finally:
+            _local.deadline, _local.timeout_ms = outer
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expr!r})"
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expr: str) -> CompiledExpression:
+    """Parse, validate and compile ``expr``; cached by expression string.
+
+    Raises:
+        ValueError: If unsafe operations or syntax are detected.
+        SyntaxError: If the expression is invalid Python.
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise SyntaxError(f"Invalid syntax in expression: {e}") from e
+
+    # Counted iteratively, before the recursive validator sees the tree.
+    if sum(1 for _ in ast.walk(tree)) > MAX_EXPRESSION_NODES:
+        raise ValueError(f"Expression exceeds {MAX_EXPRESSION_NODES} AST nodes")
+
+    validator = _Validator()
+    tree = ast.fix_missing_locations(validator.visit(tree))
+    code = compile(tree, "<safe_eval>", "eval")
+    return CompiledExpression(expr, code, frozenset(validator.names))
 
 
 def safe_eval(
@@ -336,26 +356,6 @@ def safe_eval(
     Raises:
         ValueError: If unsafe operations or syntax are detected.
         SyntaxError: If the expression is invalid Python.
+        TimeoutError: If evaluation exceeds ``timeout_ms``.
     """
-    if context is None:
-        context = {}
-
-    # Add safe builtins to context
-    full_context = context.copy()
-    full_context.update(SAFE_FUNCTIONS)
-
-    deadline = None if timeout_ms is None else time.perf_counter() + (timeout_ms / 1000)
-
-    with _execution_timeout(timeout_ms):
-        try:
-            tree = ast.parse(expr, mode="eval")
-        except SyntaxError as e:
-            raise SyntaxError(f"Invalid syntax in expression: {e}") from e
-
-        _check_timeout(deadline, timeout_ms)
-        visitor = SafeEvalVisitor(
-            full_context,
-            deadline=deadline,
-            timeout_ms=timeout_ms,
-        )
-        return visitor.visit(tree)
+    return compile_expression(expr).evaluate(context, timeout_ms=timeout_ms)
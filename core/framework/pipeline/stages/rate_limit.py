@@ -1,27 +1,208 @@
-"""Per-(entry-point, session) rate limiting stage."""
+"""Per-(entry-point, session) rate limiting stage.
+
+Limits are enforced with GCRA (the generic cell rate algorithm -- a token
+bucket stored as a single timestamp).  For each key and each limit the
+store keeps a *theoretical arrival time* (TAT): the moment the bucket
+would be full again.  A request costing ``c`` units is admitted when
+
+    max(TAT, now) + c * interval - now <= capacity * interval
+
+where ``interval`` is the time one unit takes to refill
+(``60 / per-minute limit``) and ``capacity`` is one minute's allowance.
+Admission and update are O(1) with one float per limit per key, instead of
+rebuilding a per-key list of request timestamps on every call.
+
+Two limits are charged per request: one request, and -- when
+``max_tokens_per_minute`` is set -- the request's estimated input tokens
+plus ``expected_output_tokens``, since providers meter tokens rather than
+calls.  A key whose TAT is in the past has a full bucket, which is
+indistinguishable from no entry at all, so idle keys are dropped by a
+periodic sweep without changing any decision.
+
+Stores:
+
+* ``memory`` (default) -- a dict in this process.
+* ``sqlite`` -- a table in ``HIVE_HOME/pipeline_rate_limits.db`` (or
+  ``db_path``), updated in a ``BEGIN IMMEDIATE`` transaction, so every
+  process pointed at the same file draws from the same buckets.  TATs are
+  wall-clock times so they compare across processes.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import json
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
 
 from framework.pipeline.registry import register
 from framework.pipeline.stage import PipelineContext, PipelineResult, PipelineStage
 
+# How often fully-refilled (idle) keys are dropped from a store.
+_SWEEP_INTERVAL = 60.0
+
+# (seconds per unit, capacity in units) for each charged limit.
+Limits = list[tuple[float, float]]
+
+
+def _gcra(tats: tuple[float, ...], now: float, costs: tuple[float, ...], limits: Limits) -> tuple[tuple[float, ...] | None, float, int]:
+    """Try to charge ``costs`` against buckets at ``tats``.
+
+    Returns ``(new_tats, 0.0, -1)`` when admitted, else
+    ``(None, retry_after_seconds, index_of_the_limit_hit)``.  Nothing is
+    charged unless every limit admits the request.
+    """
+    new: list[float] = []
+    for i, (tat, cost, (interval, capacity)) in enumerate(zip(tats, costs, limits, strict=True)):
+        # A request larger than the whole bucket needs a full bucket,
+        # rather than never passing.
+        tat = max(tat, now) + min(cost, capacity) * interval
+        over = tat - now - capacity * interval
+        if over > 1e-9:
+            return None, over, i
+        new.append(tat)
+    return tuple(new), 0.0, -1
+
+
+class MemoryBucketStore:
+    """GCRA buckets in this process.  ``clock`` is injectable for tests."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._tats: dict[str, tuple[float, ...]] = {}
+        self._last_sweep = clock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def acquire(self, key: str, costs: tuple[float, ...], limits: Limits) -> tuple[float, int]:
+        """Charge ``costs``; returns ``(retry_after, limit_index)`` with
+        ``retry_after == 0`` when admitted."""
+        now = self._clock()
+        if now - self._last_sweep >= _SWEEP_INTERVAL:
+            self._last_sweep = now
+            self._tats = {k: v for k, v in self._tats.items() if max(v) > now}
+        new, retry_after, index = _gcra(self._tats.get(key, (0.0,) * len(limits)), now, costs, limits)
+        if new is not None:
+            self._tats[key] = new
+        return retry_after, index
+
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS buckets (
+    key      TEXT PRIMARY KEY,
+    req_tat  REAL NOT NULL,
+    tok_tat  REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SqliteBucketStore:
+    """GCRA buckets in a SQLite file shared by every process that opens it.
+
+    Supports up to two limits (requests, tokens).  Each thread keeps its
+    own connection.  ``clock`` must be a wall clock shared by every
+    process; it is injectable for tests.
+    """
+
+    def __init__(self, db_path: str | Path | None = None, *, clock: Callable[[], float] = time.time) -> None:
+        if db_path is None:
+            from framework.config import HIVE_HOME
+
+            db_path = HIVE_HOME / "pipeline_rate_limits.db"
+        self._db_path = Path(db_path).expanduser()
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # Autocommit mode: transactions are opened explicitly below.
+            con = sqlite3.connect(str(self._db_path), timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
+            con.execute("PRAGMA busy_timeout = 5000")
+            self._local.con = con
+        return con
+
+    def acquire(self, key: str, costs: tuple[float, ...], limits: Limits) -> tuple[float, int]:
+        """Charge ``costs``; returns ``(retry_after, limit_index)`` with
+        ``retry_after == 0`` when admitted."""
+        con = self._connect()
+        pad = (0.0,) * (2 - len(limits))
+        # The write lock is taken up front so the read-modify-write below
+        # is atomic across processes.
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            now = self._clock()
+            row = con.execute("SELECT req_tat, tok_tat FROM buckets WHERE key = ?", (key,)).fetchone()
+            tats = tuple(row[: len(limits)]) if row else (0.0,) * len(limits)
+            new, retry_after, index = _gcra(tats, now, costs, limits)
+            if new is not None:
+                con.execute(
+                    "INSERT INTO buckets (key, req_tat, tok_tat) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET req_tat = excluded.req_tat, tok_tat = excluded.tok_tat",
+                    (key, *new, *pad),
+                )
+            if now - self._last_sweep >= _SWEEP_INTERVAL:
+                self._last_sweep = now
+                con.execute("DELETE FROM buckets WHERE req_tat <= ? AND tok_tat <= ?", (now, now))
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        return retry_after, index
+
+
+def _estimate_input_tokens(ctx: PipelineContext) -> int:
+    """``ctx.metadata["estimated_tokens"]`` when an earlier stage (or the
+    caller) set it, else ~4 characters per token of the input."""
+    estimated = ctx.metadata.get("estimated_tokens")
+    if isinstance(estimated, int | float):
+        return int(estimated)
+    return len(json.dumps(ctx.input_data, default=str)) // 4
+
 
 @register("rate_limit")
 class RateLimitStage(PipelineStage):
-    """Reject requests that exceed ``max_requests_per_minute`` per session.
+    """Reject requests that exceed ``max_requests_per_minute`` (and
+    optionally ``max_tokens_per_minute``) per session.
 
     The key is ``<entry_point_id>:<session_id>``.  When no session_id is
     present in ``session_state``, a single shared "default" bucket is used.
+    Each limit allows a burst of up to one minute's allowance, refilling
+    continuously.  ``backend="sqlite"`` shares the buckets across
+    processes (see the module docstring).
     """
 
     order = 200
 
-    def __init__(self, max_requests_per_minute: int = 60) -> None:
+    def __init__(
+        self,
+        max_requests_per_minute: int = 60,
+        max_tokens_per_minute: int | None = None,
+        expected_output_tokens: int = 1024,
+        backend: str = "memory",
+        db_path: str | None = None,
+    ) -> None:
         self._max_rpm = max_requests_per_minute
-        self._timestamps: dict[str, list[float]] = defaultdict(list)
+        self._max_tpm = max_tokens_per_minute
+        self._expected_output = expected_output_tokens
+        self._limits: Limits = [(60.0 / max_requests_per_minute, float(max_requests_per_minute))]
+        if max_tokens_per_minute:
+            self._limits.append((60.0 / max_tokens_per_minute, float(max_tokens_per_minute)))
+        if backend == "memory":
+            self._store: MemoryBucketStore | SqliteBucketStore = MemoryBucketStore()
+        elif backend == "sqlite":
+            self._store = SqliteBucketStore(db_path)
+        else:
+            raise ValueError(f"Unknown rate_limit backend {backend!r} (expected 'memory' or 'sqlite')")
 
     async def process(self, ctx: PipelineContext) -> PipelineResult:
         session_id = "default"
@@ -29,13 +210,26 @@ async def process(self, ctx: PipelineContext) -> PipelineResult:
             session_id = str(ctx.session_state.get("session_id", "default"))
         key = f"{ctx.entry_point_id}:{session_id}"
 
-        now = time.monotonic()
-        # Prune entries older than 60s.
-        self._timestamps[key] = [t for t in self._timestamps[key] if now - t < 60.0]
-        if len(self._timestamps[key]) >= self._max_rpm:
+        costs: tuple[float, ...] = (1.0,)
+        if self._max_tpm:
+            costs += (float(_estimate_input_tokens(ctx) + self._expected_output),)
+        if isinstance(self._store, SqliteBucketStore):
+            # Off the loop: the transaction can wait on another process.
+            retry_after, index = await asyncio.to_thread(self._store.acquire, key, costs, self._limits)
+        else:
+            retry_after, index = self._store.acquire(key, costs, self._limits)
+
+        if index == 0:
+            return PipelineResult(
+                action="reject",
+                rejection_reason=(f"Rate limit exceeded: {self._max_rpm} req/min for session '{session_id}' (retry in {retry_after:.1f}s)"),
+            )
+        if index == 1:
             return PipelineResult(
                 action="reject",
-                rejection_reason=(f"Rate limit exceeded: {self._max_rpm} req/min for session '{session_id}'"),
+                rejection_reason=(
+                    f"Token rate limit exceeded: {self._max_tpm} tokens/min for session '{session_id}' "
+                    f"(request ~{int(costs[1])} tokens, retry in {retry_after:.1f}s)"
+                ),
             )
-        self._timestamps[key].append(now)
         return PipelineResult(action="continue")
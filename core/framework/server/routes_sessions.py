@@ -1909,6 +1909,65 @@ def _count_events_total(events_path: Path, file_size: int) -> int:
     return total
 
 
+def _events_total(events_path: Path, file_size: int) -> int:
+    """Event count from the log's sidecar index, O(new bytes) instead of O(file).
+
+    The index catches up lazily (and is built on first use for logs that
+    predate it). Falls back to the newline scan if the sidecar can't be read
+    or written — a read-only session dir must still page.
+    """
+    from framework.host.event_index import EventLogIndex
+
+    try:
+        return EventLogIndex.for_log(events_path).sync()
+    except OSError:
+        logger.debug("event index unavailable for %s; counting lines", events_path, exc_info=True)
+        return _count_events_total(events_path, file_size)
+
+
+def _parse_events_ts(raw: str | None) -> float | None:
+    """``before_ts`` query value → epoch seconds. Accepts epoch or ISO-8601."""
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        from datetime import datetime
+
+        return datetime.fromisoformat(raw).timestamp()
+    except ValueError:
+        return None
+
+
+def _read_events_page_at(
+    events_path: Path,
+    limit: int,
+    before_seq: int | None,
+    before_ts: float | None,
+) -> tuple[list[dict], int, int, int]:
+    """Page backward from an event sequence number or a timestamp.
+
+    Resolves the cursor through the sidecar index — an O(1) seek for
+    ``before_seq``, a binary search for ``before_ts`` (the page ends just
+    before the first event at or after that time) — then reads exactly like
+    a ``before_offset`` page. Returns ``(events, start_offset, total,
+    before_index)`` where ``before_index`` is the resolved 1-based seq the
+    page ends before.
+    """
+    from framework.host.event_index import EventLogIndex
+
+    idx = EventLogIndex.for_log(events_path)
+    total = idx.sync()
+    if before_ts is not None:
+        before_seq = idx.seq_at_or_after(before_ts)
+    before_seq = max(1, min(before_seq if before_seq is not None else total + 1, total + 1))
+    offset = idx.offset_of(before_seq)
+    events, start_offset, _ = _read_events_page(events_path, limit, offset)
+    return events, start_offset, total, before_seq
+
+
 def _read_events_page(
     events_path: Path,
     limit: int,
@@ -1926,9 +1985,9 @@ def _read_events_page(
       (the next backward cursor). ``0`` once the file start is reached or
       when nothing was returned — both mean "no older events remain".
     * ``total`` — total non-blank line (event) count of the whole file when
-      ``before_offset is None``; ``-1`` on cursor pages (the client doesn't
-      need it there, and skipping the full-file newline scan keeps each
-      cursor page O(page) instead of O(file)).
+      ``before_offset is None``, read from the sidecar index (see
+      ``framework.host.event_index``); ``-1`` on cursor pages (the client
+      doesn't need it there).
 
     ``before_offset`` must fall on a line boundary — it is always a
     ``start_offset`` this function returned earlier, so the byte just before
@@ -1939,7 +1998,7 @@ def _read_events_page(
     file_size = events_path.stat().st_size
     upper = file_size if before_offset is None else max(0, min(before_offset, file_size))
     if upper == 0:
-        return [], 0, (_count_events_total(events_path, file_size) if before_offset is None else -1)
+        return [], 0, (_events_total(events_path, file_size) if before_offset is None else -1)
 
     # Read backward from ``upper`` until we have at least ``limit`` complete
     # lines (one extra newline beyond ``limit`` lets us pin the first kept
@@ -1994,7 +2053,7 @@ def _read_events_page(
             continue
 
     start_offset = rows[0][0] if rows else 0
-    total = _count_events_total(events_path, file_size) if before_offset is None else -1
+    total = _events_total(events_path, file_size) if before_offset is None else -1
     return events, start_offset, total
 
 
@@ -2013,6 +2072,10 @@ async def handle_session_events_history(request: web.Request) -> web.Response:
             pass the previous response's ``start_offset`` as ``before_offset``
             and its ``start_index`` as ``before_index``; the response then
             holds the ``limit`` events immediately preceding that cursor.
+        before_seq: random-access cursor — the page ends just before the
+            event with this 1-based ``seq``. Resolved via the sidecar index.
+        before_ts: time cursor (epoch seconds or ISO-8601) — the page ends
+            just before the first event at or after this time.
 
     Response shape::
 
@@ -2061,6 +2124,9 @@ def _int_param(name: str, default: int | None) -> int | None:
     # (and therefore the rewritten ``seq``). When omitted on a cursor read we
     # fall back to seq = start_offset-relative numbering below.
     before_index = _int_param("before_index", None)
+    before_seq = _int_param("before_seq", None)
+    before_ts = _parse_events_ts(request.query.get("before_ts"))
+    seek = before_offset is None and (before_seq is not None or before_ts is not None)
 
     def _empty(extra: dict | None = None) -> web.Response:
         body = {
@@ -2087,16 +2153,32 @@ def _empty(extra: dict | None = None) -> web.Response:
 
     try:
         loop = asyncio.get_running_loop()
-        events, start_offset, total = await asyncio.wait_for(
-            loop.run_in_executor(
-                _history_read_executor(),
-                _read_events_page,
-                events_path,
-                limit,
-                before_offset,
-            ),
-            timeout=_EVENTS_HISTORY_READ_TIMEOUT_S,
-        )
+        if seek:
+            events, start_offset, total, before_index = await asyncio.wait_for(
+                loop.run_in_executor(
+                    _history_read_executor(),
+                    _read_events_page_at,
+                    events_path,
+                    limit,
+                    before_seq,
+                    before_ts,
+                ),
+                timeout=_EVENTS_HISTORY_READ_TIMEOUT_S,
+            )
+            # From here on a seek page is just a cursor page anchored at the
+            # resolved seq.
+            before_offset = start_offset
+        else:
+            events, start_offset, total = await asyncio.wait_for(
+                loop.run_in_executor(
+                    _history_read_executor(),
+                    _read_events_page,
+                    events_path,
+                    limit,
+                    before_offset,
+                ),
+                timeout=_EVENTS_HISTORY_READ_TIMEOUT_S,
+            )
     except TimeoutError:
         # The read couldn't complete in time — almost always the shared thread
         # pool being saturated, not a slow disk. Fail fast with a retryable
@@ -5,23 +5,36 @@
 operational discipline, and AS-13 trust gating for project-scope skills.
 """
 
-from framework.skills.catalog import SkillCatalog
-from framework.skills.config import DefaultSkillConfig, SkillsConfig
-from framework.skills.defaults import DefaultSkillManager
-from framework.skills.discovery import DiscoveryConfig, SkillDiscovery
-from framework.skills.installer import (
-    fork_skill,
-    install_from_git,
-    install_from_registry,
-    remove_skill,
-)
-from framework.skills.manager import SkillsManager, SkillsManagerConfig
-from framework.skills.models import TrustStatus
-from framework.skills.parser import ParsedSkill, parse_skill_md
-from framework.skills.registry import RegistryClient
-from framework.skills.skill_errors import SkillError, SkillErrorCode, log_skill_error
-from framework.skills.trust import TrustedRepoStore, TrustGate
-from framework.skills.validator import ValidationResult, validate_strict
+import importlib
+
+# Names are resolved on first access: ``framework.skills.cli`` and the
+# other submodules are imported on their own (``hive skill ...``) and
+# should not load the installer, registry client and trust store first.
+_LAZY_EXPORTS = {
+    "DefaultSkillConfig": "framework.skills.config",
+    "DefaultSkillManager": "framework.skills.defaults",
+    "DiscoveryConfig": "framework.skills.discovery",
+    "ParsedSkill": "framework.skills.parser",
+    "RegistryClient": "framework.skills.registry",
+    "SkillCatalog": "framework.skills.catalog",
+    "SkillDiscovery": "framework.skills.discovery",
+    "SkillError": "framework.skills.skill_errors",
+    "SkillErrorCode": "framework.skills.skill_errors",
+    "SkillsConfig": "framework.skills.config",
+    "SkillsManager": "framework.skills.manager",
+    "SkillsManagerConfig": "framework.skills.manager",
+    "TrustGate": "framework.skills.trust",
+    "TrustStatus": "framework.skills.models",
+    "TrustedRepoStore": "framework.skills.trust",
+    "ValidationResult": "framework.skills.validator",
+    "fork_skill": "framework.skills.installer",
+    "install_from_git": "framework.skills.installer",
+    "install_from_registry": "framework.skills.installer",
+    "log_skill_error": "framework.skills.skill_errors",
+    "parse_skill_md": "framework.skills.parser",
+    "remove_skill": "framework.skills.installer",
+    "validate_strict": "framework.skills.validator",
+}
 
 __all__ = [
     "DefaultSkillConfig",
@@ -48,3 +61,12 @@
     "remove_skill",
     "validate_strict",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
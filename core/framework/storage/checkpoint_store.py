@@ -3,50 +3,98 @@
 
 Handles saving, loading, listing, and pruning of execution checkpoints
 for session resumability.
+
+Checkpoints are stored as a chain of structural deltas over content-addressed
+values. Each top-level entry of the snapshot fields (``data_buffer``,
+``accumulated_outputs``, ``metrics_snapshot``) is written once to
+``objects/`` under the sha256 of its JSON encoding; a checkpoint file only
+records which keys changed since its parent. Every ``compact_every``
+checkpoints the chain restarts from a full base, so a restore reads at most
+that many small manifests plus the objects it needs. Long runs that carry
+megabytes of shared memory therefore write each unchanged value once instead
+of once per checkpoint.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any
+
+from pydantic_core import to_jsonable_python
 
 from framework.schemas.checkpoint import Checkpoint, CheckpointIndex, CheckpointSummary
 from framework.utils.io import atomic_write
 
 logger = logging.getLogger(__name__)
 
+# Checkpoint fields that are stored as per-key deltas over content-addressed
+# objects. Everything else is small and kept inline in the manifest.
+_SNAPSHOT_FIELDS = ("data_buffer", "accumulated_outputs", "metrics_snapshot")
+
+_MANIFEST_FORMAT = 2
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 class CheckpointStore:
     """
     Manages checkpoint storage with atomic writes.
 
     Stores checkpoints in a session's checkpoints/ directory with
-    an index for fast lookup and filtering.
+    an append-only index for fast lookup and filtering.
 
     Directory structure:
         checkpoints/
-            index.json              # Checkpoint manifest
-            cp_{type}_{node}_{timestamp}.json  # Individual checkpoints
+            index.jsonl             # Append-only checkpoint manifest log
+            objects/{ab}/{sha256}.json  # Content-addressed snapshot values
+            cp_{type}_{node}_{timestamp}.json  # Base or delta manifests
+
+    Checkpoints written before the delta format (full ``Checkpoint`` JSON,
+    plus a rewritten ``index.json``) still load; the legacy index is folded
+    into ``index.jsonl`` on first access.
     """
 
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, compact_every: int = 20):
         """
         Initialize checkpoint store.
 
         Args:
             base_path: Session directory (e.g., ~/.hive/agents/agent_name/sessions/session_ID/)
+            compact_every: Maximum delta chain length before a full base is written
         """
         self.base_path = Path(base_path)
         self.checkpoints_dir = self.base_path / "checkpoints"
-        self.index_path = self.checkpoints_dir / "index.json"
+        self.index_path = self.checkpoints_dir / "index.jsonl"
+        self.legacy_index_path = self.checkpoints_dir / "index.json"
+        self.objects_dir = self.checkpoints_dir / "objects"
+        self.compact_every = max(1, compact_every)
         self._index_lock = asyncio.Lock()
+        # Chain head from this process's last save: (checkpoint_id, full refs, depth).
+        # A fresh process starts a new base rather than re-resolving the chain.
+        self._head: tuple[str, dict[str, dict[str, str]], int] | None = None
+        self._known_objects: set[str] = set()
+        # id(value) -> (value, digest) for immutable values seen in the last
+        # save. Buffers hand the same str objects to every checkpoint, so
+        # this skips re-encoding and re-hashing megabytes that did not change.
+        # Holding ``value`` keeps its id from being reused. Cleared whenever
+        # objects may be reclaimed (delete / GC), and a hit is only trusted
+        # while its digest is still a known-present object.
+        self._digest_memo: dict[int, tuple[Any, str]] = {}
 
     async def save_checkpoint(self, checkpoint: Checkpoint) -> None:
         """
         Atomically save checkpoint and update index.
 
-        Uses temp file + rename for crash safety. Updates index
-        after checkpoint is persisted.
+        Writes any snapshot values not already stored, then a manifest
+        holding only the keys that changed since the previous checkpoint
+        (or a full base once the chain reaches ``compact_every``), then
+        appends one line to the index. Each file uses temp file + rename
+        for crash safety.
 
         Args:
             checkpoint: Checkpoint to save
@@ -54,24 +102,8 @@ async def save_checkpoint(self, checkpoint: Checkpoint) -> None:
         Raises:
             OSError: If file write fails
         """
-
-        def _write():
-            # Ensure directory exists
-            self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
-
-            # Write checkpoint file atomically
-            checkpoint_path = self.checkpoints_dir / f"{checkpoint.checkpoint_id}.json"
-            with atomic_write(checkpoint_path) as f:
-                f.write(checkpoint.model_dump_json(indent=2))
-
-            logger.debug(f"Saved checkpoint {checkpoint.checkpoint_id}")
-
-        # Write checkpoint file (blocking I/O in thread)
-        await asyncio.to_thread(_write)
-
-        # Update index (with lock to prevent concurrent modifications)
         async with self._index_lock:
-            await self._update_index_add(checkpoint)
+            await asyncio.to_thread(self._save_sync, checkpoint)
 
     async def load_checkpoint(
         self,
@@ -88,14 +120,14 @@ async def load_checkpoint(
         """
 
         def _read(checkpoint_id: str) -> Checkpoint | None:
-            checkpoint_path = self.checkpoints_dir / f"{checkpoint_id}.json"
+            checkpoint_path = self._manifest_path(checkpoint_id)
 
             if not checkpoint_path.exists():
                 logger.warning(f"Checkpoint file not found: {checkpoint_path}")
                 return None
 
             try:
-                return Checkpoint.model_validate_json(checkpoint_path.read_text(encoding="utf-8"))
+                return self._materialize(checkpoint_id)
             except Exception as e:
                 logger.error(f"Failed to load checkpoint {checkpoint_id}: {e}")
                 return None
@@ -119,14 +151,12 @@ async def load_index(self) -> CheckpointIndex | None:
         """
 
         def _read() -> CheckpointIndex | None:
-            if not self.index_path.exists():
-                return None
-
             try:
-                return CheckpointIndex.model_validate_json(self.index_path.read_text(encoding="utf-8"))
+                records = self._read_index_records()
             except Exception as e:
                 logger.error(f"Failed to load checkpoint index: {e}")
                 return None
+            return self._index_from_records(records)
 
         return await asyncio.to_thread(_read)
 
@@ -164,37 +194,18 @@ async def delete_checkpoint(self, checkpoint_id: str) -> bool:
         """
         Delete a specific checkpoint.
 
+        Checkpoints whose delta chain runs through the deleted one are
+        rewritten as full bases first, so they stay restorable. Snapshot
+        objects are reclaimed by :meth:`collect_garbage`.
+
         Args:
             checkpoint_id: Checkpoint ID to delete
 
         Returns:
             True if deleted, False if not found
         """
-
-        def _delete(checkpoint_id: str) -> bool:
-            checkpoint_path = self.checkpoints_dir / f"{checkpoint_id}.json"
-
-            if not checkpoint_path.exists():
-                logger.warning(f"Checkpoint file not found: {checkpoint_path}")
-                return False
-
-            try:
-                checkpoint_path.unlink()
-                logger.info(f"Deleted checkpoint {checkpoint_id}")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to delete checkpoint {checkpoint_id}: {e}")
-                return False
-
-        # Delete checkpoint file
-        deleted = await asyncio.to_thread(_delete, checkpoint_id)
-
-        if deleted:
-            # Update index (with lock)
-            async with self._index_lock:
-                await self._update_index_remove(checkpoint_id)
-
-        return deleted
+        async with self._index_lock:
+            return await asyncio.to_thread(self._delete_sync, checkpoint_id)
 
     async def prune_checkpoints(
         self,
@@ -203,6 +214,9 @@ async def prune_checkpoints(
         """
         Prune checkpoints older than max_age_days.
 
+        Also compacts the index log and drops snapshot objects no remaining
+        checkpoint references.
+
         Args:
             max_age_days: Maximum age in days (default 7)
 
@@ -233,10 +247,23 @@ async def prune_checkpoints(
                 deleted_count += 1
 
         if deleted_count > 0:
+            async with self._index_lock:
+                await asyncio.to_thread(self._compact_index_sync)
+            await self.collect_garbage()
             logger.info(f"Pruned {deleted_count} checkpoints older than {max_age_days} days")
 
         return deleted_count
 
+    async def collect_garbage(self) -> int:
+        """
+        Delete snapshot objects no remaining checkpoint references.
+
+        Returns:
+            Number of objects removed
+        """
+        async with self._index_lock:
+            return await asyncio.to_thread(self._collect_garbage_sync)
+
     async def checkpoint_exists(self, checkpoint_id: str) -> bool:
         """
         Check if a checkpoint exists.
@@ -249,75 +276,311 @@ async def checkpoint_exists(self, checkpoint_id: str) -> bool:
         """
 
         def _check(checkpoint_id: str) -> bool:
-            checkpoint_path = self.checkpoints_dir / f"{checkpoint_id}.json"
+            checkpoint_path = self._manifest_path(checkpoint_id)
             return checkpoint_path.exists()
 
         return await asyncio.to_thread(_check, checkpoint_id)
 
-    async def _update_index_add(self, checkpoint: Checkpoint) -> None:
-        """
-        Update index after adding a checkpoint.
-
-        Should be called with _index_lock held.
-
-        Args:
-            checkpoint: Checkpoint that was added
-        """
-
-        def _write(index: CheckpointIndex):
-            # Ensure directory exists
-            self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
-
-            # Write index atomically
-            with atomic_write(self.index_path) as f:
-                f.write(index.model_dump_json(indent=2))
-
-        # Load or create index
-        index = await self.load_index()
-        if not index:
-            index = CheckpointIndex(
-                session_id=checkpoint.session_id,
-                checkpoints=[],
-            )
-
-        # Add checkpoint to index
-        index.add_checkpoint(checkpoint)
-
-        # Write updated index
-        await asyncio.to_thread(_write, index)
-
-        logger.debug(f"Updated index with checkpoint {checkpoint.checkpoint_id}")
-
-    async def _update_index_remove(self, checkpoint_id: str) -> None:
-        """
-        Update index after removing a checkpoint.
-
-        Should be called with _index_lock held.
-
-        Args:
-            checkpoint_id: Checkpoint ID that was removed
+    # ------------------------------------------------------------------
+    # Blocking internals (run via asyncio.to_thread, _index_lock held)
+    # ------------------------------------------------------------------
+
+    def _manifest_path(self, checkpoint_id: str) -> Path:
+        return self.checkpoints_dir / f"{checkpoint_id}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def _put_object(self, value: Any) -> str:
+        """Store ``value`` under its content hash (once) and return the hash."""
+        data = _encode(value)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known_objects:
+            return digest
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path, mode="wb") as f:
+                f.write(data)
+        self._known_objects.add(digest)
+        return digest
+
+    def _save_sync(self, checkpoint: Checkpoint) -> None:
+        self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
+        self._migrate_legacy_index()
+
+        dump = checkpoint.model_dump(mode="json", exclude=set(_SNAPSHOT_FIELDS))
+        refs: dict[str, dict[str, str]] = {}
+        memo: dict[int, tuple[Any, str]] = {}
+        for field in _SNAPSHOT_FIELDS:
+            field_refs = refs[field] = {}
+            for key, value in (getattr(checkpoint, field, None) or {}).items():
+                hit = self._digest_memo.get(id(value))
+                if hit is not None and hit[0] is value and hit[1] in self._known_objects:
+                    digest = hit[1]
+                else:
+                    digest = self._put_object(to_jsonable_python(value))
+                if isinstance(value, (str, bytes, int, float, bool)):
+                    memo[id(value)] = (value, digest)
+                field_refs[key] = digest
+        self._digest_memo = memo
+
+        head = self._head
+        # IDs have one-second resolution, so a fast run can reuse one. The old
+        # manifest is about to be overwritten: re-root anything that deltas
+        # off it first, and never delta the new one against itself.
+        collided = self._manifest_path(checkpoint.checkpoint_id).exists()
+        if collided:
+            for child_id, parent_id in self._live_parents(self._read_index_records()).items():
+                if parent_id == checkpoint.checkpoint_id and child_id != checkpoint.checkpoint_id:
+                    self._rebase(child_id)
+            head = self._head
+        if head is not None and not collided and head[2] + 1 < self.compact_every:
+            parent_id, parent_refs, depth = head[0], head[1], head[2] + 1
+            changes = {}
+            for field in _SNAPSHOT_FIELDS:
+                old, new = parent_refs.get(field, {}), refs[field]
+                changes[field] = {
+                    "set": {k: h for k, h in new.items() if old.get(k) != h},
+                    "del": [k for k in old if k not in new],
+                }
+        else:
+            parent_id, depth = None, 0
+            changes = {field: {"set": refs[field], "del": []} for field in _SNAPSHOT_FIELDS}
+
+        manifest = {
+            "format": _MANIFEST_FORMAT,
+            "parent": parent_id,
+            "depth": depth,
+            "checkpoint": dump,
+            "changes": changes,
+        }
+        with atomic_write(self._manifest_path(checkpoint.checkpoint_id)) as f:
+            f.write(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")))
+
+        self._append_index_record(
+            {
+                "op": "add",
+                "session_id": checkpoint.session_id,
+                "parent": parent_id,
+                "summary": CheckpointSummary.from_checkpoint(checkpoint).model_dump(mode="json"),
+            }
+        )
+        self._head = (checkpoint.checkpoint_id, refs, depth)
+        logger.debug(f"Saved checkpoint {checkpoint.checkpoint_id} (depth {depth})")
+
+    def _read_manifest(self, checkpoint_id: str) -> dict[str, Any]:
+        return json.loads(self._manifest_path(checkpoint_id).read_text(encoding="utf-8"))
+
+    def _resolve_refs(self, checkpoint_id: str) -> tuple[dict[str, Any], dict[str, dict[str, str]]]:
+        """Walk the delta chain back to its base and replay it forward.
+
+        Returns ``(manifest, refs)`` for ``checkpoint_id``. Raises if the
+        chain is broken or the checkpoint is in the legacy format.
         """
-
-        def _write(index: CheckpointIndex):
-            with atomic_write(self.index_path) as f:
-                f.write(index.model_dump_json(indent=2))
-
-        # Load index
-        index = await self.load_index()
-        if not index:
+        chain: list[dict[str, Any]] = []
+        current: str | None = checkpoint_id
+        while current is not None:
+            manifest = self._read_manifest(current)
+            if manifest.get("format") != _MANIFEST_FORMAT:
+                raise ValueError(f"checkpoint {current} is not a delta manifest")
+            chain.append(manifest)
+            if len(chain) > self.compact_every + 1024:
+                raise ValueError(f"checkpoint chain for {checkpoint_id} does not terminate")
+            current = manifest.get("parent")
+
+        refs: dict[str, dict[str, str]] = {field: {} for field in _SNAPSHOT_FIELDS}
+        for manifest in reversed(chain):
+            for field, change in manifest.get("changes", {}).items():
+                field_refs = refs.setdefault(field, {})
+                for key in change.get("del", []):
+                    field_refs.pop(key, None)
+                field_refs.update(change.get("set", {}))
+        return chain[0], refs
+
+    def _materialize(self, checkpoint_id: str) -> Checkpoint:
+        raw = self._manifest_path(checkpoint_id).read_text(encoding="utf-8")
+        manifest = json.loads(raw)
+        if manifest.get("format") != _MANIFEST_FORMAT:
+            return Checkpoint.model_validate_json(raw)
+
+        manifest, refs = self._resolve_refs(checkpoint_id)
+        data = dict(manifest["checkpoint"])
+        cache: dict[str, Any] = {}
+        for field, field_refs in refs.items():
+            values = {}
+            for key, digest in field_refs.items():
+                if digest not in cache:
+                    cache[digest] = json.loads(self._object_path(digest).read_bytes())
+                values[key] = cache[digest]
+            data[field] = values
+        return Checkpoint.model_validate(data)
+
+    def _delete_sync(self, checkpoint_id: str) -> bool:
+        self._digest_memo = {}
+        checkpoint_path = self._manifest_path(checkpoint_id)
+
+        if not checkpoint_path.exists():
+            logger.warning(f"Checkpoint file not found: {checkpoint_path}")
+            return False
+
+        try:
+            # Re-root any checkpoint that deltas off this one before it goes.
+            records = self._read_index_records()
+            for child_id, parent_id in self._live_parents(records).items():
+                if parent_id == checkpoint_id:
+                    self._rebase(child_id)
+            checkpoint_path.unlink()
+            self._append_index_record({"op": "remove", "checkpoint_id": checkpoint_id})
+            if self._head is not None and self._head[0] == checkpoint_id:
+                self._head = None
+            logger.info(f"Deleted checkpoint {checkpoint_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete checkpoint {checkpoint_id}: {e}")
+            return False
+
+    def _rebase(self, checkpoint_id: str) -> None:
+        """Rewrite a delta manifest as a full base (parent dropped)."""
+        manifest, refs = self._resolve_refs(checkpoint_id)
+        manifest = {
+            **manifest,
+            "parent": None,
+            "depth": 0,
+            "changes": {field: {"set": field_refs, "del": []} for field, field_refs in refs.items()},
+        }
+        with atomic_write(self._manifest_path(checkpoint_id)) as f:
+            f.write(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")))
+        self._append_index_record({"op": "rebase", "checkpoint_id": checkpoint_id, "parent": None})
+        if self._head is not None and self._head[0] == checkpoint_id:
+            self._head = (checkpoint_id, refs, 0)
+
+    def _collect_garbage_sync(self) -> int:
+        self._digest_memo = {}
+        if not self.objects_dir.exists():
+            return 0
+        live: set[str] = set()
+        for checkpoint_id in self._live_parents(self._read_index_records()):
+            try:
+                _manifest, refs = self._resolve_refs(checkpoint_id)
+            except (OSError, ValueError):
+                continue
+            for field_refs in refs.values():
+                live.update(field_refs.values())
+        removed = 0
+        for path in self.objects_dir.glob("*/*.json"):
+            if path.stem not in live:
+                path.unlink(missing_ok=True)
+                self._known_objects.discard(path.stem)
+                removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # Append-only index
+    # ------------------------------------------------------------------
+
+    def _append_index_record(self, record: dict[str, Any]) -> None:
+        self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+
+    def _read_index_records(self) -> list[dict[str, Any]]:
+        self._migrate_legacy_index()
+        if not self.index_path.exists():
+            return []
+        records = []
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append.
+                    continue
+        return records
+
+    @staticmethod
+    def _live_parents(records: list[dict[str, Any]]) -> dict[str, str | None]:
+        """checkpoint_id → parent_id for every checkpoint still in the index."""
+        parents: dict[str, str | None] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                parents[record["summary"]["checkpoint_id"]] = record.get("parent")
+            elif op == "rebase" and record.get("checkpoint_id") in parents:
+                parents[record["checkpoint_id"]] = record.get("parent")
+            elif op == "remove":
+                parents.pop(record.get("checkpoint_id"), None)
+        return parents
+
+    @staticmethod
+    def _index_from_records(records: list[dict[str, Any]]) -> CheckpointIndex | None:
+        session_id = None
+        summaries: dict[str, CheckpointSummary] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                session_id = session_id or record.get("session_id")
+                summary = CheckpointSummary.model_validate(record["summary"])
+                summaries.pop(summary.checkpoint_id, None)
+                summaries[summary.checkpoint_id] = summary
+            elif op == "remove":
+                summaries.pop(record.get("checkpoint_id"), None)
+        if session_id is None:
+            return None
+        checkpoints = list(summaries.values())
+        return CheckpointIndex(
+            session_id=session_id,
+            checkpoints=checkpoints,
+            latest_checkpoint_id=checkpoints[-1].checkpoint_id if checkpoints else None,
+            total_checkpoints=len(checkpoints),
+        )
+
+    def _compact_index_sync(self) -> None:
+        """Rewrite ``index.jsonl`` with one ``add`` line per live checkpoint."""
+        records = self._read_index_records()
+        index = self._index_from_records(records)
+        parents = self._live_parents(records)
+        lines = []
+        if index is not None:
+            for summary in index.checkpoints:
+                record = {
+                    "op": "add",
+                    "session_id": index.session_id,
+                    "parent": parents.get(summary.checkpoint_id),
+                    "summary": summary.model_dump(mode="json"),
+                }
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        with atomic_write(self.index_path) as f:
+            f.write("".join(lines))
+
+    def _migrate_legacy_index(self) -> None:
+        """Fold a pre-delta ``index.json`` into ``index.jsonl`` (once)."""
+        if self.index_path.exists() or not self.legacy_index_path.exists():
             return
-
-        # Remove checkpoint from index
-        index.checkpoints = [cp for cp in index.checkpoints if cp.checkpoint_id != checkpoint_id]
-
-        # Update totals
-        index.total_checkpoints = len(index.checkpoints)
-
-        # Update latest_checkpoint_id if we removed the latest
-        if index.latest_checkpoint_id == checkpoint_id:
-            index.latest_checkpoint_id = index.checkpoints[-1].checkpoint_id if index.checkpoints else None
-
-        # Write updated index
-        await asyncio.to_thread(_write, index)
-
-        logger.debug(f"Removed checkpoint {checkpoint_id} from index")
+        try:
+            legacy = CheckpointIndex.model_validate_json(self.legacy_index_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.error(f"Failed to load checkpoint index: {e}")
+            return
+        lines = [
+            json.dumps(
+                {
+                    "op": "add",
+                    "session_id": legacy.session_id,
+                    "parent": None,
+                    "summary": summary.model_dump(mode="json"),
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+            for summary in legacy.checkpoints
+        ]
+        with atomic_write(self.index_path) as f:
+            f.write("".join(lines))
+        self.legacy_index_path.unlink(missing_ok=True)
+        logger.info(f"Migrated checkpoint index to {self.index_path}")
@@ -91,6 +91,47 @@ def _read_all() -> list[dict[str, Any]]:
 
         return await self._run(_read_all)
 
+    async def read_parts_after(self, seq: int) -> list[dict[str, Any]]:
+        """Return the parts with a sequence number above *seq*, in order.
+
+        Selection is by filename, so parts at or below *seq* are never
+        opened — a reader that keeps its own cursor pays for the new
+        parts only, not for the whole history.  Each returned dict has
+        ``seq`` set from its filename.
+        """
+
+        def _read_after() -> list[dict[str, Any]]:
+            if not self._parts_dir.exists():
+                return []
+            selected = []
+            for f in self._parts_dir.glob("*.json"):
+                try:
+                    file_seq = int(f.stem)
+                except ValueError:
+                    continue
+                if file_seq > seq:
+                    selected.append((file_seq, f))
+            parts = []
+            for file_seq, f in sorted(selected):
+                data = self._read_json(f)
+                if data is not None:
+                    data.setdefault("seq", file_seq)
+                    parts.append(data)
+            return parts
+
+        return await self._run(_read_after)
+
+    async def last_part_seq(self) -> int | None:
+        """Return the highest stored part sequence number, or None if empty."""
+
+        def _last() -> int | None:
+            if not self._parts_dir.exists():
+                return None
+            seqs = [int(f.stem) for f in self._parts_dir.glob("*.json") if f.stem.isdigit()]
+            return max(seqs, default=None)
+
+        return await self._run(_last)
+
     async def write_meta(self, data: dict[str, Any]) -> None:
         await self._run(self._write_json, self._base / "meta.json", data)
 
@@ -0,0 +1,283 @@
+"""Log-structured persistence for one session's task list.
+
+Layout per session::
+
+    tasks.json   -- TaskListDocument snapshot (``log_seq`` = last op folded in)
+    tasks.log    -- append-only JSONL of operations since the snapshot
+    .tasks.lock  -- advisory lock file (flock / msvcrt)
+
+A mutation appends one line carrying only the records it touched, so its
+cost is O(changed records) rather than O(total tasks). Once the log
+outgrows the snapshot it is folded back in: the snapshot is rewritten
+atomically with the new ``log_seq`` *before* the log is truncated, so a
+crash between the two leaves entries that replay skips as already applied.
+
+Each process keeps the materialised document in memory together with the
+snapshot's stat signature and the log offset it has replayed up to. Taking
+the lock re-validates both with two ``stat`` calls and replays only entries
+another process appended in the meantime, so separate processes can share a
+list safely.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from framework.tasks.models import TaskListDocument, TaskListMeta, TaskRecord
+from framework.utils.io import atomic_write
+
+if os.name == "nt":
+    import msvcrt
+
+    fcntl = None  # type: ignore[assignment]
+else:
+    import fcntl  # type: ignore[no-redef]
+
+    msvcrt = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "tasks.json"
+LOG_FILENAME = "tasks.log"
+LOCK_FILENAME = ".tasks.lock"
+
+# The log is folded into the snapshot once it is larger than the snapshot
+# itself (amortised O(1) per op) but never for tiny lists.
+_MIN_COMPACT_LOG_BYTES = 64 * 1024
+
+
+def _flock(fd: int, exclusive: bool) -> None:
+    if os.name == "nt":
+        # msvcrt has no shared locks; readers take the exclusive one too.
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EDEADLK, 36):
+                    raise
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _funlock(fd: int) -> None:
+    if os.name == "nt":
+        try:
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class TaskJournal:
+    """Snapshot + operation log for the task list in ``directory``.
+
+    Not thread-safe on its own — callers hold :meth:`locked`, which
+    serialises threads in-process and processes via the lock file.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.snapshot_path = directory / SNAPSHOT_FILENAME
+        self.log_path = directory / LOG_FILENAME
+        self.lock_path = directory / LOCK_FILENAME
+        self.thread_lock = threading.Lock()
+        self._doc: TaskListDocument | None = None
+        self._snapshot_sig: tuple[int, int, int] | None = None
+        self._log_offset = 0
+        self._seq = 0
+
+    # ----- locking ------------------------------------------------------
+
+    @contextmanager
+    def locked(self, *, exclusive: bool) -> Iterator[None]:
+        """Hold the in-process lock plus the cross-process file lock.
+
+        Any exception inside the block drops the cached document so the
+        next caller reloads from disk instead of trusting a half-applied
+        in-memory mutation.
+        """
+        with self.thread_lock:
+            if exclusive:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            elif not self.directory.exists():
+                self._invalidate()
+                yield
+                return
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _flock(fd, exclusive)
+                try:
+                    yield
+                except BaseException:
+                    self._invalidate()
+                    raise
+                finally:
+                    _funlock(fd)
+            finally:
+                os.close(fd)
+
+    def _invalidate(self) -> None:
+        self._doc = None
+        self._snapshot_sig = None
+        self._log_offset = 0
+        self._seq = 0
+
+    # ----- reading ------------------------------------------------------
+
+    def load(self) -> TaskListDocument | None:
+        """Return the current document (the cached, mutable instance).
+
+        Caller holds :meth:`locked`. Reloads the snapshot if another
+        process replaced it and replays any log entries not yet applied.
+        """
+        try:
+            st = self.snapshot_path.stat()
+        except FileNotFoundError:
+            self._invalidate()
+            return None
+        sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if self._doc is None or sig != self._snapshot_sig:
+            try:
+                doc = TaskListDocument.model_validate_json(self.snapshot_path.read_text(encoding="utf-8"))
+            except Exception:
+                logger.warning("Corrupt tasks.json at %s", self.snapshot_path, exc_info=True)
+                self._invalidate()
+                return None
+            self._doc, self._snapshot_sig = doc, sig
+            self._log_offset, self._seq = 0, doc.log_seq
+        self._replay()
+        return self._doc
+
+    def _replay(self) -> None:
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            self._log_offset = 0
+            return
+        if size < self._log_offset:
+            # Truncated under us without a snapshot change — only a manual
+            # edit does this. Start over from the snapshot.
+            self._doc, self._snapshot_sig = None, None
+            self.load()
+            return
+        if size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read(size - self._log_offset)
+        end = data.rfind(b"\n") + 1  # ignore an unterminated (in-flight or torn) tail
+        for raw in data[:end].splitlines():
+            if not raw.strip():
+                continue
+            try:
+                op = json.loads(raw)
+            except json.JSONDecodeError:
+                logger.warning("Skipping corrupt tasks.log entry in %s", self.log_path)
+                continue
+            if op.get("seq", 0) > self._seq:
+                self._apply(op)
+                self._seq = op["seq"]
+        self._log_offset += end
+
+    def _apply(self, op: dict) -> None:
+        doc = self._doc
+        assert doc is not None
+        if "meta" in op:
+            doc.meta = TaskListMeta.model_validate(op["meta"])
+        if "hwm" in op:
+            doc.highwatermark = max(doc.highwatermark, op["hwm"])
+        deletes = set(op.get("delete", ()))
+        upserts = {r["id"]: TaskRecord.model_validate(r) for r in op.get("upsert", ())}
+        if deletes or upserts:
+            tasks = []
+            for record in doc.tasks:
+                if record.id in deletes:
+                    continue
+                tasks.append(upserts.pop(record.id, record))
+            tasks.extend(upserts.values())
+            doc.tasks = tasks
+
+    # ----- writing ------------------------------------------------------
+
+    def append(
+        self,
+        *,
+        upsert: Iterable[TaskRecord] = (),
+        delete: Iterable[int] = (),
+        meta: bool = False,
+    ) -> None:
+        """Persist a mutation already applied to the cached document.
+
+        Caller holds :meth:`locked` (exclusive) and has called :meth:`load`.
+        """
+        doc = self._doc
+        assert doc is not None, "load() before append()"
+        op: dict = {"seq": self._seq + 1, "hwm": doc.highwatermark}
+        if meta:
+            op["meta"] = doc.meta.model_dump(mode="json")
+        records = [r.model_dump(mode="json") for r in upsert]
+        if records:
+            op["upsert"] = records
+        ids = list(delete)
+        if ids:
+            op["delete"] = ids
+        line = (json.dumps(op, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with open(self.log_path, "ab") as f:
+            if f.tell() != self._log_offset:
+                # Bytes past what replay consumed can only be a torn write
+                # from a crashed writer (we hold the exclusive lock). Cut it
+                # off so this entry starts on a line boundary.
+                f.truncate(self._log_offset)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_offset += len(line)
+        self._seq += 1
+
+        snapshot_size = self._snapshot_sig[2] if self._snapshot_sig else 0
+        if self._log_offset > max(_MIN_COMPACT_LOG_BYTES, snapshot_size):
+            self.write_snapshot(doc)
+
+    def write_snapshot(self, doc: TaskListDocument) -> None:
+        """Atomically rewrite ``tasks.json`` from ``doc`` and empty the log.
+
+        Caller holds :meth:`locked` (exclusive).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        doc.log_seq = self._seq
+        with atomic_write(self.snapshot_path) as f:
+            f.write(doc.model_dump_json(indent=2))
+        # Snapshot first, then truncate: a crash in between leaves log
+        # entries with seq <= log_seq, which replay skips.
+        if self._log_offset or self.log_path.exists():
+            with open(self.log_path, "wb"):
+                pass
+        st = self.snapshot_path.stat()
+        self._doc = doc
+        self._snapshot_sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        self._log_offset = 0
+
+
+_JOURNALS: dict[str, TaskJournal] = {}
+_JOURNALS_GUARD = threading.Lock()
+
+
+def get_journal(directory: Path) -> TaskJournal:
+    """Process-wide journal for ``directory`` (one cache + lock per list)."""
+    key = os.path.abspath(directory)
+    with _JOURNALS_GUARD:
+        journal = _JOURNALS.get(key)
+        if journal is None:
+            journal = TaskJournal(Path(key))
+            _JOURNALS[key] = journal
+        return journal
@@ -103,6 +103,10 @@ class TaskListDocument(BaseModel):
     meta: TaskListMeta
     highwatermark: int = 0
     tasks: list[TaskRecord] = Field(default_factory=list)
+    # Sequence number of the last ``tasks.log`` operation folded into this
+    # snapshot. Replay skips log entries at or below it. Absent (0) in docs
+    # written before the operation log existed.
+    log_seq: int = 0
 
 
 # Tagged union for claim_task_with_busy_check — an atomic owner-claim under
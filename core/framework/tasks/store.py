@@ -2,7 +2,8 @@
 
 Layout per session::
 
-    {session_storage_dir}/tasks.json   -- TaskListDocument (meta + hwm + tasks)
+    {session_storage_dir}/tasks.json   -- TaskListDocument snapshot (meta + hwm + tasks)
+    {session_storage_dir}/tasks.log    -- append-only operations since the snapshot
 
 Where ``session_storage_dir`` is the canonical session folder, located by
 scanning the three known session layouts (queen DM, queen overseer,
@@ -10,9 +11,12 @@
 of that session's data: conversations, events, summary, meta.
 
 All filesystem I/O is wrapped in ``asyncio.to_thread`` so the event loop
-never blocks. Each session has a single owning agent, so writes are
-serialised by an in-process ``threading.Lock`` keyed by session_id — no
-cross-process file lock is needed.
+never blocks. A mutation appends one log entry with just the records it
+touched (see ``framework.tasks.journal``), so an update costs O(1) instead
+of re-serialising and fsyncing the whole document. Writes are serialised
+by a per-list ``threading.Lock`` plus an advisory file lock, so workers in
+separate processes can share a list. Existing ``tasks.json`` files are
+simply the first snapshot — there is nothing to migrate.
 """
 
 from __future__ import annotations
@@ -26,6 +30,7 @@
 from pathlib import Path
 from typing import Any
 
+from framework.tasks.journal import LOG_FILENAME, TaskJournal, get_journal
 from framework.tasks.models import (
     ClaimAlreadyCompleted,
     ClaimAlreadyOwned,
@@ -39,27 +44,11 @@
     TaskStatus,
     is_task_idle,
 )
-from framework.utils.io import atomic_write
 
 logger = logging.getLogger(__name__)
 
 DOC_FILENAME = "tasks.json"
 
-# Per-session in-memory locks. Each session has one owning agent, so only
-# same-process concurrency matters (e.g. parallel tool use within a single
-# turn) — no on-disk lock needed.
-_INPROC_LOCKS: dict[str, threading.Lock] = {}
-_INPROC_LOCKS_GUARD = threading.Lock()
-
-
-def _get_inproc_lock(session_id: str) -> threading.Lock:
-    with _INPROC_LOCKS_GUARD:
-        lock = _INPROC_LOCKS.get(session_id)
-        if lock is None:
-            lock = threading.Lock()
-            _INPROC_LOCKS[session_id] = lock
-        return lock
-
 
 # Resolved-session-dir cache: (session_id, hive_root) -> canonical folder.
 # Session folders are created once and never move, so a positive resolution
@@ -176,9 +165,9 @@ def session_storage_dir(session_id: str, *, hive_root: Path | None = None) -> Pa
 class TaskStore:
     """Async wrapper around the on-disk store.
 
-    A single TaskStore is fine to share across the process; locking is
-    in-memory per session_id, so multi-process is not supported (and not
-    needed — each session is owned by a single process).
+    A single TaskStore is fine to share across the process. Locking is
+    per list — an in-process lock plus an advisory file lock — so several
+    processes may also operate on the same list.
     """
 
     def __init__(self, *, hive_root: Path | None = None) -> None:
@@ -218,9 +207,11 @@ def _set_goal_sync(self, session_id: str, goal: str) -> None:
         with self._list_lock(session_id):
             doc = self._read_doc_unsafe(session_id)
             if doc is None:
-                doc = TaskListDocument(meta=TaskListMeta())
+                doc = TaskListDocument(meta=TaskListMeta(goal=goal))
+                self._write_doc_unsafe(session_id, doc)
+                return
             doc.meta.goal = goal
-            self._write_doc_unsafe(session_id, doc)
+            self._journal(session_id).append(meta=True)
 
     async def list_exists(self, session_id: str) -> bool:
         """True iff ``tasks.json`` is on disk for this session."""
@@ -398,45 +389,41 @@ def _list_dir(self, session_id: str) -> Path:
     def _doc_path(self, session_id: str) -> Path:
         return self._list_dir(session_id) / DOC_FILENAME
 
+    def _journal(self, session_id: str) -> TaskJournal:
+        return get_journal(self._list_dir(session_id))
+
     def _list_lock(self, session_id: str):
         """Return a context manager that serialises writes to this session's list.
 
-        Each session has a single owning agent, so only same-process
-        concurrency matters (e.g. parallel tool use within one turn) —
-        an in-memory ``threading.Lock`` is enough.
+        Covers threads in this process (parallel tool use within one turn)
+        and other processes sharing the list (the file lock).
         """
-        d = self._list_dir(session_id)
-        d.mkdir(parents=True, exist_ok=True)
-        return _get_inproc_lock(session_id)
+        return self._journal(session_id).locked(exclusive=True)
 
     # ----- doc IO -------------------------------------------------------
 
     def _read_doc_sync(self, session_id: str) -> TaskListDocument | None:
-        """Lock-free read of the session's task doc, or None if absent."""
-        doc_path = self._doc_path(session_id)
-        if doc_path.exists():
-            try:
-                return TaskListDocument.model_validate_json(doc_path.read_text(encoding="utf-8"))
-            except Exception:
-                logger.warning("Corrupt tasks.json at %s", doc_path, exc_info=True)
-        return None
+        """Read the session's task doc under a shared lock, or None if absent.
+
+        Returns a private copy — the journal's cached document is mutated
+        in place by writers.
+        """
+        journal = self._journal(session_id)
+        with journal.locked(exclusive=False):
+            doc = journal.load()
+            return doc.model_copy(deep=True) if doc is not None else None
 
     def _read_doc_unsafe(self, session_id: str) -> TaskListDocument | None:
-        """Same as ``_read_doc_sync`` but assumes the list-lock is already held."""
-        doc_path = self._doc_path(session_id)
-        if doc_path.exists():
-            try:
-                return TaskListDocument.model_validate_json(doc_path.read_text(encoding="utf-8"))
-            except Exception:
-                logger.warning("Corrupt tasks.json at %s", doc_path, exc_info=True)
-        return None
+        """The journal's live document. Caller MUST hold the list-lock.
+
+        Mutations to it must be followed by ``_journal(...).append(...)``
+        (or ``_write_doc_unsafe``) naming what changed.
+        """
+        return self._journal(session_id).load()
 
     def _write_doc_unsafe(self, session_id: str, doc: TaskListDocument) -> None:
-        """Atomically rewrite the doc. Caller MUST hold the list-lock."""
-        path = self._doc_path(session_id)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with atomic_write(path) as f:
-            f.write(doc.model_dump_json(indent=2))
+        """Atomically rewrite the whole doc as a new snapshot. Caller MUST hold the list-lock."""
+        self._journal(session_id).write_snapshot(doc)
 
     # ----- meta accessors over the doc ----------------------------------
 
@@ -451,8 +438,8 @@ def _ensure_task_list_sync(
                 meta = TaskListMeta(creator_agent_id=creator_agent_id)
                 doc = TaskListDocument(meta=meta)
                 self._write_doc_unsafe(session_id, doc)
-                return meta
-            return doc.meta
+                return meta.model_copy()
+            return doc.meta.model_copy()
 
     def _read_meta_sync(self, session_id: str) -> TaskListMeta | None:
         doc = self._read_doc_sync(session_id)
@@ -461,12 +448,14 @@ def _read_meta_sync(self, session_id: str) -> TaskListMeta | None:
     # ----- task IO ------------------------------------------------------
 
     def _read_task_sync(self, session_id: str, task_id: int) -> TaskRecord | None:
-        doc = self._read_doc_sync(session_id)
-        if doc is None:
-            return None
-        for r in doc.tasks:
-            if r.id == task_id:
-                return r
+        journal = self._journal(session_id)
+        with journal.locked(exclusive=False):
+            doc = journal.load()
+            if doc is None:
+                return None
+            for r in doc.tasks:
+                if r.id == task_id:
+                    return r.model_copy(deep=True)
         return None
 
     def _list_tasks_sync(self, session_id: str) -> list[TaskRecord]:
@@ -506,8 +495,8 @@ def _create_task_sync(
             doc.tasks.append(record)
             if new_id > doc.highwatermark:
                 doc.highwatermark = new_id
-            self._write_doc_unsafe(session_id, doc)
-            return record
+            self._commit_unsafe(session_id, doc, upsert=[record])
+            return record.model_copy(deep=True)
 
     def _create_tasks_batch_sync(
         self,
@@ -527,6 +516,7 @@ def _create_tasks_batch_sync(
             doc = self._read_doc_unsafe(session_id)
             if doc is None:
                 doc = TaskListDocument(meta=TaskListMeta())
+            meta_changed = goal is not None and goal != doc.meta.goal
             if goal is not None:
                 doc.meta.goal = goal
 
@@ -552,9 +542,29 @@ def _create_tasks_batch_sync(
             highest = records[-1].id
             if highest > doc.highwatermark:
                 doc.highwatermark = highest
-            # Single write — atomic batch is free with the doc model.
-            self._write_doc_unsafe(session_id, doc)
-            return records
+            # Single log entry — the batch commits atomically or not at all.
+            self._commit_unsafe(session_id, doc, upsert=records, meta=meta_changed)
+            return [r.model_copy(deep=True) for r in records]
+
+    def _commit_unsafe(
+        self,
+        session_id: str,
+        doc: TaskListDocument,
+        *,
+        upsert: Iterable[TaskRecord] = (),
+        delete: Iterable[int] = (),
+        meta: bool = False,
+    ) -> None:
+        """Persist an in-place mutation of the live doc. Caller MUST hold the list-lock.
+
+        A brand-new list (no snapshot yet) is written whole; otherwise only
+        the named records go to the log.
+        """
+        journal = self._journal(session_id)
+        if journal.load() is not doc:
+            journal.write_snapshot(doc)
+            return
+        journal.append(upsert=upsert, delete=delete, meta=meta)
 
     # ----- id assignment ------------------------------------------------
 
@@ -597,8 +607,11 @@ def _update_task_sync(
                 metadata_patch=metadata_patch,
             )
             if changed:
-                self._write_doc_unsafe(session_id, doc)
-            return new, changed
+                # Blocks/blocked_by edits also touch the other side's record.
+                linked = set(add_blocks or ()) | set(add_blocked_by or ())
+                touched = [new, *(r for r in doc.tasks if r.id in linked)]
+                self._commit_unsafe(session_id, doc, upsert=touched)
+            return new.model_copy(deep=True), changed
 
     def _sweep_idle_tasks_sync(self, session_id: str) -> list[TaskRecord]:
         with self._list_lock(session_id):
@@ -614,8 +627,8 @@ def _sweep_idle_tasks_sync(self, session_id: str) -> list[TaskRecord]:
                     changed.append(record)
             if not changed:
                 return []
-            self._write_doc_unsafe(session_id, doc)
-            return changed
+            self._commit_unsafe(session_id, doc, upsert=changed)
+            return [r.model_copy(deep=True) for r in changed]
 
     def _update_task_in_doc(
         self,
@@ -718,8 +731,8 @@ def _delete_task_sync(self, session_id: str, task_id: int) -> tuple[bool, list[i
             if idx is None:
                 return False, []
             # 1. Bump high-water-mark BEFORE removing so a crash mid-write
-            #    can't cause id reuse on the next create. (atomic_write
-            #    guarantees we either commit the whole new state or none.)
+            #    can't cause id reuse on the next create. (The log entry
+            #    carries hwm, delete and cascade together — all or none.)
             if task_id > doc.highwatermark:
                 doc.highwatermark = task_id
             # 2. Remove the task itself.
@@ -738,7 +751,13 @@ def _delete_task_sync(self, session_id: str, task_id: int) -> tuple[bool, list[i
                 if touched:
                     other.updated_at = now
                     cascaded.append(other.id)
-            self._write_doc_unsafe(session_id, doc)
+            cascaded_set = set(cascaded)
+            self._commit_unsafe(
+                session_id,
+                doc,
+                upsert=[r for r in doc.tasks if r.id in cascaded_set],
+                delete=[task_id],
+            )
             return True, cascaded
 
     # ----- reset --------------------------------------------------------
@@ -773,8 +792,8 @@ def _archive_completed_sync(self, session_id: str) -> list[TaskRecord]:
                 archived.append(record)
             if not archived:
                 return []
-            self._write_doc_unsafe(session_id, doc)
-            return archived
+            self._commit_unsafe(session_id, doc, upsert=archived)
+            return [r.model_copy(deep=True) for r in archived]
 
     def _unarchive_sync(self, session_id: str, task_ids: list[int]) -> list[int]:
         with self._list_lock(session_id):
@@ -798,7 +817,8 @@ def _unarchive_sync(self, session_id: str, task_ids: list[int]) -> list[int]:
                 restored.append(record.id)
             if not restored:
                 return []
-            self._write_doc_unsafe(session_id, doc)
+            restored_set = set(restored)
+            self._commit_unsafe(session_id, doc, upsert=[r for r in doc.tasks if r.id in restored_set])
             return restored
 
     # ----- claim --------------------------------------------------------
@@ -822,9 +842,10 @@ def _claim_sync(self, session_id: str, task_id: int, claimant: str) -> ClaimResu
                     unresolved_blockers.append(b)
             if unresolved_blockers:
                 return ClaimBlocked(kind="blocked", by=unresolved_blockers)
-            new, _ = self._update_task_in_doc(doc, current, owner=claimant)
-            self._write_doc_unsafe(session_id, doc)
-            return ClaimOk(kind="ok", record=new)
+            new, changed = self._update_task_in_doc(doc, current, owner=claimant)
+            if changed:
+                self._commit_unsafe(session_id, doc, upsert=[new])
+            return ClaimOk(kind="ok", record=new.model_copy(deep=True))
 
 
 # ---------------------------------------------------------------------------
@@ -855,5 +876,4 @@ def fingerprint_for_test(session_id: str, hive_root: Path) -> Iterable[Path]:
     base = session_storage_dir(session_id, hive_root=hive_root)
     if not base.exists():
         return []
-    doc = base / DOC_FILENAME
-    return [doc] if doc.exists() else []
+    return [p for p in (base / DOC_FILENAME, base / LOG_FILENAME) if p.exists()]
@@ -0,0 +1,217 @@
+"""Tests for the log-structured persistence under TaskStore.
+
+Replay after reopen, migration from a bare ``tasks.json``, torn-tail
+recovery, compaction, and several processes sharing one list. The update
+latency benchmark at the bottom is opt-in, run with ``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from framework.tasks import TaskStatus, TaskStore, journal as journal_mod
+from framework.tasks.journal import LOG_FILENAME, SNAPSHOT_FILENAME, get_journal
+from framework.tasks.models import TaskListDocument, TaskListMeta, TaskRecord
+
+SESSION = "journal_session"
+
+
+def _fresh_store(hive_root: Path) -> TaskStore:
+    """A store whose journals start cold, as in a new process."""
+    journal_mod._JOURNALS.clear()
+    return TaskStore(hive_root=hive_root)
+
+
+def _list_dir(store: TaskStore) -> Path:
+    return store._list_dir(SESSION)
+
+
+@pytest.mark.asyncio
+async def test_updates_append_and_replay_after_reopen(tmp_path: Path) -> None:
+    store = TaskStore(hive_root=tmp_path)
+    await store.create_tasks_batch(SESSION, [{"subject": f"t{i}"} for i in range(5)], goal="g")
+    snapshot = (_list_dir(store) / SNAPSHOT_FILENAME).read_bytes()
+
+    await store.update_task(SESSION, 2, status=TaskStatus.IN_PROGRESS, add_blocks=[3])
+    await store.delete_task(SESSION, 5)
+    await store.set_goal(SESSION, "new goal")
+
+    # Only the log grew; the snapshot was not rewritten.
+    assert (_list_dir(store) / SNAPSHOT_FILENAME).read_bytes() == snapshot
+    ops = [json.loads(ln) for ln in (_list_dir(store) / LOG_FILENAME).read_text().splitlines()]
+    assert [op["seq"] for op in ops] == [1, 2, 3]
+    assert sorted(r["id"] for r in ops[0]["upsert"]) == [2, 3]
+
+    reopened = _fresh_store(tmp_path)
+    tasks = await reopened.list_tasks(SESSION)
+    assert [t.id for t in tasks] == [1, 2, 3, 4]
+    assert tasks[1].status == TaskStatus.IN_PROGRESS
+    assert tasks[2].blocked_by == [2]
+    assert (await reopened.get_meta(SESSION)).goal == "new goal"
+    # The deleted id is never reused.
+    assert (await reopened.create_task(SESSION, subject="next")).id == 6
+
+
+@pytest.mark.asyncio
+async def test_legacy_tasks_json_is_the_first_snapshot(tmp_path: Path) -> None:
+    store = TaskStore(hive_root=tmp_path)
+    d = _list_dir(store)
+    d.mkdir(parents=True)
+    legacy = TaskListDocument(meta=TaskListMeta(goal="old"), highwatermark=3, tasks=[TaskRecord(id=3, subject="kept")])
+    raw = json.loads(legacy.model_dump_json())
+    raw.pop("log_seq")
+    (d / SNAPSHOT_FILENAME).write_text(json.dumps(raw))
+
+    store = _fresh_store(tmp_path)
+    await store.update_task(SESSION, 3, subject="renamed")
+    assert (await store.create_task(SESSION, subject="new")).id == 4
+
+    store = _fresh_store(tmp_path)
+    assert [(t.id, t.subject) for t in await store.list_tasks(SESSION)] == [(3, "renamed"), (4, "new")]
+
+
+@pytest.mark.asyncio
+async def test_torn_tail_is_ignored_and_overwritten(tmp_path: Path) -> None:
+    store = TaskStore(hive_root=tmp_path)
+    await store.create_task(SESSION, subject="a")
+    await store.update_task(SESSION, 1, subject="b")
+    log = _list_dir(store) / LOG_FILENAME
+    with open(log, "ab") as f:
+        f.write(b'{"seq":99,"upsert":[{"id":1,"sub')  # crashed mid-write
+
+    store = _fresh_store(tmp_path)
+    assert (await store.get_task(SESSION, 1)).subject == "b"
+    await store.update_task(SESSION, 1, subject="c")
+    lines = log.read_text().splitlines()
+    assert all(json.loads(ln) for ln in lines)
+
+    store = _fresh_store(tmp_path)
+    assert (await store.get_task(SESSION, 1)).subject == "c"
+
+
+@pytest.mark.asyncio
+async def test_log_compacts_into_snapshot(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(journal_mod, "_MIN_COMPACT_LOG_BYTES", 2048)
+    store = TaskStore(hive_root=tmp_path)
+    await store.create_task(SESSION, subject="t")
+    for i in range(100):
+        await store.update_task(SESSION, 1, description=f"step {i}")
+
+    d = _list_dir(store)
+    assert (d / LOG_FILENAME).stat().st_size <= 2048 + 1024
+    snap = TaskListDocument.model_validate_json((d / SNAPSHOT_FILENAME).read_text())
+    assert snap.log_seq > 0
+
+    store = _fresh_store(tmp_path)
+    assert (await store.get_task(SESSION, 1)).description == "step 99"
+
+
+@pytest.mark.asyncio
+async def test_crash_between_snapshot_and_truncate_replays_nothing_twice(tmp_path: Path) -> None:
+    store = TaskStore(hive_root=tmp_path)
+    await store.create_task(SESSION, subject="t")
+    await store.delete_task(SESSION, 1)
+    d = _list_dir(store)
+    stale_log = (d / LOG_FILENAME).read_bytes()
+    # Fold the log in, then put the old entries back as if truncate never ran.
+    journal = get_journal(d)
+    with journal.locked(exclusive=True):
+        journal.write_snapshot(journal.load())
+    (d / LOG_FILENAME).write_bytes(stale_log)
+
+    store = _fresh_store(tmp_path)
+    assert await store.list_tasks(SESSION) == []
+    assert (await store.create_task(SESSION, subject="u")).id == 2
+
+
+@pytest.mark.asyncio
+async def test_returned_records_are_detached(tmp_path: Path) -> None:
+    store = TaskStore(hive_root=tmp_path)
+    rec = await store.create_task(SESSION, subject="t")
+    rec.subject = "mutated by caller"
+    listed = await store.list_tasks(SESSION)
+    listed[0].blocks.append(42)
+    fetched = await store.get_task(SESSION, 1)
+    assert fetched.subject == "t"
+    assert fetched.blocks == []
+
+
+def _contend(hive_root: str, worker: int, n: int) -> None:
+    async def run() -> None:
+        store = TaskStore(hive_root=Path(hive_root))
+        for i in range(n):
+            rec = await store.create_task(SESSION, subject=f"w{worker}-{i}")
+            await store.update_task(SESSION, rec.id, status=TaskStatus.COMPLETED)
+
+    asyncio.run(run())
+
+
+def test_multi_process_contention_loses_nothing(tmp_path: Path) -> None:
+    workers, per_worker = 4, 40
+    # fork skips re-importing the framework in each child; the journal's
+    # per-process cache starts cold because the children never touched it.
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    ctx = multiprocessing.get_context(method)
+    procs = [ctx.Process(target=_contend, args=(str(tmp_path), w, per_worker)) for w in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+    assert all(p.exitcode == 0 for p in procs)
+
+    store = _fresh_store(tmp_path)
+    tasks = asyncio.run(store.list_tasks(SESSION))
+    total = workers * per_worker
+    assert [t.id for t in tasks] == list(range(1, total + 1))
+    assert all(t.status == TaskStatus.COMPLETED for t in tasks)
+    assert len({t.subject for t in tasks}) == total
+
+
+@pytest.mark.asyncio
+async def test_update_appends_the_same_bytes_whatever_the_list_size(tmp_path: Path) -> None:
+    """An update appends one record; it must not rewrite or scale with the list."""
+
+    async def appended_per_update(n_tasks: int) -> float:
+        store = TaskStore(hive_root=tmp_path / str(n_tasks))
+        await store.create_tasks_batch(SESSION, [{"subject": f"t{i}", "description": "d" * 200} for i in range(n_tasks)])
+        log = store._list_dir(SESSION) / LOG_FILENAME
+        before = log.stat().st_size if log.exists() else 0
+        for i in range(20):
+            await store.update_task(SESSION, 1 + i % 10, status=TaskStatus.IN_PROGRESS if i % 2 else TaskStatus.PENDING)
+        return (log.stat().st_size - before) / 20
+
+    small = await appended_per_update(10)
+    large = await appended_per_update(2000)
+    assert 0 < small < 1000
+    assert large < small * 1.5
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_update_cost_independent_of_list_size(tmp_path: Path) -> None:
+    """An update appends one record; it must not scale with the list."""
+
+    async def per_update(n_tasks: int) -> float:
+        store = TaskStore(hive_root=tmp_path / str(n_tasks))
+        await store.create_tasks_batch(SESSION, [{"subject": f"t{i}", "description": "d" * 200} for i in range(n_tasks)])
+        log = store._list_dir(SESSION) / LOG_FILENAME
+        rounds = 50
+        t0 = time.perf_counter()
+        for i in range(rounds):
+            await store.update_task(SESSION, 1 + i % n_tasks, status=TaskStatus.IN_PROGRESS if i % 2 else TaskStatus.PENDING)
+        assert log.stat().st_size < 40_000
+        return (time.perf_counter() - t0) / rounds
+
+    small = await per_update(10)
+    large = await per_update(2000)
+    print(f"\nupdate latency: 10 tasks {small * 1e3:.2f} ms | 2000 tasks {large * 1e3:.2f} ms")
+    assert large < small * 5 + 0.005
@@ -30,6 +30,7 @@
 from framework.credentials.models import CredentialError
 from framework.host.event_bus import AgentEvent, EventType
 from framework.loader.preload_validation import credential_errors_to_json
+from framework.tools.tool_search_index import ToolSearchIndex, get_tool_search_index
 
 if TYPE_CHECKING:
     from framework.host.agent_host import AgentHost
@@ -325,6 +326,15 @@ def get_searchable_tools(self) -> list:
         """Tools the queen MAY use but that are not loaded — manifest source."""
         return [t for t in self._filtered_tools_for_current_phase() if not self._is_eager(t.name)]
 
+    def search_index(self) -> ToolSearchIndex:
+        """Keyword index over the current phase's full tool list.
+
+        Both phase lists are replaced wholesale when the registry changes,
+        so the shared index stays valid across allowlist edits and
+        promotions, which only narrow what a search may return.
+        """
+        return get_tool_search_index(self.colony_tools if self.phase == "colony" else self.independent_tools)
+
     def unregistered_allowlisted_names(self) -> set[str]:
         """Allowlisted tool names that no live MCP server registered this session.
 
@@ -785,113 +795,88 @@ async def resolve_missed(
 
 
 async def _start_trigger_timer(session: Any, trigger_id: str, tdef: Any) -> None:
-    """Start an asyncio background task that fires the trigger on a timer."""
+    """Register the trigger with the trigger scheduler so it fires on its
+    interval or cron schedule.
+
+    The scheduler keeps absolute deadlines, so a slow fire does not push
+    later ticks back. Ticks missed while the session was closed are not
+    caught up here (``catch_up="skip"``): the missed-trigger handshake
+    lets the user decide what to do with them.
+    """
     from framework.agent_loop.agent_loop import TriggerEvent
+    from framework.host.trigger_scheduler import TriggerFire, default_trigger_scheduler
 
     cron_expr = tdef.trigger_config.get("cron")
     interval_minutes = tdef.trigger_config.get("interval_minutes")
+    scheduler = default_trigger_scheduler()
+    key = f"queen:{getattr(session, 'id', '')}:{trigger_id}"
 
-    # Seed the first-fire time up front so introspection (and the UI
-    # countdown) have a value immediately on activation instead of only
-    # after the first tick. Cron uses croniter's next match; interval
-    # uses interval_minutes. Both use monotonic, matching route readers.
-    fire_times = getattr(session, "trigger_next_fire", None)
-    if fire_times is not None:
-        if cron_expr:
-            try:
-                from croniter import croniter as _croniter_seed
-
-                _first = _croniter_seed(cron_expr, datetime.now(tz=UTC)).get_next(datetime)
-                _first_delay = max(0.0, (_first - datetime.now(tz=UTC)).total_seconds())
-            except Exception:
-                _first_delay = 60.0
-        else:
-            _first_delay = float(interval_minutes) * 60 if interval_minutes else 60.0
-        fire_times[trigger_id] = time.monotonic() + _first_delay
+    def _record_next_fire(next_at: float | None) -> None:
+        # Monotonic, matching the route readers of ``trigger_next_fire``.
+        fire_times = getattr(session, "trigger_next_fire", None)
+        if fire_times is not None and next_at is not None:
+            fire_times[trigger_id] = time.monotonic() + max(0.0, next_at - time.time())
 
-    async def _timer_loop() -> None:
-        if cron_expr:
-            from croniter import croniter
+    async def _on_fire(fire: TriggerFire) -> None:
+        _record_next_fire(fire.next_at)
 
-            cron = croniter(cron_expr, datetime.now(tz=UTC))
+        # Gate on a colony being bound to this session
+        if getattr(session, "colony_id", None) is None:
+            return
 
-        while True:
-            try:
-                if cron_expr:
-                    next_fire = cron.get_next(datetime)
-                    delay = (next_fire - datetime.now(tz=UTC)).total_seconds()
-                    if delay > 0:
-                        await asyncio.sleep(delay)
-                else:
-                    await asyncio.sleep(float(interval_minutes) * 60)
-
-                # Record the *subsequent* next-fire time for introspection.
-                # For cron we peek one step further; for interval we add
-                # another interval. Matches routes' monotonic clock.
-                fire_times = getattr(session, "trigger_next_fire", None)
-                if fire_times is not None:
-                    if cron_expr:
-                        try:
-                            _peek = croniter(cron_expr, datetime.now(tz=UTC)).get_next(datetime)
-                            _next_delay = max(0.0, (_peek - datetime.now(tz=UTC)).total_seconds())
-                        except Exception:
-                            _next_delay = 60.0
-                    else:
-                        _next_delay = float(interval_minutes) * 60 if interval_minutes else 60.0
-                    fire_times[trigger_id] = time.monotonic() + _next_delay
+        # Fire into queen node
+        executor = getattr(session, "queen_executor", None)
+        if executor is None:
+            return
+        queen_node = getattr(executor, "node_registry", {}).get("queen")
+        if queen_node is None:
+            return
 
-                # Gate on a colony being bound to this session
-                if getattr(session, "colony_id", None) is None:
-                    continue
+        event = TriggerEvent(
+            trigger_type="timer",
+            source_id=trigger_id,
+            payload={
+                "task": tdef.task or "",
+                "trigger_config": tdef.trigger_config,
+            },
+        )
+        await queen_node.inject_trigger(event)
+        await _emit_trigger_fired(session, trigger_id, "timer")
+
+        # Persist last_fired_at + next_due_at so the activation
+        # missed-triggers handshake can reconstruct which ticks
+        # would have fired during a deactivation gap. Done after
+        # the fire (not before) so a crash mid-fire leaves the
+        # previous timestamp intact.
+        tdef.last_fired_at = datetime.now(tz=UTC).isoformat()
+        tdef.next_due_at = datetime.fromtimestamp(fire.next_at, tz=UTC).isoformat() if fire.next_at is not None else None
+        try:
+            _save_trigger_to_agent(session, trigger_id, tdef)
+        except Exception:
+            logger.warning(
+                "Failed to persist trigger fire timestamps for '%s'",
+                trigger_id,
+                exc_info=True,
+            )
 
-                # Fire into queen node
-                executor = getattr(session, "queen_executor", None)
-                if executor is None:
-                    continue
-                queen_node = getattr(executor, "node_registry", {}).get("queen")
-                if queen_node is None:
-                    continue
+    try:
+        task = scheduler.schedule_task(
+            key,
+            _on_fire,
+            interval_seconds=float(interval_minutes) * 60 if interval_minutes else None,
+            cron=cron_expr,
+            jitter_seconds=float(tdef.trigger_config.get("jitter_seconds") or 0.0),
+            catch_up="skip",
+        )
+    except (TypeError, ValueError):
+        logger.warning("Timer trigger '%s' has no valid schedule: %s", trigger_id, tdef.trigger_config, exc_info=True)
+        return
 
-                event = TriggerEvent(
-                    trigger_type="timer",
-                    source_id=trigger_id,
-                    payload={
-                        "task": tdef.task or "",
-                        "trigger_config": tdef.trigger_config,
-                    },
-                )
-                await queen_node.inject_trigger(event)
-                await _emit_trigger_fired(session, trigger_id, "timer")
-
-                # Persist last_fired_at + next_due_at so the activation
-                # missed-triggers handshake can reconstruct which ticks
-                # would have fired during a deactivation gap. Done after
-                # the fire (not before) so a crash mid-fire leaves the
-                # previous timestamp intact.
-                fire_dt = datetime.now(tz=UTC)
-                tdef.last_fired_at = fire_dt.isoformat()
-                if cron_expr:
-                    try:
-                        _peek_next = croniter(cron_expr, fire_dt).get_next(datetime)
-                        tdef.next_due_at = _peek_next.isoformat()
-                    except Exception:
-                        tdef.next_due_at = None
-                elif interval_minutes:
-                    tdef.next_due_at = (fire_dt + timedelta(minutes=float(interval_minutes))).isoformat()
-                try:
-                    _save_trigger_to_agent(session, trigger_id, tdef)
-                except Exception:
-                    logger.warning(
-                        "Failed to persist trigger fire timestamps for '%s'",
-                        trigger_id,
-                        exc_info=True,
-                    )
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                logger.warning("Timer trigger '%s' tick failed", trigger_id, exc_info=True)
+    # Seed the first-fire time up front so introspection (and the UI
+    # countdown) have a value immediately on activation instead of only
+    # after the first tick.
+    _record_next_fire(scheduler.next_fire_at(key))
 
-    task = asyncio.create_task(_timer_loop(), name=f"trigger_timer_{trigger_id}")
     if not hasattr(session, "active_timer_tasks"):
         session.active_timer_tasks = {}
     session.active_timer_tasks[trigger_id] = task
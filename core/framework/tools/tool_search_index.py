@@ -0,0 +1,203 @@
+"""Inverted BM25 index behind keyword ``search_tools`` queries.
+
+``_match_searchable_tools`` used to lowercase and substring-scan the name and
+description of every searchable tool on each query, ranking by the number of
+query tokens that appeared. With hundreds of MCP tools loaded that scan runs
+on every discovery turn, and the overlap count cannot tell a tool *about*
+email from one that mentions it in passing.
+
+:class:`ToolSearchIndex` tokenizes each tool once — name, description and
+parameter names — into posting lists with precomputed BM25 contributions,
+so a query only touches the postings of its own terms. Name tokens weigh
+more than description tokens. A query token that is not a whole indexed
+term still matches any term that contains it (``mail`` → ``gmail``), at a
+discount, which keeps the old substring behaviour for tokens of three or
+more characters.
+
+Indexes are immutable and shared process-wide through
+:func:`get_tool_search_index`, keyed by the tool set's identity (name,
+description, parameter names). The queen and every worker in a colony draw
+from the same registry, so one index serves all of them until the registry
+itself changes; promoting a tool only changes which names a query may
+return (``allowed``), not the index.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import OrderedDict
+
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+# Per-field term weights: a tool's name is what it does, its description
+# says how, parameter names hint at what it takes.
+_NAME_WEIGHT = 3.0
+_DESCRIPTION_WEIGHT = 1.0
+_PARAM_WEIGHT = 1.0
+# Contribution scale for a query token matched only as a substring of an
+# indexed term. Shorter tokens ("in", "to") would match half the vocabulary,
+# so they only match whole terms.
+_PARTIAL_WEIGHT = 0.5
+_PARTIAL_MIN_LEN = 3
+
+_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+
+_MAX_INDEXES = 16
+_MAX_EXPANSIONS = 1024
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric runs of ``text``.
+
+    ``camelCase`` words contribute their parts as well as the whole word,
+    since parameter names are usually written that way.
+    """
+    if not text:
+        return []
+    out = [tok for tok in _SPLIT_RE.split(text.lower()) if tok]
+    split = _CAMEL_RE.sub(r"\1 \2", text)
+    if split != text:
+        out.extend(tok for tok in _SPLIT_RE.split(split.lower()) if tok and tok not in out)
+    return out
+
+
+def _param_names(tool) -> list[str]:
+    params = getattr(tool, "parameters", None)
+    props = params.get("properties") if isinstance(params, dict) else None
+    return [k for k in props if isinstance(k, str)] if isinstance(props, dict) else []
+
+
+def _fingerprint(tools: list) -> tuple:
+    return tuple((t.name, getattr(t, "description", "") or "", tuple(_param_names(t))) for t in tools)
+
+
+class ToolSearchIndex:
+    """BM25 posting lists over a fixed list of tools.
+
+    Build once per tool set (see :func:`get_tool_search_index`); the index
+    is never mutated afterwards, so concurrent searches need no lock.
+    """
+
+    def __init__(self, tools: list) -> None:
+        self.names: list[str] = []
+        doc_terms: list[dict[str, float]] = []
+        for t in tools:
+            terms: dict[str, float] = {}
+            for weight, tokens in (
+                (_NAME_WEIGHT, tokenize(t.name)),
+                (_DESCRIPTION_WEIGHT, tokenize(getattr(t, "description", "") or "")),
+                (_PARAM_WEIGHT, [tok for p in _param_names(t) for tok in tokenize(p)]),
+            ):
+                for tok in tokens:
+                    terms[tok] = terms.get(tok, 0.0) + weight
+            self.names.append(t.name)
+            doc_terms.append(terms)
+
+        n = len(doc_terms)
+        lengths = [sum(terms.values()) for terms in doc_terms]
+        avg_len = (sum(lengths) / n) if n else 0.0
+        doc_freq: dict[str, int] = {}
+        for terms in doc_terms:
+            for tok in terms:
+                doc_freq[tok] = doc_freq.get(tok, 0) + 1
+
+        # term -> [(doc, bm25 contribution)], contributions precomputed so a
+        # query is a handful of dict lookups and additions.
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        for doc, terms in enumerate(doc_terms):
+            norm = _K1 * (1 - _B + _B * lengths[doc] / (avg_len or 1))
+            for tok, tf in terms.items():
+                df = doc_freq[tok]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                self._postings.setdefault(tok, []).append((doc, idf * tf * (_K1 + 1) / (tf + norm)))
+        self._vocab = sorted(self._postings)
+        self._expansions: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _partial_terms(self, token: str) -> list[str]:
+        """Indexed terms that contain ``token`` without being equal to it."""
+        if len(token) < _PARTIAL_MIN_LEN:
+            return []
+        hit = self._expansions.get(token)
+        if hit is None:
+            hit = [term for term in self._vocab if token in term and term != token]
+            if len(self._expansions) >= _MAX_EXPANSIONS:
+                self._expansions.clear()
+            self._expansions[token] = hit
+        return hit
+
+    def search(self, query: str, limit: int = 5, allowed: set[str] | None = None) -> list[str]:
+        """Best tool names for a free-text ``query``, at most ``limit``.
+
+        Only names in ``allowed`` are returned when it is given. Every
+        result matched at least one query token; ties rank by name.
+        """
+        tokens = list(dict.fromkeys(tok for tok in _SPLIT_RE.split((query or "").lower()) if tok))
+        if not tokens or limit <= 0:
+            return []
+        scores: dict[int, float] = {}
+        get = scores.get
+        for tok in tokens:
+            partial_terms = self._partial_terms(tok)
+            if not partial_terms:
+                for doc, contribution in self._postings.get(tok, ()):
+                    scores[doc] = get(doc, 0.0) + contribution
+                continue
+            # A token counts once per tool: its best exact or partial match.
+            best = dict(self._postings.get(tok, ()))
+            for term in partial_terms:
+                for doc, contribution in self._postings[term]:
+                    partial = contribution * _PARTIAL_WEIGHT
+                    if partial > best.get(doc, 0.0):
+                        best[doc] = partial
+            for doc, contribution in best.items():
+                scores[doc] = get(doc, 0.0) + contribution
+        names = self.names
+        ranked = ((-score, names[doc]) for doc, score in scores.items() if allowed is None or names[doc] in allowed)
+        return [name for _, name in heapq.nsmallest(limit, ranked)]
+
+
+_INDEXES: OrderedDict[tuple, ToolSearchIndex] = OrderedDict()
+# id(list) -> (list, len, index): skips fingerprinting when the caller hands
+# back the same memoized tool list it used last time.
+_BY_LIST: OrderedDict[int, tuple[list, int, ToolSearchIndex]] = OrderedDict()
+_INDEXES_GUARD = threading.Lock()
+
+
+def get_tool_search_index(tools: list, *, refresh: bool = False) -> ToolSearchIndex:
+    """Process-wide index for ``tools``, built on first use.
+
+    Tool lists with the same names, descriptions and parameter names share
+    one index regardless of which state object or worker holds them. A list
+    object seen before is trusted to be unchanged unless its length moved;
+    pass ``refresh=True`` after mutating a list in place.
+    """
+    with _INDEXES_GUARD:
+        cached = _BY_LIST.get(id(tools))
+        if not refresh and cached is not None and cached[0] is tools and cached[1] == len(tools):
+            _BY_LIST.move_to_end(id(tools))
+            return cached[2]
+    key = _fingerprint(tools)
+    with _INDEXES_GUARD:
+        index = _INDEXES.get(key)
+    if index is None:
+        # Built outside the guard; a racing builder at worst does the same
+        # work twice and the first insert wins.
+        built = ToolSearchIndex(tools)
+        with _INDEXES_GUARD:
+            index = _INDEXES.setdefault(key, built)
+    with _INDEXES_GUARD:
+        _INDEXES.move_to_end(key)
+        while len(_INDEXES) > _MAX_INDEXES:
+            _INDEXES.popitem(last=False)
+        _BY_LIST[id(tools)] = (tools, len(tools), index)
+        while len(_BY_LIST) > _MAX_INDEXES:
+            _BY_LIST.popitem(last=False)
+    return index
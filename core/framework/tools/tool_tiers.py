@@ -21,7 +21,9 @@
       unregistered_allowlisted_names() -> set[str]
       promote_searched_tools(names: list[str]) -> list[str]
 
-  (``QueenPhaseState`` and :class:`ToolTierState` both qualify.)
+  and optionally ``search_index() -> ToolSearchIndex`` covering a superset
+  of the searchable tools. (``QueenPhaseState`` and :class:`ToolTierState`
+  both qualify.)
 
 Semantics contract (kept in lockstep with ``QueenPhaseState``):
 
@@ -43,6 +45,8 @@
 from pathlib import Path
 from typing import Any
 
+from framework.tools.tool_search_index import ToolSearchIndex, get_tool_search_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,14 +63,19 @@ def _first_line(text: str, max_len: int = 160) -> str:
     return ""
 
 
-def _match_searchable_tools(query: str, searchable: list, limit: int = 5) -> list[str]:
+def _match_searchable_tools(query: str, searchable: list, limit: int = 5, index: ToolSearchIndex | None = None) -> list[str]:
     """Resolve a search query to tool names from the searchable set.
 
     Deterministic (no model in the loop — Rule 5): two forms supported.
       * ``select:a,b,c`` — load these exact names (those present in the set).
-      * free text — token-overlap scored against each tool's name +
-        description; returns up to ``limit`` best matches with >=1 token hit,
-        ranked by score then name.
+      * free text — BM25 over each tool's name, description and parameter
+        names (see :mod:`framework.tools.tool_search_index`); returns up to
+        ``limit`` best matches with >=1 token hit, ranked by score then name.
+
+    ``index`` may cover a superset of ``searchable`` (typically the whole
+    pool, so promotions don't invalidate it); results are restricted to
+    ``searchable`` either way. Without one, the shared index for
+    ``searchable`` itself is used.
     """
     by_name = {t.name: t for t in searchable}
     q = (query or "").strip()
@@ -75,17 +84,9 @@ def _match_searchable_tools(query: str, searchable: list, limit: int = 5) -> lis
         # Preserve caller order; dedupe; keep only names actually searchable.
         seen: set[str] = set()
         return [n for n in wanted if n in by_name and not (n in seen or seen.add(n))]
-    tokens = [tok for tok in re.split(r"[^a-z0-9]+", q.lower()) if tok]
-    if not tokens:
-        return []
-    scored: list[tuple[int, str]] = []
-    for t in searchable:
-        haystack = f"{t.name} {getattr(t, 'description', '') or ''}".lower()
-        score = sum(1 for tok in tokens if tok in haystack)
-        if score:
-            scored.append((score, t.name))
-    scored.sort(key=lambda s: (-s[0], s[1]))
-    return [name for _, name in scored[:limit]]
+    if index is None:
+        index = get_tool_search_index(searchable)
+    return index.search(q, limit=limit, allowed=set(by_name))
 
 
 def _match_names(query: str, names: set[str]) -> list[str]:
@@ -138,6 +139,9 @@ class ToolTierState:
 
     _filtered_pool: list = field(default_factory=list)
     _eager_pool: list = field(default_factory=list)
+    # Keyword index over ``pool``; dropped by ``rebuild`` and re-resolved
+    # from the process-wide registry on the next search.
+    _search_index: ToolSearchIndex | None = None
 
     # ---- gates (same precedence as QueenPhaseState) ----------------------
 
@@ -172,6 +176,7 @@ def rebuild(self) -> None:
             )
         self._filtered_pool = [t for t in self.pool if self.passes_allowlist(t.name)]
         self._eager_pool = [t for t in self._filtered_pool if self.is_eager(t.name)]
+        self._search_index = None
         logger.info(
             "ToolTierState.rebuild: always_enabled=%d, loaded=%d, gateable=%d, pool=%d -> allowed=%d, eager=%d",
             len(self.always_enabled_names),
@@ -198,6 +203,12 @@ def searchable_names(self) -> set[str]:
         """Names currently in the searchable (advertised-not-loaded) tier."""
         return {t.name for t in self.get_searchable_tools()}
 
+    def search_index(self) -> ToolSearchIndex:
+        """Keyword index over the whole pool, shared with same-pool workers."""
+        if self._search_index is None:
+            self._search_index = get_tool_search_index(self.pool, refresh=True)
+        return self._search_index
+
     def unregistered_allowlisted_names(self) -> set[str]:
         """Allowlisted names absent from the gateable set (server never booted)."""
         if not self.enabled_allowlist:
@@ -325,7 +336,8 @@ async def search_tools(*, query: str, max_results: int = 5) -> str:
             limit = max(1, int(max_results))
         except (TypeError, ValueError):
             limit = 5
-        matches = _match_searchable_tools(query, searchable, limit=limit)
+        index_of = getattr(provider, "search_index", None)
+        matches = _match_searchable_tools(query, searchable, limit=limit, index=index_of() if callable(index_of) else None)
         if not matches:
             available = ", ".join(sorted(t.name for t in searchable))
             if already_loaded:
@@ -0,0 +1,175 @@
+"""Tests for the benchmark harness and the scripted MockLLMProvider."""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+import pytest
+
+from framework.benchmarks.baseline import compare, load_baseline, save_baseline, tolerance_for
+from framework.benchmarks.metrics import LatencyRecorder, ScenarioResult, percentile
+from framework.benchmarks.runner import SuiteResult, run_scenario
+from framework.benchmarks.scenarios import SCENARIOS
+from framework.llm.mock import MockLLMProvider
+from framework.llm.stream_events import FinishEvent, TextDeltaEvent, ToolCallEvent
+
+
+def _suite(metrics: dict[str, float], params: dict | None = None, name: str = "event_bus") -> SuiteResult:
+    return SuiteResult("quick", [ScenarioResult(name, params or {"events": 10}, metrics, 1.0)])
+
+
+def _baseline(metrics: dict[str, float], params: dict | None = None, thresholds: dict | None = None) -> dict:
+    return {
+        "thresholds": thresholds or {"default": 0.3},
+        "profiles": {"quick": {"scenarios": {"event_bus": {"params": params or {"events": 10}, "metrics": metrics}}}},
+    }
+
+
+# ── metrics ──────────────────────────────────────────────────────────
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_summary_in_milliseconds():
+    rec = LatencyRecorder()
+    for s in (0.001, 0.002, 0.003):
+        rec.add(s)
+    summary = rec.summary("turn")
+    assert summary["turn_p50_ms"] == pytest.approx(2.0)
+    assert summary["turn_p99_ms"] == pytest.approx(3.0)
+
+
+# ── baseline comparison ──────────────────────────────────────────────
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    baseline = _baseline({"events_per_sec": 1000.0, "publish_p50_ms": 1.0})
+    worse = compare(_suite({"events_per_sec": 500.0, "publish_p50_ms": 2.0}), baseline)
+    assert {c.metric: c.status for c in worse} == {"events_per_sec": "regressed", "publish_p50_ms": "regressed"}
+
+    better = compare(_suite({"events_per_sec": 2000.0, "publish_p50_ms": 0.5}), baseline)
+    assert {c.metric: c.status for c in better} == {"events_per_sec": "improved", "publish_p50_ms": "improved"}
+
+    within = compare(_suite({"events_per_sec": 900.0, "publish_p50_ms": 1.2}), baseline)
+    assert {c.status for c in within} == {"ok"}
+
+
+def test_compare_absolute_slack_ignores_sub_millisecond_jitter():
+    baseline = _baseline({"publish_p50_ms": 0.01, "rss_growth_mb": 1.0})
+    result = compare(_suite({"publish_p50_ms": 0.04, "rss_growth_mb": 8.0}), baseline)
+    assert {c.status for c in result} == {"ok"}
+
+
+def test_compare_params_changed_and_new_metrics_never_fail():
+    baseline = _baseline({"publish_p50_ms": 1.0}, params={"events": 5})
+    result = compare(_suite({"publish_p50_ms": 9.0, "fresh_ms": 1.0}), baseline)
+    assert {c.metric: c.status for c in result} == {"publish_p50_ms": "params-changed", "fresh_ms": "new"}
+
+
+def test_tolerance_lookup_order():
+    thresholds = {"default": 0.3, "turn_p99_ms": 0.5, "agent_loop.turn_p99_ms": 0.8}
+    assert tolerance_for(thresholds, "agent_loop", "turn_p99_ms") == 0.8
+    assert tolerance_for(thresholds, "mcp_tools", "turn_p99_ms") == 0.5
+    assert tolerance_for(thresholds, "mcp_tools", "turn_p50_ms") == 0.3
+
+
+def test_save_baseline_keeps_thresholds_and_other_profiles(tmp_path):
+    path = tmp_path / "baselines.json"
+    path.write_text(json.dumps({"thresholds": {"default": 0.2}, "profiles": {"full": {"scenarios": {}}}}))
+    save_baseline(_suite({"events_per_sec": 100.0}), path)
+
+    data = load_baseline(path)
+    assert data["thresholds"] == {"default": 0.2}
+    assert set(data["profiles"]) == {"full", "quick"}
+    assert data["profiles"]["quick"]["scenarios"]["event_bus"]["metrics"] == {"events_per_sec": 100.0}
+    assert compare(_suite({"events_per_sec": 100.0}), data)[0].status == "ok"
+
+
+def test_shipped_baseline_covers_every_scenario():
+    data = load_baseline()
+    assert data is not None
+    assert set(data["profiles"]["quick"]["scenarios"]) == set(SCENARIOS)
+
+
+# ── mock LLM ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_default_stream_unchanged():
+    events = [e async for e in MockLLMProvider().stream([{"role": "user", "content": "hi"}])]
+    assert isinstance(events[-1], FinishEvent)
+    assert events[-1].stop_reason == "mock_complete"
+
+
+@pytest.mark.asyncio
+async def test_mock_llm_scripted_turns_and_token_stream():
+    llm = MockLLMProvider(
+        tokens_per_response=5,
+        turns=[{"tool_calls": [{"name": "echo", "input": {"text": "a"}}]}, {"text": "all done"}],
+    )
+    first = [e async for e in llm.stream([{"role": "user", "content": "go"}])]
+    calls = [e for e in first if isinstance(e, ToolCallEvent)]
+    assert [(c.tool_name, c.tool_input) for c in calls] == [("echo", {"text": "a"})]
+    assert len([e for e in first if isinstance(e, TextDeltaEvent)]) == 5
+    assert first[-1].stop_reason == "tool_calls"
+
+    history = [{"role": "user", "content": "go"}, {"role": "assistant", "content": ""}]
+    second = [e async for e in llm.stream(history)]
+    assert "".join(e.content for e in second if isinstance(e, TextDeltaEvent)).strip() == "all done"
+    assert second[-1].stop_reason == "stop"
+
+
+# ── end to end ───────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+async def test_scenario_smoke(name):
+    result = await run_scenario(name, "smoke")
+    if result.skipped:
+        pytest.skip(result.skipped)
+    assert result.error is None, result.error
+    assert result.metrics
+    assert any(k.endswith("_per_sec") or k.endswith("_ms") for k in result.metrics)
+    assert "rss_peak_mb" in result.metrics
+
+
+def test_cli_profile_choices_match_scenarios():
+    from framework.benchmarks import cli, scenarios
+
+    assert cli.PROFILES == scenarios.PROFILES
+
+
+def test_cli_exit_codes(tmp_path, capsys):
+    from framework.benchmarks.cli import cmd_bench_run
+
+    def _args(**kw):
+        base = {
+            "scenarios": ["event_bus"],
+            "profile": "smoke",
+            "baseline": tmp_path / "b.json",
+            "tolerance": None,
+            "no_compare": False,
+            "save_baseline": False,
+            "json_path": None,
+        }
+        return argparse.Namespace(**{**base, **kw})
+
+    assert cmd_bench_run(_args(save_baseline=True)) == 0
+    data = json.loads((tmp_path / "b.json").read_text())
+    # Make the stored numbers impossibly good so the next run regresses.
+    metrics = data["profiles"]["smoke"]["scenarios"]["event_bus"]["metrics"]
+    for key in metrics:
+        metrics[key] = metrics[key] * 1000 if key.endswith("_per_sec") else 0.0
+    (tmp_path / "b.json").write_text(json.dumps(data))
+
+    assert cmd_bench_run(_args(json_path=tmp_path / "out.json")) == 1
+    assert "regressed" in capsys.readouterr().out
+    assert json.loads((tmp_path / "out.json").read_text())["comparison"]
+    assert cmd_bench_run(_args(scenarios=["nope"])) == 2
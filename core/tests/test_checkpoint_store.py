@@ -0,0 +1,214 @@
+"""Tests for CheckpointStore's delta / content-addressed layout.
+
+Restores must be identical to what was saved regardless of where in the
+delta chain a checkpoint sits, deletes must keep descendants restorable,
+and checkpoints written in the legacy full-JSON format must still load.
+
+The 1000-step benchmark at the bottom reports bytes written and per-save
+latency against the legacy layout (one full ``indent=2`` JSON per
+checkpoint plus a rewritten ``index.json``). It is opt-in:
+``pytest -m benchmark -s``.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from framework.schemas.checkpoint import Checkpoint, CheckpointIndex
+from framework.storage.checkpoint_store import CheckpointStore
+from framework.utils.io import atomic_write
+
+
+def _checkpoint(step: int, buffer: dict, *, node: str = "n", created_at: str | None = None) -> Checkpoint:
+    return Checkpoint(
+        checkpoint_id=f"cp_node_complete_{node}_{step:05d}",
+        checkpoint_type="node_complete",
+        session_id="session_test",
+        created_at=created_at or datetime.now().isoformat(),
+        current_node=node,
+        execution_path=[node] * (step % 7),
+        data_buffer=dict(buffer),
+        accumulated_outputs={"last": step},
+        metrics_snapshot={"steps": step},
+    )
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+@pytest.mark.asyncio
+async def test_restore_identical_across_chain(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, compact_every=4)
+    buffer: dict = {"big": "x" * 10_000, "keep": {"a": [1, 2, 3]}}
+    saved = []
+    for step in range(11):
+        buffer[f"k{step % 3}"] = step
+        if step == 5:
+            buffer.pop("keep")
+        cp = _checkpoint(step, buffer)
+        await store.save_checkpoint(cp)
+        saved.append(cp)
+
+    # A fresh store (new process) reads the same chain.
+    reader = CheckpointStore(tmp_path, compact_every=4)
+    for cp in saved:
+        assert await reader.load_checkpoint(cp.checkpoint_id) == cp
+    assert await reader.load_checkpoint() == saved[-1]
+
+    # Unchanged values are stored once.
+    big_objects = [p for p in (tmp_path / "checkpoints" / "objects").rglob("*.json") if p.stat().st_size > 5000]
+    assert len(big_objects) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_rebases_descendants(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, compact_every=10)
+    saved = []
+    for step in range(5):
+        cp = _checkpoint(step, {"step": step, "const": "c"})
+        await store.save_checkpoint(cp)
+        saved.append(cp)
+
+    assert await store.delete_checkpoint(saved[0].checkpoint_id)
+    assert await store.delete_checkpoint(saved[2].checkpoint_id)
+    assert not await store.delete_checkpoint(saved[2].checkpoint_id)
+
+    for cp in (saved[1], saved[3], saved[4]):
+        assert await store.load_checkpoint(cp.checkpoint_id) == cp
+    ids = [s.checkpoint_id for s in await store.list_checkpoints()]
+    assert ids == [saved[1].checkpoint_id, saved[3].checkpoint_id, saved[4].checkpoint_id]
+
+    # Saving continues the chain after deletes.
+    nxt = _checkpoint(5, {"step": 5, "const": "c"})
+    await store.save_checkpoint(nxt)
+    assert await store.load_checkpoint() == nxt
+
+
+@pytest.mark.asyncio
+async def test_reused_checkpoint_id_does_not_corrupt_chain(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path)
+    a1 = _checkpoint(1, {"v": 1}, node="a")
+    b = _checkpoint(2, {"v": 2}, node="b")
+    a2 = a1.model_copy(update={"data_buffer": {"v": 3}})
+    for cp in (a1, b, a2):
+        await store.save_checkpoint(cp)
+
+    assert await store.load_checkpoint(b.checkpoint_id) == b
+    assert await store.load_checkpoint(a1.checkpoint_id) == a2
+    assert (await store.load_index()).total_checkpoints == 2
+
+
+@pytest.mark.asyncio
+async def test_prune_compacts_index_and_collects_objects(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path)
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    for step in range(3):
+        await store.save_checkpoint(_checkpoint(step, {"old": f"value-{step}"}, created_at=old))
+    fresh = _checkpoint(3, {"new": "value"})
+    await store.save_checkpoint(fresh)
+
+    assert await store.prune_checkpoints(max_age_days=7) == 3
+    assert await store.load_checkpoint() == fresh
+    lines = (tmp_path / "checkpoints" / "index.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    objects = {p.read_text() for p in (tmp_path / "checkpoints" / "objects").rglob("*.json")}
+    assert '"value-0"' not in objects
+
+
+@pytest.mark.asyncio
+async def test_legacy_checkpoints_still_load(tmp_path: Path) -> None:
+    cp_dir = tmp_path / "checkpoints"
+    cp_dir.mkdir()
+    legacy = _checkpoint(1, {"k": "v"})
+    (cp_dir / f"{legacy.checkpoint_id}.json").write_text(legacy.model_dump_json(indent=2))
+    index = CheckpointIndex(session_id="session_test")
+    index.add_checkpoint(legacy)
+    (cp_dir / "index.json").write_text(index.model_dump_json(indent=2))
+
+    store = CheckpointStore(tmp_path)
+    assert await store.load_checkpoint() == legacy
+
+    newer = _checkpoint(2, {"k": "w"})
+    await store.save_checkpoint(newer)
+    assert not (cp_dir / "index.json").exists()
+    assert [s.checkpoint_id for s in await store.list_checkpoints()] == [legacy.checkpoint_id, newer.checkpoint_id]
+    assert await store.load_checkpoint(legacy.checkpoint_id) == legacy
+
+
+@pytest.mark.asyncio
+async def test_gc_then_resave_of_same_value_rewrites_object(tmp_path: Path) -> None:
+    """The digest memo must not point a manifest at an object GC removed."""
+    store = CheckpointStore(tmp_path)
+    value = "payload " * 100
+    first = _checkpoint(1, {"doc": value})
+    await store.save_checkpoint(first)
+    assert await store.delete_checkpoint(first.checkpoint_id)
+    assert await store.collect_garbage() >= 1
+
+    second = _checkpoint(2, {"doc": value})
+    await store.save_checkpoint(second)
+    assert await CheckpointStore(tmp_path).load_checkpoint(second.checkpoint_id) == second
+
+
+@pytest.mark.asyncio
+async def test_unchanged_memory_is_stored_once(tmp_path: Path) -> None:
+    shared = {f"doc_{i}": "m" * 2_000 for i in range(10)}
+    store = CheckpointStore(tmp_path)
+    for step in range(50):
+        await store.save_checkpoint(_checkpoint(step, {**shared, "counter": step}))
+    objects = list(store.checkpoints_dir.glob("objects/*/*.json"))
+    # 10 shared docs + the per-step counters, never a copy per checkpoint.
+    assert sum(p.stat().st_size for p in objects) < 2 * sum(len(v) for v in shared.values())
+    assert (await store.load_checkpoint()).data_buffer == {**shared, "counter": 49}
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_1000_step_run(tmp_path: Path) -> None:
+    """Bytes written and save latency over a 1000-step run with ~250 KB of memory."""
+    steps = 1000
+    shared = {f"doc_{i}": "m" * 5_000 for i in range(50)}  # ~250 KB, rarely changes
+
+    def _buffer(step: int) -> dict:
+        buf = dict(shared)
+        buf["counter"] = step
+        buf["last_output"] = f"output of step {step}"
+        if step % 100 == 0:
+            shared[f"doc_{step % 50}"] = f"rewritten at {step} " * 250
+        return buf
+
+    # Legacy layout, reproduced inline for comparison.
+    legacy_dir = tmp_path / "legacy" / "checkpoints"
+    legacy_dir.mkdir(parents=True)
+    index = CheckpointIndex(session_id="session_test")
+    t0 = time.perf_counter()
+    for step in range(steps):
+        cp = _checkpoint(step, _buffer(step))
+        with atomic_write(legacy_dir / f"{cp.checkpoint_id}.json") as f:
+            f.write(cp.model_dump_json(indent=2))
+        index.add_checkpoint(cp)
+        with atomic_write(legacy_dir / "index.json") as f:
+            f.write(index.model_dump_json(indent=2))
+    legacy_s = time.perf_counter() - t0
+    legacy_bytes = _dir_bytes(legacy_dir)
+
+    store = CheckpointStore(tmp_path / "delta")
+    t0 = time.perf_counter()
+    for step in range(steps):
+        await store.save_checkpoint(_checkpoint(step, _buffer(step)))
+    delta_s = time.perf_counter() - t0
+    delta_bytes = _dir_bytes(store.checkpoints_dir)
+
+    print(
+        f"\n1000-step checkpoints: legacy {legacy_bytes / 1e6:.1f} MB "
+        f"{legacy_s / steps * 1e3:.2f} ms/save | delta {delta_bytes / 1e6:.1f} MB "
+        f"{delta_s / steps * 1e3:.2f} ms/save"
+    )
+    restored = await store.load_checkpoint()
+    assert restored.data_buffer["counter"] == steps - 1
+    assert json.loads(json.dumps(restored.data_buffer)) == _buffer(steps - 1)
+    assert delta_bytes * 20 < legacy_bytes
@@ -0,0 +1,163 @@
+"""Tests for the ``events.jsonl`` sidecar index (``framework.host.event_index``).
+
+Covers the writer path through ``EventLogFile``, lazy rebuild for logs that
+predate the index, catch-up after out-of-band appends, staleness detection
+after a rewrite, and the seq/time cursors on the events/history route.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from framework.host.event_index import EventLogIndex, index_path_for
+from framework.host.event_log import EventLogFile
+from framework.server import routes_sessions
+from framework.server.routes_sessions import _read_events_page, _read_events_page_at
+
+_T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _line(i: int) -> str:
+    ts = (_T0 + timedelta(seconds=i)).isoformat()
+    return json.dumps({"type": "x", "data": {"i": i, "timestamp": "1999-01-01T00:00:00"}, "timestamp": ts})
+
+
+def _ts(i: int) -> float:
+    return (_T0 + timedelta(seconds=i)).timestamp()
+
+
+def _write_via_log(path: Path, count: int) -> None:
+    log = EventLogFile(path)
+    for i in range(count):
+        log.write(_line(i), timestamp=_ts(i))
+    log.close()
+
+
+def test_writer_maintains_index(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 50)
+
+    idx = EventLogIndex.for_log(p)
+    assert idx.count() == 50
+    assert index_path_for(p).stat().st_size == 8 + 50 * 24
+    assert idx.sync() == 50
+
+    raw = p.read_bytes()
+    for seq in (1, 2, 25, 50):
+        off = idx.offset_of(seq)
+        assert json.loads(raw[off : raw.index(b"\n", off)])["data"]["i"] == seq - 1
+
+
+def test_lazy_rebuild_for_unindexed_log(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    p.write_text("\n".join(_line(i) for i in range(30)) + "\n", encoding="utf-8")
+    assert not index_path_for(p).exists()
+
+    idx = EventLogIndex.for_log(p)
+    assert idx.sync() == 30
+    assert index_path_for(p).exists()
+    # Seek by time uses the line's top-level timestamp, not data.timestamp.
+    assert idx.seq_at_or_after(_ts(10)) == 11
+    assert idx.seq_at_or_after(_ts(0) - 1) == 1
+    assert idx.seq_at_or_after(_ts(100)) == 31
+
+
+def test_catch_up_after_foreign_append(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 5)
+    with open(p, "a", encoding="utf-8") as f:
+        f.write(_line(5) + "\n")
+    # The writer skips lines it didn't see land where the index ends...
+    _write_via_log(p, 2)
+    idx = EventLogIndex.for_log(p)
+    # ...and the reader fills the gap from the log itself.
+    assert idx.sync() == 8
+    start, end = idx.byte_range(6, 8)
+    lines = p.read_bytes()[start:end].splitlines()
+    assert [json.loads(ln)["data"]["i"] for ln in lines] == [5, 0, 1]
+
+
+def test_unterminated_tail_is_counted_not_recorded(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    p.write_text(_line(0) + "\n" + _line(1), encoding="utf-8")
+    idx = EventLogIndex.for_log(p)
+    assert idx.sync() == 2
+    assert idx.count() == 1
+
+
+def test_rewritten_log_is_reindexed(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 20)
+    # Same size, different content — only the crc check can tell.
+    p.write_text("\n".join(_line(i + 100) for i in range(20)) + "\n", encoding="utf-8")
+    idx = EventLogIndex.for_log(p)
+    assert idx.sync() == 20
+    assert idx.seq_at_or_after(_ts(100)) == 1
+
+    p.write_text(_line(7) + "\n", encoding="utf-8")
+    assert idx.sync() == 1
+
+
+def test_discard_removes_sidecar(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 3)
+    EventLogIndex.discard(p)
+    assert not index_path_for(p).exists()
+    assert EventLogIndex.for_log(p).sync() == 3
+
+
+def test_page_total_matches_index(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 40)
+    events, _start, total = _read_events_page(p, 10, None)
+    assert total == 40
+    assert [e["data"]["i"] for e in events] == list(range(30, 40))
+
+
+@pytest.mark.parametrize("before_seq,expected", [(11, list(range(5, 10))), (3, [0, 1]), (1, []), (999, list(range(15, 20)))])
+def test_page_at_seq(tmp_path: Path, before_seq: int, expected: list[int]) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 20)
+    events, start_offset, total, before_index = _read_events_page_at(p, 5, before_seq, None)
+    assert total == 20
+    assert [e["data"]["i"] for e in events] == expected
+    assert before_index == min(before_seq, 21)
+
+
+def test_page_at_timestamp(tmp_path: Path) -> None:
+    p = tmp_path / "events.jsonl"
+    _write_via_log(p, 20)
+    events, _start, _total, before_index = _read_events_page_at(p, 3, None, _ts(12))
+    assert before_index == 13
+    assert [e["data"]["i"] for e in events] == [9, 10, 11]
+
+
+@pytest.mark.asyncio
+async def test_handler_before_seq_anchors_seq(tmp_path: Path, monkeypatch) -> None:
+    from aiohttp.test_utils import make_mocked_request
+
+    sid = "session_20260101_seek"
+    queen_dir = tmp_path / "queens" / "q" / "sessions" / sid
+    queen_dir.mkdir(parents=True)
+    _write_via_log(queen_dir / "events.jsonl", 20)
+    monkeypatch.setattr(
+        "framework.server.session_manager._find_queen_session_dir",
+        lambda _sid: queen_dir,
+    )
+
+    req = make_mocked_request(
+        "GET",
+        f"/api/sessions/{sid}/events/history?limit=4&before_seq=11",
+        match_info={"session_id": sid},
+    )
+    resp = await routes_sessions.handle_session_events_history(req)
+    body = json.loads(resp.body)
+    assert [e["data"]["i"] for e in body["events"]] == [6, 7, 8, 9]
+    assert [e["seq"] for e in body["events"]] == [7, 8, 9, 10]
+    assert body["total"] == 20
+    assert body["start_index"] == 7
+    assert body["has_more_older"] is True
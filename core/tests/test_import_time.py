@@ -0,0 +1,132 @@
+"""Import cost of the ``hive`` CLI, per command.
+
+Each command runs in a fresh interpreter under ``python -X importtime``,
+which attributes the cost to modules.  The budget is checked against the
+CPU time the command used beyond a bare interpreter: wall-clock import
+times scale with however many other tests share the machine, CPU time
+does not.  The child reports its own ``time.process_time()`` at exit, so
+this works on Windows too (no ``resource``).  The budgets are several
+times the measured cost, while a change that pulls the agent runtime or
+a provider SDK back into a read-only command costs seconds.  The heavy modules are also checked by
+name, which does not depend on timing.
+
+The per-command table with each command's heaviest imports is opt-in:
+run with ``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+CORE_DIR = Path(__file__).resolve().parents[1]
+
+# Modules that only ``serve`` / running an agent (or ``bench run``) should need.
+HEAVY = ("litellm", "aiohttp", "framework.host.colony_runtime", "framework.agent_loop.agent_loop", "framework.benchmarks.scenarios")
+
+# (argv, budget in ms).
+COMMANDS = [
+    (["--help"], 600),
+    (["queen", "list"], 800),
+    (["colony", "list"], 600),
+    (["session", "list", "--cold"], 800),
+    (["skill", "list"], 800),
+    (["mcp", "list"], 1200),
+    (["janitor", "--help"], 600),
+    (["debugger", "--help"], 600),
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \| *(\S+)$")
+_CPU_LINE = re.compile(r"^cpu time: ([\d.]+) ms$", re.MULTILINE)
+
+# Prefixed to every child's code: report the process's CPU time on exit,
+# including an exit through SystemExit (``--help``).
+_REPORT_CPU = "import atexit, sys, time; atexit.register(lambda: print(f'cpu time: {time.process_time() * 1000:.3f} ms', file=sys.stderr)); "
+_RUN_CLI = "import runpy; runpy.run_module('framework', run_name='__main__', alter_sys=True)"
+
+
+def _profile(code: str, hive_home: Path, argv: list[str] | None = None) -> tuple[subprocess.CompletedProcess, dict[str, int], float]:
+    """Run ``python -X importtime -c <code> <argv>``; returns the process,
+    ``{module: self_time_us}`` and the CPU time it used, in ms."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _REPORT_CPU + code, *(argv or [])],
+        cwd=CORE_DIR,
+        env={**os.environ, "HIVE_HOME": str(hive_home)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    cpu = _CPU_LINE.search(proc.stderr)
+    assert cpu is not None, proc.stderr[-2000:]
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            modules[m.group(2)] = int(m.group(1))
+    return proc, modules, float(cpu.group(1))
+
+
+@functools.cache
+def _command_profile(argv: tuple[str, ...]) -> tuple[subprocess.CompletedProcess, dict[str, int], float]:
+    """Best of three runs of ``hive <argv>``, minus what a bare interpreter
+    imports and costs.  The first run also writes the bytecode cache."""
+    home = Path(tempfile.mkdtemp(prefix="hive_import_time_"))
+    bare = [_profile("pass", home) for _ in range(3)]
+    runs = [_profile(_RUN_CLI, home, list(argv)) for _ in range(3)]
+    proc, modules, _ = min(runs, key=lambda run: sum(run[1].values()))
+    baseline = bare[0][1]
+    cpu_ms = min(run[2] for run in runs) - min(run[2] for run in bare)
+    return proc, {k: v for k, v in modules.items() if k not in baseline}, cpu_ms
+
+
+def test_import_framework_is_lazy(tmp_path) -> None:
+    proc, modules, _ = _profile("import framework, framework.llm; print(framework.DecisionTracker.__name__)", tmp_path)
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip() == "DecisionTracker"
+    assert not [m for m in HEAVY if m in modules]
+
+
+def test_lazy_exports_resolve() -> None:
+    import framework
+    import framework.host
+    import framework.llm
+    import framework.skills
+
+    assert framework.AgentLoop.__module__ == "framework.agent_loop.agent_loop"
+    assert framework.ColonyRuntime is framework.host.ColonyRuntime
+    assert framework.llm.MockLLMProvider.__name__ == "MockLLMProvider"
+    assert callable(framework.skills.parse_skill_md)
+    assert set(framework.__all__) <= set(dir(framework))
+    with pytest.raises(AttributeError):
+        framework.NoSuchThing  # noqa: B018
+
+
+@pytest.mark.parametrize(("argv", "budget_ms"), COMMANDS, ids=[" ".join(a) for a, _ in COMMANDS])
+def test_command_import_budget(argv: list[str], budget_ms: int) -> None:
+    proc, modules, cpu_ms = _command_profile(tuple(argv))
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert not [m for m in HEAVY if m in modules]
+    assert cpu_ms < budget_ms, f"hive {' '.join(argv)} took {cpu_ms:.0f} ms of CPU beyond a bare interpreter (budget {budget_ms} ms)"
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+def test_benchmark_command_import_time() -> None:
+    print("\nper command, beyond a bare interpreter (best of 3): import wall time, CPU time, budget")
+    for argv, budget in COMMANDS:
+        _, modules, cpu_ms = _command_profile(tuple(argv))
+        total_ms = sum(modules.values()) / 1000
+        heaviest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:3]
+        top = ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+        print(f"  hive {' '.join(argv):22}{total_ms:6.0f} ms{cpu_ms:6.0f} ms{budget:6} ms   {top}")
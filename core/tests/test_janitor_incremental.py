@@ -0,0 +1,278 @@
+"""Janitor scaling tests: size catalog, byte-budget pacing, pooled archiving.
+
+Covers catalog reuse/invalidation against the plain ``_dir_size`` walk,
+residue lookup through the catalog, the junk scan bypassing it, the
+IOBudget token bucket, the archive pool's prefetch window, stale-prefetch
+and unclaimed-archive cleanup, compression fallback, and an archive-mode
+run with several worker processes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tarfile
+import time
+from pathlib import Path
+
+import pytest
+
+from framework import config
+from framework.config import RetentionConfig
+from framework.maintenance import archive
+from framework.maintenance.archive import ArchiveDisposer, resolve_compression
+from framework.maintenance.catalog import SizeCatalog
+from framework.maintenance.janitor import IOBudget, run_once
+from framework.maintenance.retention import (
+    Manifest,
+    SafetyContext,
+    _dir_size,
+    is_janitor_residue,
+    sweep_janitor_leftovers,
+)
+
+_DAY = 86400.0
+
+
+def _age_tree(root: Path, days: float) -> None:
+    old = time.time() - days * _DAY
+    for p in [*root.rglob("*"), root]:
+        os.utime(p, (old, old), follow_symlinks=False)
+
+
+def _build_tree(root: Path) -> Path:
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "c").mkdir()
+    (root / "top.txt").write_text("x" * 100, encoding="utf-8")
+    (root / "a" / "mid.txt").write_text("y" * 200, encoding="utf-8")
+    (root / "a" / "b" / "leaf.txt").write_text("z" * 300, encoding="utf-8")
+    (root / "c" / "other.bin").write_bytes(b"\0" * 400)
+    _age_tree(root, 1)
+    return root
+
+
+def _cfg(**overrides) -> RetentionConfig:
+    base = {"active_grace_hours": 0, "worker_deep_clean_days": 14, "io_sleep_ms": 0, "mode": "archive", "archive_compression": "gzip"}
+    base.update(overrides)
+    return RetentionConfig(**base)
+
+
+# ---------------------------------------------------------------------------
+# SizeCatalog
+# ---------------------------------------------------------------------------
+
+
+def test_catalog_matches_full_walk_and_reuses_unchanged_dirs(tmp_path: Path) -> None:
+    root = _build_tree(tmp_path / "tree")
+    catalog = SizeCatalog(tmp_path / "catalog.json")
+    assert catalog.dir_size(root) == _dir_size(root) == (4, 1000)
+    assert catalog.misses == 4 and catalog.hits == 0
+
+    catalog.save()
+    again = SizeCatalog.load(tmp_path / "catalog.json")
+    assert again.dir_size(root) == (4, 1000)
+    assert again.misses == 0 and again.hits == 4, "unchanged dirs are stat'ed, not re-listed"
+
+
+def test_catalog_relists_only_changed_dirs(tmp_path: Path) -> None:
+    root = _build_tree(tmp_path / "tree")
+    catalog = SizeCatalog()
+    catalog.dir_size(root)
+
+    (root / "a" / "b" / "new.txt").write_text("n" * 50, encoding="utf-8")
+    _age_tree(root / "a" / "b", 1)
+    catalog.hits = catalog.misses = 0
+    assert catalog.dir_size(root) == (5, 1050)
+    assert catalog.misses == 1, "only the directory that gained an entry is listed again"
+
+
+def test_catalog_skips_racy_fresh_dirs(tmp_path: Path) -> None:
+    root = tmp_path / "fresh"
+    root.mkdir()
+    (root / "f.txt").write_text("abc", encoding="utf-8")
+    catalog = SizeCatalog()
+    assert catalog.dir_size(root) == (1, 3)
+    # Written within the racy window: same-tick writes must not be cached.
+    (root / "f.txt").write_text("abcdef", encoding="utf-8")
+    assert catalog.dir_size(root) == (1, 6)
+
+
+def test_catalog_forget_and_marked(tmp_path: Path) -> None:
+    root = _build_tree(tmp_path / "tree")
+    (root / "a" / "events.jsonl.janitor-tmp").write_text("t", encoding="utf-8")
+    (root / "c" / "conversations.jtrash-123").mkdir()
+    (root / "c" / "conversations.jtrash-123" / "inner.janitor-tmp").write_text("i", encoding="utf-8")
+    _age_tree(root, 1)
+
+    catalog = SizeCatalog(mark=is_janitor_residue)
+    found = sorted(p.relative_to(root).as_posix() for p in catalog.marked(root))
+    assert found == ["a/events.jsonl.janitor-tmp", "c/conversations.jtrash-123"], "residue trees are not descended"
+
+    catalog.forget(root / "a")
+    assert str(root / "a") not in catalog._dirs and str(root / "a" / "b") not in catalog._dirs
+    assert str(root / "c") in catalog._dirs
+
+
+def test_leftover_sweep_through_catalog(tmp_path: Path) -> None:
+    residue = config.HIVE_HOME / "colonies" / "c1" / "workers" / "w1" / "conversations.jtrash-1"
+    (residue / "parts").mkdir(parents=True)
+    (residue / "parts" / "0001.json").write_text("{}", encoding="utf-8")
+    _age_tree(config.HIVE_HOME, 1)
+
+    catalog = SizeCatalog(mark=is_janitor_residue)
+    report = sweep_janitor_leftovers(Manifest(), catalog)
+    assert report.files == 1 and not residue.exists()
+    assert list(catalog.marked(config.HIVE_HOME)) == [], "parent re-listed after the sweep"
+
+
+def test_junk_threshold_sees_files_grown_in_place() -> None:
+    junk = config.HIVE_HOME / "dumps"
+    junk.mkdir()
+    (junk / "core").write_bytes(b"\0" * 10)
+    _age_tree(junk, 1)
+    cfg = _cfg(junk_min_bytes=1000)
+    report = run_once(SafetyContext.for_offline(cfg), cfg, tiers=set(), execute=False)
+    assert next(t for t in report.targets if t.name == "junk").skipped == 0
+
+    # Appending leaves the directory's mtime alone; the catalog can't see it.
+    with open(junk / "core", "ab") as f:
+        f.write(b"\0" * 5000)
+    report = run_once(SafetyContext.for_offline(cfg), cfg, tiers=set(), execute=False)
+    assert next(t for t in report.targets if t.name == "junk").skipped == 1, "reported as a junk candidate"
+
+
+# ---------------------------------------------------------------------------
+# IOBudget
+# ---------------------------------------------------------------------------
+
+
+def test_io_budget_paces_on_bytes_not_items() -> None:
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(s: float) -> None:
+        sleeps.append(s)
+        clock[0] += s
+
+    budget = IOBudget(1000, clock=lambda: clock[0], sleep=sleep)
+    for _ in range(100):
+        budget.charge(10)  # many tiny items fit in the one-second burst
+    assert sleeps == []
+    budget.charge(3000)
+    assert sleeps == [pytest.approx(3.0)]
+    budget.charge(0)
+    IOBudget(0, clock=lambda: clock[0], sleep=sleep).charge(10**9)
+    assert len(sleeps) == 1, "zero-byte charges and a zero budget never sleep"
+
+
+# ---------------------------------------------------------------------------
+# Archive pool
+# ---------------------------------------------------------------------------
+
+
+def _targets(n: int) -> list[Path]:
+    out = []
+    for i in range(n):
+        d = config.HIVE_HOME / "colonies" / "c1" / "workers" / f"w{i}" / "conversations"
+        d.mkdir(parents=True)
+        (d / "part.json").write_text(json.dumps({"i": i}) * 50, encoding="utf-8")
+        out.append(d)
+    return out
+
+
+def test_pool_archives_each_target_before_deleting(tmp_path: Path) -> None:
+    targets = _targets(5)
+    disposer = ArchiveDisposer(tmp_path / "archive", workers=2, compression="gzip")
+    disposer.prefetch(targets)
+    assert 0 < len(disposer._inflight) <= 4, "only a bounded window is in flight"
+    for t in targets[:4]:
+        files, _ = disposer.dispose_dir(t)
+        assert files == 1 and not t.exists()
+    run_dir = disposer.close()
+
+    tarballs = sorted(run_dir.glob("*.tar.gz"))
+    assert len(tarballs) == 4, "the unclaimed prefetch is removed on close"
+    assert targets[4].exists(), "a target never disposed keeps its source"
+    assert not list(run_dir.glob("*.tmp"))
+    with tarfile.open(tarballs[0]) as tar:
+        assert "colonies/c1/workers/w0/conversations/part.json" in tar.getnames()
+
+
+def test_stale_prefetched_archive_is_rewritten(tmp_path: Path) -> None:
+    (target,) = _targets(1)
+    disposer = ArchiveDisposer(tmp_path / "archive", workers=2, compression="gzip")
+    disposer.prefetch([target])
+    assert disposer._pool._mp_context.get_start_method() != "fork", "never fork the live server's threads"
+    disposer._inflight[str(target)][0].result()  # the tarball is done long before the delete
+
+    (target / "part.json").write_text('{"late": true}', encoding="utf-8")
+    later = time.time() + 5
+    os.utime(target / "part.json", (later, later))
+    disposer.dispose_dir(target)
+    run_dir = disposer.close()
+
+    assert disposer.rearchived == 1
+    (tarball,) = run_dir.glob("*.tar.gz")
+    with tarfile.open(tarball) as tar:
+        member = next(m for m in tar if m.name.endswith("part.json"))
+        assert tar.extractfile(member).read() == b'{"late": true}'
+
+
+def test_pool_failure_keeps_source(tmp_path: Path, monkeypatch) -> None:
+    (target,) = _targets(1)
+    disposer = ArchiveDisposer(tmp_path / "archive", workers=1, compression="gzip")
+
+    def fail(src, arcname, dest, compression):
+        raise tarfile.TarError("member vanished")
+
+    monkeypatch.setattr(archive, "_write_archive", fail)
+    with pytest.raises(OSError, match="archive failed"):
+        disposer.dispose_dir(target)
+    assert (target / "part.json").exists()
+    assert disposer.close() is None
+
+
+def test_resolve_compression(monkeypatch) -> None:
+    assert resolve_compression("gzip") == "gzip"
+    monkeypatch.setattr(archive, "_zstd_available", lambda: False)
+    assert resolve_compression("auto") == "gzip"
+    assert resolve_compression("zstd") == "gzip"
+    monkeypatch.setattr(archive, "_zstd_available", lambda: True)
+    assert resolve_compression("auto") == "zstd"
+    with pytest.raises(ValueError):
+        resolve_compression("lz4")
+
+
+def test_zstd_archive_round_trip(tmp_path: Path) -> None:
+    zstandard = pytest.importorskip("zstandard")
+    (target,) = _targets(1)
+    original = (target / "part.json").read_text(encoding="utf-8")
+    disposer = ArchiveDisposer(tmp_path / "archive", compression="zstd")
+    disposer.dispose_dir(target)
+    (tarball,) = disposer.close().glob("*.tar.zst")
+    with open(tarball, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            member = next(m for m in tar if m.name.endswith("part.json"))
+            assert tar.extractfile(member).read().decode("utf-8") == original
+
+
+def test_archive_run_with_worker_pool() -> None:
+    wids = [f"session_20250101_12000{i}_deadbee{i}" for i in range(4)]
+    for wid in wids:
+        wdir = config.COLONIES_DIR / "c1" / "workers" / wid
+        (wdir / "conversations" / "parts").mkdir(parents=True)
+        (wdir / "conversations" / "parts" / "0000000001.json").write_text(
+            json.dumps({"seq": 1, "role": "assistant", "content": "done"}), encoding="utf-8"
+        )
+        (wdir / "meta.json").write_text(json.dumps({"worker_id": wid}), encoding="utf-8")
+        _age_tree(wdir, 30)
+
+    cfg = _cfg(archive_workers=2)
+    report = run_once(SafetyContext.for_offline(cfg), cfg, tiers={2}, execute=True)
+    assert report.error == ""
+    assert len(list(Path(report.archive_path).glob("*.tar.gz"))) == len(wids)
+    for wid in wids:
+        wdir = config.COLONIES_DIR / "c1" / "workers" / wid
+        assert not (wdir / "conversations").exists()
+        assert (wdir / "result.json").exists()
+    assert (config.HIVE_HOME / "maintenance" / "size_catalog.json").exists()
@@ -227,7 +227,7 @@ def test_server_marker_lifecycle() -> None:
 def test_global_lock_not_leaked_on_disposer_setup_failure(monkeypatch) -> None:
     cfg = _cfg(mode="archive")
 
-    def boom(cfg_, execute):
+    def boom(cfg_, execute, catalog=None):
         raise OSError("archive dir on read-only fs")
 
     monkeypatch.setattr(janitor, "_build_disposer", boom)
@@ -203,7 +203,7 @@ def test_dry_run_changes_nothing_and_lists_candidates() -> None:
 def test_archive_mode_round_trip(tmp_path: Path) -> None:
     wdir = _build_worker()
     original_part = (wdir / "conversations" / "parts" / "0000000004.json").read_text(encoding="utf-8")
-    cfg = _cfg(mode="archive")
+    cfg = _cfg(mode="archive", archive_compression="gzip")
     report = run_once(SafetyContext.for_offline(cfg), cfg, tiers={2}, execute=True)
 
     assert not (wdir / "conversations").exists()
@@ -0,0 +1,350 @@
+"""KeyPool: latency-, load- and quota-aware key selection.
+
+Most tests drive the pool against ``_FakeProvider``, a local stand-in for
+an LLM API that enforces a per-key request quota per window, answers with
+per-key latency and reports ``x-ratelimit-*`` headers the way OpenAI does.
+The tests at the bottom compare the previous round-robin rotation with
+leases: on 429 count and failures when quota binds, and (opt-in, with
+``-m benchmark``) on p99 latency when one key is slow.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from litellm.exceptions import RateLimitError
+
+from framework.llm.key_pool import KeyLease, KeyPool, parse_quota_headers
+from framework.llm.litellm import LiteLLMProvider
+
+
+class _Throttled(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+class _FakeProvider:
+    """Fixed-window quota of ``limit`` requests per ``window`` seconds per
+    key; ``latency`` maps key -> seconds per successful call."""
+
+    def __init__(self, latency: dict[str, float], limit: int, window: float) -> None:
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.rejections = 0
+        self._used: dict[str, tuple[float, int]] = {}
+
+    def _admit(self, key: str) -> dict[str, str]:
+        now = time.monotonic()
+        start, used = self._used.get(key, (now, 0))
+        if now - start >= self.window:
+            start, used = now, 0
+        reset = max(start + self.window - now, 0.0)
+        if used >= self.limit:
+            self.rejections += 1
+            raise _Throttled(reset)
+        self._used[key] = (start, used + 1)
+        return {
+            "x-ratelimit-remaining-requests": str(self.limit - used - 1),
+            "x-ratelimit-reset-requests": f"{int(reset * 1000)}ms",
+        }
+
+    async def call(self, key: str) -> dict[str, str]:
+        headers = self._admit(key)
+        await asyncio.sleep(self.latency[key])
+        return headers
+
+
+# ── header parsing ────────────────────────────────────────────────────
+
+
+def test_parse_quota_headers_provider_formats() -> None:
+    assert parse_quota_headers({"x-ratelimit-remaining-requests": "59", "x-ratelimit-reset-requests": "1m30s"}) == (59, 90.0)
+    assert parse_quota_headers({"llm_provider-x-ratelimit-remaining-requests": "3", "llm_provider-x-ratelimit-reset-requests": "250ms"}) == (3, 0.25)
+
+    reset_at = (datetime.now(UTC) + timedelta(seconds=30)).isoformat().replace("+00:00", "Z")
+    remaining, reset = parse_quota_headers(
+        httpx.Headers({"anthropic-ratelimit-requests-remaining": "0", "anthropic-ratelimit-requests-reset": reset_at})
+    )
+    assert remaining == 0 and 28 < reset <= 30
+
+    assert parse_quota_headers(None) == (None, None)
+    assert parse_quota_headers(MagicMock()) == (None, None)
+    assert parse_quota_headers({"x-ratelimit-remaining-requests": "n/a"}) == (None, None)
+
+
+# ── selection ─────────────────────────────────────────────────────────
+
+
+def _warm(pool: KeyPool, latencies: dict[str, float]) -> None:
+    for key, latency in latencies.items():
+        pool.record_success(KeyLease(key, started=time.monotonic() - latency))
+
+
+def test_slow_key_gets_little_traffic() -> None:
+    pool = KeyPool(["fast-1", "fast-2", "slow-0"], rng=random.Random(0))
+    _warm(pool, {"fast-1": 0.01, "fast-2": 0.01, "slow-0": 0.5})
+
+    picks = [pool.get_key() for _ in range(300)]
+
+    # P2C only picks the slow key when both samples land on it — never,
+    # with one slow key among three.
+    assert picks.count("slow-0") == 0
+    assert {"fast-1", "fast-2"} <= set(picks)
+
+
+def test_in_flight_load_spreads_leases() -> None:
+    pool = KeyPool(["a", "b"], rng=random.Random(0))
+    _warm(pool, {"a": 0.05, "b": 0.05})
+
+    leases = [pool.acquire() for _ in range(6)]
+
+    assert sorted(lease.key for lease in leases).count("a") == 3
+    for lease in leases:
+        pool.release(lease)
+        pool.release(lease)  # idempotent
+    assert all(s["in_flight"] == 0 for s in pool.get_stats().values())
+
+
+def test_exhausted_quota_is_skipped_until_reset() -> None:
+    pool = KeyPool(["a", "b"], rng=random.Random(0))
+    lease = pool.acquire()
+    pool.record_success(lease, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "200ms"})
+    pool.release(lease)
+    spent = lease.key
+
+    assert all(pool.get_key() != spent for _ in range(20))
+    time.sleep(0.25)
+    assert spent in {pool.get_key() for _ in range(20)}
+
+
+def test_rate_limit_uses_reported_reset() -> None:
+    pool = KeyPool(["a", "b"])
+    lease = pool.acquire()
+    pool.record_rate_limit(lease, headers={"x-ratelimit-reset-requests": "2s"})
+    pool.release(lease)
+
+    stats = pool.get_stats()[f"...{lease.key}"]
+    assert stats["healthy"] is False and stats["rate_limits"] == 1
+    assert pool._health[lease.key].rate_limited_until - time.monotonic() == pytest.approx(2.0, abs=0.1)
+
+
+# ── waiting ───────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_acquire_async_waits_for_cooldown() -> None:
+    pool = KeyPool(["a", "b"])
+    for key in ("a", "b"):
+        pool.mark_rate_limited(key, 0.2 if key == "b" else 5.0)
+
+    t0 = time.monotonic()
+    lease = await pool.acquire_async(max_wait=2.0)
+
+    assert lease.key == "b"
+    assert 0.15 < time.monotonic() - t0 < 1.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_async_wakes_when_quota_frees() -> None:
+    pool = KeyPool(["a"])
+    first = pool.acquire()
+    pool.record_success(first, {"x-ratelimit-remaining-requests": "1", "x-ratelimit-reset-requests": "30s"})
+    pool.release(first)
+    held = pool.acquire()  # the last unit of quota is now in flight
+
+    # Released from another thread, as the sync retry path would.
+    threading.Timer(0.1, pool.release, args=(held,)).start()
+    t0 = time.monotonic()
+    lease = await pool.acquire_async(max_wait=5.0)
+
+    assert lease.key == "a"
+    assert time.monotonic() - t0 < 1.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_async_gives_up_after_max_wait() -> None:
+    pool = KeyPool(["a", "b"])
+    pool.mark_rate_limited("a", 10.0)
+    pool.mark_rate_limited("b", 20.0)
+
+    t0 = time.monotonic()
+    lease = await pool.acquire_async(max_wait=0.1)
+
+    assert lease.key == "a"  # soonest to recover
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_sync_acquire_waits_across_threads() -> None:
+    pool = KeyPool(["a", "b"])
+    pool.mark_rate_limited("a", 5.0)
+    pool.mark_rate_limited("b", 0.15)
+
+    t0 = time.monotonic()
+    assert pool.acquire(max_wait=2.0).key == "b"
+    assert 0.1 < time.monotonic() - t0 < 1.0
+
+
+# ── LiteLLM retry path ────────────────────────────────────────────────
+
+
+def _response(text: str) -> MagicMock:
+    resp = MagicMock()
+    resp.choices = [MagicMock()]
+    resp.choices[0].message.content = text
+    resp.choices[0].message.tool_calls = None
+    resp.choices[0].finish_reason = "stop"
+    resp.model = "gpt-4o-mini"
+    resp.usage.prompt_tokens = 5
+    resp.usage.completion_tokens = 3
+    resp._hidden_params = {"additional_headers": {"llm_provider-x-ratelimit-remaining-requests": "42"}}
+    return resp
+
+
+@pytest.mark.asyncio
+@patch("litellm.acompletion")
+async def test_litellm_rotates_and_releases_leases(mock_acompletion) -> None:
+    seen: list[str] = []
+
+    async def acompletion(**kwargs):
+        seen.append(kwargs["api_key"])
+        if kwargs["api_key"] == "key-throttled":
+            raise RateLimitError(
+                "429",
+                llm_provider="openai",
+                model="gpt-4o-mini",
+                response=httpx.Response(429, headers={"retry-after": "30"}, request=httpx.Request("POST", "http://llm")),
+            )
+        return _response("ok")
+
+    mock_acompletion.side_effect = acompletion
+    provider = LiteLLMProvider(model="gpt-4o-mini", api_keys=["key-throttled", "key-healthy"])
+    provider._key_pool._rng = random.Random(1)
+
+    for _ in range(4):
+        result = await provider.acomplete(messages=[{"role": "user", "content": "hi"}])
+        assert result.content == "ok"
+
+    stats = provider._key_pool.get_stats()
+    assert seen.count("key-throttled") <= 1
+    assert stats["...ottled"]["healthy"] is False and stats["...ottled"]["rate_limits"] == len(seen) - 4
+    assert stats["...ealthy"]["successes"] == 4 and stats["...ealthy"]["quota_remaining"] == 42
+    assert all(s["in_flight"] == 0 for s in stats.values())
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+class _RoundRobinPool:
+    """The previous pool: strict rotation, skipping cooled-down keys."""
+
+    def __init__(self, keys: list[str]) -> None:
+        self._keys = keys
+        self._index = 0
+        self._until = dict.fromkeys(keys, 0.0)
+
+    def get_key(self) -> str:
+        now = time.monotonic()
+        for _ in range(len(self._keys)):
+            key = self._keys[self._index]
+            self._index = (self._index + 1) % len(self._keys)
+            if self._until[key] <= now:
+                return key
+        return min(self._keys, key=self._until.__getitem__)
+
+    def mark_rate_limited(self, key: str, retry_after: float) -> None:
+        self._until[key] = time.monotonic() + retry_after
+
+
+async def _round_robin_call(pool: _RoundRobinPool, api: _FakeProvider, retries: int = 10) -> bool:
+    """The previous retry loop: rotate on every 429 with a blind 60 s
+    cooldown and no waiting; with every key cooling it retries the one
+    that recovers soonest."""
+    for _ in range(retries + 1):
+        key = pool.get_key()
+        try:
+            await api.call(key)
+        except _Throttled:
+            pool.mark_rate_limited(key, 60.0)
+            continue
+        return True
+    return False
+
+
+async def _lease_call(pool: KeyPool, api: _FakeProvider, retries: int = 10) -> bool:
+    for _ in range(retries + 1):
+        lease = await pool.acquire_async(max_wait=5.0)
+        try:
+            headers = await api.call(lease.key)
+        except _Throttled as e:
+            pool.record_rate_limit(lease, e.retry_after)
+            continue
+        else:
+            pool.record_success(lease, headers)
+            return True
+        finally:
+            pool.release(lease)
+    return False
+
+
+async def _run(call, pool, api: _FakeProvider, requests: int, concurrency: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    failures = 0
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal failures
+        for _ in queue:
+            t0 = time.perf_counter()
+            if await call(pool, api):
+                latencies.append(time.perf_counter() - t0)
+            else:
+                failures += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies), failures
+
+
+_BENCH_KEYS = [f"sk-bench-{i}" for i in range(4)]
+# One key answers 10x slower than the others.
+_BENCH_LATENCY = {k: (0.05 if i == 0 else 0.005) for i, k in enumerate(_BENCH_KEYS)}
+
+
+async def _compare(limit: int, requests: int) -> dict[str, tuple[int, int, float]]:
+    """(429s, failed requests, p99 latency) per strategy, 16 concurrent callers."""
+    results = {}
+    for name, call, pool in (
+        ("round-robin", _round_robin_call, _RoundRobinPool(_BENCH_KEYS)),
+        ("p2c + leases", _lease_call, KeyPool(_BENCH_KEYS, rng=random.Random(0))),
+    ):
+        api = _FakeProvider(_BENCH_LATENCY, limit=limit, window=0.25)
+        lat, failures = await _run(call, pool, api, requests=requests, concurrency=16)
+        p99 = lat[int(len(lat) * 0.99) - 1] if lat else float("inf")
+        results[name] = (api.rejections, failures, p99)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_leases_avoid_429s_and_failures_when_quota_binds() -> None:
+    # 15 requests / 250 ms per key: less than the offered load.
+    results = await _compare(limit=15, requests=200)
+    old, new = results["round-robin"], results["p2c + leases"]
+    assert new[0] < old[0] / 4
+    assert new[1] == 0 and new[1] <= old[1]
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_p99_latency_with_a_slow_key() -> None:
+    # Quota never binds; only latency differs. Enough requests that the
+    # first, unsampled burst is under 1%.
+    results = await _compare(limit=1_000_000, requests=2000)
+    assert results["p2c + leases"][2] < results["round-robin"][2]
@@ -0,0 +1,273 @@
+"""Opt-in node result memoization across graph runs.
+
+Graphs are run through the ``Orchestrator`` with registered nodes that
+sleep and report token usage like an LLM node would.  The benchmark at
+the bottom re-runs a three-node pipeline whose two upstream nodes are
+cacheable and reports the tokens and latency saved; it is opt-in, run
+with ``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from framework.orchestrator.edge import EdgeCondition, EdgeSpec, GraphSpec
+from framework.orchestrator.goal import Goal
+from framework.orchestrator.node import DataBuffer, NodeContext, NodeProtocol, NodeResult, NodeSpec
+from framework.orchestrator.node_cache import NodeResultCache
+from framework.orchestrator.orchestrator import Orchestrator
+from framework.tracker.decision_tracker import DecisionTracker
+
+GOAL = Goal(id="g", name="g", description="summarize a topic")
+
+
+class _FakeLLMNode(NodeProtocol):
+    """Writes ``<output>`` derived from ``<input>`` after ``delay`` seconds,
+    reporting ``tokens`` used; also writes a side key into the buffer."""
+
+    def __init__(self, input_key: str, output_key: str, *, tokens: int = 400, delay: float = 0.02) -> None:
+        self.input_key = input_key
+        self.output_key = output_key
+        self.tokens = tokens
+        self.delay = delay
+        self.calls = 0
+
+    async def execute(self, ctx: NodeContext) -> NodeResult:
+        self.calls += 1
+        t0 = time.perf_counter()
+        await asyncio.sleep(self.delay)
+        value = f"{self.output_key}({ctx.buffer.read(self.input_key)})"
+        ctx.buffer.write(f"{self.output_key}_notes", f"notes on {value}")
+        latency_ms = int((time.perf_counter() - t0) * 1000)
+        return NodeResult(success=True, output={self.output_key: value}, tokens_used=self.tokens, latency_ms=latency_ms)
+
+
+def _spec(node_id: str, input_key: str, output_key: str, *, cache: bool = True, **extra) -> NodeSpec:
+    return NodeSpec(
+        id=node_id,
+        name=node_id,
+        description=f"produce {output_key}",
+        input_keys=[input_key],
+        output_keys=[output_key, f"{output_key}_notes"],
+        cache_results=cache,
+        **extra,
+    )
+
+
+def _pipeline(*, cache_last: bool = False) -> GraphSpec:
+    nodes = [
+        _spec("research", "topic", "facts"),
+        _spec("outline", "facts", "outline"),
+        _spec("write", "outline", "draft", cache=cache_last),
+    ]
+    edges = [
+        EdgeSpec(id="e1", source="research", target="outline", condition=EdgeCondition.ON_SUCCESS),
+        EdgeSpec(id="e2", source="outline", target="write", condition=EdgeCondition.ON_SUCCESS),
+    ]
+    return GraphSpec(
+        id="pipeline",
+        goal_id=GOAL.id,
+        entry_node="research",
+        terminal_nodes=["write"],
+        nodes=nodes,
+        edges=edges,
+        conversation_mode="isolated",
+    )
+
+
+def _registry(**kwargs) -> dict[str, _FakeLLMNode]:
+    return {
+        "research": _FakeLLMNode("topic", "facts", **kwargs),
+        "outline": _FakeLLMNode("facts", "outline", **kwargs),
+        "write": _FakeLLMNode("outline", "draft", **kwargs),
+    }
+
+
+async def _run(graph, registry, cache, tmp_path, topic="tides"):
+    orchestrator = Orchestrator(runtime=DecisionTracker(storage_path=tmp_path / "tracker"), node_registry=registry, node_cache=cache)
+    return await orchestrator.execute(graph, GOAL, input_data={"topic": topic})
+
+
+@pytest.fixture
+def cache(tmp_path) -> NodeResultCache:
+    return NodeResultCache(root=tmp_path / "node_cache")
+
+
+@pytest.mark.asyncio
+async def test_rerun_replays_cached_nodes(cache, tmp_path) -> None:
+    graph = _pipeline()
+    first_nodes = _registry()
+    first = await _run(graph, first_nodes, cache, tmp_path)
+
+    nodes = _registry()
+    second = await _run(graph, nodes, cache, tmp_path)
+
+    assert first.success and second.success
+    assert second.output == first.output
+    assert second.output["draft"] == "draft(outline(facts(tides)))"
+    # Side writes are replayed too, so downstream nodes see the same buffer.
+    assert second.session_state["data_buffer"]["facts_notes"] == "notes on facts(tides)"
+    assert [n.calls for n in nodes.values()] == [0, 0, 1]
+    assert cache.stats.hits == 2 and cache.stats.stores == 2
+    assert cache.stats.tokens_saved == 800
+    assert second.total_tokens == first.total_tokens - 800
+
+
+@pytest.mark.asyncio
+async def test_changed_input_misses_and_invalidates_downstream(cache, tmp_path) -> None:
+    graph = _pipeline()
+    await _run(graph, _registry(), cache, tmp_path, topic="tides")
+
+    nodes = _registry()
+    result = await _run(graph, nodes, cache, tmp_path, topic="moons")
+
+    assert result.output["draft"] == "draft(outline(facts(moons)))"
+    assert [n.calls for n in nodes.values()] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_changed_prompt_or_tools_changes_key(cache) -> None:
+    buffer = DataBuffer()
+    buffer.write("topic", "tides")
+    spec = _spec("research", "topic", "facts", system_prompt="Be brief.")
+
+    def key(node_spec, **ctx_kwargs):
+        ctx = NodeContext(runtime=None, node_id=node_spec.id, node_spec=node_spec, buffer=buffer.with_permissions(["topic"], []), **ctx_kwargs)
+        return cache.key_for(node_spec, ctx)
+
+    base = key(spec)
+    assert base == key(spec.model_copy(update={"cache_ttl_seconds": 60}))
+    assert base != key(spec.model_copy(update={"system_prompt": "Be thorough."}))
+    assert base != key(spec, goal_context="another goal")
+    assert base != key(spec, available_tools=[type("T", (), {"name": "web_search", "description": "", "parameters": {}})()])
+    buffer.write("topic", "moons")
+    assert base != key(spec)
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_runs_are_not_keyed(cache) -> None:
+    spec = _spec("research", "topic", "facts")
+    buffer = DataBuffer()
+    buffer.write("topic", object())
+
+    def ctx(**kwargs):
+        return NodeContext(runtime=None, node_id=spec.id, node_spec=spec, buffer=buffer, **kwargs)
+
+    assert cache.key_for(spec, ctx()) is None  # not JSON
+    buffer.write("topic", "tides")
+    assert cache.key_for(spec, ctx()) is not None
+    assert cache.key_for(spec, ctx(continuous_mode=True)) is None
+    assert cache.key_for(spec, ctx(dynamic_prompt_provider=lambda: "now")) is None
+    assert not cache.put("k" * 64, NodeResult(success=False, error="boom"), {})
+
+
+@pytest.mark.asyncio
+async def test_tool_key_is_order_independent_with_schema_dicts(cache) -> None:
+    spec = _spec("research", "topic", "facts")
+    buffer = DataBuffer()
+    buffer.write("topic", "tides")
+
+    def tool(params):
+        return type("T", (), {"name": "search", "description": "", "parameters": params})()
+
+    def key(tools):
+        ctx = NodeContext(runtime=None, node_id=spec.id, node_spec=spec, buffer=buffer, available_tools=tools)
+        return cache.key_for(spec, ctx)
+
+    a, b = tool({"type": "object", "properties": {"q": {}}}), tool({"type": "object"})
+    assert key([a, b]) is not None  # equal name/description: dicts must not be compared
+    assert key([a, b]) == key([b, a])
+
+
+@pytest.mark.asyncio
+async def test_nodes_without_output_keys_are_not_cached(cache, tmp_path) -> None:
+    spec = _spec("research", "topic", "facts").model_copy(update={"output_keys": []})
+    graph = GraphSpec(
+        id="single", goal_id=GOAL.id, entry_node="research", terminal_nodes=["research"], nodes=[spec], edges=[], conversation_mode="isolated"
+    )
+    for _ in range(2):
+        nodes = {"research": _FakeLLMNode("topic", "facts")}
+        assert (await _run(graph, nodes, cache, tmp_path)).success
+        assert nodes["research"].calls == 1
+    assert cache.stats.stores == 0 and cache.stats.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_continuous_graphs_and_opted_out_nodes_always_run(cache, tmp_path) -> None:
+    graph = _pipeline().model_copy(update={"conversation_mode": "continuous"})
+    await _run(graph, _registry(), cache, tmp_path)
+    nodes = _registry()
+    await _run(graph, nodes, cache, tmp_path)
+
+    assert [n.calls for n in nodes.values()] == [1, 1, 1]
+    assert cache.stats.stores == 0
+
+
+def test_ttl_expiry(cache) -> None:
+    key = "ab" * 32
+    cache.put(key, NodeResult(success=True, output={"x": 1}, tokens_used=10), {"x_notes": "n"})
+
+    hit = cache.get(key, ttl_seconds=60)
+    assert hit.result.output == {"x": 1} and hit.buffer_writes == {"x_notes": "n"}
+    assert hit.result.tokens_used == 0
+
+    path = cache._path(key)
+    os.utime(path, (0, 0))
+    entry = path.read_text().replace('"created": ', '"created": 1, "_old": ', 1)
+    path.write_text(entry)
+    assert cache.get(key, ttl_seconds=60) is None
+    assert not path.exists()
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path) -> None:
+    cache = NodeResultCache(root=tmp_path / "c", max_bytes=4000)
+    keys = [f"{i:02d}" * 32 for i in range(12)]
+    for i, key in enumerate(keys):
+        cache.put(key, NodeResult(success=True, output={"blob": "x" * 500}), {})
+        os.utime(cache._path(key), (i, i))
+        if i == 5:
+            cache.get(keys[0])  # touched: now the most recent
+
+    assert cache.stats.evictions > 0
+    assert sum(p.stat().st_size for p in cache.root.glob("*/*.json")) <= 4000
+    assert cache._path(keys[-1]).exists()
+    assert not cache._path(keys[1]).exists()
+
+
+@pytest.mark.asyncio
+async def test_repeated_reruns_only_pay_for_the_uncached_node(cache, tmp_path) -> None:
+    graph = _pipeline()
+    runs = 5
+    tokens = [(await _run(graph, _registry(tokens=1500, delay=0), cache, tmp_path)).total_tokens for _ in range(runs)]
+
+    assert tokens == [4500] + [1500] * (runs - 1)
+    assert cache.stats.hits == 2 * (runs - 1) and cache.stats.stores == 2
+    assert cache.stats.tokens_saved == 3000 * (runs - 1)
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_rerun_saves_tokens_and_latency(cache, tmp_path) -> None:
+    graph = _pipeline()
+    runs = 5
+    timings, tokens = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = await _run(graph, _registry(tokens=1500, delay=0.2), cache, tmp_path)
+        timings.append(time.perf_counter() - t0)
+        tokens.append(result.total_tokens)
+
+    cold_s, warm_s = timings[0], min(timings[1:])
+    print(f"\n3-node pipeline, 2 cacheable upstream nodes (0.2 s, 1500 tokens each), {runs} runs")
+    print(f"  cold run   {cold_s:5.2f} s  {tokens[0]:6} tokens")
+    print(f"  re-run     {warm_s:5.2f} s  {tokens[1]:6} tokens")
+    print(f"  saved      {cache.stats.tokens_saved} tokens, {cache.stats.latency_saved_ms / 1000:.1f} s of node latency over {cache.stats.hits} hits")
+
+    assert warm_s < cold_s * 0.6
@@ -0,0 +1,211 @@
+"""RateLimitStage: GCRA buckets charged per request and per token.
+
+Refill behaviour is driven by an injected clock rather than by sleeping.
+The benchmark at the bottom measures per-check overhead (the previous
+timestamp-list stage vs the memory and SQLite stores); it is opt-in, run
+with ``-m benchmark -s`` for the table.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+from collections import defaultdict
+
+import pytest
+
+from framework.pipeline.registry import build_pipeline_from_config
+from framework.pipeline.stage import PipelineContext, PipelineRejectedError
+from framework.pipeline.stages import rate_limit
+from framework.pipeline.stages.rate_limit import MemoryBucketStore, RateLimitStage, SqliteBucketStore
+
+
+def _ctx(session: str = "s1", text: str = "hi", **metadata) -> PipelineContext:
+    return PipelineContext(entry_point_id="ep", input_data={"task": text}, session_state={"session_id": session}, metadata=metadata)
+
+
+async def _admitted(stage: RateLimitStage, n: int, **kw) -> int:
+    results = [await stage.process(_ctx(**kw)) for _ in range(n)]
+    return sum(r.action == "continue" for r in results)
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_burst_of_one_minute_then_reject() -> None:
+    stage = RateLimitStage(max_requests_per_minute=5)
+
+    assert await _admitted(stage, 5) == 5
+    result = await stage.process(_ctx())
+
+    assert result.action == "reject"
+    assert "5 req/min for session 's1'" in result.rejection_reason
+    assert "retry in 12.0s" in result.rejection_reason  # one request refills every 12 s
+    # Sessions are independent.
+    assert (await stage.process(_ctx(session="s2"))).action == "continue"
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_continuously() -> None:
+    clock = _Clock()
+    stage = RateLimitStage(max_requests_per_minute=600)  # one per 100 ms
+    stage._store = MemoryBucketStore(clock=clock)
+
+    assert await _admitted(stage, 650) == 600
+    clock.now += 0.25
+    assert await _admitted(stage, 5) == 2
+    clock.now += 60
+    assert await _admitted(stage, 650) == 600, "an idle minute refills the whole bucket"
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_charged_and_rejection_is_atomic() -> None:
+    clock = _Clock()
+    stage = RateLimitStage(max_requests_per_minute=100, max_tokens_per_minute=10_000, expected_output_tokens=500)
+    stage._store = MemoryBucketStore(clock=clock)
+
+    # ~2000 input + 500 output tokens each: three fit, the fourth does not.
+    assert await _admitted(stage, 4, text="x" * 8000) == 3
+    result = await stage.process(_ctx(text="x" * 8000))
+    assert result.action == "reject" and "10000 tokens/min" in result.rejection_reason
+
+    # A caller-supplied estimate takes precedence over the character count,
+    # and token rejections did not consume request budget.
+    assert await _admitted(stage, 6, text="x" * 8000, estimated_tokens=0) == 4
+    assert stage._store._tats["ep:s1"][0] == pytest.approx(clock.now + 7 * 0.6)
+
+
+@pytest.mark.asyncio
+async def test_request_larger_than_bucket_needs_a_full_bucket() -> None:
+    stage = RateLimitStage(max_tokens_per_minute=1000)
+
+    assert (await stage.process(_ctx(estimated_tokens=50_000))).action == "continue"
+    assert (await stage.process(_ctx(estimated_tokens=10))).action == "reject"
+
+
+def test_idle_keys_are_swept(monkeypatch) -> None:
+    monkeypatch.setattr(rate_limit, "_SWEEP_INTERVAL", 0.0)
+    clock = _Clock()
+    store = MemoryBucketStore(clock=clock)
+    limits = [(0.001, 10.0)]
+    for i in range(1000):
+        store.acquire(f"k{i}", (1.0,), limits)
+    clock.now += 0.01
+
+    store.acquire("live", (1.0,), limits)
+
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_buckets_are_shared(tmp_path) -> None:
+    db = tmp_path / "limits.db"
+    a = RateLimitStage(max_requests_per_minute=4, backend="sqlite", db_path=str(db))
+    b = RateLimitStage(max_requests_per_minute=4, backend="sqlite", db_path=str(db))
+
+    assert await _admitted(a, 3) == 3
+    assert await _admitted(b, 3) == 1
+
+
+def test_sqlite_default_path_and_sweep(monkeypatch) -> None:
+    from framework import config
+
+    monkeypatch.setattr(rate_limit, "_SWEEP_INTERVAL", 0.0)
+    clock = _Clock()
+    store = SqliteBucketStore(clock=clock)
+    store.acquire("old", (1.0,), [(0.001, 5.0)])
+    clock.now += 0.01
+    store.acquire("new", (1.0,), [(10.0, 5.0)])
+
+    con = store._connect()
+    assert [r[0] for r in con.execute("SELECT key FROM buckets")] == ["new"]
+    assert (config.HIVE_HOME / "pipeline_rate_limits.db").exists()
+
+
+@pytest.mark.asyncio
+async def test_configured_from_pipeline_spec(tmp_path) -> None:
+    runner = build_pipeline_from_config(
+        [{"type": "rate_limit", "config": {"max_requests_per_minute": 1, "backend": "sqlite", "db_path": str(tmp_path / "rl.db")}}]
+    )
+    await runner.run(_ctx())
+    with pytest.raises(PipelineRejectedError):
+        await runner.run(_ctx())
+    with pytest.raises(ValueError, match="Unknown rate_limit backend"):
+        RateLimitStage(backend="redis")
+
+
+def _hammer(db_path: str, rpm: int, attempts: int, now: float, out) -> None:
+    store = SqliteBucketStore(db_path, clock=lambda: now)
+    limits = [(60.0 / rpm, float(rpm))]
+    out.put(sum(store.acquire("shared", (1.0,), limits)[0] == 0 for _ in range(attempts)))
+
+
+def test_processes_sharing_a_bucket_never_overshoot(tmp_path) -> None:
+    # Every process sees the same frozen clock, so nothing refills and
+    # exactly one bucket's worth is admitted across all of them.
+    rpm, attempts, procs = 120, 100, 4
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    db = str(tmp_path / "shared.db")
+    SqliteBucketStore(db)
+    workers = [ctx.Process(target=_hammer, args=(db, rpm, attempts, 1000.0, out)) for _ in range(procs)]
+    for w in workers:
+        w.start()
+    counts = [out.get(timeout=30) for _ in workers]
+    for w in workers:
+        w.join(timeout=30)
+
+    assert sum(counts) == rpm
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+class _TimestampListStage:
+    """The previous stage: a list of timestamps per key, filtered per call."""
+
+    def __init__(self, max_rpm: int) -> None:
+        self._max_rpm = max_rpm
+        self._timestamps: dict[str, list[float]] = defaultdict(list)
+
+    def check(self, key: str) -> bool:
+        now = time.monotonic()
+        self._timestamps[key] = [t for t in self._timestamps[key] if now - t < 60.0]
+        if len(self._timestamps[key]) >= self._max_rpm:
+            return False
+        self._timestamps[key].append(now)
+        return True
+
+
+def _per_check_us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+@pytest.mark.benchmark
+def test_benchmark_check_overhead(tmp_path) -> None:
+    rpm = 5000
+    old = _TimestampListStage(rpm)
+    memory = MemoryBucketStore()
+    sqlite = SqliteBucketStore(tmp_path / "bench.db")
+    limits = [(60.0 / rpm, float(rpm)), (60.0 / 1e9, 1e9)]
+
+    # With a busy key the old list holds up to max_rpm timestamps.
+    rows = [
+        ("timestamp list (busy key)", _per_check_us(lambda: old.check("k"), 4000)),
+        ("GCRA memory", _per_check_us(lambda: memory.acquire("k", (1.0, 500.0), limits), 4000)),
+        ("GCRA sqlite", _per_check_us(lambda: sqlite.acquire("k", (1.0, 500.0), limits), 1000)),
+    ]
+    print(f"\nper-check overhead, {rpm} req/min limit")
+    for name, us in rows:
+        print(f"  {name:28}{us:9.1f} us")
+
+    assert rows[1][1] < rows[0][1]
@@ -0,0 +1,200 @@
+"""Tests for the local recall index and the selector's LLM-skip fast path.
+
+The benchmark at the bottom replays a short session of queen turns against
+``MockLLMProvider`` with an injected round-trip delay and reports per-turn
+recall latency with and without the index; it is opt-in, run with
+``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from framework.agents.queen import queen_memory_v2 as qm, recall_index, recall_selector
+from framework.agents.queen.recall_index import INDEX_FILENAME, MemoryRecallIndex, tokenize
+from framework.agents.queen.recall_selector import select_memories
+from framework.llm.mock import MockLLMProvider
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    recall_index._INDEXES.clear()
+    recall_selector._selection_cache.clear()
+    yield
+    recall_index._INDEXES.clear()
+    recall_selector._selection_cache.clear()
+
+
+def _write(d: Path, slug: str, description: str, body: str = "", mem_type: str = "environment") -> Path:
+    path = d / f"{slug}.md"
+    path.write_text(qm.build_memory_document(name=slug, description=description, mem_type=mem_type, body=body or description))
+    return path
+
+
+def _llm_picking(*names: str) -> AsyncMock:
+    llm = AsyncMock()
+    llm.acomplete.return_value = MagicMock(content=json.dumps({"selected_memories": list(names)}))
+    return llm
+
+
+def _count_reads(monkeypatch) -> list[str]:
+    reads: list[str] = []
+    original = qm.MemoryFile.from_path.__func__
+
+    def counting(cls, path):
+        reads.append(path.name)
+        return original(cls, path)
+
+    monkeypatch.setattr(qm.MemoryFile, "from_path", classmethod(counting))
+    return reads
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals() -> None:
+    assert tokenize("Who is my partner's dogs? Deploys to AWS") == ["partner", "dog", "deploy", "aws"]
+
+
+def test_refresh_rereads_only_changed_files(tmp_path: Path, monkeypatch) -> None:
+    for i in range(5):
+        _write(tmp_path, f"m{i}", f"memory number {i}")
+    reads = _count_reads(monkeypatch)
+    index = MemoryRecallIndex(tmp_path)
+    assert len(index.refresh()) == 5
+    assert len(reads) == 5
+
+    reads.clear()
+    index.refresh()
+    assert reads == []
+
+    path = _write(tmp_path, "m2", "memory number two, edited")
+    bumped = path.stat().st_mtime + 5
+    os.utime(path, (bumped, bumped))
+    (tmp_path / "m4.md").unlink()
+    files = index.refresh()
+    assert reads == ["m2.md"]
+    assert [f.filename for f in files][0] == "m2.md"
+    assert "m4.md" not in {f.filename for f in files}
+
+
+def test_index_persists_across_processes(tmp_path: Path, monkeypatch) -> None:
+    _write(tmp_path, "deploy-target", "production deploys go to the fly.io cluster")
+    MemoryRecallIndex(tmp_path).refresh()
+    assert (tmp_path / INDEX_FILENAME).exists()
+
+    reads = _count_reads(monkeypatch)
+    fresh = MemoryRecallIndex(tmp_path)
+    fresh.refresh()
+    assert reads == []
+    assert fresh.rank("where do deploys go")[0].file.filename == "deploy-target.md"
+    # The index file is a dotfile and never shows up as a memory.
+    assert [f.filename for f in qm.scan_memory_files(tmp_path)] == ["deploy-target.md"]
+
+
+@pytest.mark.asyncio
+async def test_confident_ranking_skips_llm(tmp_path: Path) -> None:
+    _write(tmp_path, "kubernetes-cluster", "the staging kubernetes cluster lives in eu-west-1")
+    _write(tmp_path, "coffee", "prefers oat milk flat whites")
+    _write(tmp_path, "writing-style", "likes terse commit messages")
+    llm = _llm_picking("coffee.md")
+
+    result = await select_memories("which region is the staging kubernetes cluster in", llm, memory_dir=tmp_path)
+    assert result == ["kubernetes-cluster.md"]
+    llm.acomplete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_ranking_asks_llm_and_caches(tmp_path: Path) -> None:
+    _write(tmp_path, "coffee", "prefers oat milk flat whites")
+    _write(tmp_path, "tea", "drinks green tea in the afternoon")
+    llm = _llm_picking("coffee.md")
+
+    assert await select_memories("what should I order for them", llm, memory_dir=tmp_path) == ["coffee.md"]
+    assert await select_memories("what should I order for them", llm, memory_dir=tmp_path) == ["coffee.md"]
+    llm.acomplete.assert_called_once()
+
+    # A changed memory set changes the manifest, so the cache misses.
+    _write(tmp_path, "lunch", "usually eats at noon")
+    await select_memories("what should I order for them", llm, memory_dir=tmp_path)
+    assert llm.acomplete.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_large_sets_send_a_ranked_shortlist(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(recall_selector, "SHORTLIST_SIZE", 5)
+    for i in range(20):
+        _write(tmp_path, f"filler-{i}", f"unrelated note {i}")
+    _write(tmp_path, "billing", "invoices are sent from stripe")
+    llm = _llm_picking("billing.md")
+
+    await select_memories("stripe question", llm, memory_dir=tmp_path)
+    manifest = llm.acomplete.call_args.kwargs["messages"][0]["content"]
+    assert manifest.count(".md:") == 5
+    assert manifest.index("billing.md") < manifest.index("filler-")
+
+
+@pytest.mark.asyncio
+async def test_full_pinned_set_skips_llm(tmp_path: Path) -> None:
+    for i in range(3):
+        _write(tmp_path, f"profile-{i}", f"profile fact {i}", mem_type="profile")
+    llm = _llm_picking()
+    result = await select_memories("anything", llm, memory_dir=tmp_path, max_results=3)
+    assert len(result) == 3
+    llm.acomplete.assert_not_called()
+
+
+def _session(d: Path) -> tuple[list[str], list[str]]:
+    """A memory dir of misc notes plus five topics; returns the topic
+    slugs and a short session of queen turns about them."""
+    topics = ["postgres replica lag", "terraform state bucket", "oncall rotation schedule", "grafana alert routing", "docker base image"]
+    for i in range(120):
+        _write(d, f"note-{i}", f"misc note {i}", body=f"misc body {i}")
+    for t in topics:
+        _write(d, t.replace(" ", "-"), f"{t} details", body=f"how we handle {t}")
+    turns = [f"what about the {t}?" for t in topics] * 2 + ["thanks", "ok, continue", "thanks"]
+    return [t.replace(" ", "-") for t in topics], turns
+
+
+@pytest.mark.asyncio
+async def test_session_asks_llm_only_for_ambiguous_new_turns(tmp_path: Path) -> None:
+    slugs, turns = _session(tmp_path)
+    llm = _llm_picking()
+    picks = [await select_memories(q, llm, memory_dir=tmp_path) for q in turns]
+
+    # Topic turns are confident hits; "thanks" is asked once, then cached.
+    assert [p[0] for p in picks[:5]] == [f"{s}.md" for s in slugs]
+    assert [c.kwargs["messages"][0]["content"].split("\n\n")[1] for c in llm.acomplete.call_args_list] == ["thanks", "ok, continue"]
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_recall_latency_with_mock_delay(tmp_path: Path, monkeypatch) -> None:
+    """Per-turn recall latency against a mock LLM with a 50 ms round trip."""
+    delay = 0.05
+    _, turns = _session(tmp_path)
+
+    async def run_session() -> float:
+        llm = MockLLMProvider(delay=delay)
+        t0 = time.perf_counter()
+        for q in turns:
+            await select_memories(q, llm, memory_dir=tmp_path)
+        return (time.perf_counter() - t0) / len(turns)
+
+    # Always-ask baseline: no confident fast path, no cache.
+    with monkeypatch.context() as m:
+        m.setattr(recall_selector, "_confident_picks", lambda *a, **k: None)
+        m.setattr(recall_selector, "_SELECTION_CACHE_SIZE", 0)
+        baseline = await run_session()
+    recall_selector._selection_cache.clear()
+    indexed = await run_session()
+
+    print(f"\nrecall per turn: always-LLM {baseline * 1e3:.1f} ms | indexed {indexed * 1e3:.1f} ms | saved {(baseline - indexed) * 1e3:.1f} ms")
+    assert baseline >= delay
+    assert indexed < baseline * 0.5
@@ -0,0 +1,193 @@
+"""Incremental short reflection and the debounced trigger job.
+
+The test at the bottom replays a 300-turn synthetic queen session against
+``MockLLMProvider`` and compares prompt tokens per reflection for the
+full-transcript read the reflection agent used to do with the
+cursor-based read.  Latency over a 1,000-turn session is tracked by the
+``reflection`` scenario of ``hive bench`` (framework/benchmarks).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from framework.agents.queen import reflection_agent as ra
+from framework.llm.mock import MockLLMProvider
+from framework.storage.conversation_store import FileConversationStore
+
+
+class RecordingLLM(MockLLMProvider):
+    """Mock provider that keeps every prompt it was sent."""
+
+    def __init__(self, **kw: Any) -> None:
+        super().__init__(**kw)
+        self.prompts: list[str] = []
+
+    async def acomplete(self, messages: list[dict[str, Any]], system: str = "", **kw: Any):
+        self.prompts.append(system + "".join(str(m.get("content", "")) for m in messages))
+        return await super().acomplete(messages, system, **kw)
+
+
+def _write_turns(session_dir: Path, start: int, turns: int, width: int = 40) -> None:
+    parts_dir = session_dir / "conversations" / "parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    for turn in range(start, start + turns):
+        for offset, role in enumerate(("user", "assistant")):
+            seq = 2 * turn + offset
+            body = f"turn {turn} {role} " + "lorem ipsum " * width
+            (parts_dir / f"{seq:010d}.json").write_text(json.dumps({"seq": seq, "role": role, "content": body}))
+
+
+async def _reflect(session_dir: Path, llm: Any, tmp_path: Path) -> None:
+    await ra.run_unified_short_reflection(session_dir, llm, global_memory_dir=tmp_path / "global")
+
+
+@pytest.mark.asyncio
+async def test_store_reads_only_parts_after_seq(tmp_path: Path):
+    store = FileConversationStore(tmp_path)
+    for seq in range(5):
+        await store.write_part(seq, {"role": "user", "content": str(seq)})
+    (tmp_path / "parts" / "0000000001.json").write_text("{broken")
+
+    assert [p["seq"] for p in await store.read_parts_after(2)] == [3, 4]
+    assert [p["seq"] for p in await store.read_parts_after(-1)] == [0, 2, 3, 4]
+    assert await store.read_parts_after(4) == []
+    assert await store.last_part_seq() == 4
+
+
+@pytest.mark.asyncio
+async def test_short_reflection_sends_only_new_parts_with_digest(tmp_path: Path):
+    session_dir = tmp_path / "session"
+    llm = RecordingLLM()
+    _write_turns(session_dir, 0, 3, width=2)
+
+    await _reflect(session_dir, llm, tmp_path)
+    first = llm.prompts[-1]
+    assert "turn 0 user" in first and "turn 2 assistant" in first and "Earlier in this session" not in first
+    state = json.loads((session_dir / "reflection_state.json").read_text())["unified"]
+    assert state["cursor"] == 5 and state["reflected_parts"] == 6
+
+    # Nothing new: no LLM call at all.
+    await _reflect(session_dir, llm, tmp_path)
+    assert len(llm.prompts) == 1
+
+    _write_turns(session_dir, 3, 2, width=2)
+    await _reflect(session_dir, llm, tmp_path)
+    second = llm.prompts[-1]
+    recent = second.split("## Recent conversation", 1)[1]
+    assert "turn 3 user" in recent and "turn 0 user" not in recent
+    assert "turn 0 user" in second.split("## Recent conversation", 1)[0]  # via the digest
+    assert "(4 new messages, 10 total)" in second
+
+
+@pytest.mark.asyncio
+async def test_failed_reflection_keeps_cursor(tmp_path: Path):
+    session_dir = tmp_path / "session"
+    _write_turns(session_dir, 0, 2, width=1)
+    llm = AsyncMock()
+    llm.acomplete.side_effect = RuntimeError("provider down")
+
+    await _reflect(session_dir, llm, tmp_path)
+    assert not (session_dir / "reflection_state.json").exists()
+
+    retry = RecordingLLM()
+    await _reflect(session_dir, retry, tmp_path)
+    assert "turn 0 user" in retry.prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_cursor_resets_when_conversation_restarts(tmp_path: Path):
+    session_dir = tmp_path / "session"
+    llm = RecordingLLM()
+    _write_turns(session_dir, 0, 5, width=1)
+    await _reflect(session_dir, llm, tmp_path)
+
+    await FileConversationStore(session_dir / "conversations").clear()
+    _write_turns(session_dir, 0, 1, width=1)
+    await _reflect(session_dir, llm, tmp_path)
+    assert len(llm.prompts) == 2 and "turn 0 user" in llm.prompts[-1]
+    assert "Earlier in this session" not in llm.prompts[-1]
+
+
+@pytest.mark.asyncio
+async def test_overlapping_triggers_run_as_one_debounced_job(tmp_path: Path, monkeypatch):
+    from framework.host.event_bus import AgentEvent, EventBus, EventType
+
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    async def short(*args: Any, **kwargs: Any) -> None:
+        calls.append("short")
+        await release.wait()
+
+    async def long(*args: Any, **kwargs: Any) -> None:
+        calls.append("long")
+
+    monkeypatch.setattr(ra, "run_unified_short_reflection", short)
+    monkeypatch.setattr(ra, "run_unified_long_reflection", long)
+    bus = EventBus()
+    await ra.subscribe_reflection_triggers(bus, tmp_path / "session", AsyncMock(), global_memory_dir=tmp_path, debounce_sec=0.02)
+
+    async def turn(stop_reason: str = "stop") -> None:
+        await bus.publish(AgentEvent(type=EventType.LLM_TURN_COMPLETE, stream_id="queen", data={"stop_reason": stop_reason}))
+
+    async def compaction() -> None:
+        await bus.publish(AgentEvent(type=EventType.CONTEXT_COMPACTED, stream_id="queen", data={}))
+
+    # Turn trigger + compaction inside one window: one short, one long.
+    await turn()
+    await compaction()
+    await asyncio.sleep(0.06)
+    assert calls == ["short"]
+
+    # While that job runs, the turn-3 trigger and another compaction
+    # fold into a single follow-up pass (turns 2, 4, 5 are gated out).
+    for _ in range(4):
+        await turn()
+    await compaction()
+    release.set()
+    await asyncio.sleep(0.1)
+    assert calls == ["short", "long", "short", "long"]
+
+
+# ── prompt size over a long session ───────────────────────────────────
+
+
+async def _full_transcript_reflection(session_dir: Path, llm: Any, memory_dir: Path) -> None:
+    """The previous short reflection: load every part, send the last 50."""
+    messages = await FileConversationStore(session_dir / "conversations").read_parts()
+    transcript = "\n".join(ra._transcript_lines(messages[-50:], 800))
+    user_msg = f"## Recent conversation ({len(messages)} messages total)\n\n{transcript}\n\nTimestamp: {datetime.now().isoformat(timespec='minutes')}"
+    await ra._reflection_loop(llm, ra._build_unified_short_reflect_system(), user_msg, memory_dir)
+
+
+@pytest.mark.asyncio
+async def test_incremental_reflection_prompts_stay_small_over_long_session(tmp_path: Path):
+    turns, every = 300, 3
+    tokens: dict[str, list[float]] = {}
+    for label in ("full transcript", "incremental"):
+        session_dir = tmp_path / label.replace(" ", "_")
+        memory_dir = tmp_path / f"{label}_memory"
+        memory_dir.mkdir()
+        llm = RecordingLLM()
+        for turn in range(0, turns, every):
+            _write_turns(session_dir, turn, min(every, turns - turn))
+            if label == "incremental":
+                await ra.run_unified_short_reflection(session_dir, llm, global_memory_dir=memory_dir)
+            else:
+                await _full_transcript_reflection(session_dir, llm, memory_dir)
+        tokens[label] = [len(p) / 4 for p in llm.prompts]
+
+    full, inc = tokens["full transcript"], tokens["incremental"]
+    assert len(inc) == len(full) == turns // every
+    assert statistics.mean(inc) * 2 < statistics.mean(full)
+    # The incremental prompt does not grow with the session.
+    assert max(inc[-10:]) <= max(inc[:10]) * 1.5
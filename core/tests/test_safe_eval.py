@@ -7,10 +7,13 @@
 AST nodes, disallowed function calls).
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 import framework.orchestrator.safe_eval as safe_eval_module
-from framework.orchestrator.safe_eval import safe_eval
+from framework.orchestrator.safe_eval import compile_expression, safe_eval
 
 # ---------------------------------------------------------------------------
 # Literals and constants
@@ -113,10 +116,7 @@ def test_complex_expression(self):
 
 class TestExecutionTimeout:
     def test_default_timeout(self):
-        import signal
-
-        expected = 100 if hasattr(signal, "SIGALRM") else 500
-        assert safe_eval_module.DEFAULT_TIMEOUT_MS == expected
+        assert safe_eval_module.DEFAULT_TIMEOUT_MS == 100
 
     def test_timeout_must_be_positive(self):
         with pytest.raises(ValueError, match="timeout_ms"):
@@ -132,88 +132,64 @@ def test_timeout_exceeded_raises(self, monkeypatch):
         with pytest.raises(TimeoutError, match="1ms"):
             safe_eval("1 + 1", timeout_ms=1)
 
-    def test_existing_process_timer_is_preserved(self, monkeypatch):
-        calls: list[tuple[str, object]] = []
-        main_thread = object()
-
-        monkeypatch.setattr(safe_eval_module.signal, "SIGALRM", object(), raising=False)
-        monkeypatch.setattr(safe_eval_module.signal, "ITIMER_REAL", object(), raising=False)
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "getitimer",
-            lambda which: (5.0, 0.0),
-            raising=False,
-        )
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "setitimer",
-            lambda *args: calls.append(("setitimer", args)),
-            raising=False,
-        )
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "signal",
-            lambda *args: calls.append(("signal", args)),
-        )
-        monkeypatch.setattr(safe_eval_module.threading, "main_thread", lambda: main_thread)
-        monkeypatch.setattr(
-            safe_eval_module.threading,
-            "current_thread",
-            lambda: main_thread,
-        )
+    def test_timeout_enforced_off_the_main_thread(self, monkeypatch):
+        """The deadline is checked around calls, without signals, so it
+        holds in worker threads too."""
+        ticks = iter([0.0, 0.0, 1.0])
+        monkeypatch.setattr(safe_eval_module.time, "perf_counter", lambda: next(ticks))
+        errors: list[BaseException] = []
 
-        with safe_eval_module._execution_timeout(100):
-            pass
+        def run():
+            try:
+                safe_eval("len(x) > 0", {"x": [1]}, timeout_ms=1)
+            except BaseException as e:  # noqa: BLE001
+                errors.append(e)
 
-        assert calls == []
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join()
 
-    def test_timeout_restores_alarm_state(self, monkeypatch):
-        calls: list[tuple[str, object]] = []
-        main_thread = object()
-        old_handler = object()
+        assert len(errors) == 1 and isinstance(errors[0], TimeoutError)
 
-        monkeypatch.setattr(safe_eval_module.signal, "SIGALRM", object(), raising=False)
-        monkeypatch.setattr(safe_eval_module.signal, "ITIMER_REAL", object(), raising=False)
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "getitimer",
-            lambda which: (0.0, 0.0),
-            raising=False,
-        )
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "getsignal",
-            lambda which: old_handler,
-        )
+    def test_expression_size_is_bounded(self):
+        with pytest.raises(ValueError, match="nodes"):
+            safe_eval(" + ".join(["1"] * 600))
 
-        def fake_signal(which, handler):
-            calls.append(("signal", handler))
 
-        def fake_setitimer(which, delay, interval=0.0):
-            calls.append(("setitimer", (delay, interval)))
-            return (0.0, 0.0)
+# ---------------------------------------------------------------------------
+# Compilation cache
+# ---------------------------------------------------------------------------
 
-        monkeypatch.setattr(safe_eval_module.signal, "signal", fake_signal)
-        monkeypatch.setattr(
-            safe_eval_module.signal,
-            "setitimer",
-            fake_setitimer,
-            raising=False,
-        )
-        monkeypatch.setattr(safe_eval_module.threading, "main_thread", lambda: main_thread)
-        monkeypatch.setattr(
-            safe_eval_module.threading,
-            "current_thread",
-            lambda: main_thread,
-        )
 
-        with safe_eval_module._execution_timeout(100):
-            pass
+class TestCompiledExpressions:
+    def test_compiled_once_per_expression(self):
+        first = compile_expression("x > 1 and len(y) == 2")
 
-        assert calls[0][0] == "signal"
-        assert calls[1] == ("setitimer", (0.1, 0.0))
-        assert calls[2] == ("signal", old_handler)
-        assert calls[3] == ("setitimer", (0.0, 0.0))
+        assert compile_expression("x > 1 and len(y) == 2") is first
+        assert first.names == {"x", "y"}
+        assert first.evaluate({"x": 2, "y": "ab"}) is True
+        assert first.evaluate({"x": 0, "y": "ab"}) is False
+
+    def test_safe_function_names_shadow_the_context(self):
+        assert safe_eval("len(x)", {"x": [1, 2], "len": lambda v: 99}) == 2
+
+    def test_call_through_context_variable_is_checked(self):
+        assert safe_eval("f(x)", {"f": len, "x": [1, 2]}) == 2
+        with pytest.raises(ValueError, match="not allowed"):
+            safe_eval("f(x)", {"f": print, "x": 1})
+
+    def test_internal_names_are_unreachable(self):
+        with pytest.raises(NameError, match="not defined"):
+            safe_eval("__hive_call(f)", {"f": print})
+
+    def test_concurrent_evaluation(self):
+        expr = compile_expression("output.get('n') == n and n % 2 == 0")
+
+        def check(n: int) -> bool:
+            return expr.evaluate({"output": {"n": n}, "n": n}) == (n % 2 == 0)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(pool.map(check, range(2000)))
 
 
 # ---------------------------------------------------------------------------
@@ -636,3 +612,33 @@ def test_no_context_needed(self):
         """Some edges use constant expressions."""
         assert safe_eval("True") is True
         assert safe_eval("1 == 1") is True
+
+
+# ---------------------------------------------------------------------------
+# Compile cache on the evaluation path
+# ---------------------------------------------------------------------------
+
+_EDGE_CONTEXT = {
+    "output": {"status": "completed", "score": 0.9, "results": [1, 2, 3]},
+    "buffer": {"score": 0.85},
+    "result": None,
+}
+_EDGE_EXPRESSIONS = [
+    "output.get('status') == 'completed' and buffer.get('score', 0) >= 0.8",
+    "len(output['results']) > 0",
+    "output.get('primary') or output.get('secondary') or 'default'",
+]
+
+
+def test_repeat_evaluations_are_compiled_once():
+    """Each edge condition is parsed and checked once, then every later
+    ``safe_eval`` of it is a compile-cache hit with the same result."""
+    uncached = safe_eval_module.compile_expression.__wrapped__
+    compile_expression.cache_clear()
+    for expr in _EDGE_EXPRESSIONS:
+        expected = uncached(expr).evaluate(_EDGE_CONTEXT)
+        assert [safe_eval(expr, _EDGE_CONTEXT) for _ in range(50)] == [expected] * 50
+
+    info = compile_expression.cache_info()
+    assert info.misses == len(_EDGE_EXPRESSIONS)
+    assert info.hits == 49 * len(_EDGE_EXPRESSIONS)
@@ -0,0 +1,248 @@
+"""Content-addressed, write-behind tool-result spill store.
+
+Spill files are hard links to one pretty-printed blob per distinct result,
+written on a background thread and awaited before the next tool runs.
+The benchmark at the bottom compares the previous inline pipeline
+(``json.loads`` + ``json.dumps(indent=2)`` + write per result) with the
+store on tool-turn latency and disk bytes; it is opt-in, run with
+``-m benchmark -s`` for the table.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from framework import config
+from framework.agent_loop.internals import spill_store
+from framework.agent_loop.internals.tool_result_handler import execute_tool, truncate_tool_result
+from framework.llm.provider import ToolResult, ToolUse
+from framework.maintenance.retention import DeleteDisposer, Manifest, sweep_unreferenced_spill_blobs
+
+
+class _ToolCallEvent:
+    def __init__(self, tool_name: str, tool_input: dict) -> None:
+        self.tool_use_id = "test_id"
+        self.tool_name = tool_name
+        self.tool_input = tool_input
+
+
+def _namer():
+    counter = iter(range(1, 10_000))
+    return lambda tool: f"{tool}_{next(counter)}.txt"
+
+
+def _spill(content: str, spill_dir: Path, name_fn, limit: int = 1000) -> ToolResult:
+    return truncate_tool_result(
+        ToolResult(tool_use_id="t", content=content),
+        "web_fetch",
+        max_tool_result_chars=limit,
+        spillover_dir=str(spill_dir),
+        next_spill_filename_fn=name_fn,
+    )
+
+
+def _page(seed: int, items: int = 50) -> str:
+    return json.dumps(
+        {"url": f"https://example.com/{seed}", "items": [{"id": i, "title": f"item {i} of {seed}", "body": "x" * 200} for i in range(items)]}
+    )
+
+
+def _blobs() -> list[Path]:
+    return sorted((config.HIVE_HOME / spill_store.BLOB_DIR_NAME).glob("*/*.txt"))
+
+
+def test_identical_results_share_one_blob(tmp_path) -> None:
+    page = _page(1)
+    name_fn = _namer()
+    a = _spill(page, tmp_path / "w1" / "data", name_fn)
+    b = _spill(page, tmp_path / "w2" / "data", name_fn)
+    _spill(_page(2), tmp_path / "w1" / "data", name_fn)
+    spill_store.wait_for_spills()
+
+    fa, fb = Path(a.spillover_path), Path(b.spillover_path)
+    assert fa.stat().st_ino == fb.stat().st_ino
+    assert len(_blobs()) == 2
+    # Pretty-printed once, for every link.
+    assert fa.read_text(encoding="utf-8") == json.dumps(json.loads(page), indent=2, ensure_ascii=False)
+
+
+def test_large_result_preview_and_path(tmp_path) -> None:
+    page = _page(3, items=200)
+    res = _spill(page, tmp_path / "data", _namer())
+    spill_store.wait_for_spills()
+
+    assert f"Full result at: {res.spillover_path}" in res.content
+    assert '"items": list of 200 items' in res.content
+    assert "more items omitted, 200 total" in res.content
+    assert json.loads(Path(res.spillover_path).read_text(encoding="utf-8")) == json.loads(page)
+
+
+def test_small_and_plain_text_results_pass_through(tmp_path) -> None:
+    res = _spill("plain output", tmp_path / "data", _namer())
+    spill_store.wait_for_spills()
+    assert res.content == "plain output"
+    assert Path(res.spillover_path).read_text(encoding="utf-8") == "plain output"
+
+
+@pytest.mark.asyncio
+async def test_next_tool_waits_for_pending_spills(tmp_path, monkeypatch) -> None:
+    release = threading.Event()
+    real_render = spill_store.render_spill_text
+
+    def slow_render(content, parsed=spill_store.UNPARSED):
+        release.wait(5)
+        return real_render(content, parsed)
+
+    monkeypatch.setattr(spill_store, "render_spill_text", slow_render)
+    res = _spill("slow result", tmp_path / "data", _namer())
+    assert spill_store.has_pending_spills()
+    seen: dict = {}
+
+    def exec_(tool_use: ToolUse) -> ToolResult:
+        seen["exists"] = os.path.exists(res.spillover_path)
+        return ToolResult(tool_use_id=tool_use.id, content="ok")
+
+    threading.Timer(0.2, release.set).start()
+    await execute_tool(tool_executor=exec_, tc=_ToolCallEvent("terminal_exec", {}), timeout=10, spill_dir=str(tmp_path / "data"))
+    assert seen["exists"] is True
+
+
+@pytest.mark.asyncio
+async def test_next_tool_does_not_wait_for_other_loops_spills(tmp_path, monkeypatch) -> None:
+    release = threading.Event()
+    real_render = spill_store.render_spill_text
+
+    def stuck_render(content, parsed=spill_store.UNPARSED):
+        release.wait(10)
+        return real_render(content, parsed)
+
+    monkeypatch.setattr(spill_store, "render_spill_text", stuck_render)
+    other = _spill("another session's result", tmp_path / "other" / "data", _namer())
+    try:
+        assert spill_store.has_pending_spills(tmp_path / "other" / "data")
+        assert not spill_store.has_pending_spills(tmp_path / "mine" / "data")
+
+        def exec_(tool_use: ToolUse) -> ToolResult:
+            return ToolResult(tool_use_id=tool_use.id, content="ok")
+
+        result = await execute_tool(
+            tool_executor=exec_, tc=_ToolCallEvent("terminal_exec", {}), timeout=10, spill_dir=str(tmp_path / "mine" / "data")
+        )
+        assert result.content == "ok"
+        assert not os.path.exists(other.spillover_path), "returned without waiting for the other loop's write"
+    finally:
+        release.set()
+        spill_store.wait_for_spills()
+    assert os.path.exists(other.spillover_path) and not spill_store.has_pending_spills()
+
+
+def test_janitor_sweeps_unreferenced_blobs(tmp_path) -> None:
+    name_fn = _namer()
+    kept = _spill(_page(4), tmp_path / "data", name_fn)
+    gone = _spill(_page(5), tmp_path / "data", name_fn)
+    spill_store.wait_for_spills()
+    Path(gone.spillover_path).unlink()
+
+    report = sweep_unreferenced_spill_blobs(DeleteDisposer(), Manifest(), now=time.time() + 2 * 3600)
+
+    assert report.files == 1
+    assert len(_blobs()) == 1 and _blobs()[0].stat().st_ino == Path(kept.spillover_path).stat().st_ino
+
+
+def test_blob_swept_before_link_is_rewritten(tmp_path, monkeypatch) -> None:
+    page = _page(6)
+    first = tmp_path / "w1" / "web_fetch_1.txt"
+    assert spill_store.write_spill(page, first) is False
+    (blob,) = _blobs()
+    first.unlink()  # the blob is unreferenced now
+
+    real_link = os.link
+
+    def sweep_then_link(src, dst):
+        # The janitor sweeps the blob just as a repeat result links to it.
+        Path(src).unlink(missing_ok=True)
+        monkeypatch.setattr(spill_store.os, "link", real_link)
+        return real_link(src, dst)
+
+    monkeypatch.setattr(spill_store.os, "link", sweep_then_link)
+    second = tmp_path / "w2" / "web_fetch_1.txt"
+    assert spill_store.write_spill(page, second) is False
+
+    assert second.read_text(encoding="utf-8") == json.dumps(json.loads(page), indent=2, ensure_ascii=False)
+    assert blob.stat().st_ino == second.stat().st_ino and blob.stat().st_nlink == 2
+    assert not list(second.parent.glob(".*.link"))
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+def _inline_spill(content: str, spill_dir: Path, name: str) -> None:
+    """The previous write path, minus the preview (unchanged)."""
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    text = content
+    try:
+        text = json.dumps(json.loads(content), indent=2, ensure_ascii=False)
+    except ValueError:
+        pass
+    (spill_dir / name).write_text(text, encoding="utf-8")
+
+
+def _disk_bytes(*roots: Path) -> int:
+    """Bytes under ``roots``, counting each inode (hard links) once."""
+    seen, total = set(), 0
+    for p in (p for root in roots for p in root.rglob("*.txt")):
+        st = p.stat()
+        if st.st_ino not in seen:
+            seen.add(st.st_ino)
+            total += st.st_size
+    return total
+
+
+@pytest.mark.benchmark
+def test_benchmark_spill_latency_and_disk(tmp_path) -> None:
+    # Ten workers fetch the same large page, plus each handles a few
+    # small distinct results.
+    big = _page(7, items=4000)
+    results = []
+    for w in range(10):
+        results.append((w, big))
+        results += [(w, _page(100 * w + k, items=3)) for k in range(5)]
+
+    old_root = tmp_path / "old"
+    t0 = time.perf_counter()
+    for n, (w, content) in enumerate(results):
+        _inline_spill(content, old_root / f"w{w}", f"r_{n}.txt")
+    old_turn = time.perf_counter() - t0
+
+    new_root = tmp_path / "new"
+    namer = _namer()
+    t0 = time.perf_counter()
+    for w, content in results:
+        truncate_tool_result(
+            ToolResult(tool_use_id="t", content=content),
+            "web_fetch",
+            max_tool_result_chars=0,  # spill only; previews are the same on both paths
+            spillover_dir=str(new_root / f"w{w}"),
+            next_spill_filename_fn=namer,
+        )
+    new_turn = time.perf_counter() - t0
+    spill_store.wait_for_spills()
+    new_total = time.perf_counter() - t0
+
+    old_bytes = _disk_bytes(old_root)
+    new_bytes = _disk_bytes(new_root, config.HIVE_HOME / spill_store.BLOB_DIR_NAME)
+
+    print(f"\n{len(results)} results ({len(big) / 1e6:.1f} MB page x10 + 50 small)")
+    print(
+        f"  tool-turn time   inline {old_turn * 1e3:7.1f} ms  →  write-behind {new_turn * 1e3:6.1f} ms (writer done after {new_total * 1e3:.1f} ms)"
+    )
+    print(f"  disk bytes       inline {old_bytes / 1e6:7.2f} MB  →  content-addressed {new_bytes / 1e6:.2f} MB")
+
+    assert new_turn < old_turn
+    assert new_bytes < old_bytes / 5
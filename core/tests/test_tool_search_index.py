@@ -0,0 +1,204 @@
+"""Tests for the BM25 index behind keyword ``search_tools`` queries.
+
+The benchmark at the bottom builds 2,000 synthetic MCP-style tools and
+compares the old per-query overlap scan with the shared index on latency
+and top-5 recall; it is opt-in, run with ``-m benchmark -s``. The recall
+comparison also runs as a normal test.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import statistics
+import time
+
+import pytest
+
+from framework.llm.provider import Tool
+from framework.tools import tool_search_index as tsi
+from framework.tools.tool_search_index import ToolSearchIndex, get_tool_search_index, tokenize
+from framework.tools.tool_tiers import ToolTierState, _match_searchable_tools, build_search_tools
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    tsi._INDEXES.clear()
+    tsi._BY_LIST.clear()
+    yield
+    tsi._INDEXES.clear()
+    tsi._BY_LIST.clear()
+
+
+def _tool(name: str, description: str, *params: str) -> Tool:
+    return Tool(name=name, description=description, parameters={"type": "object", "properties": {p: {"type": "string"} for p in params}})
+
+
+def test_tokenize_splits_snake_and_camel_case() -> None:
+    assert tokenize("gmail_send") == ["gmail", "send"]
+    assert tokenize("maxResults") == ["maxresults", "max", "results"]
+
+
+def test_name_hits_outrank_passing_mentions() -> None:
+    tools = [
+        _tool("calendar_create_event", "Create a calendar event. Can also email invitees."),
+        _tool("gmail_send", "Send an email message through Gmail."),
+        _tool("slack_post", "Post a message to a Slack channel."),
+    ]
+    assert ToolSearchIndex(tools).search("send email", limit=2) == ["gmail_send", "calendar_create_event"]
+
+
+def test_partial_tokens_still_match() -> None:
+    tools = [_tool("gmail_send", "Send via Gmail"), _tool("notion_search", "Search pages")]
+    index = ToolSearchIndex(tools)
+    assert index.search("mail") == ["gmail_send"]
+    # An exact term beats a substring-only match.
+    tools.append(_tool("mail_merge", "Merge fields into a template"))
+    assert ToolSearchIndex(tools).search("mail")[0] == "mail_merge"
+
+
+def test_parameter_names_are_searchable() -> None:
+    index = ToolSearchIndex([_tool("http_request", "Make a request", "url", "headerMap"), _tool("noop", "Nothing")])
+    assert index.search("header") == ["http_request"]
+
+
+def test_allowed_restricts_results_without_rebuilding() -> None:
+    tools = [_tool(f"gmail_{a}", f"{a} gmail messages") for a in ("send", "list", "delete")]
+    index = ToolSearchIndex(tools)
+    assert index.search("gmail", allowed={"gmail_list"}) == ["gmail_list"]
+    assert _match_searchable_tools("gmail", tools[1:2], index=index) == ["gmail_list"]
+
+
+def test_registry_shares_identical_tool_sets_and_rebuilds_on_change() -> None:
+    pool = [_tool("a_tool", "alpha"), _tool("b_tool", "beta")]
+    first = get_tool_search_index(pool)
+    assert get_tool_search_index(pool) is first
+    # A different list object with the same tools (another worker's pool).
+    assert get_tool_search_index(list(pool)) is first
+
+    pool.append(_tool("c_tool", "gamma"))
+    changed = get_tool_search_index(pool)
+    assert changed is not first
+    assert changed.search("gamma") == ["c_tool"]
+
+    pool[0] = _tool("a_tool", "delta")
+    assert get_tool_search_index(pool).search("delta") == []
+    assert get_tool_search_index(pool, refresh=True).search("delta") == ["a_tool"]
+
+
+@pytest.mark.asyncio
+async def test_tier_state_keeps_index_across_promotions() -> None:
+    pool = [_tool("keep", "always on")] + [_tool(f"svc_{i}", f"service number {i} widget") for i in range(5)]
+    tiers = [ToolTierState(pool=list(pool), always_enabled_names={"keep"}, gateable_names={t.name for t in pool}) for _ in range(2)]
+    for tier in tiers:
+        tier.rebuild()
+    # Two workers over the same tools share one index.
+    assert tiers[0].search_index() is tiers[1].search_index()
+
+    _tool_schema, search = build_search_tools(tiers[0])
+    first = json.loads(await search(query="widget", max_results=2))
+    assert len(first["loaded"]) == 2
+    second = json.loads(await search(query="widget", max_results=5))
+    assert set(second["loaded"]).isdisjoint(first["loaded"])
+    assert tiers[0].search_index() is tiers[1].search_index()
+
+
+def _overlap_scan(query: str, searchable: list, limit: int) -> list[str]:
+    """The pre-index matcher, kept here as the benchmark baseline."""
+    tokens = [tok for tok in re.split(r"[^a-z0-9]+", query.lower()) if tok]
+    scored = []
+    for t in searchable:
+        haystack = f"{t.name} {t.description}".lower()
+        score = sum(1 for tok in tokens if tok in haystack)
+        if score:
+            scored.append((score, t.name))
+    scored.sort(key=lambda s: (-s[0], s[1]))
+    return [name for _, name in scored[:limit]]
+
+
+def _synthetic_tools() -> tuple[list[Tool], list[tuple[str, str]]]:
+    """2,000 MCP-style tools and 200 queries, each naming the tool it wants."""
+    rng = random.Random(31)
+    services = [
+        f"{a}{b}"
+        for a in ("cloud", "data", "mail", "task", "chat", "file", "pay", "crm", "doc", "ads")
+        for b in ("hub", "ly", "box", "desk", "flow", "base", "io", "ops", "kit", "lab")
+    ]
+    actions = {
+        "create": "Create a new {obj} in {svc}",
+        "delete": "Permanently delete a {obj} from {svc}",
+        "list": "List every {obj} visible in {svc}",
+        "get": "Fetch one {obj} by id from {svc}",
+        "update": "Update fields on an existing {obj} in {svc}",
+        "search": "Full-text search over {obj} records in {svc}",
+        "export": "Export {obj} records from {svc} as CSV",
+        "archive": "Archive an old {obj} in {svc}",
+        "share": "Share a {obj} with teammates in {svc}",
+        "comment": "Add a comment to a {obj} in {svc}",
+    }
+    objects = ["invoice", "ticket", "contact", "report", "campaign", "folder", "channel", "dataset", "pipeline", "calendar"]
+    # Every description also name-drops another service and object, which is
+    # where a plain overlap count starts ranking bystanders as high as the
+    # tool itself.
+    filler = "Requires an API key. Returns JSON. Supports pagination, retries and rate limits. Often paired with {other_obj} in {other}."
+    tools: list[Tool] = []
+    for svc in services:
+        for action, template in actions.items():
+            for obj in rng.sample(objects, 2):
+                desc = template.format(obj=obj, svc=svc) + ". " + filler.format(other=rng.choice(services), other_obj=rng.choice(objects))
+                tools.append(_tool(f"{svc}_{action}_{obj}", desc, f"{obj}Id", "pageToken", "limit"))
+    assert len(tools) == 2000
+
+    queries = []
+    for t in rng.sample(tools, 100):
+        svc, action, obj = t.name.split("_")
+        queries.append((f"{action} {obj} {svc}", t.name))
+        queries.append((f"{obj} in {svc}", t.name))
+    return tools, queries
+
+
+def _recall(matcher, queries: list[tuple[str, str]]) -> float:
+    return sum(want in matcher(q) for q, want in queries) / len(queries)
+
+
+def test_index_recall_on_2000_tools() -> None:
+    tools, queries = _synthetic_tools()
+    index = get_tool_search_index(tools)
+    old_recall = _recall(lambda q: _overlap_scan(q, tools, 5), queries)
+    new_recall = _recall(lambda q: _match_searchable_tools(q, tools, limit=5, index=index), queries)
+    assert new_recall >= old_recall
+    assert new_recall >= 0.95
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+def test_benchmark_search_latency_and_recall_2000_tools() -> None:
+    tools, queries = _synthetic_tools()
+
+    def run(matcher) -> tuple[list[float], float]:
+        times, hits = [], 0
+        for q, want in queries:
+            t0 = time.perf_counter()
+            got = matcher(q)
+            times.append(time.perf_counter() - t0)
+            hits += want in got
+        return times, hits / len(queries)
+
+    t0 = time.perf_counter()
+    index = get_tool_search_index(tools)
+    build_s = time.perf_counter() - t0
+    old_times, old_recall = run(lambda q: _overlap_scan(q, tools, 5))
+    new_times, new_recall = run(lambda q: _match_searchable_tools(q, tools, limit=5, index=index))
+
+    def p(times, pct):
+        return sorted(times)[int(pct / 100 * (len(times) - 1))] * 1e3
+
+    print(
+        f"\n2000 tools, index build {build_s * 1e3:.1f} ms\n"
+        f"  overlap scan  p50 {p(old_times, 50):.2f} ms  p99 {p(old_times, 99):.2f} ms  recall@5 {old_recall:.2f}\n"
+        f"  bm25 index    p50 {p(new_times, 50):.2f} ms  p99 {p(new_times, 99):.2f} ms  recall@5 {new_recall:.2f}"
+    )
+    assert statistics.median(new_times) < statistics.median(old_times)
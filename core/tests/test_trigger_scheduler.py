@@ -0,0 +1,393 @@
+"""Central timer-trigger scheduler.
+
+Most tests drive a ``TriggerScheduler`` with a fake clock through
+``run_due()``, so hours of schedule run in milliseconds.  The opt-in
+benchmark at the bottom (``-m benchmark``) runs a few hundred real-time
+triggers whose callbacks take a while against the per-trigger sleep
+loops the scheduler replaced, and checks drift and peak concurrency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from framework.host.trigger_scheduler import TriggerFire, TriggerScheduler
+
+T0 = datetime(2026, 3, 2, 9, 0, tzinfo=UTC).timestamp()
+
+
+class FakeClock:
+    def __init__(self, t: float = T0) -> None:
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class Recorder:
+    """Callback that records fires; ``work`` advances the fake clock, as
+    a fire that takes that long would."""
+
+    def __init__(self, clock: FakeClock | None = None, work: float = 0.0) -> None:
+        self.fires: list[TriggerFire] = []
+        self.clock = clock
+        self.work = work
+
+    async def __call__(self, fire: TriggerFire) -> None:
+        self.fires.append(fire)
+        if self.work:
+            self.clock.t += self.work
+
+    @property
+    def scheduled(self) -> list[float]:
+        return [f.scheduled_at - T0 for f in self.fires]
+
+
+async def _advance(scheduler: TriggerScheduler, clock: FakeClock, until: float, step: float = 1.0) -> None:
+    """Step the fake clock to ``T0 + until``, firing whatever falls due."""
+    while clock.t < T0 + until:
+        clock.t = min(clock.t + step, T0 + until)
+        while await scheduler.run_due():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_interval_ticks_stay_on_the_grid_despite_slow_fires() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock)
+    slow = Recorder(clock, work=20.0)  # each fire takes a third of the interval
+    scheduler.schedule("slow", slow, interval_seconds=60)
+
+    await _advance(scheduler, clock, until=600)
+
+    assert slow.scheduled == [60.0 * k for k in range(1, 11)]
+    assert all(f.missed == 0 for f in slow.fires)
+    assert scheduler.next_fire_at("slow") == T0 + 660
+
+
+@pytest.mark.asyncio
+async def test_run_immediately_and_cron_schedules() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock)
+    now, cron = Recorder(), Recorder()
+    scheduler.schedule("now", now, interval_seconds=300, run_immediately=True)
+    scheduler.schedule("cron", cron, cron="*/15 * * * *")
+    first_iter = None
+
+    await scheduler.run_due()
+    assert now.scheduled == [0.0] and cron.fires == []
+    await _advance(scheduler, clock, until=1800, step=60)
+    first_iter = scheduler._entries["cron"].cron_iter
+    await _advance(scheduler, clock, until=3600, step=60)
+
+    assert now.scheduled == [300.0 * k for k in range(13)]
+    assert cron.scheduled == [900.0, 1800.0, 2700.0, 3600.0]
+    assert cron.fires[0].next_at == T0 + 1800
+    # The parsed cron iterator is reused from tick to tick.
+    assert scheduler._entries["cron"].cron_iter is first_iter
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("policy", "expected_scheduled", "expected_missed"),
+    [
+        ("latest", [600.0], [9]),
+        ("all", [60.0 * k for k in range(1, 11)], [0] * 10),
+        ("skip", [], []),
+    ],
+)
+async def test_catch_up_policies(policy, expected_scheduled, expected_missed) -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock, grace_seconds=20)
+    rec = Recorder()
+    scheduler.schedule("t", rec, interval_seconds=60, catch_up=policy)
+
+    clock.t = T0 + 630  # the loop was stalled for ten ticks
+    while await scheduler.run_due():
+        pass
+
+    assert rec.scheduled == expected_scheduled
+    assert [f.missed for f in rec.fires] == expected_missed
+    assert scheduler.next_fire_at("t") == T0 + 660
+
+
+@pytest.mark.asyncio
+async def test_skip_still_fires_a_tick_within_grace() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock, grace_seconds=30)
+    rec = Recorder()
+    scheduler.schedule("t", rec, interval_seconds=60, catch_up="skip")
+
+    clock.t = T0 + 610
+    await scheduler.run_due()
+
+    assert rec.scheduled == [600.0] and rec.fires[0].missed == 9
+    assert scheduler.stats.skipped == 0
+
+
+@pytest.mark.asyncio
+async def test_all_coalesces_a_backlog_past_max_catch_up() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock, max_catch_up=5)
+    rec = Recorder()
+    scheduler.schedule("t", rec, interval_seconds=60, catch_up="all")
+
+    clock.t = T0 + 24 * 3600
+    while await scheduler.run_due():
+        pass
+
+    assert len(rec.fires) == 1 and rec.fires[0].missed == 24 * 60 - 1
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ticks_coalesce_while_a_fire_runs() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock)
+    rec = Recorder(clock, work=150.0)  # longer than two intervals
+    scheduler.schedule("t", rec, interval_seconds=60)
+
+    while clock.t < T0 + 600:
+        clock.t = max(clock.t, scheduler.next_fire_at("t"))
+        await scheduler.run_due()
+
+    # 60 runs until 210, so 120 and 180 fold into the 180 fire, and so on.
+    assert rec.scheduled == [60.0, 180.0, 360.0, 480.0]
+    assert [f.missed for f in rec.fires] == [0, 1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_jitter_delays_each_deadline_but_not_the_grid() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock, rng=random.Random(3))
+    rec = Recorder()
+    scheduler.schedule("t", rec, interval_seconds=60, jitter_seconds=10)
+
+    deadlines = []
+    for _ in range(20):
+        deadlines.append(scheduler.next_fire_at("t"))
+        clock.t = deadlines[-1]
+        await scheduler.run_due()
+
+    offsets = [d - T0 - 60.0 * k for k, d in enumerate(deadlines, start=1)]
+    assert all(0 <= o <= 10 for o in offsets) and len(set(offsets)) > 1
+    assert rec.scheduled == [60.0 * k for k in range(1, 21)]
+
+
+@pytest.mark.asyncio
+async def test_next_deadlines_persist_across_restarts(tmp_path) -> None:
+    state = tmp_path / "triggers" / "schedule.json"
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock, state_path=state)
+    rec = Recorder()
+    scheduler.schedule("hourly", rec, interval_seconds=3600)
+    scheduler.schedule("daily", rec, cron="0 9 * * *")
+    await _advance(scheduler, clock, until=3600, step=600)
+    scheduler.save()
+    assert json.loads(state.read_text())["triggers"]["hourly"]["next_at"] == T0 + 7200
+
+    # Down for five hours; the hourly trigger resumes its phase and fires
+    # once for what it missed, the daily one is not due yet.
+    clock.t = T0 + 5 * 3600 + 1800
+    restarted = TriggerScheduler(clock=clock, state_path=state)
+    after = Recorder()
+    restarted.schedule("hourly", after, interval_seconds=3600)
+    restarted.schedule("daily", after, cron="0 9 * * *")
+    await restarted.run_due()
+
+    assert after.scheduled == [5 * 3600.0] and after.fires[0].missed == 3
+    assert restarted.next_fire_at("hourly") == T0 + 6 * 3600
+    assert restarted.next_fire_at("daily") == T0 + 24 * 3600
+
+    # A changed schedule starts fresh instead of resuming.
+    restarted.schedule("hourly", after, interval_seconds=600)
+    assert restarted.next_fire_at("hourly") == clock.t + 600
+
+
+@pytest.mark.asyncio
+async def test_thousands_of_triggers_respect_the_concurrency_cap() -> None:
+    clock = FakeClock()
+    cap = 16
+    scheduler = TriggerScheduler(clock=clock, max_concurrent=cap)
+    rng = random.Random(11)
+    intervals = {f"t{i}": rng.choice([60, 90, 300, 600]) for i in range(5000)}
+    running = peak = 0
+    fires: dict[str, list[float]] = {key: [] for key in intervals}
+
+    def callback(key):
+        async def fire(f: TriggerFire) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            fires[key].append(f.scheduled_at - T0)
+            await asyncio.sleep(0)
+            running -= 1
+
+        return fire
+
+    for key, interval in intervals.items():
+        scheduler.schedule(key, callback(key), interval_seconds=interval, run_immediately=True)
+    assert len(scheduler) == 5000
+
+    await _advance(scheduler, clock, until=1800, step=30)
+
+    assert peak == cap == scheduler.stats.max_inflight
+    for key, interval in intervals.items():
+        assert fires[key] == [float(interval * k) for k in range(1800 // interval + 1)], key
+    assert scheduler.stats.failed == scheduler.stats.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_are_contained_and_cancel_unregisters() -> None:
+    clock = FakeClock()
+    scheduler = TriggerScheduler(clock=clock)
+    good = Recorder()
+
+    async def broken(fire: TriggerFire) -> None:
+        raise RuntimeError("boom")
+
+    scheduler.schedule("broken", broken, interval_seconds=60)
+    scheduler.schedule("good", good, interval_seconds=60)
+    with pytest.raises(ValueError):
+        scheduler.schedule("bad", good, cron="not a cron")
+    await _advance(scheduler, clock, until=120, step=60)
+    assert scheduler.stats.failed == 2 and len(good.fires) == 2
+    assert scheduler.next_fire_at("broken") == T0 + 180
+
+    assert scheduler.cancel("broken") and not scheduler.cancel("broken")
+    await _advance(scheduler, clock, until=240, step=60)
+    assert scheduler.stats.failed == 2 and "broken" not in scheduler
+
+
+@pytest.mark.asyncio
+async def test_real_loop_fires_on_the_grid_and_task_cancel_unregisters() -> None:
+    scheduler = TriggerScheduler()
+    scheduler.start()
+    fires: list[TriggerFire] = []
+
+    async def slow(fire: TriggerFire) -> None:
+        fires.append(fire)
+        await asyncio.sleep(0.03)
+
+    task = scheduler.schedule_task("t", slow, interval_seconds=0.05)
+    await asyncio.sleep(0.4)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await scheduler.wait_idle()
+    count = len(fires)
+    await asyncio.sleep(0.1)
+
+    assert "t" not in scheduler and len(fires) == count >= 3
+    first = fires[0].scheduled_at
+    assert all(abs(round((f.scheduled_at - first) / 0.05) * 0.05 - (f.scheduled_at - first)) < 1e-6 for f in fires)
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_colony_timers_fire_through_the_shared_scheduler(tmp_path) -> None:
+    from unittest.mock import AsyncMock
+
+    from framework.agent_loop.types import AgentSpec
+    from framework.host.colony_runtime import ColonyRuntime, TriggerSpec
+    from framework.host.event_bus import EventBus
+    from framework.host.trigger_scheduler import default_trigger_scheduler
+    from framework.llm.mock import MockLLMProvider
+    from framework.schemas.goal import Goal
+
+    runtime = ColonyRuntime(
+        agent_spec=AgentSpec(id="t", name="t", description="t", system_prompt="t", agent_type="event_loop", output_keys=[]),
+        goal=Goal(id="g", name="g", description="g"),
+        storage_path=tmp_path / "colony",
+        llm=MockLLMProvider(),
+        tools=[],
+        tool_executor=None,
+        event_bus=EventBus(),
+        stream_id="timers",
+        pipeline_stages=[],
+    )
+    runtime.register_trigger(
+        TriggerSpec(id="tick", name="tick", trigger_type="timer", trigger_config={"interval_minutes": 0.001, "run_immediately": True})
+    )
+    runtime.register_trigger(TriggerSpec(id="nightly", name="nightly", trigger_type="timer", trigger_config={"cron": "0 3 * * *"}))
+    runtime.trigger = AsyncMock(return_value="w")
+    await runtime.start()
+    try:
+        await asyncio.sleep(0.2)
+        assert runtime.trigger.await_count >= 2
+        trigger_id, payload = runtime.trigger.await_args_list[0].args
+        assert trigger_id == "tick" and payload["event"]["source"] == "timer"
+        assert payload["event"]["missed_ticks"] == 0
+        assert 0 < runtime.get_timer_next_fire_in("nightly") <= 24 * 3600
+        assert runtime._timer_key("nightly") in default_trigger_scheduler()
+    finally:
+        await runtime.stop()
+    assert runtime.get_timer_next_fire_in("nightly") is None
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+async def _per_trigger_loops(n: int, interval: float, work: float, duration: float) -> tuple[list[list[float]], int]:
+    """The previous design: one task per trigger, sleeping the interval
+    after each fire."""
+    fires: list[list[float]] = [[] for _ in range(n)]
+    running = peak = 0
+
+    async def loop(i: int) -> None:
+        nonlocal running, peak
+        while True:
+            await asyncio.sleep(interval)
+            fires[i].append(time.time())
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(work)
+            running -= 1
+
+    tasks = [asyncio.create_task(loop(i)) for i in range(n)]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return fires, peak
+
+
+async def _scheduled(n: int, interval: float, work: float, duration: float, cap: int) -> tuple[list[list[float]], int]:
+    scheduler = TriggerScheduler(max_concurrent=cap)
+    scheduler.start()
+    fires: list[list[float]] = [[] for _ in range(n)]
+
+    def callback(i: int):
+        async def fire(f: TriggerFire) -> None:
+            fires[i].append(f.scheduled_at)
+            await asyncio.sleep(work)
+
+        return fire
+
+    for i in range(n):
+        scheduler.schedule(f"t{i}", callback(i), interval_seconds=interval)
+    await asyncio.sleep(duration)
+    await scheduler.stop()
+    return fires, scheduler.stats.max_inflight
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_many_timers_drift_and_concurrency() -> None:
+    # cap * interval / work >= n, so the cap alone never makes fires late.
+    n, interval, work, duration, cap = 200, 0.25, 0.1, 1.6, 128
+    rows = {}
+    for name, run in (
+        ("per-trigger loops", lambda: _per_trigger_loops(n, interval, work, duration)),
+        ("scheduler", lambda: _scheduled(n, interval, work, duration, cap)),
+    ):
+        fires, peak = await run()
+        rows[name] = (sum(len(f) for f in fires) / n, peak)
+
+    # Loops drift by the callback time every fire; the scheduler keeps the grid.
+    assert rows["scheduler"][0] > rows["per-trigger loops"][0]
+    assert rows["scheduler"][1] <= cap
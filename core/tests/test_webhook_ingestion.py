@@ -0,0 +1,382 @@
+"""Durable, batched webhook ingestion.
+
+Requests are sent to a real ``WebhookServer`` on an ephemeral port with a
+journal in a temp directory.  The benchmark at the bottom drives it with
+a local load generator and compares it with publishing inline, before
+acknowledging, against a subscriber that takes a few milliseconds per
+event; it is opt-in, run with ``-m benchmark -s`` for requests/sec and
+p99 ack latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from framework.host.event_bus import EventBus, EventType
+from framework.host.webhook_journal import WebhookJournal
+from framework.host.webhook_server import WebhookRoute, WebhookServer, WebhookServerConfig
+
+
+class _Collector:
+    """Bus subscriber that records payloads; ``gate`` holds it until set."""
+
+    def __init__(self, bus: EventBus, delay: float = 0.0) -> None:
+        self.payloads: list[dict] = []
+        self.delay = delay
+        self.gate = asyncio.Event()
+        self.gate.set()
+        bus.subscribe(event_types=[EventType.WEBHOOK_RECEIVED], handler=self._on_event)
+
+    async def _on_event(self, event) -> None:
+        await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.payloads.append(event.data["payload"])
+
+    async def wait_for(self, n: int, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self.payloads) < n:
+            assert time.monotonic() < deadline, f"got {len(self.payloads)} of {n} events"
+            await asyncio.sleep(0.01)
+
+
+async def _server(
+    tmp_path, bus: EventBus, *, secret: str | None = None, dedup_body: bool = False, cls=WebhookServer, **config
+) -> tuple[WebhookServer, str]:
+    server = cls(bus, WebhookServerConfig(port=0, journal_dir=tmp_path / "journal", **config))
+    server.add_route(WebhookRoute(source_id="gh", path="/hooks/gh", methods=["POST"], secret=secret, dedup_body=dedup_body))
+    await server.start()
+    return server, f"http://127.0.0.1:{server.port}/hooks/gh"
+
+
+@pytest.mark.asyncio
+async def test_acks_before_publishing_and_delivers_all(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    collector.gate.clear()  # subscribers are stuck
+    server, url = await _server(tmp_path, bus)
+    try:
+        async with aiohttp.ClientSession() as http:
+            statuses = await asyncio.gather(*(_post(http, url, {"n": i}) for i in range(20)))
+        assert statuses == [202] * 20
+        assert collector.payloads == []
+
+        collector.gate.set()
+        await collector.wait_for(20)
+        assert sorted(p["n"] for p in collector.payloads) == list(range(20))
+    finally:
+        await server.stop()
+
+
+async def _post(http: aiohttp.ClientSession, url: str, payload: dict, headers: dict | None = None) -> int:
+    async with http.post(url, json=payload, headers=headers or {}) as resp:
+        await resp.read()
+        return resp.status
+
+
+@pytest.mark.asyncio
+async def test_redeliveries_are_acked_but_published_once(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    server, url = await _server(tmp_path, bus)
+    try:
+        async with aiohttp.ClientSession() as http:
+            delivery = {"X-GitHub-Delivery": "d-1"}
+            assert await _post(http, url, {"action": "opened"}, delivery) == 202
+            async with http.post(url, json={"action": "edited"}, headers=delivery) as resp:
+                assert resp.status == 202 and (await resp.json())["status"] == "duplicate"
+            # No delivery ID: identical pings are separate deliveries.
+            assert await _post(http, url, {"ping": 1}) == 202
+            assert await _post(http, url, {"ping": 1}) == 202
+        await collector.wait_for(3)
+        await asyncio.sleep(0.05)
+        assert collector.payloads == [{"action": "opened"}, {"ping": 1}, {"ping": 1}]
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_body_dedup_is_opt_in_and_skips_empty_bodies(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    server, url = await _server(tmp_path, bus, dedup_body=True, drain_concurrency=1)
+    try:
+        async with aiohttp.ClientSession() as http:
+            assert await _post(http, url, {"ping": 1}) == 202
+            async with http.post(url, json={"ping": 1}) as resp:
+                assert (await resp.json())["status"] == "duplicate"
+            for _ in range(2):
+                async with http.post(url, data=b"") as resp:
+                    assert (await resp.json())["status"] == "accepted"
+        await collector.wait_for(3)
+        await asyncio.sleep(0.05)
+        assert collector.payloads == [{"ping": 1}, {}, {}]
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_is_rejected_before_journaling(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    server, url = await _server(tmp_path, bus, secret="s3cret")
+    body = json.dumps({"ok": True}).encode()
+    good = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    try:
+        async with aiohttp.ClientSession() as http:
+            async with http.post(url, data=body, headers={"X-Hub-Signature-256": "sha256=bad"}) as resp:
+                assert resp.status == 401
+            async with http.post(url, data=body, headers={"X-Hub-Signature-256": good}) as resp:
+                assert resp.status == 202
+        await collector.wait_for(1)
+        journaled = [line for f in (tmp_path / "journal").glob("journal-*.jsonl") for line in f.read_text().splitlines()]
+        assert len(journaled) == 1
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_secret_headers_are_redacted_before_journaling(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    server, url = await _server(tmp_path, bus, secret="s3cret")
+    body = json.dumps({"ok": True}).encode()
+    signature = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    headers = {"X-Hub-Signature-256": signature, "Authorization": "Bearer tok-123", "X-GitHub-Event": "push"}
+    try:
+        async with aiohttp.ClientSession() as http, http.post(url, data=body, headers=headers) as resp:
+            assert resp.status == 202
+        await collector.wait_for(1)
+        journal = "".join(f.read_text() for f in (tmp_path / "journal").glob("journal-*.jsonl"))
+        assert "tok-123" not in journal and signature not in journal
+        (record,) = [json.loads(line) for line in journal.splitlines()]
+        assert record["headers"]["Authorization"] == "[redacted]"
+        assert record["headers"]["X-Hub-Signature-256"] == "[redacted]"
+        assert record["headers"]["X-GitHub-Event"] == "push"
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_is_retried_then_dead_lettered(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    emit = bus.emit_webhook_received
+    attempts: dict[int, int] = {}
+
+    async def flaky(**kwargs):
+        n = kwargs["payload"]["n"]
+        attempts[n] = attempts.get(n, 0) + 1
+        if n == 1 and attempts[n] < 2:
+            raise RuntimeError("subscriber store down")  # recovers on retry
+        if n == 2:
+            raise RuntimeError("subscriber store down")  # never recovers
+        await emit(**kwargs)
+
+    bus.emit_webhook_received = flaky
+    server, url = await _server(tmp_path, bus, publish_retry_delay=0, drain_concurrency=1, drain_batch_size=2)
+    journal = server._journal
+    async with aiohttp.ClientSession() as http:
+        for i in range(8):
+            assert await _post(http, url, {"n": i}) == 202
+    await collector.wait_for(7)
+    await server.stop()
+    assert [p["n"] for p in collector.payloads] == [0, 1, 3, 4, 5, 6, 7]
+    assert attempts[1] == 2 and attempts[2] == 3
+    assert journal.cursor == 8 and journal.backlog == 0, "later deliveries commit past the failed one"
+    dead = [json.loads(line) for line in (tmp_path / "journal" / "dead-letter.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(r["seq"], r["payload"]["n"]) for r in dead] == [(3, 2)]
+
+    # Nothing is replayed after a restart: the failed delivery is in the dead-letter file.
+    bus = EventBus()
+    replayed = _Collector(bus)
+    server, _ = await _server(tmp_path, bus)
+    try:
+        await asyncio.sleep(0.1)
+        assert replayed.payloads == []
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_cursor_waits_while_dead_lettering_fails(tmp_path, monkeypatch) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    emit = bus.emit_webhook_received
+
+    async def fail_first(**kwargs):
+        if kwargs["payload"]["n"] == 0:
+            raise RuntimeError("subscriber store down")
+        await emit(**kwargs)
+
+    bus.emit_webhook_received = fail_first
+    calls = []
+
+    def broken_dead_letter(records):
+        calls.append([r["seq"] for r in records])
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return real_dead_letter(records)
+
+    server, url = await _server(tmp_path, bus, publish_attempts=1, drain_concurrency=1, drain_batch_size=1)
+    journal = server._journal
+    real_dead_letter = journal.dead_letter
+    monkeypatch.setattr(journal, "dead_letter", broken_dead_letter)
+    try:
+        async with aiohttp.ClientSession() as http:
+            assert await _post(http, url, {"n": 0}) == 202
+            await asyncio.sleep(0.1)
+            assert journal.cursor == 0, "held until the failed delivery is set aside"
+            assert await _post(http, url, {"n": 1}) == 202
+        await collector.wait_for(1)
+        await asyncio.sleep(0.1)
+        assert calls == [[1], [1]]
+        assert journal.cursor == 2
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_acked_deliveries_survive_a_restart(tmp_path) -> None:
+    stuck_bus = EventBus()
+    stuck = _Collector(stuck_bus)
+    stuck.gate.clear()
+    server, url = await _server(tmp_path, stuck_bus)
+    async with aiohttp.ClientSession() as http:
+        for i in range(5):
+            assert await _post(http, url, {"n": i}, {"X-GitHub-Delivery": f"d-{i}"}) == 202
+    await server.stop(drain_timeout=0.1)
+    assert stuck.payloads == []
+
+    bus = EventBus()
+    collector = _Collector(bus)
+    server, url = await _server(tmp_path, bus)
+    try:
+        await collector.wait_for(5)
+        assert [p["n"] for p in collector.payloads] == list(range(5))
+        # Dedup state is rebuilt from the journal too.
+        async with aiohttp.ClientSession() as http, http.post(url, json={"n": 0}, headers={"X-GitHub-Delivery": "d-0"}) as resp:
+            assert (await resp.json())["status"] == "duplicate"
+    finally:
+        await server.stop()
+
+    bus = EventBus()
+    again = _Collector(bus)
+    server, _ = await _server(tmp_path, bus)
+    await asyncio.sleep(0.1)
+    await server.stop()
+    assert again.payloads == []
+
+
+@pytest.mark.asyncio
+async def test_backlog_limit_returns_503(tmp_path) -> None:
+    bus = EventBus()
+    collector = _Collector(bus)
+    collector.gate.clear()
+    server, url = await _server(tmp_path, bus, max_backlog=3, drain_batch_size=1, drain_concurrency=1)
+    try:
+        async with aiohttp.ClientSession() as http:
+            statuses = [await _post(http, url, {"n": i}) for i in range(6)]
+        assert statuses[:3] == [202] * 3
+        assert 503 in statuses[3:]
+    finally:
+        collector.gate.set()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_journal_rotates_drops_published_segments_and_skips_torn_tail(tmp_path) -> None:
+    journal = WebhookJournal(root=tmp_path / "j", segment_max_bytes=300)
+    assert journal.open() == []
+    records = [await journal.append({"payload": {"n": i, "pad": "x" * 100}}, key=f"k{i}") for i in range(10)]
+    assert [r["seq"] for r in records] == list(range(1, 11))
+    assert len(list(journal.root.glob("journal-*.jsonl"))) > 3
+
+    # Published segments stay while their keys are inside the dedup window.
+    journal.commit_cursor(6)
+    await journal.close()
+    segments = sorted(journal.root.glob("journal-*.jsonl"))
+    assert len(segments) > 3
+    with open(segments[-1], "ab") as f:
+        f.write(b'{"seq": 11, "payl')  # crash mid-write
+
+    reopened = WebhookJournal(root=tmp_path / "j", segment_max_bytes=300)
+    replay = reopened.open()
+    assert [r["payload"]["n"] for r in replay] == [6, 7, 8, 9]
+    assert reopened.is_duplicate("k0") and not reopened.is_duplicate("k99")
+    assert (await reopened.append({"payload": {}}))["seq"] == 11
+    await reopened.close()
+
+    pruned = WebhookJournal(root=tmp_path / "j", dedup_window_seconds=0)
+    assert [r["seq"] for r in pruned.open()] == [7, 8, 9, 10, 11]
+    pruned.commit_cursor(11)
+    await pruned.close()
+    assert len(list(journal.root.glob("journal-*.jsonl"))) == 1
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+class _InlineWebhookServer(WebhookServer):
+    """The previous behaviour: publish to the bus before acknowledging."""
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        await self._event_bus.emit_webhook_received(
+            source_id="gh",
+            path=request.path,
+            method=request.method,
+            headers=dict(request.headers),
+            payload=json.loads(body),
+            query_params=dict(request.query),
+        )
+        return web.json_response({"status": "accepted"}, status=202)
+
+
+async def _load(url: str, total: int, concurrency: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    counter = iter(range(total))
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as http:
+
+        async def client() -> None:
+            for i in counter:
+                t0 = time.perf_counter()
+                async with http.post(url, json={"n": i}, headers={"X-GitHub-Delivery": f"d-{i}"}) as resp:
+                    await resp.read()
+                    assert resp.status == 202
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - t0, sorted(latencies)
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_ingestion_throughput_and_ack_latency(tmp_path) -> None:
+    total, concurrency, handler_ms = 600, 32, 5
+    print(f"\n{total} webhooks, {concurrency} concurrent clients, bus subscriber takes {handler_ms} ms per event")
+    rows = {}
+    for name, cls in (("inline publish", _InlineWebhookServer), ("journaled", WebhookServer)):
+        bus = EventBus(max_concurrent_handlers=4)
+        collector = _Collector(bus, delay=handler_ms / 1000)
+        server, url = await _server(tmp_path / name.replace(" ", "_"), bus, cls=cls)
+        try:
+            elapsed, latencies = await _load(url, total, concurrency)
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+            rows[name] = (total / elapsed, p99)
+            print(f"  {name:15} {total / elapsed:7.0f} req/s   p99 ack {p99:7.1f} ms")
+            await collector.wait_for(total, timeout=60)
+        finally:
+            await server.stop(drain_timeout=60)
+
+    assert rows["journaled"][1] < rows["inline publish"][1]
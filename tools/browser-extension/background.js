@@ -73,7 +73,14 @@ function wsSend(obj) {
 //       Hive tabs that escaped into a new window. Bridge feature-gates the
 //       listUngrouped reaper on protocol >= 6; an older bridge ignores the
 //       "regrouped" reason harmlessly.
-const EXTENSION_PROTOCOL_VERSION = 6;
+//   7 — forwards DOM mutation events (DOM.documentUpdated, childNodeInserted,
+//       attributeModified, …), Accessibility.nodesUpdated and
+//       Page.navigatedWithinDocument so the bridge can keep a per-tab AX tree
+//       cache and re-fetch only dirty subtrees on snapshot. DOM node payloads
+//       are slimmed to the ids and structure the cache needs. Bridge gates
+//       incremental snapshots on protocol >= 7; older extensions get a full
+//       getFullAXTree per snapshot as before.
+const EXTENSION_PROTOCOL_VERSION = 7;
 const EXTENSION_VERSION = (chrome.runtime.getManifest && chrome.runtime.getManifest().version) || "0.0.0";
 
 async function getOrCreateExtensionId() {
@@ -788,15 +795,64 @@ const FORWARDED_CDP_EVENTS = new Set([
   // navigation poll loop instead of timing out at 30s.
   "Page.javascriptDialogOpening",
   "Page.javascriptDialogClosed",
+  // Snapshot cache invalidation (protocol 7). DOM events only fire once the
+  // bridge has called DOM.getDocument for the tab, i.e. after its first
+  // snapshot; nodesUpdated needs Accessibility.enable.
+  "Page.navigatedWithinDocument",
+  "Accessibility.nodesUpdated",
+  "DOM.documentUpdated",
+  "DOM.setChildNodes",
+  "DOM.childNodeInserted",
+  "DOM.childNodeRemoved",
+  "DOM.childNodeCountUpdated",
+  "DOM.attributeModified",
+  "DOM.attributeRemoved",
+  "DOM.characterDataModified",
+  "DOM.inlineStyleInvalidated",
+  "DOM.shadowRootPushed",
+  "DOM.shadowRootPopped",
+  "DOM.pseudoElementAdded",
+  "DOM.pseudoElementRemoved",
 ]);
 
+// The bridge's snapshot cache only needs ids and structure from DOM nodes;
+// attribute lists and text values would be the bulk of each event.
+function slimDomNode(node) {
+  if (!node) return node;
+  const out = { nodeId: node.nodeId, backendNodeId: node.backendNodeId };
+  if (node.childNodeCount != null) out.childNodeCount = node.childNodeCount;
+  if (node.children) out.children = node.children.map(slimDomNode);
+  if (node.shadowRoots) out.shadowRoots = node.shadowRoots.map(slimDomNode);
+  if (node.contentDocument) out.contentDocument = slimDomNode(node.contentDocument);
+  if (node.templateContent) out.templateContent = slimDomNode(node.templateContent);
+  return out;
+}
+
+function slimDomEvent(method, params) {
+  switch (method) {
+    case "DOM.setChildNodes":
+      return { parentId: params.parentId, nodes: (params.nodes || []).map(slimDomNode) };
+    case "DOM.childNodeInserted":
+      return { parentNodeId: params.parentNodeId, node: slimDomNode(params.node) };
+    case "DOM.shadowRootPushed":
+      return { hostId: params.hostId, root: slimDomNode(params.root) };
+    case "DOM.pseudoElementAdded":
+      return { parentId: params.parentId };
+    case "DOM.attributeModified":
+    case "DOM.characterDataModified":
+      return { nodeId: params.nodeId };
+    default:
+      return params;
+  }
+}
+
 chrome.debugger.onEvent.addListener((source, method, params) => {
   if (!FORWARDED_CDP_EVENTS.has(method)) return;
   wsSend({
     type: "cdp_event",
     tabId: source.tabId,
     method,
-    params: params ?? {},
+    params: method.startsWith("DOM.") ? slimDomEvent(method, params ?? {}) : params ?? {},
   });
 });
 
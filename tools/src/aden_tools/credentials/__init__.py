@@ -87,7 +87,11 @@
 from .greenhouse import GREENHOUSE_CREDENTIALS
 from .health_check import (
     HealthCheckResult,
+    acheck_credential_health,
+    acheck_credentials_health,
     check_credential_health,
+    check_credentials_health,
+    invalidate_health_cache,
 )
 from .hubspot import HUBSPOT_CREDENTIALS
 from .huggingface import HUGGINGFACE_CREDENTIALS
@@ -239,6 +243,10 @@
     # Health check utilities
     "HealthCheckResult",
     "check_credential_health",
+    "check_credentials_health",
+    "acheck_credential_health",
+    "acheck_credentials_health",
+    "invalidate_health_cache",
     # Browser utilities for OAuth2 flows
     "open_browser",
     "get_aden_auth_url",
@@ -4,11 +4,36 @@
 Validates that stored credentials are valid before agent execution.
 Each integration has a lightweight health check that makes a minimal API call
 to verify the credential works.
+
+``check_credential_health`` checks one credential. To validate many at once
+(agent startup, the credentials UI) use ``check_credentials_health`` or its
+async twin ``acheck_credentials_health``: checkers run concurrently on a
+bounded worker pool, share one pooled ``httpx.Client`` (so repeat hosts
+reuse TLS connections), keep their own per-provider ``TIMEOUT`` per
+request, and get an overall deadline per check. Checkers that make several
+requests (Google's per-scope endpoints) issue them in parallel during a
+sweep. A sweep takes about as long as the slowest provider instead of the
+sum of all of them.
+
+Sweep results are cached for ``HIVE_CREDENTIAL_HEALTH_TTL`` seconds
+(default 300), keyed by a hash of the credential name, value and checker
+arguments, so a changed credential is always re-checked. Transient failures
+(timeouts, connection errors, rate limiting) are not cached.
+``invalidate_health_cache`` drops entries explicitly.
 """
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import json
 import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Any, Protocol
 
@@ -45,6 +70,60 @@ def check(self, credential_value: str) -> HealthCheckResult:
         ...
 
 
+# ── HTTP client plumbing ─────────────────────────────────────────────
+
+# The pooled client of the sweep running on this thread, if any.
+_SHARED_CLIENT: contextvars.ContextVar[httpx.Client | None] = contextvars.ContextVar("health_check_shared_client", default=None)
+
+
+class _SharedClient:
+    """A shared ``httpx.Client`` bound to one checker's timeout."""
+
+    def __init__(self, client: httpx.Client, timeout: float) -> None:
+        self._client = client
+        self._timeout = timeout
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return self._client.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return self._client.post(url, **kwargs)
+
+
+@contextmanager
+def _http_client(timeout: float) -> Iterator[Any]:
+    """The sweep's shared client when called from a sweep, else a
+    short-lived ``httpx.Client`` of the checker's own."""
+    shared = _SHARED_CLIENT.get()
+    if shared is not None:
+        yield _SharedClient(shared, timeout)
+        return
+    with httpx.Client(timeout=timeout) as client:
+        yield client
+
+
+def _get_each(client: Any, requests: list[tuple[str, dict[str, Any]]]) -> Iterator[httpx.Response]:
+    """Responses to ``client.get(url, **kwargs)`` for each request, in order.
+
+    Outside a sweep the requests are made lazily one at a time, so a caller
+    that stops early skips the rest. In a sweep they are all sent at once
+    and yielded in order as they complete.
+    """
+    if not isinstance(client, _SharedClient):
+        for url, kwargs in requests:
+            yield client.get(url, **kwargs)
+        return
+    futures = [_fanout_pool().submit(client.get, url, **kwargs) for url, kwargs in requests]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
 class HubSpotHealthChecker:
     """Health checker for HubSpot credentials."""
 
@@ -58,7 +137,7 @@ def check(self, access_token: str) -> HealthCheckResult:
         Makes a GET request for 1 contact to verify the token works.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={
@@ -119,7 +198,7 @@ def check(self, access_token: str) -> HealthCheckResult:
         api_domain = os.getenv("ZOHO_API_DOMAIN", "https://www.zohoapis.com").rstrip("/")
         endpoint = f"{api_domain}/crm/v2/users?type=CurrentUser"
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     endpoint,
                     headers={
@@ -184,7 +263,7 @@ def check(self, api_key: str) -> HealthCheckResult:
         Makes a minimal search request to verify the key works.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={"X-Subscription-Token": api_key},
@@ -250,7 +329,7 @@ def _extract_identity(self, data: dict) -> dict[str, str]:
 
     def check(self, access_token: str) -> HealthCheckResult:
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.endpoint,
                     headers={
@@ -443,7 +522,7 @@ def check(self, credential_value: str) -> HealthCheckResult:
             auth = self._build_auth(credential_value)
             json_body = self._build_json_body(credential_value)
 
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 kwargs: dict[str, Any] = {"headers": headers}
                 if params:
                     kwargs["params"] = params
@@ -502,11 +581,11 @@ def check(self, access_token: str) -> HealthCheckResult:
         missing_scopes: list[str] = []
 
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
-                for scope, url in self.ENDPOINTS.items():
-                    params = {"maxResults": "1"} if scope == "calendar" else {}
-                    response = client.get(url, headers=headers, params=params)
-
+            with _http_client(self.TIMEOUT) as client:
+                requests = [
+                    (url, {"headers": headers, "params": {"maxResults": "1"} if scope == "calendar" else {}}) for scope, url in self.ENDPOINTS.items()
+                ]
+                for scope, response in zip(self.ENDPOINTS, _get_each(client, requests), strict=True):
                     if response.status_code == 401:
                         return HealthCheckResult(
                             valid=False,
@@ -576,7 +655,7 @@ def check(self, api_key: str, cse_id: str | None = None) -> HealthCheckResult:
             )
 
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     params={
@@ -637,7 +716,7 @@ def check(self, bot_token: str) -> HealthCheckResult:
         This is Slack's recommended way to verify a token.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.post(
                     self.ENDPOINT,
                     headers={
@@ -695,7 +774,7 @@ def check(self, pat: str) -> HealthCheckResult:
         Validate Calendly PAT by fetching the authenticated user.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={
@@ -756,7 +835,7 @@ def check(self, token: str) -> HealthCheckResult:
         Validate GitHub PAT by fetching the authenticated user.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={
@@ -817,7 +896,7 @@ def check(self, bot_token: str) -> HealthCheckResult:
         Validate Discord Bot token by fetching bot user info.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={
@@ -877,7 +956,7 @@ def check(self, api_key: str) -> HealthCheckResult:
         Validate Resend API key by listing domains.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={
@@ -934,7 +1013,7 @@ def check(self, api_key: str) -> HealthCheckResult:
         Validate Google Maps API key with a minimal geocoding request.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     params={
@@ -1001,7 +1080,7 @@ def check(self, api_key: str) -> HealthCheckResult:
         Validate Lusha API key with a minimal person lookup.
         """
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(
                     self.ENDPOINT,
                     headers={"api_key": api_key, "Accept": "application/json"},
@@ -1057,7 +1136,7 @@ def check(self, base_url: str) -> HealthCheckResult:
         url = base_url.rstrip("/") + "/-/ready"
 
         try:
-            with httpx.Client(timeout=self.TIMEOUT) as client:
+            with _http_client(self.TIMEOUT) as client:
                 response = client.get(url)
 
                 if response.status_code == 200:
@@ -1449,6 +1528,11 @@ def check_credential_health(
         ... else:
         ...     print(f"Invalid: {result.message}")
     """
+    return _resolve_check(credential_name, credential_value, kwargs)()
+
+
+def _resolve_check(credential_name: str, credential_value: str, kwargs: dict[str, Any]) -> Callable[[], HealthCheckResult]:
+    """The zero-argument call that checks this credential."""
     checker = HEALTH_CHECKERS.get(credential_name)
 
     if checker is None:
@@ -1460,7 +1544,7 @@ def check_credential_health(
                 service_name=credential_name.replace("_", " ").title(),
             )
         else:
-            return HealthCheckResult(
+            return lambda: HealthCheckResult(
                 valid=True,
                 message=f"No health checker for '{credential_name}', assuming valid",
                 details={"no_checker": True},
@@ -1468,10 +1552,201 @@ def check_credential_health(
 
     # Special case for Google which needs CSE ID
     if credential_name == "google_search" and "cse_id" in kwargs:
-        checker = GoogleSearchHealthChecker()
-        return checker.check(credential_value, kwargs["cse_id"])
+        return lambda: GoogleSearchHealthChecker().check(credential_value, kwargs["cse_id"])
+
+    return lambda: checker.check(credential_value)
+
+
+# ── concurrent, cached sweep ─────────────────────────────────────────
+
+_SWEEP_CONCURRENCY = max(1, int(os.environ.get("HIVE_CREDENTIAL_HEALTH_CONCURRENCY", "8") or "8"))
+_CACHE_TTL = float(os.environ.get("HIVE_CREDENTIAL_HEALTH_TTL", "300") or "300")
+# Allowance on top of a checker's TIMEOUT before a check is abandoned.
+_DEADLINE_SLACK = 5.0
+
+_lock = threading.Lock()
+_sweep_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_fanout_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_shared_client: httpx.Client | None = None
+# credential name -> {hash of (name, value, kwargs): (expires_at, result)}
+_cache: dict[str, dict[str, tuple[float, HealthCheckResult]]] = {}
+
+HealthCheckRequest = tuple[str, str] | tuple[str, str, dict[str, Any]]
+
+
+def _sweep_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _sweep_executor
+    with _lock:
+        if _sweep_executor is None:
+            _sweep_executor = concurrent.futures.ThreadPoolExecutor(max_workers=_SWEEP_CONCURRENCY, thread_name_prefix="cred-health")
+        return _sweep_executor
+
+
+def _fanout_pool() -> concurrent.futures.ThreadPoolExecutor:
+    # Separate from the sweep pool: a sweep worker waiting on its own
+    # fan-out must never be waiting for a slot in the pool it occupies.
+    global _fanout_executor
+    with _lock:
+        if _fanout_executor is None:
+            _fanout_executor = concurrent.futures.ThreadPoolExecutor(max_workers=_SWEEP_CONCURRENCY, thread_name_prefix="cred-health-fanout")
+        return _fanout_executor
+
+
+def _client() -> httpx.Client:
+    global _shared_client
+    with _lock:
+        if _shared_client is None:
+            _shared_client = httpx.Client(
+                limits=httpx.Limits(max_connections=4 * _SWEEP_CONCURRENCY, max_keepalive_connections=2 * _SWEEP_CONCURRENCY),
+            )
+        return _shared_client
+
+
+def _cache_key(credential_name: str, credential_value: str, kwargs: dict[str, Any]) -> str:
+    payload = json.dumps([credential_name, credential_value, sorted(kwargs.items())], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cacheable(result: HealthCheckResult) -> bool:
+    """Definitive answers only: not timeouts, connection errors or 429s."""
+    return "error" not in result.details and not result.details.get("rate_limited")
+
+
+def _cache_get(credential_name: str, key: str) -> HealthCheckResult | None:
+    with _lock:
+        entry = _cache.get(credential_name, {}).get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _cache[credential_name][key]
+            return None
+        return entry[1]
+
+
+def _cache_put(credential_name: str, key: str, result: HealthCheckResult) -> None:
+    if _CACHE_TTL <= 0 or not _cacheable(result):
+        return
+    with _lock:
+        _cache.setdefault(credential_name, {})[key] = (time.monotonic() + _CACHE_TTL, result)
+
+
+def invalidate_health_cache(credential_name: str | None = None) -> None:
+    """Forget cached sweep results for one credential name, or all of them."""
+    with _lock:
+        if credential_name is None:
+            _cache.clear()
+        else:
+            _cache.pop(credential_name, None)
+
+
+def _checker_timeout(credential_name: str) -> float:
+    return float(getattr(HEALTH_CHECKERS.get(credential_name), "TIMEOUT", 10.0))
+
+
+def _timed_out(credential_name: str) -> HealthCheckResult:
+    return HealthCheckResult(
+        valid=False,
+        message=f"Health check for '{credential_name}' timed out",
+        details={"error": "timeout"},
+    )
+
+
+def _run_on_shared_client(call: Callable[[], HealthCheckResult]) -> HealthCheckResult:
+    token = _SHARED_CLIENT.set(_client())
+    try:
+        return call()
+    finally:
+        _SHARED_CLIENT.reset(token)
+
+
+def _normalise(checks: Iterable[HealthCheckRequest]) -> list[tuple[str, str, dict[str, Any]]]:
+    return [(c[0], c[1], dict(c[2]) if len(c) > 2 else {}) for c in checks]
+
+
+def check_credentials_health(
+    checks: Iterable[HealthCheckRequest],
+    *,
+    use_cache: bool = True,
+    return_exceptions: bool = False,
+) -> list[HealthCheckResult | BaseException]:
+    """Check many credentials concurrently. Blocking.
+
+    Args:
+        checks: ``(credential_name, credential_value)`` or
+            ``(credential_name, credential_value, kwargs)`` tuples; kwargs
+            are those of ``check_credential_health``.
+        use_cache: Serve and store results in the sweep cache.
+        return_exceptions: Return a checker's exception in its slot
+            instead of raising it.
+
+    Returns:
+        One result per check, in input order.
+    """
+    items = _normalise(checks)
+    results: list[HealthCheckResult | BaseException | None] = [None] * len(items)
+    pending: dict[int, tuple[str, concurrent.futures.Future]] = {}
+    for i, (name, value, kwargs) in enumerate(items):
+        key = _cache_key(name, value, kwargs)
+        cached = _cache_get(name, key) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+            continue
+        pending[i] = (key, _sweep_pool().submit(_run_on_shared_client, _resolve_check(name, value, kwargs)))
+
+    for i, (key, future) in pending.items():
+        name = items[i][0]
+        try:
+            result = future.result(timeout=_checker_timeout(name) + _DEADLINE_SLACK)
+        except concurrent.futures.TimeoutError:
+            results[i] = _timed_out(name)
+            continue
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            results[i] = exc
+            continue
+        if use_cache:
+            _cache_put(name, key, result)
+        results[i] = result
+    return results  # type: ignore[return-value]
+
+
+async def acheck_credentials_health(
+    checks: Iterable[HealthCheckRequest],
+    *,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+    return_exceptions: bool = False,
+) -> list[HealthCheckResult | BaseException]:
+    """Async ``check_credentials_health``: awaits checks without blocking
+    the event loop, at most ``concurrency`` (default
+    ``HIVE_CREDENTIAL_HEALTH_CONCURRENCY``, 8) at a time."""
+    items = _normalise(checks)
+    semaphore = asyncio.Semaphore(concurrency or _SWEEP_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+
+    async def one(name: str, value: str, kwargs: dict[str, Any]) -> HealthCheckResult:
+        key = _cache_key(name, value, kwargs)
+        cached = _cache_get(name, key) if use_cache else None
+        if cached is not None:
+            return cached
+        async with semaphore:
+            future = loop.run_in_executor(_sweep_pool(), _run_on_shared_client, _resolve_check(name, value, kwargs))
+            try:
+                result = await asyncio.wait_for(future, _checker_timeout(name) + _DEADLINE_SLACK)
+            except TimeoutError:
+                return _timed_out(name)
+        if use_cache:
+            _cache_put(name, key, result)
+        return result
+
+    return await asyncio.gather(*(one(*item) for item in items), return_exceptions=return_exceptions)
+
 
-    return checker.check(credential_value)
+async def acheck_credential_health(credential_name: str, credential_value: str, **kwargs: Any) -> HealthCheckResult:
+    """Async, cached ``check_credential_health``."""
+    (result,) = await acheck_credentials_health([(credential_name, credential_value, kwargs)])
+    return result  # type: ignore[return-value]
 
 
 def validate_integration_wiring(credential_name: str) -> list[str]:
@@ -553,32 +553,69 @@ def _is_binary(filepath: str) -> bool:
         return False
 
 
-def _levenshtein(a: str, b: str) -> int:
-    """Standard Levenshtein distance."""
-    if not a:
-        return len(b)
-    if not b:
-        return len(a)
+def _levenshtein(a: str, b: str, cutoff: int | None = None) -> int:
+    """Levenshtein distance, bit-parallel (Myers 1999, Hyyrö's global
+    variant).
+
+    One big-int bit vector holds a whole DP column, so the cost is one
+    Python step per character of the shorter string instead of one per
+    cell. With ``cutoff`` it returns ``cutoff + 1`` as soon as the
+    distance is known to exceed it — the length difference is a lower
+    bound, and the running score can fall by at most one per remaining
+    column.
+    """
+    if len(a) < len(b):
+        a, b = b, a
     m, n = len(a), len(b)
-    dp = list(range(n + 1))
-    for i in range(1, m + 1):
-        prev = dp[0]
-        dp[0] = i
-        for j in range(1, n + 1):
-            temp = dp[j]
-            if a[i - 1] == b[j - 1]:
-                dp[j] = prev
-            else:
-                dp[j] = 1 + min(prev, dp[j], dp[j - 1])
-            prev = temp
-    return dp[n]
-
-
-def _similarity(a: str, b: str) -> float:
+    if cutoff is not None and m - n > cutoff:
+        return cutoff + 1
+    if not n:
+        return m
+    peq: dict[str, int] = {}
+    bit = 1
+    for ch in a:
+        peq[ch] = peq.get(ch, 0) | bit
+        bit <<= 1
+    full = bit - 1
+    high = bit >> 1
+    pv, mv, score = full, 0, m
+    for j, ch in enumerate(b):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+        if cutoff is not None and score - (n - 1 - j) > cutoff:
+            return cutoff + 1
+    return score
+
+
+def _similarity(a: str, b: str, floor: float | None = None) -> float:
+    """``1 - distance / max length``. With ``floor``, results below it
+    are only guaranteed to be below it, not exact."""
     maxlen = max(len(a), len(b))
     if maxlen == 0:
         return 1.0
-    return 1.0 - _levenshtein(a, b) / maxlen
+    if floor is None:
+        return 1.0 - _levenshtein(a, b) / maxlen
+    # Largest distance that still scores >= floor, computed in the same
+    # float arithmetic as the result so boundary cases agree.
+    cutoff = int((1.0 - floor) * maxlen)
+    while cutoff < maxlen and 1.0 - (cutoff + 1) / maxlen >= floor:
+        cutoff += 1
+    while cutoff >= 0 and 1.0 - cutoff / maxlen < floor:
+        cutoff -= 1
+    if cutoff < 0:
+        return 0.0
+    return 1.0 - _levenshtein(a, b, cutoff) / maxlen
 
 
 # Unicode normalization map for fuzzy matching. LLMs frequently emit
@@ -602,6 +639,95 @@ def _unicode_normalize(s: str) -> str:
     return s
 
 
+def _strip_indent(lines: list[str]) -> str:
+    """Join ``lines`` with their common leading indent removed."""
+    non_empty = [ln for ln in lines if ln.strip()]
+    if not non_empty:
+        return "\n".join(lines)
+    min_indent = min(len(ln) - len(ln.lstrip()) for ln in non_empty)
+    return "\n".join(ln[min_indent:] for ln in lines)
+
+
+# Below this many lines a plain scan beats building the position map.
+_INDEX_MIN_LINES = 2_000
+
+
+class _LineIndex:
+    """Anchor index over a file's lines for the line-window strategies.
+
+    Trimmed lines are hashed to their positions, so a window search
+    starts only where the search block's rarest line occurs instead of
+    sliding over every offset. Per-line whitespace tokens (with prefix
+    counts) do the same for whitespace-normalized matching. Both are
+    built on first use, and the position map only for files of at least
+    ``_INDEX_MIN_LINES`` lines; smaller files are scanned directly.
+    """
+
+    def __init__(self, lines: list[str]) -> None:
+        self.lines = lines
+        self.trimmed = [ln.strip() for ln in lines]
+        self._positions: dict[str, list[int]] | None = None
+        self._tokens: list[list[str]] | None = None
+        self._token_prefix: list[int] | None = None
+
+    def positions(self, trimmed: str) -> list[int]:
+        """Ascending indexes of the lines that equal ``trimmed`` after stripping."""
+        if len(self.lines) < _INDEX_MIN_LINES:
+            return [i for i, t in enumerate(self.trimmed) if t == trimmed]
+        if self._positions is None:
+            self._positions = {}
+            for i, t in enumerate(self.trimmed):
+                self._positions.setdefault(t, []).append(i)
+        return self._positions.get(trimmed, [])
+
+    def trimmed_window_starts(self, search_trimmed: list[str]) -> list[int]:
+        """Ascending window starts whose lines equal ``search_trimmed``
+        line by line after stripping."""
+        n_lines, n_search = len(self.lines), len(search_trimmed)
+        if n_lines < _INDEX_MIN_LINES:
+            return [i for i in range(n_lines - n_search + 1) if self.trimmed[i : i + n_search] == search_trimmed]
+        best: list[int] | None = None
+        best_offset = 0
+        for offset, t in enumerate(search_trimmed):
+            hits = self.positions(t)
+            if not hits:
+                return []
+            if best is None or len(hits) < len(best):
+                best, best_offset = hits, offset
+        starts = []
+        for pos in best or ():
+            i = pos - best_offset
+            if 0 <= i <= n_lines - n_search and self.trimmed[i : i + n_search] == search_trimmed:
+                starts.append(i)
+        return starts
+
+    def token_window_starts(self, search_tokens: list[str], n_search: int):
+        """Window starts whose whitespace-separated tokens equal
+        ``search_tokens`` — i.e. whose whitespace-collapsed text matches."""
+        if self._tokens is None:
+            self._tokens = [ln.split() for ln in self.lines]
+            prefix = [0]
+            for toks in self._tokens:
+                prefix.append(prefix[-1] + len(toks))
+            self._token_prefix = prefix
+        tokens, prefix = self._tokens, self._token_prefix
+        want = len(search_tokens)
+        for i in range(len(self.lines) - n_search + 1):
+            if prefix[i + n_search] - prefix[i] != want:
+                continue
+            k = 0
+            for toks in tokens[i : i + n_search]:
+                for tok in toks:
+                    if tok != search_tokens[k]:
+                        break
+                    k += 1
+                else:
+                    continue
+                break
+            if k == want:
+                yield i
+
+
 def _fuzzy_find_candidates(content: str, old_text: str):
     """Yield candidate substrings from content that match old_text.
 
@@ -613,6 +739,12 @@ def _fuzzy_find_candidates(content: str, old_text: str):
     Order: exact → line-trimmed → whitespace-normalized →
     indentation-flexible → escape-normalized → trimmed-boundary →
     unicode-normalized → block-anchor → context-aware.
+
+    The line-window strategies look up candidate regions in a
+    :class:`_LineIndex` rather than sliding over every offset, and the
+    similarity strategies use a bit-parallel edit distance that gives up
+    once a threshold is out of reach. Both yield exactly what a full scan
+    would, in the same order.
     """
     # 1. Exact match
     if old_text in content:
@@ -627,31 +759,23 @@ def _fuzzy_find_candidates(content: str, old_text: str):
         return
 
     n_search = len(search_lines)
+    index = _LineIndex(content_lines)
+    search_trimmed = [sl.strip() for sl in search_lines]
 
     # 2. Line-trimmed match
-    for i in range(len(content_lines) - n_search + 1):
-        window = content_lines[i : i + n_search]
-        if all(cl.strip() == sl.strip() for cl, sl in zip(window, search_lines, strict=True)):
-            yield "\n".join(window)
-
-    # 3. Whitespace-normalized match (collapse runs of whitespace)
-    normalized_search = re.sub(r"\s+", " ", old_text).strip()
-    for i in range(len(content_lines) - n_search + 1):
-        window = content_lines[i : i + n_search]
-        normalized_block = re.sub(r"\s+", " ", "\n".join(window)).strip()
-        if normalized_block == normalized_search:
-            yield "\n".join(window)
-
-    # 4. Indentation-flexible match (strip common leading indent)
-    def _strip_indent(lines):
-        non_empty = [ln for ln in lines if ln.strip()]
-        if not non_empty:
-            return "\n".join(lines)
-        min_indent = min(len(ln) - len(ln.lstrip()) for ln in non_empty)
-        return "\n".join(ln[min_indent:] for ln in lines)
+    trimmed_starts = index.trimmed_window_starts(search_trimmed)
+    for i in trimmed_starts:
+        yield "\n".join(content_lines[i : i + n_search])
 
+    # 3. Whitespace-normalized match (collapse runs of whitespace).
+    # Collapsed texts are equal exactly when their token lists are.
+    for i in index.token_window_starts(old_text.split(), n_search):
+        yield "\n".join(content_lines[i : i + n_search])
+
+    # 4. Indentation-flexible match (strip common leading indent). Every
+    # such window is also line-trimmed-equal, so only those are checked.
     stripped_search = _strip_indent(search_lines)
-    for i in range(len(content_lines) - n_search + 1):
+    for i in trimmed_starts:
         block = content_lines[i : i + n_search]
         if _strip_indent(block) == stripped_search:
             yield "\n".join(block)
@@ -697,20 +821,19 @@ def _strip_indent(lines):
     # 8. Block-anchor match — first and last lines match exactly (after
     # trim), middle is allowed to drift if similarity is high enough.
     # Thresholds (0.50 / 0.70) are deliberately tight; older 0.10/0.30
-    # values silently matched unrelated blocks.
+    # values silently matched unrelated blocks. Similarities below 0.50
+    # can never be picked, so they are cut off early rather than computed.
     if n_search >= 3:
-        first_trimmed = search_lines[0].strip()
-        last_trimmed = search_lines[-1].strip()
+        last_trimmed = search_trimmed[-1]
+        middle_search = "\n".join(search_lines[1:-1])
         candidates = []
-        for i, line in enumerate(content_lines):
-            if line.strip() == first_trimmed:
-                end = i + n_search
-                if end <= len(content_lines) and content_lines[end - 1].strip() == last_trimmed:
-                    block = content_lines[i:end]
-                    middle_content = "\n".join(block[1:-1])
-                    middle_search = "\n".join(search_lines[1:-1])
-                    sim = _similarity(middle_content, middle_search)
-                    candidates.append((sim, "\n".join(block)))
+        for i in index.positions(search_trimmed[0]):
+            end = i + n_search
+            if end <= len(content_lines) and index.trimmed[end - 1] == last_trimmed:
+                block = content_lines[i:end]
+                middle_content = "\n".join(block[1:-1])
+                sim = _similarity(middle_content, middle_search, floor=0.50)
+                candidates.append((sim, "\n".join(block)))
         if candidates:
             candidates.sort(key=lambda x: x[0], reverse=True)
             threshold = 0.50 if len(candidates) == 1 else 0.70
@@ -719,13 +842,26 @@ def _strip_indent(lines):
 
     # 9. Context-aware match — last resort. Per-line similarity with
     # 50% threshold per line for heavily mangled but recognizable blocks.
+    # Lines are checked longest-first (the most selective anchor) and a
+    # window is dropped at its first line under 0.50; similarities are
+    # memoised per distinct line pair, since source files repeat lines.
     if n_search >= 2:
+        order = sorted(range(n_search), key=lambda j: -len(search_trimmed[j]))
+        memo: dict[tuple[str, int], float] = {}
         for i in range(len(content_lines) - n_search + 1):
-            window = content_lines[i : i + n_search]
-            sims = [_similarity(cl.strip(), sl.strip()) for cl, sl in zip(window, search_lines, strict=True)]
-            if sims and min(sims) >= 0.50 and (sum(sims) / len(sims)) >= 0.65:
-                yield "\n".join(window)
-                break
+            sims = [0.0] * n_search
+            for j in order:
+                key = (index.trimmed[i + j], j)
+                sim = memo.get(key)
+                if sim is None:
+                    sim = memo[key] = _similarity(key[0], search_trimmed[j], floor=0.50)
+                if sim < 0.50:
+                    break
+                sims[j] = sim
+            else:
+                if (sum(sims) / len(sims)) >= 0.65:
+                    yield "\n".join(content_lines[i : i + n_search])
+                    break
 
 
 def _compute_diff(old: str, new: str, path: str) -> str:
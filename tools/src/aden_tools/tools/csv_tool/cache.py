@@ -0,0 +1,171 @@
+"""Columnar cache behind ``csv_sql``.
+
+``csv_sql`` used to open a fresh in-memory DuckDB database per call and
+``CREATE TABLE data AS SELECT * FROM read_csv_auto(...)`` — a full parse
+and type-sniff of the file, held entirely in RAM, for every query. An agent
+issuing ten queries against a 2 GB file parsed it ten times and peaked at
+several GB each time.
+
+Now the first query against a file materialises it once as a
+zstd-compressed Parquet file under ``<HIVE_HOME>/cache/csv`` and every
+later query scans that through one shared DuckDB connection:
+
+* **Keyed by path, size and mtime.** Any change to the CSV gets a new key;
+  the stale Parquet file for the same path is deleted when the new one is
+  written.
+* **Same types as before.** The Parquet file is written from
+  ``read_csv_auto`` itself, so queries see the same inferred schema the
+  in-memory table had.
+* **Streaming scans.** Parquet is read column by column with projection
+  and filter pushdown, so a query touching two columns of a wide file
+  reads two columns, and nothing is held in RAM between queries.
+* **Bounded on disk.** Entries are evicted least-recently-used once the
+  directory exceeds ``HIVE_CSV_CACHE_MAX_BYTES`` (default 4 GiB).
+* **Small files skip it.** Below ``HIVE_CSV_CACHE_MIN_BYTES`` (default
+  4 MiB) parsing is faster than a disk round trip; those are queried
+  straight from the CSV.
+
+If the cache directory is unusable the query falls back to scanning the
+CSV directly, which is still cheaper than the old full in-memory load.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MAX_BYTES = int(os.environ.get("HIVE_CSV_CACHE_MAX_BYTES", str(4 * 1024**3)))
+_MIN_BYTES = int(os.environ.get("HIVE_CSV_CACHE_MIN_BYTES", str(4 * 1024**2)))
+
+_lock = threading.Lock()
+_connection: Any = None
+# Per-entry build locks; dropped with their entry so the map stays as
+# small as the cache itself.
+_build_locks: dict[str, threading.Lock] = {}
+
+
+def cache_dir() -> Path:
+    """``HIVE_CSV_CACHE_DIR``, else ``<HIVE_HOME>/cache/csv``."""
+    override = os.environ.get("HIVE_CSV_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    hive_home = os.environ.get("HIVE_HOME")
+    base = Path(hive_home).expanduser() if hive_home else Path.home() / ".hive"
+    return base / "cache" / "csv"
+
+
+def _shared_connection():
+    """The process-wide DuckDB database. Queries run on per-call cursors
+    (separate connections to the same database), so they can run
+    concurrently while sharing the Parquet metadata cache."""
+    global _connection
+    with _lock:
+        if _connection is None:
+            import duckdb
+
+            con = duckdb.connect(":memory:")
+            con.execute("SET parquet_metadata_cache = true")
+            _connection = con
+        return _connection
+
+
+def _path_key(path: str) -> str:
+    return hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_name(path: str, st: os.stat_result) -> str:
+    state = hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:12]
+    return f"{_path_key(path)}-{state}.parquet"
+
+
+def _sql_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _drop(entry: Path) -> bool:
+    """Delete a cache entry and forget its build lock."""
+    try:
+        entry.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return False
+    with _lock:
+        _build_locks.pop(entry.name, None)
+    return True
+
+
+def _evict(directory: Path, keep: Path) -> None:
+    """Delete least-recently-used entries until the directory fits the
+    budget. Recency is the file mtime, bumped on every cache hit."""
+    entries = []
+    total = 0
+    for entry in directory.glob("*.parquet"):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry))
+        total += st.st_size
+    entries.sort()
+    for _mtime, size, entry in entries:
+        if total <= _MAX_BYTES:
+            break
+        if entry == keep:
+            continue
+        if _drop(entry):
+            total -= size
+
+
+def _materialise(con, csv_path: str, st: os.stat_result) -> Path:
+    """Return the Parquet file for ``csv_path`` at its current state,
+    building it on a miss."""
+    directory = cache_dir()
+    target = directory / _entry_name(csv_path, st)
+    with _lock:
+        build_lock = _build_locks.setdefault(target.name, threading.Lock())
+    with build_lock:
+        if target.exists():
+            os.utime(target)
+            return target
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            con.execute(f"COPY (SELECT * FROM read_csv_auto({_sql_str(csv_path)})) TO {_sql_str(str(tmp))} (FORMAT parquet, COMPRESSION zstd)")
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        prefix = _path_key(csv_path) + "-"
+        for stale in directory.glob(prefix + "*.parquet"):
+            if stale != target:
+                _drop(stale)
+        _evict(directory, keep=target)
+        return target
+
+
+def run_query(csv_path: str, query: str) -> tuple[list[str], list[tuple]]:
+    """Run a read-only ``query`` against the CSV at ``csv_path`` (exposed
+    as table ``data``) and return ``(columns, rows)``."""
+    cursor = _shared_connection().cursor()
+    try:
+        st = os.stat(csv_path)
+        source = f"read_csv_auto({_sql_str(csv_path)})"
+        if st.st_size >= _MIN_BYTES:
+            try:
+                source = f"read_parquet({_sql_str(str(_materialise(cursor, csv_path, st)))})"
+            except Exception as e:
+                logger.warning("csv cache unavailable for %s, scanning the CSV directly: %s", csv_path, e)
+        # Temp views are per connection, so concurrent cursors each get
+        # their own ``data``.
+        cursor.execute(f"CREATE OR REPLACE TEMP VIEW data AS SELECT * FROM {source}")
+        result = cursor.execute(query)
+        columns = [desc[0] for desc in result.description]
+        return columns, result.fetchall()
+    finally:
+        cursor.close()
@@ -7,6 +7,19 @@
 from fastmcp import FastMCP
 
 from ..file_system_toolkits.security import resolve_safe_path
+from .cache import run_query
+
+
+def _as_record(columns: list[str], row: list[str]) -> dict:
+    """``row`` as csv.DictReader would return it (extras under None,
+    missing fields as None)."""
+    record: dict = dict(zip(columns, row, strict=False))
+    if len(row) > len(columns):
+        record[None] = row[len(columns) :]
+    else:
+        for key in columns[len(row) :]:
+            record[key] = None
+    return record
 
 
 def register_tools(mcp: FastMCP) -> None:
@@ -40,6 +53,8 @@ def csv_read(
             if not path.lower().endswith(".csv"):
                 return {"error": "File must have .csv extension"}
 
+            # One pass: rows before the window are skipped as raw lists
+            # (no dict built), rows after it are only counted.
             with open(secure_path, encoding="utf-8", newline="") as f:
                 reader = csv.DictReader(f)
 
@@ -47,18 +62,22 @@ def csv_read(
                     return {"error": "CSV file is empty or has no headers"}
 
                 columns = list(reader.fieldnames)
-
+                raw = reader.reader
+                total_rows = 0
+                skipped = 0
                 rows = []
-                for i, row in enumerate(reader):
-                    if i < offset:
-                        continue
-                    if limit is not None and len(rows) >= limit:
+                for row in raw:
+                    if not row:
+                        continue  # blank line; DictReader skips these too
+                    total_rows += any(row)
+                    if skipped < offset:
+                        skipped += 1
+                    elif limit is None or len(rows) < limit:
+                        rows.append(_as_record(columns, row))
+                    else:
                         break
-                    rows.append(row)
 
-            with open(secure_path, encoding="utf-8", newline="") as f:
-                reader = csv.reader(f)
-                total_rows = sum(1 for row in reader if any(row)) - 1
+                total_rows += sum(1 for row in raw if any(row))
 
             return {
                 "success": True,
@@ -260,7 +279,7 @@ def csv_sql(
             dict with query results, columns, and row count
         """
         try:
-            import duckdb
+            import duckdb  # noqa: F401
         except ImportError:
             return {"error": ("DuckDB not installed. Install with: uv pip install duckdb  or  uv pip install tools[sql]")}
 
@@ -293,31 +312,18 @@ def csv_sql(
                 if token in q_lower:
                     return {"error": "Multiple statements or comments are not allowed"}
 
-            con = duckdb.connect(":memory:")
-            try:
-                con.execute(
-                    "CREATE TABLE data AS SELECT * FROM read_csv_auto(?)",
-                    [str(secure_path)],
-                )
-
-                result = con.execute(query)
-                columns = [desc[0] for desc in result.description]
-                rows = result.fetchall()
-
-                rows_as_dicts = [dict(zip(columns, row, strict=False)) for row in rows]
-
-                return {
-                    "success": True,
-                    "path": path,
-                    "query": query,
-                    "columns": columns,
-                    "column_count": len(columns),
-                    "rows": rows_as_dicts,
-                    "row_count": len(rows_as_dicts),
-                }
-
-            finally:
-                con.close()
+            columns, rows = run_query(str(secure_path), query)
+            rows_as_dicts = [dict(zip(columns, row, strict=False)) for row in rows]
+
+            return {
+                "success": True,
+                "path": path,
+                "query": query,
+                "columns": columns,
+                "column_count": len(columns),
+                "rows": rows_as_dicts,
+                "row_count": len(rows_as_dicts),
+            }
 
         except ValueError as e:
             return {"error": str(e)}
@@ -0,0 +1,510 @@
+"""
+Per-tab accessibility tree cache, kept current from DOM mutation events.
+
+``BeelineBridge.snapshot`` used to call ``Accessibility.getFullAXTree`` and
+reformat the whole tree on every call. On heavy pages that is seconds of
+CDP transfer plus formatting, usually to learn that one button changed.
+
+:class:`AXTreeCache` keeps the last full AX tree for a tab together with a
+map of the page's DOM (``DOM.getDocument(depth=-1)`` subscribes the
+session to mutation events for every node). The bridge feeds it the CDP
+events the extension forwards (``DOM.*``, ``Accessibility.nodesUpdated``)
+through :meth:`AXTreeCache.apply_event`. Each event is translated into a
+*dirty* backend node id as it arrives. ``backendNodeId`` is stable across
+DOM-agent rebinding; the event's own ``nodeId`` is not.
+
+On the next snapshot :meth:`AXTreeCache.sync` does one of four things:
+
+* ``"hit"`` — nothing changed, reuse everything, zero CDP round trips.
+* ``"ax"`` — the bridge clicked, typed, pressed a key or scrolled since
+  the last snapshot (:meth:`AXTreeCache.touch`). An input's value, focus,
+  checked or expanded state lives in the AX tree and can change without
+  any DOM mutation, so re-fetch the AX tree; the DOM map stays as is.
+* ``"incremental"`` — re-fetch only the AX subtrees under the nearest
+  cached ancestor of each dirty DOM node (``getPartialAXTree`` for the
+  node and its ancestors, ``getChildAXNodes`` below it).
+* ``"full"`` — the first snapshot, a document change, a foreign
+  ``DOM.getDocument`` that reset the node bindings, or more dirt than an
+  incremental pass is worth.
+
+Anything the cache can't account for falls back to ``"full"``, so the
+result always matches a fresh ``getFullAXTree``. The module is pure
+bookkeeping over an injected ``cdp(method, params)`` coroutine, so it is
+testable without a browser.
+"""
+
+from __future__ import annotations
+
+import difflib
+import logging
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CdpCall = Callable[..., Awaitable[dict]]
+
+# Distinct dirty subtrees an incremental pass will re-fetch before giving
+# up and taking a full snapshot instead.
+MAX_DIRTY_SUBTREES = 32
+# CDP round trips one incremental pass may spend. Past this a full fetch
+# is cheaper than walking the dirty subtrees level by level.
+MAX_INCREMENTAL_FETCHES = 150
+
+# Single-node DOM events: the node itself changed.
+_NODE_EVENTS = frozenset(
+    {
+        "DOM.attributeModified",
+        "DOM.attributeRemoved",
+        "DOM.characterDataModified",
+        "DOM.childNodeCountUpdated",
+        "DOM.inlineStyleInvalidated",
+    }
+)
+
+_REF_RE = re.compile(r" \[ref=e\d+\]")
+
+NO_CHANGES = "(no changes since last snapshot)"
+
+
+class _NeedsFull(Exception):
+    """Raised inside an incremental pass when only a full fetch will do."""
+
+
+class AXTreeCache:
+    """Cached AX tree for one tab plus the bookkeeping to keep it fresh.
+
+    Construct one per tab; drop it when the tab navigates, detaches or
+    closes. ``track_dom=False`` in :meth:`sync` (extensions that don't
+    forward DOM events) makes every sync a full fetch. The cache then only
+    serves :meth:`diff` and the formatting memo.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.stale = True
+        self.url: str | None = None
+        self.href_map: dict[str, list[str]] | None = None
+        # AX tree, keyed by AXNodeId. ``_root`` is the walk start.
+        self._nodes: dict[str, dict] = {}
+        self._parent: dict[str, str] = {}
+        self._ax_by_backend: dict[int, str] = {}
+        self._root: str | None = None
+        # DOM map: frontend nodeId -> backendNodeId, and the backend-level
+        # parent chain used to find a dirty node's nearest AX ancestor.
+        self._dom_backend: dict[int, int] = {}
+        self._backend_parent: dict[int, int] = {}
+        # Nodes inside child frames / template content. getFullAXTree
+        # covers the main frame only, so their mutations are irrelevant.
+        self._foreign: set[int] = set()
+        self._tracking = False
+        self._awaiting_document = False
+        self._dirty: set[int] = set()
+        self._subscribe: set[int] = set()
+        self._patched = False
+        self._touched = False
+        self._formatted: dict[str, tuple[int, str]] = {}
+        self._last_tree: dict[str, str] = {}
+
+    @property
+    def tracking(self) -> bool:
+        """True while the tree is current and kept so by forwarded DOM events."""
+        return self._tracking and not self.stale
+
+    # ── event side (sync, called from the bridge's read loop) ────────────
+
+    def invalidate(self) -> None:
+        """Force the next :meth:`sync` to fetch the full tree."""
+        self.stale = True
+        self._tracking = False
+
+    def touch(self) -> None:
+        """The page was interacted with; re-fetch the AX tree on the next :meth:`sync`."""
+        self._touched = True
+
+    def bindings_reset(self) -> None:
+        """Someone else called ``DOM.getDocument``; our nodeIds are void."""
+        if self._tracking:
+            self.invalidate()
+
+    def apply_event(self, method: str, params: dict) -> None:
+        """Fold one forwarded CDP event into the dirty set."""
+        if method == "DOM.documentUpdated":
+            self.invalidate()
+            return
+        if method == "Page.navigatedWithinDocument":
+            self.url = None
+            return
+        if method == "Accessibility.nodesUpdated":
+            self._apply_ax_update(params.get("nodes") or [])
+            return
+        if not self._tracking or self.stale or self._awaiting_document or not method.startswith("DOM."):
+            return
+
+        if method == "DOM.setChildNodes":
+            parent = params.get("parentId")
+            foreign = parent in self._foreign
+            pb = self._dom_backend.get(parent)
+            for node in params.get("nodes") or []:
+                self._index_dom(node, pb, foreign=foreign)
+        elif method == "DOM.childNodeInserted":
+            parent = params.get("parentNodeId")
+            node = params.get("node") or {}
+            if parent in self._foreign:
+                self._index_dom(node, None, foreign=True)
+                return
+            pb = self._mark_dirty(parent)
+            if pb is not None:
+                self._index_dom(node, pb)
+                if node.get("childNodeCount") and not node.get("children"):
+                    self._subscribe.add(node.get("nodeId"))
+        elif method == "DOM.childNodeRemoved":
+            if params.get("parentNodeId") not in self._foreign:
+                self._mark_dirty(params.get("parentNodeId"))
+            self._dom_backend.pop(params.get("nodeId"), None)
+        elif method in _NODE_EVENTS:
+            for nid in params.get("nodeIds") or [params.get("nodeId")]:
+                if nid in self._foreign:
+                    continue
+                self._mark_dirty(nid)
+                if method == "DOM.childNodeCountUpdated":
+                    self._subscribe.add(nid)
+        elif method in ("DOM.shadowRootPushed", "DOM.shadowRootPopped"):
+            host = params.get("hostId")
+            hb = self._mark_dirty(host)
+            if hb is not None and method == "DOM.shadowRootPushed":
+                self._index_dom(params.get("root") or {}, hb)
+        elif method in ("DOM.pseudoElementAdded", "DOM.pseudoElementRemoved"):
+            self._mark_dirty(params.get("parentId"))
+
+    def _mark_dirty(self, node_id: Any) -> int | None:
+        backend = self._dom_backend.get(node_id)
+        if backend is None:
+            # A node we never indexed — our map is incomplete, so only a
+            # full fetch is trustworthy.
+            self.invalidate()
+            return None
+        self._dirty.add(backend)
+        return backend
+
+    def _apply_ax_update(self, nodes: list[dict]) -> None:
+        for node in nodes:
+            nid = node.get("nodeId")
+            old = self._nodes.get(nid)
+            if old is None:
+                continue
+            if old.get("childIds", []) != node.get("childIds", []):
+                backend = node.get("backendDOMNodeId")
+                if backend is None:
+                    self.invalidate()
+                    return
+                self._dirty.add(backend)
+                continue
+            self._nodes[nid] = node
+            self._patched = True
+
+    def _index_dom(self, node: dict, parent_backend: int | None, *, foreign: bool = False) -> None:
+        stack = [(node, parent_backend, foreign)]
+        while stack:
+            n, pb, inside = stack.pop()
+            nid, backend = n.get("nodeId"), n.get("backendNodeId")
+            if nid is None or backend is None:
+                continue
+            if inside:
+                self._foreign.add(nid)
+            else:
+                self._dom_backend[nid] = backend
+                if pb is not None:
+                    self._backend_parent[backend] = pb
+            for child in n.get("children") or ():
+                stack.append((child, backend, inside))
+            for child in n.get("shadowRoots") or ():
+                stack.append((child, backend, inside))
+            if n.get("contentDocument"):
+                stack.append((n["contentDocument"], backend, True))
+            if n.get("templateContent"):
+                stack.append((n["templateContent"], backend, True))
+
+    # ── fetch side ────────────────────────────────────────────────────────
+
+    async def sync(self, cdp: CdpCall, *, track_dom: bool) -> str:
+        """Bring the cached tree up to date; return how (see module doc)."""
+        try:
+            if self.stale or not track_dom:
+                await self._full(cdp, track_dom=track_dom)
+                return "full"
+            if self._touched:
+                await self._reload_ax(cdp)
+                return "ax"
+            if not (self._dirty or self._subscribe or self._patched):
+                return "hit"
+            try:
+                fetches = await self._incremental(cdp)
+            except _NeedsFull as exc:
+                logger.debug("AX cache: incremental pass gave up (%s), fetching full tree", exc)
+                await self._full(cdp, track_dom=track_dom)
+                return "full"
+            logger.debug("AX cache: incremental refresh with %d CDP fetches", fetches)
+            return "incremental"
+        except BaseException:
+            # Cancelled or failed half way: whatever we hold is suspect.
+            self.invalidate()
+            raise
+
+    async def _full(self, cdp: CdpCall, *, track_dom: bool) -> None:
+        self.stale = False
+        self._dirty = set()
+        self._subscribe = set()
+        self._patched = False
+        self._touched = False
+        self._dom_backend = {}
+        self._backend_parent = {}
+        self._foreign = set()
+        self._tracking = False
+        if track_dom:
+            self._awaiting_document = True
+            try:
+                doc = await cdp("DOM.getDocument", {"depth": -1, "pierce": True})
+            finally:
+                self._awaiting_document = False
+            self._index_dom((doc or {}).get("root") or {}, None)
+            # Events from here on refer to the bindings we just indexed.
+            self._tracking = not self.stale
+        result = await cdp("Accessibility.getFullAXTree")
+        self._load((result or {}).get("nodes") or [])
+        self._bump()
+
+    async def _reload_ax(self, cdp: CdpCall) -> None:
+        # The whole AX tree supersedes any dirt; the DOM bindings (and the
+        # event subscription they carry) are still good.
+        self._touched = False
+        self._dirty = set()
+        self._patched = False
+        subscribe, self._subscribe = self._subscribe, set()
+        for nid in subscribe:
+            if nid in self._dom_backend:
+                await cdp("DOM.requestChildNodes", {"nodeId": nid, "depth": -1, "pierce": True})
+        result = await cdp("Accessibility.getFullAXTree")
+        self._load((result or {}).get("nodes") or [])
+        self._bump()
+
+    async def _incremental(self, cdp: CdpCall) -> int:
+        dirty, self._dirty = self._dirty, set()
+        subscribe, self._subscribe = self._subscribe, set()
+        self._patched = False
+        fetches = 0
+
+        # Inserted subtrees arrive shallow; ask for the rest so mutations
+        # inside them are reported too.
+        for nid in subscribe:
+            if nid in self._dom_backend:
+                await cdp("DOM.requestChildNodes", {"nodeId": nid, "depth": -1, "pierce": True})
+                fetches += 1
+
+        anchors: set[str] = set()
+        for backend in dirty:
+            anchor = self._anchor_for(backend)
+            if anchor is None:
+                raise _NeedsFull(f"no cached AX ancestor for backend node {backend}")
+            anchors.add(anchor)
+        anchors = self._outermost(anchors)
+        if len(anchors) > MAX_DIRTY_SUBTREES:
+            raise _NeedsFull(f"{len(anchors)} dirty subtrees")
+
+        for anchor in anchors:
+            fetches += await self._refetch(cdp, anchor, MAX_INCREMENTAL_FETCHES - fetches)
+        # An updated ancestor can list children we have never seen (a
+        # sibling inserted next to a dirty node); fetch those too.
+        while True:
+            holes = self._outermost({nid for nid, n in self._nodes.items() if any(c not in self._nodes for c in n.get("childIds", ()))})
+            if not holes:
+                break
+            for nid in holes:
+                fetches += await self._refetch_children(cdp, nid, MAX_INCREMENTAL_FETCHES - fetches)
+        self._prune()
+        self._bump()
+        return fetches
+
+    async def _refetch(self, cdp: CdpCall, anchor: str, budget: int) -> int:
+        backend = self._nodes[anchor].get("backendDOMNodeId")
+        if backend is None or budget <= 0:
+            raise _NeedsFull("anchor without backend node")
+        rel = await cdp("Accessibility.getPartialAXTree", {"backendNodeId": backend, "fetchRelatives": True})
+        fresh = {n.get("nodeId"): n for n in (rel or {}).get("nodes") or []}
+        if anchor not in fresh:
+            raise _NeedsFull("anchor AX node was replaced")
+        # Ancestors (names computed from content) and siblings come back
+        # too; adopt their fresh data, but not their children, which are
+        # handled below or by the hole pass.
+        for nid, node in fresh.items():
+            if nid in self._nodes and nid != anchor and self._parent.get(nid) != anchor:
+                self._put(node)
+        return 1 + await self._refetch_children(cdp, anchor, budget - 1, anchor_node=fresh[anchor])
+
+    async def _refetch_children(self, cdp: CdpCall, nid: str, budget: int, *, anchor_node: dict | None = None) -> int:
+        """Replace everything below ``nid`` with a fresh walk."""
+        self._drop_descendants(nid)
+        if anchor_node is not None:
+            self._put(anchor_node)
+        fetches = 0
+        queue = [nid]
+        while queue:
+            current = queue.pop()
+            if not self._nodes[current].get("childIds"):
+                continue
+            if fetches >= budget:
+                raise _NeedsFull("fetch budget exhausted")
+            result = await cdp("Accessibility.getChildAXNodes", {"id": current})
+            fetches += 1
+            for child in (result or {}).get("nodes") or []:
+                cid = child.get("nodeId")
+                if cid is None or cid in self._nodes:
+                    continue
+                self._put(child)
+                queue.append(cid)
+        return fetches
+
+    # ── tree bookkeeping ─────────────────────────────────────────────────
+
+    def _load(self, nodes: list[dict]) -> None:
+        self._nodes = {}
+        self._parent = {}
+        self._ax_by_backend = {}
+        self._root = nodes[0].get("nodeId") if nodes else None
+        for node in nodes:
+            self._put(node)
+
+    def _put(self, node: dict) -> None:
+        nid = node.get("nodeId")
+        old = self._nodes.get(nid)
+        if old is not None and old.get("backendDOMNodeId") is not None:
+            self._ax_by_backend.pop(old["backendDOMNodeId"], None)
+        self._nodes[nid] = node
+        backend = node.get("backendDOMNodeId")
+        if backend is not None:
+            self._ax_by_backend[backend] = nid
+        for cid in node.get("childIds", ()):
+            self._parent[cid] = nid
+
+    def _drop_descendants(self, nid: str) -> None:
+        stack = list(self._nodes[nid].get("childIds", ()))
+        while stack:
+            cid = stack.pop()
+            node = self._nodes.pop(cid, None)
+            if node is None:
+                continue
+            if self._parent.get(cid) == nid or self._parent.get(cid) not in self._nodes:
+                self._parent.pop(cid, None)
+            backend = node.get("backendDOMNodeId")
+            if backend is not None and self._ax_by_backend.get(backend) == cid:
+                del self._ax_by_backend[backend]
+            stack.extend(node.get("childIds", ()))
+
+    def _prune(self) -> None:
+        """Forget nodes no longer reachable from the root (removed children
+        of a refreshed ancestor)."""
+        if self._root not in self._nodes:
+            raise _NeedsFull("root AX node missing")
+        reachable = {self._root}
+        stack = [self._root]
+        while stack:
+            for cid in self._nodes[stack.pop()].get("childIds", ()):
+                if cid in self._nodes and cid not in reachable:
+                    reachable.add(cid)
+                    stack.append(cid)
+        for nid in [nid for nid in self._nodes if nid not in reachable]:
+            node = self._nodes.pop(nid)
+            self._parent.pop(nid, None)
+            backend = node.get("backendDOMNodeId")
+            if backend is not None and self._ax_by_backend.get(backend) == nid:
+                del self._ax_by_backend[backend]
+
+    def _anchor_for(self, backend: int) -> str | None:
+        seen = 0
+        current: int | None = backend
+        while current is not None and seen < 10_000:
+            nid = self._ax_by_backend.get(current)
+            if nid is not None and nid in self._nodes:
+                return nid
+            current = self._backend_parent.get(current)
+            seen += 1
+        return None
+
+    def _outermost(self, ids: set[str]) -> set[str]:
+        keep = set()
+        for nid in ids:
+            parent = self._parent.get(nid)
+            while parent is not None and parent not in ids:
+                parent = self._parent.get(parent)
+            if parent is None:
+                keep.add(nid)
+        return keep
+
+    def _bump(self) -> None:
+        self.generation += 1
+        self.href_map = None
+        self._formatted.clear()
+
+    def nodes(self) -> list[dict]:
+        """Shallow copies of the cached nodes, root first.
+
+        Copies, because the formatter's inline-text-box cleanup rewrites
+        ``childIds`` on the dicts it is given.
+        """
+        if self._root is None or self._root not in self._nodes:
+            return [dict(n) for n in self._nodes.values()]
+        root = self._nodes[self._root]
+        return [dict(root)] + [dict(n) for nid, n in self._nodes.items() if nid != self._root]
+
+    def formatted(self, mode: str, render: Callable[[], str]) -> str:
+        """Memoized formatter output for ``mode`` at the current generation."""
+        hit = self._formatted.get(mode)
+        if hit is not None and hit[0] == self.generation:
+            return hit[1]
+        text = render()
+        self._formatted[mode] = (self.generation, text)
+        return text
+
+    def diff(self, mode: str, tree: str) -> str | None:
+        """Diff ``tree`` against the previous snapshot returned for ``mode``.
+
+        Returns ``None`` when there is no previous snapshot. Records
+        ``tree`` as the new base either way.
+        """
+        previous = self._last_tree.get(mode)
+        self._last_tree[mode] = tree
+        if previous is None:
+            return None
+        return diff_trees(previous, tree)
+
+    def remember(self, mode: str, tree: str) -> None:
+        """Record ``tree`` as the base for the next diff in ``mode``."""
+        self._last_tree[mode] = tree
+
+
+def diff_trees(old: str, new: str, context: int = 1) -> str:
+    """Line diff of two formatted snapshots.
+
+    Lines are compared with their ``[ref=eN]`` stripped, because ref
+    numbers are assigned in walk order and shift whenever a node is
+    inserted above; the output shows each line as it was in its own
+    snapshot. ``-``/``+`` mark removed/added lines, two spaces mark
+    context, ``@@`` separates hunks.
+    """
+    old_lines, new_lines = old.splitlines(), new.splitlines()
+    matcher = difflib.SequenceMatcher(
+        a=[_REF_RE.sub("", ln) for ln in old_lines],
+        b=[_REF_RE.sub("", ln) for ln in new_lines],
+        autojunk=False,
+    )
+    out: list[str] = []
+    for group in matcher.get_grouped_opcodes(context):
+        out.append("@@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(f"  {ln}" for ln in new_lines[j1:j2])
+                continue
+            out.extend(f"- {ln}" for ln in old_lines[i1:i2])
+            out.extend(f"+ {ln}" for ln in new_lines[j1:j2])
+    return "\n".join(out) if out else NO_CHANGES
@@ -22,8 +22,8 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import contextlib
+import functools
 import json
 import logging
 import os
@@ -37,7 +37,9 @@
 from pathlib import Path
 from typing import Any
 
+from .ax_cache import NO_CHANGES, AXTreeCache
 from .health import Blocker, classify_all
+from .imaging import INTERMEDIATE_QUALITY, MIME_TYPES, OUTPUT_QUALITY, capture_scale, image_size
 from .telemetry import (
     log_bridge_message,
     log_cdp_command,
@@ -276,6 +278,27 @@ async def _adaptive_poll_sleep(elapsed_s: float) -> None:
 _interaction_highlights: dict[int, dict] = {}
 
 
+def _touches_page(method):
+    """Mark the tab's AX cache for a refresh once ``method`` returns.
+
+    Typing, clicking or pressing a key can change what the AX tree reports
+    (an input's value, focus, checked or expanded state) without any DOM
+    mutation the cache would hear about. Applied to every bridge method
+    that interacts with the page, whether it succeeded or not.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, tab_id: int, *args, **kwargs):
+        try:
+            return await method(self, tab_id, *args, **kwargs)
+        finally:
+            cache = self._ax_caches.get(tab_id)
+            if cache is not None:
+                cache.touch()
+
+    return wrapper
+
+
 def _swallow_future_exc(fut: asyncio.Future) -> None:
     """Consume an abandoned future's result/exception.
 
@@ -689,6 +712,10 @@ def __init__(self, *, runtime_version: str | None = None) -> None:
         # source of truth for "why automation is impaired on this tab".
         self._tab_snapshots: dict[int, dict] = {}
         self._tab_blockers: dict[int, list[dict]] = {}
+        # Per-tab accessibility tree caches behind snapshot() (see
+        # ax_cache.py). Kept fresh from forwarded DOM mutation events;
+        # dropped on main-frame navigation, detach and close.
+        self._ax_caches: dict[int, AXTreeCache] = {}
         # Per-context in-flight command count and the tabId→profile reverse
         # map that drives it. Used by list_contexts to render an explicit
         # "working / waiting / idle / blocked" status badge per agent. We
@@ -1146,6 +1173,7 @@ async def stop(self) -> None:
         # Health caches go with the tabs they describe.
         self._tab_snapshots.clear()
         self._tab_blockers.clear()
+        self._ax_caches.clear()
         # Per-context status bookkeeping is bridge-process state; clear too.
         self._context_in_flight.clear()
         self._tab_to_profile.clear()
@@ -1880,6 +1908,17 @@ def _handle_cdp_event(self, tab_id: int | None, method: str, params: dict) -> No
         """
         from .telemetry import write_log
 
+        # DOM mutation / AX update streams (protocol >= 7) only feed the
+        # snapshot cache. They fire per mutation on busy pages, far too
+        # often to log each one.
+        if method.startswith("DOM.") or method == "Accessibility.nodesUpdated":
+            cache = self._ax_caches.get(tab_id) if tab_id is not None else None
+            if cache is not None:
+                cache.apply_event(method, params)
+            return
+        if method == "Page.navigatedWithinDocument" and tab_id in self._ax_caches:
+            self._ax_caches[tab_id].apply_event(method, params)
+
         if method == "Runtime.consoleAPICalled":
             args = params.get("args") or []
             first = args[0].get("value") if args and isinstance(args[0], dict) else None
@@ -1971,6 +2010,7 @@ def _handle_cdp_event(self, tab_id: int | None, method: str, params: dict) -> No
                 # chrome:// page to a real https one.
                 self._tab_snapshots.pop(tab_id, None)
                 self._tab_blockers.pop(tab_id, None)
+                self._ax_caches.pop(tab_id, None)
 
         # Layout viewport resized (hidden→visible, banner commit,
         # user window resize, devtools open/close, zoom). Invalidate
@@ -2207,6 +2247,10 @@ async def _cdp(
                 f"Tab {tab_id} is blocked by a native browser dialog. Call browser_dialog_respond to accept or dismiss it first.",
                 retryable=False,
             )
+        if method == "DOM.getDocument" and tab_id in self._ax_caches:
+            # getDocument discards the DOM agent's node bindings, so the
+            # node ids the snapshot cache indexed no longer mean anything.
+            self._ax_caches[tab_id].bindings_reset()
         start = time.perf_counter()
         async with self._tab_lock(tab_id):
             try:
@@ -2252,6 +2296,8 @@ async def _cdp(
                         str(e)[:120],
                     )
                     self._cdp_attached.discard(tab_id)
+                    # A new debugger session starts with no DOM subscriptions.
+                    self._ax_caches.pop(tab_id, None)
                     try:
                         reattach = await self._send("cdp.attach", tabId=tab_id)
                         if reattach.get("ok"):
@@ -3029,6 +3075,7 @@ async def close_tab(self, tab_id: int) -> dict:
         # Health snapshot + blockers belonged to this tab's attach session.
         self._tab_snapshots.pop(tab_id, None)
         self._tab_blockers.pop(tab_id, None)
+        self._ax_caches.pop(tab_id, None)
         # The tab is gone — its profile attribution goes with it.
         self._tab_to_profile.pop(tab_id, None)
         # And it can no longer be an ungrouped-orphan candidate.
@@ -3398,9 +3445,11 @@ async def cdp_detach(self, tab_id: int) -> dict:
         """Detach CDP debugger from a tab."""
         result = await self._send("cdp.detach", tabId=tab_id)
         self._cdp_attached.discard(tab_id)
-        # Health state was specific to this attach session.
+        # Health state was specific to this attach session, and so are the
+        # DOM node ids the snapshot cache was tracking.
         self._tab_snapshots.pop(tab_id, None)
         self._tab_blockers.pop(tab_id, None)
+        self._ax_caches.pop(tab_id, None)
         return result
 
     # ── Tab health audit ───────────────────────────────────────────────────────
@@ -3865,6 +3914,7 @@ def list_pending_dialogs(self) -> list[dict]:
 
     # ── Interaction ────────────────────────────────────────────────────────────
 
+    @_touches_page
     async def click(
         self,
         tab_id: int,
@@ -4177,6 +4227,7 @@ async def _read_focused_element(self, tab_id: int) -> dict | None:
         except Exception:
             return None
 
+    @_touches_page
     async def click_coordinate(self, tab_id: int, x: float, y: float, button: str = "left", click_count: int = 1) -> dict:
         """Click at specific coordinates.
 
@@ -4254,6 +4305,7 @@ async def click_coordinate(self, tab_id: int, x: float, y: float, button: str =
                 pass
         return resp
 
+    @_touches_page
     async def type_text(
         self,
         tab_id: int,
@@ -4487,6 +4539,7 @@ def _cdp_modifier_mask(self, modifiers: list[str] | None) -> int:
             mask |= self._CDP_MODIFIERS.get(m.lower(), 0)
         return mask
 
+    @_touches_page
     async def press_key(
         self,
         tab_id: int,
@@ -4680,6 +4733,7 @@ async def shadow_query(self, tab_id: int, selector: str) -> dict:
             return {"ok": False, "error": f"Element not found: {selector}"}
         return {"ok": True, "selector": selector, "rect": rect}
 
+    @_touches_page
     async def hover(self, tab_id: int, selector: str, timeout_ms: int = 30000) -> dict:
         """Hover over an element. Supports '>>>' shadow-piercing selectors.
 
@@ -4746,6 +4800,7 @@ async def hover(self, tab_id: int, selector: str, timeout_ms: int = 30000) -> di
         await self.highlight_rect(tab_id, x - w / 2, y - h / 2, w, h, label=selector)
         return {"ok": True, "action": "hover", "selector": selector, "x": x, "y": y}
 
+    @_touches_page
     async def hover_coordinate(self, tab_id: int, x: float, y: float) -> dict:
         """Hover at CSS pixel coordinates.
 
@@ -4763,6 +4818,7 @@ async def hover_coordinate(self, tab_id: int, x: float, y: float) -> dict:
         await self.highlight_point(tab_id, x, y, label=f"hover ({x},{y})")
         return {"ok": True, "action": "hover_coordinate", "x": x, "y": y}
 
+    @_touches_page
     async def press_key_at(self, tab_id: int, x: float, y: float, key: str) -> dict:
         """Move mouse to (x, y) then dispatch a key event.
 
@@ -5024,6 +5080,7 @@ async def clear_highlight(self, tab_id: int) -> None:
             pass
         _interaction_highlights.pop(tab_id, None)
 
+    @_touches_page
     async def scroll(
         self,
         tab_id: int,
@@ -5242,6 +5299,7 @@ async def scroll(
             logger.warning("Scroll failed: %s", e)
             return {"ok": False, "error": str(e)}
 
+    @_touches_page
     async def select_option(self, tab_id: int, selector: str, values: list[str]) -> dict:
         """Select options in a select element."""
         await self.cdp_attach(tab_id)
@@ -5297,6 +5355,7 @@ async def select_option(self, tab_id: int, selector: str, values: list[str]) ->
 
     # ── Inspection ─────────────────────────────────────────────────────────────
 
+    @_touches_page
     async def evaluate(self, tab_id: int, script: str) -> dict:
         """Execute JavaScript in the page.
 
@@ -5418,7 +5477,7 @@ async def _evaluate_failure(self, tab_id: int, exc: BaseException) -> dict:
             out["blockers"] = blockers
         return out
 
-    async def snapshot(self, tab_id: int, timeout_s: float = 30.0, mode: str = "default") -> dict:
+    async def snapshot(self, tab_id: int, timeout_s: float = 30.0, mode: str = "default", diff: bool = False) -> dict:
         """Get an accessibility snapshot of the page.
 
         Uses a hybrid approach:
@@ -5426,21 +5485,42 @@ async def snapshot(self, tab_id: int, timeout_s: float = 30.0, mode: str = "defa
         2. DOM queries for visibility and computed styles
         3. Falls back to DOM tree if accessibility returns mostly ignored
 
+        The AX tree is cached per tab (see ``ax_cache.py``). With an
+        extension that forwards DOM mutation events (protocol >= 7) a
+        repeat snapshot re-fetches only the subtrees that changed, or
+        nothing at all; older extensions fetch the full tree every time.
+        ``cache`` in the result says which happened.
+
         Args:
             tab_id: The tab ID to snapshot
             timeout_s: Maximum time to spend building snapshot (default 10s)
             mode: Filtering mode — "default", "simple", or "interactive"
+            diff: Return only the lines that changed since the previous
+                snapshot of this tab in the same mode. The first snapshot
+                (or the first after a navigation) is returned in full with
+                ``diff: False``.
         """
         try:
             async with asyncio.timeout(timeout_s):
                 await self.cdp_attach(tab_id)
-                await self._try_enable_domain(tab_id, "Accessibility")
-                await self._try_enable_domain(tab_id, "DOM")
-                await self._try_enable_domain(tab_id, "Runtime")
+                cache = self._ax_caches.get(tab_id)
+                # A tracking cache proves the domains are enabled (their
+                # events keep it fresh), so a hit makes no CDP calls.
+                if cache is None or not cache.tracking:
+                    await self._try_enable_domain(tab_id, "Accessibility")
+                    await self._try_enable_domain(tab_id, "DOM")
+                    await self._try_enable_domain(tab_id, "Runtime")
+
+                if cache is None:
+                    cache = self._ax_caches[tab_id] = AXTreeCache()
+                conn = self._conn_for_tab(tab_id) or self._primary_conn()
+                proto = (conn.protocol_version if conn else None) or 0
 
-                # Try accessibility tree first
-                result = await self._cdp(tab_id, "Accessibility.getFullAXTree")
-                nodes = result.get("nodes", [])
+                async def cdp(method: str, params: dict | None = None) -> dict:
+                    return await self._cdp(tab_id, method, params)
+
+                kind = await cache.sync(cdp, track_dom=proto >= 7)
+                nodes = cache.nodes()
 
             # Count non-ignored nodes
             visible_count = sum(1 for n in nodes if not n.get("ignored", False))
@@ -5461,33 +5541,51 @@ async def snapshot(self, tab_id: int, timeout_s: float = 30.0, mode: str = "defa
                 )
                 return await self._dom_snapshot(tab_id)
 
-            # Clean redundant InlineTextBox children before formatting
-            nodes = self._clean_inline_text_boxes(nodes)
-
             # Fetch hrefs for <a> elements so link nodes can render them
             # inline. The AX tree does not carry href; without this, agents
             # must follow up with browser_evaluate to extract URLs from
             # what is often the most action-relevant attribute on the page
             # (e.g. LinkedIn messaging compose URLs encode the recipient).
-            href_map = await self._collect_link_hrefs(tab_id)
-
-            # Format the accessibility tree (with node limit)
-            snapshot = self._format_ax_tree(nodes, max_nodes=2000, mode=mode, href_map=href_map)
-
-            # Get URL
-            url_result = await self._cdp(
-                tab_id,
-                "Runtime.evaluate",
-                {"expression": "window.location.href", "returnByValue": True},
+            # Cached alongside the tree; an unchanged tree means unchanged
+            # links.
+            if cache.href_map is None:
+                cache.href_map = await self._collect_link_hrefs(tab_id)
+            href_map = cache.href_map
+
+            # Clean redundant InlineTextBox children, then format the
+            # accessibility tree (with node limit). Memoized per mode
+            # until the cached tree changes.
+            snapshot = cache.formatted(
+                mode,
+                lambda: self._format_ax_tree(self._clean_inline_text_boxes(nodes), max_nodes=2000, mode=mode, href_map=href_map),
             )
-            url = (url_result or {}).get("result", {}).get("value", "")
 
-            return {
+            # Get URL (in-document navigation resets the cached one)
+            if kind != "hit" or cache.url is None:
+                url_result = await self._cdp(
+                    tab_id,
+                    "Runtime.evaluate",
+                    {"expression": "window.location.href", "returnByValue": True},
+                )
+                cache.url = (url_result or {}).get("result", {}).get("value", "")
+            url = cache.url
+
+            out = {
                 "ok": True,
                 "tabId": tab_id,
                 "url": url,
                 "tree": snapshot,
+                "cache": kind,
             }
+            if not diff:
+                cache.remember(mode, snapshot)
+                return out
+            delta = cache.diff(mode, snapshot)
+            out["diff"] = delta is not None
+            if delta is not None:
+                out["tree"] = delta
+                out["changed"] = delta != NO_CHANGES
+            return out
         except TimeoutError:
             logger.warning("Snapshot timed out after %ss", timeout_s)
             return {"ok": False, "error": f"snapshot timed out after {timeout_s}s"}
@@ -5960,9 +6058,19 @@ async def screenshot(
         selector: str | None = None,
         timeout_s: float = 30.0,
         selector_timeout_ms: int = 5000,
+        image_format: str = "png",
+        quality: int | None = None,
+        target_width: int | None = None,
     ) -> dict:
         """Take a screenshot of the page or element.
 
+        ``image_format`` is the CDP capture format ("png", "jpeg" or
+        "webp"). With ``target_width``, clipped captures (``selector``,
+        ``full_page``) are rendered by Chrome at roughly that width via
+        ``clip.scale`` instead of being resized afterwards, and lossy
+        formats default to the final output quality when they land there
+        (see ``imaging.py``).
+
         Returns {"ok": True, "data": base64_string, "mimeType": "image/png"}.
         """
         try:
@@ -5970,7 +6078,9 @@ async def screenshot(
                 await self.cdp_attach(tab_id)
                 await self._cdp(tab_id, "Page.enable")
 
-                params: dict[str, Any] = {"format": "png"}
+                if image_format not in MIME_TYPES:
+                    image_format = "png"
+                params: dict[str, Any] = {"format": image_format}
                 # SAFETY: an over-large Page.captureScreenshot bitmap SIGTRAPs the
                 # whole Chrome process (it crashed the user's browser + extension
                 # mid-session). So: NEVER use captureBeyondViewport (renders the full
@@ -5992,12 +6102,14 @@ async def screenshot(
                         sq = await self.shadow_query(tab_id, selector)
                         r = sq.get("rect") if sq.get("ok") else None
                         if r and r.get("w") and r.get("h"):
+                            clip_w = min(r["w"], _MAX_CLIP_PX)
+                            clip_h = min(r["h"], _MAX_CLIP_PX)
                             clip_rect = {
                                 "x": r["x"],
                                 "y": r["y"],
-                                "width": min(r["w"], _MAX_CLIP_PX),
-                                "height": min(r["h"], _MAX_CLIP_PX),
-                                "scale": 1,
+                                "width": clip_w,
+                                "height": clip_h,
+                                "scale": capture_scale(clip_w, clip_h, target_width) if target_width else 1,
                             }
                             break
                         if asyncio.get_event_loop().time() >= deadline:
@@ -6025,6 +6137,10 @@ async def screenshot(
                     fp_scale = min(1.0, _FP_MAX_SIDE / fp_w, _FP_MAX_SIDE / fp_h)
                     if fp_w * fp_h * fp_scale * fp_scale > _FP_MAX_PIXELS:
                         fp_scale = (_FP_MAX_PIXELS / (fp_w * fp_h)) ** 0.5
+                    if target_width:
+                        # Rendering straight at the output width is also the
+                        # smallest bitmap Chrome can be asked for.
+                        fp_scale = min(fp_scale, target_width / fp_w)
                     fp_scale = max(0.05, round(fp_scale, 4))
                     params["captureBeyondViewport"] = True
                     params["clip"] = {
@@ -6035,6 +6151,11 @@ async def screenshot(
                         "scale": fp_scale,
                     }
 
+                if image_format != "png":
+                    clip = params.get("clip")
+                    lands = bool(target_width and clip and round(clip["width"] * clip["scale"]) == target_width)
+                    params["quality"] = quality or (OUTPUT_QUALITY if lands else INTERMEDIATE_QUALITY)
+
                 # Pass the outer screenshot timeout budget to the
                 # underlying CDP call. Full-page screenshots over slow
                 # networks can legitimately take 20-40s; the default 30s
@@ -6109,13 +6230,13 @@ def _fullpage_limit_error() -> dict:
                 css_w = meta.get("cssWidth", 0)
                 css_h = meta.get("cssHeight", 0)
 
-                import struct as _struct
-
-                raw_bytes = base64.b64decode(data) if data else b""
-                png_w = _struct.unpack(">I", raw_bytes[16:20])[0] if len(raw_bytes) >= 24 else 0
-                png_h = _struct.unpack(">I", raw_bytes[20:24])[0] if len(raw_bytes) >= 24 else 0
+                # Dimensions from the image header alone — decoding the whole
+                # multi-MB payload on the event loop just for these was most
+                # of the bridge-side cost of a screenshot.
+                captured_fmt, png_w, png_h = image_size(data)
                 logger.info(
-                    "CDP screenshot raw: png=%dx%d, css=%dx%d, dpr=%s, implied_dpr=%.2f",
+                    "CDP screenshot raw: %s=%dx%d, css=%dx%d, dpr=%s, implied_dpr=%.2f",
+                    captured_fmt,
                     png_w,
                     png_h,
                     css_w,
@@ -6138,15 +6259,15 @@ def _fullpage_limit_error() -> dict:
                     "devicePixelRatio": dpr,
                     "cssWidth": css_w,
                     "cssHeight": css_h,
-                    # Raw PNG pixel dims so callers can compare against
-                    # cssWidth/cssHeight × dpr and detect viewport ↔
-                    # capture mismatches (e.g. devtools-attached infobar
-                    # shifting one but not the other).
+                    # Raw captured pixel dims (named for the original PNG-only
+                    # pipeline) so callers can compare against cssWidth/cssHeight
+                    # × dpr and detect viewport ↔ capture mismatches (e.g.
+                    # devtools-attached infobar shifting one but not the other).
                     "pngWidth": png_w,
                     "pngHeight": png_h,
                     "clip": clip_rect,
                     "data": data,
-                    "mimeType": "image/png",
+                    "mimeType": MIME_TYPES.get(captured_fmt, MIME_TYPES[image_format]),
                 }
         except TimeoutError:
             logger.warning("Screenshot timed out after %ss", timeout_s)
@@ -6170,6 +6291,8 @@ async def screenshot_region(
         y1: float,
         scale: float = 2.0,
         timeout_s: float = 30.0,
+        image_format: str = "png",
+        quality: int | None = None,
     ) -> dict:
         """Capture a sub-region of the viewport at higher resolution.
 
@@ -6180,7 +6303,7 @@ async def screenshot_region(
         not an upscale of the 800px page screenshot).
 
         Returns the same envelope shape as :meth:`screenshot` with
-        ``data`` holding a base64 PNG, plus ``regionCssWidth`` /
+        ``data`` holding a base64 ``image_format`` image, plus ``regionCssWidth`` /
         ``regionCssHeight`` / ``captureScale`` for the caller's resize.
         """
         try:
@@ -6218,21 +6341,21 @@ async def screenshot_region(
                 clip_w = max(1.0, (fx1 - fx0) * cw)
                 clip_h = max(1.0, (fy1 - fy0) * ch)
 
-                result = await self._cdp(
-                    tab_id,
-                    "Page.captureScreenshot",
-                    {
-                        "format": "png",
-                        "clip": {
-                            "x": fx0 * cw,
-                            "y": fy0 * ch,
-                            "width": clip_w,
-                            "height": clip_h,
-                            "scale": scale,
-                        },
+                if image_format not in MIME_TYPES:
+                    image_format = "png"
+                capture: dict[str, Any] = {
+                    "format": image_format,
+                    "clip": {
+                        "x": fx0 * cw,
+                        "y": fy0 * ch,
+                        "width": clip_w,
+                        "height": clip_h,
+                        "scale": scale,
                     },
-                    timeout=timeout_s,
-                )
+                }
+                if image_format != "png":
+                    capture["quality"] = quality or INTERMEDIATE_QUALITY
+                result = await self._cdp(tab_id, "Page.captureScreenshot", capture, timeout=timeout_s)
                 data = result.get("data")
                 if not data:
                     return {"ok": False, "error": "Zoom screenshot failed"}
@@ -6248,7 +6371,7 @@ async def screenshot_region(
                     "regionCssHeight": clip_h,
                     "captureScale": scale,
                     "data": data,
-                    "mimeType": "image/png",
+                    "mimeType": MIME_TYPES[image_format],
                 }
         except TimeoutError:
             logger.warning("Zoom screenshot timed out after %ss", timeout_s)
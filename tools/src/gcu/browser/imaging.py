@@ -0,0 +1,244 @@
+"""
+Screenshot encoding pipeline: capture format, header parsing, off-loop
+re-encode and frame fingerprints.
+
+Screenshots used to be captured as PNG at native device resolution,
+base64-decoded in full on the bridge's event loop just to read the IHDR
+dimensions, and only then shrunk to the 800 px JPEG the model sees.
+That pipeline is now:
+
+* **Capture** in the configured format (JPEG by default, WebP or PNG via
+  ``HIVE_GCU_SCREENSHOT_FORMAT``). Clipped captures (element, full page,
+  zoom region) set ``clip.scale`` so that Chrome renders straight at the
+  output width. Those frames usually need no re-encode at all.
+* **Parse** dimensions from the first few hundred base64 characters
+  (:func:`image_size`) instead of decoding the whole payload.
+* **Re-encode** (resize, annotate, transcode) in a small dedicated
+  thread pool (:func:`run_off_loop`). JPEG sources are decoded at reduced
+  DCT scale via Pillow's ``draft`` mode, so a 2x-DPR viewport never
+  materialises at full size.
+* **Fingerprint** each output frame (:class:`FrameSignature`) so an
+  unchanged viewport can be answered with "same as before" rather than
+  another image.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import functools
+import io
+import math
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+EXTENSIONS = {"jpeg": ".jpg", "webp": ".webp", "png": ".png"}
+
+
+def _env_format() -> str:
+    fmt = (os.environ.get("HIVE_GCU_SCREENSHOT_FORMAT") or "jpeg").strip().lower()
+    fmt = "jpeg" if fmt == "jpg" else fmt
+    return fmt if fmt in MIME_TYPES else "jpeg"
+
+
+# Format and quality of the image handed to the model.
+OUTPUT_FORMAT = _env_format()
+OUTPUT_QUALITY = max(1, min(100, int(os.environ.get("HIVE_GCU_SCREENSHOT_QUALITY", "75") or "75")))
+# Quality asked of Chrome when the frame will be resized and re-encoded
+# anyway. Higher than OUTPUT_QUALITY so that the second lossy pass doesn't
+# compound visible artefacts; still a fraction of the PNG size.
+INTERMEDIATE_QUALITY = 90
+
+# Worker threads for resize / annotate / encode. Pillow releases the GIL
+# in decode, resize and encode, so threads parallelise. The pool size is
+# also the memory bound: each job holds a decoded bitmap plus an overlay in
+# native buffers (libjpeg/libpng/Pillow, invisible to tracemalloc), and a
+# burst of screenshots on the shared default executor once stacked those
+# into a ~900 MB RSS spike. Tunable; keep it small.
+_WORKERS = max(1, int(os.environ.get("HIVE_GCU_SCREENSHOT_CONCURRENCY", "2") or "2"))
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_WORKERS, thread_name_prefix="gcu-imaging")
+    return _executor
+
+
+async def run_off_loop(fn, /, *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn(*args, **kwargs)`` on the imaging pool and await it."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+# Chrome's largest safe capture. Over-large captureScreenshot bitmaps have
+# crashed the whole browser (see BeelineBridge.screenshot).
+_MAX_CAPTURE_SIDE = 16000
+_MAX_CAPTURE_PIXELS = 16_000_000
+# Upper bound on render-time upscaling of a small element.
+_MAX_UPSCALE = 4.0
+
+
+def capture_scale(width: float, height: float, target_width: int) -> float:
+    """``clip.scale`` that renders a ``width`` x ``height`` CSS-px clip at
+    ``target_width`` pixels wide, within Chrome's safe bitmap limits.
+
+    Small clips are rendered larger (crisper than upscaling afterwards),
+    up to 4x; large clips are rendered smaller rather than downscaled
+    from a full-size bitmap.
+    """
+    if width <= 0 or height <= 0:
+        return 1.0
+    scale = min(target_width / width, _MAX_UPSCALE, _MAX_CAPTURE_SIDE / width, _MAX_CAPTURE_SIDE / height)
+    scale = min(scale, (_MAX_CAPTURE_PIXELS / (width * height)) ** 0.5)
+    # Round down so the rounded scale never overshoots the limits.
+    return max(0.05, math.floor(scale * 10_000) / 10_000)
+
+
+# ── header parsing ───────────────────────────────────────────────────
+
+# JPEG start-of-frame markers carry the dimensions; C4 (DHT), C8 (JPG)
+# and CC (DAC) share the range but are not frames.
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _size_from_bytes(raw: bytes) -> tuple[str, int, int] | None:
+    """``(format, width, height)`` from an image prefix, or None if the
+    prefix is too short to tell."""
+    if raw[:8] == b"\x89PNG\r\n\x1a\n":
+        if len(raw) < 24:
+            return None
+        w, h = struct.unpack(">II", raw[16:24])
+        return "png", w, h
+    if raw[:4] == b"RIFF" and raw[8:12] == b"WEBP":
+        if len(raw) < 30:
+            return None
+        chunk = raw[12:16]
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", raw[26:30])
+            return "webp", w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(raw[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return "webp", int.from_bytes(raw[24:27], "little") + 1, int.from_bytes(raw[27:30], "little") + 1
+        return "webp", 0, 0
+    if raw[:2] == b"\xff\xd8":
+        i = 2
+        while i + 4 <= len(raw):
+            if raw[i] != 0xFF:
+                i += 1
+                continue
+            marker = raw[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            if i + 9 > len(raw):
+                return None
+            if marker in _JPEG_SOF:
+                h, w = struct.unpack(">HH", raw[i + 5 : i + 9])
+                return "jpeg", w, h
+            i += 2 + struct.unpack(">H", raw[i + 2 : i + 4])[0]
+        return None
+    return ("unknown", 0, 0) if len(raw) >= 12 else None
+
+
+def image_size(data: str) -> tuple[str, int, int]:
+    """``(format, width, height)`` of a base64 image, decoding only as
+    much of the payload as the header needs.
+
+    PNG and WebP answer from the first 40 characters. JPEG needs to walk
+    its markers to the frame header, which sits after the quantisation
+    and Huffman tables — usually within the first 1 KB. Returns
+    ``("unknown", 0, 0)`` for anything unparseable.
+    """
+    if not data:
+        return "unknown", 0, 0
+    chars = 64
+    while True:
+        chunk = data[:chars]
+        chunk = chunk[: len(chunk) - len(chunk) % 4]
+        try:
+            raw = base64.b64decode(chunk)
+        except (binascii.Error, ValueError):
+            return "unknown", 0, 0
+        found = _size_from_bytes(raw)
+        if found is not None:
+            return found
+        if chars >= len(data):
+            return "unknown", 0, 0
+        chars *= 4
+
+
+# ── frame fingerprints ───────────────────────────────────────────────
+
+# Grayscale thumbnail width for frame comparison. At 64 px wide each
+# sample averages ~20x20 CSS px of a typical viewport, so a toggled
+# checkbox or a changed word still moves its sample well past the
+# tolerance, while JPEG noise and sub-pixel antialiasing do not.
+_THUMB_WIDTH = 64
+_THUMB_TOLERANCE = 10
+_DHASH_MAX_DISTANCE = 4
+
+
+@dataclass(frozen=True)
+class FrameSignature:
+    """Perceptual fingerprint of one output frame.
+
+    ``dhash`` is a 64-bit difference hash (a cheap first check that
+    ignores encoding noise); ``thumb`` is a small grayscale rendering
+    compared sample by sample so that localised changes the hash is too
+    coarse to see still register.
+    """
+
+    width: int
+    height: int
+    dhash: int
+    thumb: bytes
+
+    def matches(self, other: FrameSignature | None) -> bool:
+        """True when ``other`` shows the same picture as this frame."""
+        if other is None or (self.width, self.height) != (other.width, other.height):
+            return False
+        if bin(self.dhash ^ other.dhash).count("1") > _DHASH_MAX_DISTANCE:
+            return False
+        if len(self.thumb) != len(other.thumb):
+            return False
+        return max((abs(a - b) for a, b in zip(self.thumb, other.thumb, strict=True)), default=0) <= _THUMB_TOLERANCE
+
+
+def frame_signature(img) -> FrameSignature:
+    """Fingerprint a PIL image (any mode)."""
+    from PIL import Image
+
+    gray = img.convert("L")
+    small = gray.resize((9, 8), Image.BILINEAR)
+    px = small.tobytes()
+    dhash = 0
+    for row in range(8):
+        for col in range(8):
+            dhash = (dhash << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    thumb_h = max(1, round(img.height * _THUMB_WIDTH / max(1, img.width)))
+    thumb = gray.resize((_THUMB_WIDTH, thumb_h), Image.BOX).tobytes()
+    return FrameSignature(img.width, img.height, dhash, thumb)
+
+
+def open_for_width(raw: bytes, target_width: int):
+    """Open image bytes with Pillow, decoding JPEGs at the smallest DCT
+    scale that still covers ``target_width`` (1/2, 1/4 or 1/8 — several
+    times less decode work and memory for a high-DPR viewport)."""
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw))
+    if img.format == "JPEG" and target_width and img.width > target_width:
+        img.draft("RGB", (target_width, max(1, img.height * target_width // img.width)))
+    return img
@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import base64
 import inspect
 import io
@@ -14,6 +13,7 @@
 import logging
 import os
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Annotated, Literal
 
@@ -22,6 +22,7 @@
 from pydantic import Field
 
 from ..bridge import connection_error, get_bridge
+from ..imaging import EXTENSIONS, MIME_TYPES, OUTPUT_FORMAT, OUTPUT_QUALITY, FrameSignature, frame_signature, image_size, open_for_width, run_off_loop
 from ..telemetry import log_tool_call
 from .tabs import _get_context
 
@@ -75,6 +76,13 @@ def _write_browser_artifact_bytes(tool_name: str, tab_id: int, raw: bytes, ext:
     return path.resolve()
 
 
+def _b64_size(data: str | None) -> int:
+    """Decoded byte length of a base64 payload, without decoding it."""
+    if not data:
+        return 0
+    return len(data) * 3 // 4 - data[-2:].count("=")
+
+
 # Fixed output width for all screenshots (bandwidth default). This
 # number does NOT affect coordinate semantics — click / hover / press
 # and rect tools all work in fractions of the viewport (0..1), which
@@ -83,25 +91,12 @@ def _write_browser_artifact_bytes(tool_name: str, tab_id: int, raw: bytes, ext:
 # ~150 KB on typical UI screenshots.
 _SCREENSHOT_WIDTH = 800
 
-# Bound concurrent PIL screenshot processing. Each _resize_and_annotate decodes
-# the raw PNG to a full-resolution RGBA bitmap (a 2748x1382 shot ≈ 15 MB; a tall
-# full-page shot can be 100+ MB) plus a same-size overlay — all NATIVE buffers
-# (libpng/Pillow), invisible to tracemalloc. Because the call is dispatched via
-# asyncio.to_thread, the default thread pool let many run at once, so a burst of
-# concurrent screenshots stacked those buffers and spiked RSS to ~900 MB (glibc
-# only partly returns native memory). This semaphore caps peak footprint at
-# roughly N × image-size. Tunable; keep it small.
-_SCREENSHOT_CONCURRENCY = max(1, int(os.environ.get("HIVE_GCU_SCREENSHOT_CONCURRENCY", "2") or "2"))
-_resize_semaphore: asyncio.Semaphore | None = None
-
-
-def _get_resize_semaphore() -> asyncio.Semaphore:
-    """Lazily create the semaphore on the running loop (avoids binding at import
-    time / to the wrong loop)."""
-    global _resize_semaphore
-    if _resize_semaphore is None:
-        _resize_semaphore = asyncio.Semaphore(_SCREENSHOT_CONCURRENCY)
-    return _resize_semaphore
+# How long a screenshot counts as "in the model's view" for an opt-in
+# ``dedupe`` capture: one that looks identical to the last image of the
+# same tab sent within this window is answered with metadata only. 0
+# disables. Off by default: the agent loop evicts old images and
+# compaction strips them, so the model cannot be assumed to still have it.
+_SCREENSHOT_DEDUPE_S = float(os.environ.get("HIVE_GCU_SCREENSHOT_DEDUPE_S", "120") or "0")
 
 
 # Per-tab viewport-size cache populated on every browser_screenshot
@@ -116,6 +111,10 @@ def _get_resize_semaphore() -> asyncio.Semaphore:
 # _SCREENSHOT_WIDTH). Logged only; no consumer.
 _screenshot_scales: dict[int, float] = {}
 
+# Last frame sent to the model per tab: (signature, capture key, monotonic
+# time). See _SCREENSHOT_DEDUPE_S.
+_last_frames: dict[int, tuple[FrameSignature, tuple, float]] = {}
+
 
 def clear_tab_state(tab_ids) -> None:
     """Drop cached screenshot scales and viewport sizes for the given tab_ids.
@@ -129,61 +128,87 @@ def clear_tab_state(tab_ids) -> None:
     for tid in tab_ids:
         _screenshot_scales.pop(tid, None)
         _viewport_sizes.pop(tid, None)
+        _last_frames.pop(tid, None)
+
+
+@dataclass
+class _Frame:
+    """One encoded screenshot, ready to hand to the model."""
+
+    data: str
+    fmt: str
+    physical_scale: float
+    signature: FrameSignature | None = None
+
+    @property
+    def mime(self) -> str:
+        return MIME_TYPES.get(self.fmt, "image/png")
 
 
-def _resize_and_annotate(
+def _render_frame(
     data: str,
     css_width: int,
     dpr: float = 1.0,
     highlights: list[dict] | None = None,
-) -> tuple[str, float]:
-    """Resize the captured PNG down to ``_SCREENSHOT_WIDTH`` (=800 px)
-    and re-encode as JPEG quality 75.
+    *,
+    fmt: str = OUTPUT_FORMAT,
+    quality: int = OUTPUT_QUALITY,
+    fingerprint: bool = False,
+) -> _Frame:
+    """Resize the captured image down to ``_SCREENSHOT_WIDTH`` (=800 px)
+    and encode it as ``fmt`` (JPEG quality 75 by default).
 
     The image dimensions do NOT determine click coordinates any more —
     the tools work in viewport fractions. This helper exists purely
-    for bandwidth + annotation overlay. Returns ``(new_b64,
-    physical_scale)`` where ``physical_scale = orig_png_w / output_w``
-    is kept for debug logging.
+    for bandwidth + annotation overlay. ``physical_scale = orig_w /
+    output_w`` is kept for debug logging.
+
+    A capture that already arrives at the output width and format (the
+    bridge scales clipped captures at capture time) is returned as-is
+    unless it needs an annotation. ``fingerprint=True`` also computes
+    the frame's :class:`FrameSignature` for deduplication.
 
     Highlight rects arrive in CSS px; they're converted to image-space
     for overlay drawing via the local ``css_to_image = css_width /
     output_w`` factor (computed inline — no external cache).
+
+    Blocking (decode / resize / encode) — call through
+    :func:`~gcu.browser.imaging.run_off_loop`.
     """
+    src_fmt, orig_w, orig_h = image_size(data)
     if not css_width or css_width <= 0:
         # Bridge always supplies css_width from window.innerWidth; only
-        # reach here on a degraded response. Return the raw PNG.
-        return data, 1.0
+        # reach here on a degraded response. Return the raw capture.
+        return _Frame(data, src_fmt, 1.0)
 
     try:
         from PIL import Image, ImageDraw, ImageFont
     except ImportError:
-        raw = base64.b64decode(data) if data else b""
-        orig_w = 0
-        if len(raw) >= 24 and raw[:8] == b"\x89PNG\r\n\x1a\n":
-            import struct
-
-            orig_w = struct.unpack(">I", raw[16:20])[0]
         physical_scale = orig_w / _SCREENSHOT_WIDTH if orig_w else 1.0
         logger.warning(
             "PIL not available — screenshot resize SKIPPED. "
-            "Returning raw physical-px PNG. physicalScale=%.4f, "
+            "Returning raw physical-px capture. physicalScale=%.4f, "
             "css_width=%d, dpr=%s. Install Pillow for annotation.",
             physical_scale,
             css_width,
             dpr,
         )
-        return data, round(physical_scale, 4)
+        return _Frame(data, src_fmt, round(physical_scale, 4))
 
     try:
+        passthrough = src_fmt == fmt and orig_w == _SCREENSHOT_WIDTH and not highlights
+        if passthrough and not fingerprint:
+            return _Frame(data, fmt, 1.0)
         raw = base64.b64decode(data)
-        img = Image.open(io.BytesIO(raw)).convert("RGBA")
-        orig_w, orig_h = img.size
+        img = open_for_width(raw, _SCREENSHOT_WIDTH)
+        if not orig_w:
+            orig_w, orig_h = img.size
 
         physical_scale = orig_w / _SCREENSHOT_WIDTH
         new_w = _SCREENSHOT_WIDTH
         new_h = round(orig_h * new_w / orig_w)
-        if (new_w, new_h) != img.size:
+        img = img.convert("RGBA" if highlights else "RGB")
+        if img.size != (new_w, new_h):
             img = img.resize((new_w, new_h), Image.LANCZOS)
 
         # Local CSS → image px factor for overlay draws. Kept local —
@@ -249,15 +274,18 @@ def _resize_and_annotate(
                 draw.text((lx, ly), display_label, fill=(255, 255, 255, 255), font=font)
 
             img = Image.alpha_composite(img, overlay).convert("RGB")
-        else:
-            img = img.convert("RGB")
 
+        signature = frame_signature(img) if fingerprint else None
+        if passthrough:
+            return _Frame(data, fmt, round(physical_scale, 4), signature)
         buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=75, optimize=True)
-        return (
-            base64.b64encode(buf.getvalue()).decode(),
-            round(physical_scale, 4),
-        )
+        if fmt == "png":
+            img.save(buf, format="PNG")
+        elif fmt == "webp":
+            img.save(buf, format="WEBP", quality=quality, method=4)
+        else:
+            img.save(buf, format="JPEG", quality=quality, optimize=True)
+        return _Frame(base64.b64encode(buf.getvalue()).decode(), fmt, round(physical_scale, 4), signature)
     except Exception:
         logger.warning(
             "Screenshot resize/annotate FAILED — returning original image. css_width=%s, dpr=%s.",
@@ -265,7 +293,13 @@ def _resize_and_annotate(
             dpr,
             exc_info=True,
         )
-        return data, 1.0
+        return _Frame(data, src_fmt, 1.0)
+
+
+def _remember_frame(tab_id: int, frame: _Frame, capture_key: tuple) -> None:
+    """Record ``frame`` as the last image of ``tab_id`` the model received."""
+    if frame.signature is not None:
+        _last_frames[tab_id] = (frame.signature, capture_key, time.monotonic())
 
 
 async def _ensure_viewport_size(tab_id: int, _caller: str = "unknown") -> tuple[int, int]:
@@ -347,6 +381,7 @@ async def render_screenshot(
     spill: bool = False,
     intent: str | None = None,
     selector_timeout_ms: int = 5000,
+    dedupe: bool = False,
 ) -> list | dict:
     """Capture a screenshot of ``target_tab``, resize + annotate it, and
     return MCP content blocks ``[TextContent(metadata), ImageContent]``.
@@ -356,7 +391,13 @@ async def render_screenshot(
     byte-identical output. ``bridge`` and ``target_tab`` must already be
     resolved by the caller.
 
-    When ``spill=True`` (the ``hive-browser`` CLI path), the JPEG is written to
+    With ``dedupe=True``, a capture that looks the same as the last image
+    of this tab sent within ``_SCREENSHOT_DEDUPE_S`` (same URL, same
+    capture kind) returns the metadata with ``unchanged: true`` and no
+    image, so an idle viewport is not paid for twice. The caller must know
+    that image is still in view; by default the image is always returned.
+
+    When ``spill=True`` (the ``hive-browser`` CLI path), the image is written to
     a sibling artifact file instead of being returned inline, and the function
     returns a JSON dict of the same metadata plus ``saved_to`` and an ``_image``
     marker. The framework recognizes that marker on the ``terminal_exec`` result
@@ -368,7 +409,14 @@ async def render_screenshot(
     if log_params is None:
         log_params = {"tab_id": target_tab, "full_page": full_page, "selector": selector}
     try:
-        screenshot_result = await bridge.screenshot(target_tab, full_page=full_page, selector=selector, selector_timeout_ms=selector_timeout_ms)
+        screenshot_result = await bridge.screenshot(
+            target_tab,
+            full_page=full_page,
+            selector=selector,
+            selector_timeout_ms=selector_timeout_ms,
+            image_format=OUTPUT_FORMAT,
+            target_width=_SCREENSHOT_WIDTH,
+        )
 
         if not screenshot_result.get("ok"):
             log_tool_call(
@@ -422,19 +470,11 @@ async def render_screenshot(
         if annotate and target_tab in _interaction_highlights:
             highlights = [_interaction_highlights[target_tab]]
 
-        # Resize to CSS-viewport dimensions (image px == CSS px) and
-        # re-encode as JPEG. Offloaded to a thread because PIL on a
-        # 2-megapixel PNG blocks for ~150–300 ms of CPU. The semaphore bounds
-        # how many of these run at once so concurrent screenshots can't stack
-        # their large native PIL buffers into a multi-hundred-MB RSS spike.
-        async with _get_resize_semaphore():
-            data, physical_scale = await asyncio.to_thread(
-                _resize_and_annotate,
-                data,
-                css_width,
-                dpr,
-                highlights,
-            )
+        # Resize to the output width and encode. Runs on the imaging pool:
+        # decoding a 2x-DPR viewport blocks for 100+ ms of CPU, and the
+        # pool's size bounds how many native bitmaps exist at once.
+        frame = await run_off_loop(_render_frame, data, css_width, dpr, highlights, fingerprint=True)
+        data, physical_scale = frame.data, frame.physical_scale
         # Cache live viewport dimensions so click / hover / press / rect
         # tools can translate fractions ↔ CSS px without re-querying.
         css_height = int(screenshot_result.get("cssHeight", 0)) or 0
@@ -461,8 +501,8 @@ async def render_screenshot(
             "ok": True,
             "tabId": target_tab,
             "url": screenshot_result.get("url", ""),
-            "imageType": "jpeg",
-            "size": len(base64.b64decode(data)) if data else 0,
+            "imageType": frame.fmt,
+            "size": _b64_size(data),
             "imageWidth": _SCREENSHOT_WIDTH,
             "cssWidth": css_width,
             "cssHeight": css_height,
@@ -488,12 +528,37 @@ async def render_screenshot(
             ),
         }
 
+        # An unchanged viewport is answered with metadata only. The timestamp
+        # is not refreshed on a match — what matters is how long ago the
+        # model actually received the image.
+        capture_key = (screenshot_result.get("url", ""), full_page, selector)
+        now = time.monotonic()
+        previous = _last_frames.get(target_tab)
+        unchanged = (
+            dedupe
+            and _SCREENSHOT_DEDUPE_S > 0
+            and previous is not None
+            and previous[1] == capture_key
+            and now - previous[2] <= _SCREENSHOT_DEDUPE_S
+            and frame.signature is not None
+            and frame.signature.matches(previous[0])
+        )
+        if unchanged:
+            meta_obj["unchanged"] = True
+            meta_obj["note"] = (
+                f"The page looks the same as the screenshot of this tab sent {now - previous[2]:.0f}s ago, "
+                "so the image was not resent. Refer to that image."
+            )
+        else:
+            _remember_frame(target_tab, frame, capture_key)
+
         log_tool_call(
             log_name,
             log_params,
             result={
                 "ok": True,
-                "size": len(base64.b64decode(data)) if data else 0,
+                "unchanged": unchanged,
+                "size": _b64_size(data),
                 "url": screenshot_result.get("url", ""),
                 "cssWidth": css_width,
                 "cssHeight": css_height,
@@ -503,20 +568,23 @@ async def render_screenshot(
             duration_ms=(time.perf_counter() - start) * 1000,
         )
 
+        if unchanged:
+            return meta_obj if spill else [TextContent(type="text", text=json.dumps(meta_obj))]
+
         if spill:
-            # CLI path: write the JPEG to disk and return a pointer + an
+            # CLI path: write the image to disk and return a pointer + an
             # ``_image`` marker the framework re-inlines into the session.
-            raw_jpeg = base64.b64decode(data) if data else b""
-            artifact = _write_browser_artifact_bytes("browser_screenshot", target_tab, raw_jpeg, ".jpg")
+            raw_image = base64.b64decode(data) if data else b""
+            artifact = _write_browser_artifact_bytes("browser_screenshot", target_tab, raw_image, EXTENSIONS.get(frame.fmt, ".png"))
             return {
                 **meta_obj,
                 "saved_to": str(artifact),
-                "_image": {"path": str(artifact), "mime": "image/jpeg", "intent": intent},
+                "_image": {"path": str(artifact), "mime": frame.mime, "intent": intent},
             }
 
         return [
             TextContent(type="text", text=json.dumps(meta_obj)),
-            ImageContent(type="image", data=data, mimeType="image/jpeg"),
+            ImageContent(type="image", data=data, mimeType=frame.mime),
         ]
     except Exception as e:
         log_tool_call(
@@ -542,6 +610,12 @@ async def render_screenshot(
 left_click / hover / key action. ``browser_shadow_query``
 likewise returns coordinates as fractions.
 
+Always returns a fresh image unless you pass ``dedupe=true``: then,
+if the page looks the same as this tab's previous screenshot, the
+metadata comes back with ``unchanged: true`` and no image. Only use
+it when that previous screenshot is still visible to you (e.g. it is
+the result right before this call).
+
 Returns a list of content blocks: text metadata + image."""
 
 BROWSER_SCREENSHOT_PARAMS = {
@@ -564,6 +638,11 @@ async def render_screenshot(
     ),
     "selector": "CSS selector to screenshot a specific element (optional)",
     "annotate": "Draw bounding box of last interaction on image (default: True)",
+    "dedupe": (
+        "Skip the image if the page looks unchanged since this tab's previous "
+        "screenshot (default: False). Only when that screenshot is still in "
+        "view, e.g. the immediately preceding tool result."
+    ),
 }
 
 
@@ -619,6 +698,11 @@ async def render_screenshot(
         '    - "simple": interactive + content nodes, skip unnamed structural nodes\n'
         '    - "interactive": only interactive nodes (buttons, links, inputs, etc.)'
     ),
+    "diff": (
+        "Return only what changed since the previous snapshot of this tab in the same mode "
+        '("- " removed, "+ " added, "@@" between hunks). The first snapshot after opening '
+        "or navigating is returned in full with diff=false."
+    ),
 }
 
 
@@ -664,6 +748,7 @@ async def browser_screenshot(
         full_page: Annotated[bool, Field(description=BROWSER_SCREENSHOT_PARAMS["full_page"])] = False,
         selector: Annotated[str | None, Field(description=BROWSER_SCREENSHOT_PARAMS["selector"])] = None,
         annotate: Annotated[bool, Field(description=BROWSER_SCREENSHOT_PARAMS["annotate"])] = True,
+        dedupe: Annotated[bool, Field(description=BROWSER_SCREENSHOT_PARAMS["dedupe"])] = False,
     ) -> list:
         start = time.perf_counter()
         params = {
@@ -671,6 +756,7 @@ async def browser_screenshot(
             "profile": profile,
             "full_page": full_page,
             "selector": selector,
+            "dedupe": dedupe,
         }
 
         bridge = get_bridge()
@@ -700,6 +786,7 @@ async def browser_screenshot(
             log_name="browser_screenshot",
             log_params=params,
             start=start,
+            dedupe=dedupe,
         )
 
     @mcp.tool(description=BROWSER_SHADOW_QUERY_DOC)
@@ -755,9 +842,10 @@ async def browser_snapshot(
             Literal["default", "simple", "interactive"],
             Field(description=BROWSER_SNAPSHOT_PARAMS["mode"]),
         ] = "default",
+        diff: Annotated[bool, Field(description=BROWSER_SNAPSHOT_PARAMS["diff"])] = False,
     ) -> dict:
         start = time.perf_counter()
-        params = {"tab_id": tab_id, "profile": profile, "mode": mode}
+        params = {"tab_id": tab_id, "profile": profile, "mode": mode, "diff": diff}
 
         bridge = get_bridge()
         if not bridge or not bridge.is_connected:
@@ -807,13 +895,22 @@ async def browser_snapshot(
             return result
 
         try:
-            snapshot_result = await bridge.snapshot(target_tab, mode=mode)
+            snapshot_result = await bridge.snapshot(target_tab, mode=mode, diff=diff)
             # Spill the raw AX-tree text to a sibling file so the
             # LLM-visible result stays tiny (a JSON-wrapped multi-KB
             # tree forces escaping of every newline / quote, which is
             # noisy and token-hostile). The model receives only a
             # pointer; it can read_file or grep the artifact on demand.
-            if isinstance(snapshot_result, dict) and snapshot_result.get("ok") and isinstance(snapshot_result.get("tree"), str):
+            if isinstance(snapshot_result, dict) and snapshot_result.get("ok") and snapshot_result.get("diff") and not snapshot_result.get("changed"):
+                # Nothing to spill; the answer is the absence of a diff.
+                result = {
+                    "ok": True,
+                    "tabId": snapshot_result.get("tabId", target_tab),
+                    "url": snapshot_result.get("url"),
+                    "diff": True,
+                    "changed": False,
+                }
+            elif isinstance(snapshot_result, dict) and snapshot_result.get("ok") and isinstance(snapshot_result.get("tree"), str):
                 tree_text = snapshot_result["tree"]
                 try:
                     artifact_path = _write_browser_artifact("browser_snapshot", target_tab, tree_text, ".txt")
@@ -824,6 +921,10 @@ async def browser_snapshot(
                         "length": len(tree_text),
                         "saved_to": str(artifact_path),
                     }
+                    if "diff" in snapshot_result:
+                        result["diff"] = snapshot_result["diff"]
+                        if snapshot_result["diff"]:
+                            result["changed"] = True
                 except OSError as write_err:
                     # If disk write fails, surface the error rather than
                     # silently returning the inline tree (which would
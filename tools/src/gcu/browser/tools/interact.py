@@ -25,11 +25,13 @@
 from pydantic import Field
 
 from ..bridge import connection_error, get_bridge
+from ..imaging import OUTPUT_FORMAT, run_off_loop
 from ..telemetry import log_tool_call
 from .inspection import (
     _SCREENSHOT_WIDTH,
     _ensure_viewport_size,
-    _resize_and_annotate,
+    _remember_frame,
+    _render_frame,
     render_screenshot,
 )
 from .tabs import _get_context
@@ -188,18 +190,20 @@ async def _build_visual_response(result: dict, bridge, target_tab: int | None) -
     try:
         from ..bridge import _interaction_highlights
 
-        shot = await bridge.screenshot(target_tab, full_page=False)
+        shot = await bridge.screenshot(target_tab, full_page=False, image_format=OUTPUT_FORMAT, target_width=_SCREENSHOT_WIDTH)
         if not shot.get("ok"):
             return [text_block]
         highlights = [_interaction_highlights[target_tab]] if target_tab in _interaction_highlights else None
-        data, _ = await asyncio.to_thread(
-            _resize_and_annotate,
+        frame = await run_off_loop(
+            _render_frame,
             shot["data"],
             shot.get("cssWidth", 0),
             shot.get("devicePixelRatio", 1.0),
             highlights,
+            fingerprint=True,
         )
-        return [text_block, ImageContent(type="image", data=data, mimeType="image/jpeg")]
+        _remember_frame(target_tab, frame, (shot.get("url", ""), False, None))
+        return [text_block, ImageContent(type="image", data=frame.data, mimeType=frame.mime)]
     except Exception:
         return [text_block]
 
@@ -415,11 +419,11 @@ async def _do_zoom(bridge, target_tab: int, region: list[float]) -> list:
     # output width — a small region gets scaled up at capture time
     # (true higher-res), a large region is captured 1:1 and downscaled.
     scale = max(_ZOOM_MIN_SCALE, min(_ZOOM_MAX_SCALE, _SCREENSHOT_WIDTH / region_css_w))
-    shot = await bridge.screenshot_region(target_tab, x0, y0, x1, y1, scale=scale)
+    shot = await bridge.screenshot_region(target_tab, x0, y0, x1, y1, scale=scale, image_format=OUTPUT_FORMAT)
     if not shot.get("ok"):
         return _text_only(shot)
-    data, _ = await asyncio.to_thread(
-        _resize_and_annotate,
+    frame = await run_off_loop(
+        _render_frame,
         shot["data"],
         int(shot.get("regionCssWidth", region_css_w)),
         shot.get("devicePixelRatio", 1.0),
@@ -438,7 +442,7 @@ async def _do_zoom(bridge, target_tab: int, region: list[float]) -> list:
             "action": "zoom",
             "tabId": target_tab,
             "url": shot.get("url", ""),
-            "imageType": "jpeg",
+            "imageType": frame.fmt,
             "region": list(region),
             "crop_box": crop_box,
             "captureScale": shot.get("captureScale"),
@@ -456,7 +460,7 @@ async def _do_zoom(bridge, target_tab: int, region: list[float]) -> list:
     )
     return [
         TextContent(type="text", text=meta),
-        ImageContent(type="image", data=data, mimeType="image/jpeg"),
+        ImageContent(type="image", data=frame.data, mimeType=frame.mime),
     ]
 
 
@@ -59,20 +59,23 @@ async def _build_visual_response(result: dict, bridge, target_tab: int | None) -
         return [text_block]
     try:
         from ..bridge import _interaction_highlights
-        from .inspection import _resize_and_annotate
+        from ..imaging import OUTPUT_FORMAT, run_off_loop
+        from .inspection import _SCREENSHOT_WIDTH, _remember_frame, _render_frame
 
-        shot = await bridge.screenshot(target_tab, full_page=False)
+        shot = await bridge.screenshot(target_tab, full_page=False, image_format=OUTPUT_FORMAT, target_width=_SCREENSHOT_WIDTH)
         if not shot.get("ok"):
             return [text_block]
         highlights = [_interaction_highlights[target_tab]] if target_tab in _interaction_highlights else None
-        data, _ = await asyncio.to_thread(
-            _resize_and_annotate,
+        frame = await run_off_loop(
+            _render_frame,
             shot["data"],
             shot.get("cssWidth", 0),
             shot.get("devicePixelRatio", 1.0),
             highlights,
+            fingerprint=True,
         )
-        return [text_block, ImageContent(type="image", data=data, mimeType="image/jpeg")]
+        _remember_frame(target_tab, frame, (shot.get("url", ""), False, None))
+        return [text_block, ImageContent(type="image", data=frame.data, mimeType=frame.mime)]
     except Exception:
         return [text_block]
 
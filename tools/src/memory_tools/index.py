@@ -24,6 +24,13 @@
     data/<scope>/<owner>/<session>/<spill_filename>.txt
         body = hardlink (or capped copy) of <session>/data/<file>.txt
 
+Trigram index (see ``trigram.py``):
+    Every sync indexes the cache files it just wrote (new ordinals, newly
+    mirrored spills) as one more segment under
+    ``meta/<scope>/<owner>/<session>/trigrams/``, so ``locate`` can narrow
+    rg to candidate files. Sessions cached before the index existed are
+    backfilled on their next sync.
+
 Cursor invariants:
     * events.jsonl is strictly append-only by the runtime, so resuming
       from cursor.events_byte_offset only sees genuinely new content.
@@ -61,7 +68,7 @@
 
     msvcrt = None  # type: ignore[assignment]
 
-from memory_tools import paths as P
+from memory_tools import paths as P, trigram
 
 
 def _flock_exclusive(fd: int) -> None:
@@ -107,6 +114,7 @@ def _flock_release(fd: int) -> None:
 # "Full result saved at: ". See tool_result_handler.py:343.
 _SPILL_PLACEHOLDER_HEADER = re.compile(r"^Tool `[^`]+` returned [\d,]+ characters")
 _SPILL_PATH_RE = re.compile(r"Full result saved at:\s*(\S+)")
+_EVENT_CACHE_FILE_RE = re.compile(r"^\d{6}\.(user|assistant|tool)\.txt$")
 
 
 @dataclass
@@ -401,10 +409,6 @@ def sync_session(
             stats.elapsed_ms = int((time.monotonic() - t0) * 1000)
             return stats
 
-        # Persist cursor + data_map AFTER processing.
-        _atomic_write_json(cursor_p, cursor.to_dict())
-        _atomic_write_json(data_map_p, data_map)
-
         # Mirror spilled data files (independent of events processing —
         # the spilled file may already exist before its event lands, or
         # vice versa).
@@ -416,12 +420,79 @@ def sync_session(
             stats=stats,
         )
 
+        # Index what was just written BEFORE the cursor moves past it: a
+        # crash in between re-processes (and re-indexes) those events.
+        _update_trigram_index(
+            scope,
+            owner,
+            session,
+            first_ordinal=before_ordinal,
+            next_ordinal=cursor.next_ordinal,
+            stats=stats,
+        )
+
+        # Persist cursor + data_map AFTER processing.
+        _atomic_write_json(cursor_p, cursor.to_dict())
+        _atomic_write_json(data_map_p, data_map)
+
     if cursor.next_ordinal > before_ordinal:
         stats.sessions_synced = 1
     stats.elapsed_ms = int((time.monotonic() - t0) * 1000)
     return stats
 
 
+def _update_trigram_index(
+    scope: P.Scope,
+    owner: str,
+    session: str,
+    *,
+    first_ordinal: int,
+    next_ordinal: int,
+    stats: SyncStats,
+) -> None:
+    """Add this sync's new cache files to the session's trigram index.
+
+    Events files are the ordinals written in this sync; mirrored spills are
+    whatever is in the data dir but not yet indexed. A session with no
+    index yet is indexed in full. On failure the index is dropped so
+    ``locate`` falls back to a full sweep and the next sync rebuilds it.
+    """
+    idx = trigram.TrigramIndex.for_session(scope, owner, session)
+    events_dir = P.events_index_dir(scope, owner, session)
+    data_dir = P.data_index_dir(scope, owner, session)
+    try:
+        backfill = not idx.exists()
+        indexed: set[str] | None = set() if backfill else None
+        files: list[tuple[str, Path]] = []
+        if backfill:
+            if events_dir.exists():
+                for entry in os.scandir(events_dir):
+                    if _EVENT_CACHE_FILE_RE.match(entry.name):
+                        files.append((trigram.EVENTS_PREFIX + entry.name, Path(entry.path)))
+        else:
+            for ordinal in range(first_ordinal, next_ordinal):
+                for role in ("user", "assistant", "tool"):
+                    name = _ordinal_filename(ordinal, role)
+                    path = events_dir / name
+                    if path.exists():
+                        files.append((trigram.EVENTS_PREFIX + name, path))
+        if data_dir.exists():
+            for entry in os.scandir(data_dir):
+                if not entry.name.endswith(".txt"):
+                    continue
+                if indexed is None:
+                    indexed = idx.indexed_names()
+                name = trigram.DATA_PREFIX + entry.name
+                if name not in indexed:
+                    files.append((name, Path(entry.path)))
+        if files or backfill:
+            idx.add(files)
+    except (OSError, ValueError) as exc:
+        logger.warning("memory_tools: trigram index update failed for %s/%s/%s: %s", scope, owner, session, exc)
+        stats.errors.append(f"trigram index {session}: {exc}")
+        shutil.rmtree(idx.directory, ignore_errors=True)
+
+
 def _reset_session_cache(scope: P.Scope, owner: str, session: str) -> None:
     """Move stale cache aside under .stale/<ts>/ for safety, then clear."""
     base_meta = P.meta_dir(scope, owner, session)
@@ -440,6 +511,7 @@ def _reset_session_cache(scope: P.Scope, owner: str, session: str) -> None:
     for f in (P.cursor_path(scope, owner, session), P.data_map_path(scope, owner, session)):
         if f.exists():
             f.unlink(missing_ok=True)
+    shutil.rmtree(trigram.index_dir(scope, owner, session), ignore_errors=True)
 
 
 def _process_event(
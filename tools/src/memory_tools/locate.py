@@ -15,6 +15,12 @@
     * Fall back to Python ``re`` over the same flat tree if rg is
       missing. Same shape of output; lookaround/backref still rejected
       at validation time so behavior matches.
+
+Narrowing:
+    When the pattern has required literals, each session's trigram index
+    (``trigram.py``) picks the cache files that can possibly match, and
+    the engine only verifies those. Sessions without an index, and
+    patterns without a usable literal, are swept in full as before.
 """
 
 from __future__ import annotations
@@ -30,13 +36,17 @@
 from pathlib import Path
 from typing import Literal
 
-from memory_tools import paths as P
+from memory_tools import paths as P, trigram
 
 logger = logging.getLogger(__name__)
 
 
 _EVENT_FILE_RE = re.compile(r"^(\d{6})\.(user|assistant|tool)\.txt$")
 
+# Explicit file arguments per rg invocation — keeps argv well under
+# ARG_MAX (and Windows' 32K command line) when many files survive narrowing.
+_RG_PATHS_PER_CALL = 500
+
 
 @dataclass
 class Hit:
@@ -72,7 +82,7 @@ def _parse_event_path(path: Path) -> tuple[str, int, str] | None:
 
 def _build_rg_argv(
     pattern: str,
-    root: Path,
+    root: Path | list[Path],
     *,
     ignore_case: bool,
     multiline: bool,
@@ -89,13 +99,14 @@ def _build_rg_argv(
     eff_pattern = f"(?s){pattern}" if dotall else pattern
     if max_count is not None:
         argv.extend(["-m", str(max_count)])
-    argv.extend(["--", eff_pattern, str(root)])
+    targets = root if isinstance(root, list) else [root]
+    argv.extend(["--", eff_pattern, *(str(t) for t in targets)])
     return argv
 
 
 def _rg_sweep(
     pattern: str,
-    root: Path,
+    root: Path | list[Path],
     *,
     ignore_case: bool,
     multiline: bool,
@@ -103,9 +114,31 @@ def _rg_sweep(
     max_count: int | None,
     timeout_sec: int = 30,
 ) -> list[tuple[Path, tuple[int, int]]]:
-    """Run rg over ``root``; return [(path, (start, end))] in match order."""
+    """Run rg over ``root`` (a directory or explicit targets); return [(path, (start, end))] in match order."""
+    if isinstance(root, list):
+        out: list[tuple[Path, tuple[int, int]]] = []
+        for i in range(0, len(root), _RG_PATHS_PER_CALL):
+            batch = [p for p in root[i : i + _RG_PATHS_PER_CALL] if p.exists()]
+            if batch:
+                out.extend(
+                    _rg_run(pattern, batch, ignore_case=ignore_case, multiline=multiline, dotall=dotall, max_count=max_count, timeout_sec=timeout_sec)
+                )
+        return out
     if not root.exists():
         return []
+    return _rg_run(pattern, root, ignore_case=ignore_case, multiline=multiline, dotall=dotall, max_count=max_count, timeout_sec=timeout_sec)
+
+
+def _rg_run(
+    pattern: str,
+    root: Path | list[Path],
+    *,
+    ignore_case: bool,
+    multiline: bool,
+    dotall: bool,
+    max_count: int | None,
+    timeout_sec: int,
+) -> list[tuple[Path, tuple[int, int]]]:
     argv = _build_rg_argv(
         pattern,
         root,
@@ -154,13 +187,18 @@ def _rg_sweep(
 
 def _re_sweep(
     pattern: str,
-    root: Path,
+    root: Path | list[Path],
     *,
     ignore_case: bool,
     multiline: bool,
     dotall: bool,
     max_count: int | None,
 ) -> list[tuple[Path, tuple[int, int]]]:
+    if isinstance(root, list):
+        out: list[tuple[Path, tuple[int, int]]] = []
+        for target in root:
+            out.extend(_re_sweep(pattern, target, ignore_case=ignore_case, multiline=multiline, dotall=dotall, max_count=max_count))
+        return out
     if not root.exists():
         return []
     flags = 0
@@ -175,9 +213,13 @@ def _re_sweep(
     except re.error:
         return []
 
+    if root.is_file():
+        walk = [(str(root.parent), [], [root.name])]
+    else:
+        walk = os.walk(root)
     out: list[tuple[Path, tuple[int, int]]] = []
     # Walk the tree; for each file run search and emit all matches.
-    for dirpath, _dirnames, filenames in os.walk(root):
+    for dirpath, _dirnames, filenames in walk:
         for fname in filenames:
             fp = Path(dirpath) / fname
             try:
@@ -199,6 +241,48 @@ def _re_sweep(
     return out
 
 
+# ── Index narrowing ───────────────────────────────────────────────────
+
+
+def _narrowed_targets(
+    scope: P.Scope,
+    owner: str,
+    session_filter: str | None,
+    clauses: list[trigram.Clause],
+) -> tuple[list[Path], list[Path]]:
+    """Per-source search targets: candidate files, or whole session dirs
+    for sessions that have no usable index."""
+    events_base = P.events_index_dir(scope, owner)
+    data_base = P.data_index_dir(scope, owner)
+    if session_filter:
+        sessions = [session_filter]
+    else:
+        sessions = sorted({e.name for base in (events_base, data_base) if base.exists() for e in os.scandir(base) if e.is_dir()})
+
+    events_targets: list[Path] = []
+    data_targets: list[Path] = []
+    for session in sessions:
+        events_dir = events_base / session
+        data_dir = data_base / session
+        idx = trigram.TrigramIndex.for_session(scope, owner, session)
+        try:
+            names = idx.candidates(clauses) if idx.exists() else None
+        except (OSError, ValueError) as exc:
+            logger.warning("memory_tools: trigram index unreadable for %s: %s", session, exc)
+            names = None
+        if names is None:
+            events_targets.append(events_dir)
+            data_targets.append(data_dir)
+            continue
+        for name in sorted(names):
+            if name.startswith(trigram.EVENTS_PREFIX):
+                events_targets.append(events_dir / name[len(trigram.EVENTS_PREFIX) :])
+            elif name.startswith(trigram.DATA_PREFIX) and not name.startswith(trigram.DATA_PREFIX + "."):
+                # rg skips hidden files when walking a directory; keep that.
+                data_targets.append(data_dir / name[len(trigram.DATA_PREFIX) :])
+    return events_targets, data_targets
+
+
 # ── Top-level locate ──────────────────────────────────────────────────
 
 
@@ -219,8 +303,13 @@ def locate(
     engine = _engine_available()
     sweep = _rg_sweep if engine == "rg" else _re_sweep
 
+    events_root: Path | list[Path]
+    data_root: Path | list[Path]
     events_root = P.events_index_dir(scope, owner, session_filter) if session_filter else P.events_index_dir(scope, owner)
     data_root = P.data_index_dir(scope, owner, session_filter) if session_filter else P.data_index_dir(scope, owner)
+    clauses = trigram.required_trigrams(pattern)
+    if clauses is not None:
+        events_root, data_root = _narrowed_targets(scope, owner, session_filter, clauses)
 
     do_events = match_source in ("events", "all")
     do_data = match_source in ("data", "all")
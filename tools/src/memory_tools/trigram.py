@@ -0,0 +1,446 @@
+"""Trigram posting-list index over the mirror cache.
+
+Without an index, ``locate`` runs rg over every cache file of an owner, so
+query latency grows with total memory size. This module keeps, per
+session, an inverted index from byte trigrams to the cache files that
+contain them. ``locate`` turns the regex into the trigrams any match must
+contain, intersects their posting lists, and hands rg only the surviving
+files for the real (Rust-regex) verification.
+
+Layout (under the session's meta dir)::
+
+    meta/<scope>/<owner>/<session>/trigrams/seg-<NNNNNN>.tri
+
+Each sync that writes new cache files appends one immutable *segment*
+covering just those files — the same incremental, resume-where-you-left-off
+shape as the byte-offset cursor in ``index.py``. Once a session has more
+than ``MAX_SEGMENTS`` segments they are merged into one.
+
+Segment format (little-endian)::
+
+    magic      8s   b"HIVETRG1"
+    n_names    u32
+    n_trigrams u32
+    names_off  u64  offset of the names block
+    table      n_trigrams × (trigram u32, count u32, postings_off u64), sorted
+    postings   u32 name ids
+    names      utf-8, ``\\n``-joined, ``events/<file>`` or ``data/<file>``
+
+Trigrams are taken over ASCII-lowercased bytes so one index serves both
+case-sensitive and ``(?i)`` patterns. The two non-ASCII characters whose
+simple case fold is ASCII (KELVIN SIGN → k, LONG S → s) are folded first,
+keeping ``(?i)k`` / ``(?i)s`` sound. The index only ever narrows: anything
+it cannot reason about (a missing or unreadable index, a pattern with no
+required literal of 3+ ASCII characters) falls back to the full sweep.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with pandas
+    np = None  # type: ignore[assignment]
+
+from memory_tools import paths as P
+
+logger = logging.getLogger(__name__)
+
+MAX_SEGMENTS = 8
+
+_MAGIC = b"HIVETRG1"
+_HEADER = struct.Struct("<8sIIQ")
+_ENTRY = struct.Struct("<IIQ")
+_NP_ENTRY = np.dtype([("code", "<u4"), ("count", "<u4"), ("off", "<u8")]) if np is not None else None
+_SEGMENT_RE = re.compile(r"^seg-(\d{6})\.tri$")
+_CASE_FOLDS = ((b"\xe2\x84\xaa", b"k"), (b"\xc5\xbf", b"s"))
+
+# Rust-only class syntax that Python's parser would read as literals.
+_UNSAFE_SYNTAX = ("[[", "[:", "&&", "~~", "--")
+
+EVENTS_PREFIX = "events/"
+DATA_PREFIX = "data/"
+
+# One AND-clause is an OR over alternatives; each alternative is a list of
+# trigram codes that must all be present.
+Clause = list[list[int]]
+
+
+# ── Trigram extraction ─────────────────────────────────────────────────
+
+
+def _normalize(data: bytes) -> bytes:
+    for src, dst in _CASE_FOLDS:
+        if src in data:
+            data = data.replace(src, dst)
+    return data.lower()
+
+
+def file_trigrams(data: bytes):
+    """Sorted unique trigram codes (``b0 << 16 | b1 << 8 | b2``) of ``data``.
+
+    A numpy array when numpy is available, else a list.
+    """
+    data = _normalize(data)
+    if len(data) < 3:
+        return []
+    if np is not None:
+        arr = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+        return np.unique((arr[:-2] << 16) | (arr[1:-1] << 8) | arr[2:])
+    return sorted({(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)})
+
+
+def _literal_codes(literal: str) -> list[int]:
+    data = _normalize(literal.encode("ascii"))
+    return sorted({(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)})
+
+
+def required_trigrams(pattern: str) -> list[Clause] | None:
+    """Trigram clauses every match of ``pattern`` must satisfy.
+
+    Returns ``None`` when nothing useful can be derived, in which case the
+    caller must not narrow. Parsing uses Python's regex parser; patterns it
+    rejects (Rust-only syntax) or reads differently are left unnarrowed.
+    """
+    if any(tok in pattern for tok in _UNSAFE_SYNTAX):
+        return None
+    try:
+        import re._constants as C
+        import re._parser as sre_parse
+
+        parsed = sre_parse.parse(pattern)
+    except Exception:  # noqa: BLE001 - any parse problem just disables narrowing
+        return None
+
+    def seq(items) -> list[Clause]:
+        clauses: list[Clause] = []
+        run: list[str] = []
+
+        def flush() -> None:
+            if len(run) >= 3:
+                clauses.append([_literal_codes("".join(run))])
+            run.clear()
+
+        def walk(items) -> None:
+            for op, av in items:
+                if op is C.LITERAL and av < 128:
+                    run.append(chr(av))
+                elif op is C.SUBPATTERN and not any(o is C.BRANCH for o, _ in av[-1]):
+                    walk(av[-1])  # a plain group continues the concatenation
+                elif op is C.BRANCH:
+                    flush()
+                    alternatives: Clause = []
+                    for alt in av[1]:
+                        codes = sorted({c for clause in seq(alt) if len(clause) == 1 for c in clause[0]})
+                        if not codes:
+                            alternatives = []
+                            break
+                        alternatives.append(codes)
+                    if alternatives:
+                        clauses.append(alternatives)
+                elif op is C.SUBPATTERN:
+                    flush()
+                    clauses.extend(seq(av[-1]))
+                elif op in (C.MAX_REPEAT, C.MIN_REPEAT, C.POSSESSIVE_REPEAT):
+                    flush()
+                    if av[0] >= 1:
+                        clauses.extend(seq(av[2]))
+                else:
+                    flush()
+
+        walk(items)
+        flush()
+        return clauses
+
+    clauses = seq(parsed)
+    return clauses or None
+
+
+# ── Segments ───────────────────────────────────────────────────────────
+
+
+def index_dir(scope: P.Scope, owner: str, session: str) -> Path:
+    return P.meta_dir(scope, owner, session) / "trigrams"
+
+
+def _invert(code_lists: list) -> tuple[list[int], list[int], bytes]:
+    """Invert per-document code lists into (keys, counts, postings bytes).
+
+    Posting ids come out ascending within each key.
+    """
+    if np is not None:
+        n = len(code_lists)
+        if n:
+            lengths = np.fromiter((len(c) for c in code_lists), dtype=np.int64, count=n)
+            codes = np.concatenate([np.asarray(c, dtype=np.uint32) for c in code_lists])
+            ids = np.repeat(np.arange(n, dtype=np.uint32), lengths)
+        else:
+            codes = ids = np.empty(0, dtype=np.uint32)
+        return _invert_pairs(codes, ids)
+    postings: dict[int, list[int]] = {}
+    for doc_id, codes in enumerate(code_lists):
+        for code in codes:
+            postings.setdefault(code, []).append(doc_id)
+    keys = sorted(postings)
+    flat = [i for k in keys for i in postings[k]]
+    return keys, [len(postings[k]) for k in keys], struct.pack(f"<{len(flat)}I", *flat)
+
+
+def _invert_pairs(codes, ids) -> tuple[list[int], list[int], bytes]:
+    order = np.argsort(codes, kind="stable")
+    codes, ids = codes[order], ids[order]
+    keys, counts = np.unique(codes, return_counts=True)
+    return keys.tolist(), counts.tolist(), ids.astype("<u4").tobytes()
+
+
+def _write_segment(path: Path, names: list[str], keys: list[int], counts: list[int], body: bytes) -> None:
+    base = _HEADER.size + len(keys) * _ENTRY.size
+    table = bytearray()
+    off = base
+    for code, count in zip(keys, counts, strict=True):
+        table += _ENTRY.pack(code, count, off)
+        off += 4 * count
+    names_blob = "\n".join(names).encode("utf-8")
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(names), len(keys), base + len(body)))
+        f.write(table)
+        f.write(body)
+        f.write(names_blob)
+    tmp.replace(path)
+
+
+class _Segment:
+    """Read side of one segment.
+
+    Names and the trigram table are cached in memory; posting lists are
+    read from disk on demand.
+    """
+
+    def __init__(self, path: Path, sig: tuple[int, int]) -> None:
+        self.path = path
+        self.sig = sig
+        with open(path, "rb") as f:
+            magic, n_names, n_trigrams, names_off = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"bad trigram segment {path}")
+            table = f.read(n_trigrams * _ENTRY.size)
+            f.seek(names_off)
+            blob = f.read()
+        self.names = blob.decode("utf-8").split("\n") if n_names else []
+        if len(self.names) != n_names or len(table) != n_trigrams * _ENTRY.size:
+            raise ValueError(f"truncated trigram segment {path}")
+        self._table = table
+        self._n = n_trigrams
+        self._body_off = _HEADER.size + len(table)
+        self._body_len = names_off - self._body_off
+        self._codes = np.frombuffer(table, dtype=_NP_ENTRY)["code"] if np is not None else None
+
+    def _entry(self, code: int) -> tuple[int, int] | None:
+        if self._codes is not None:
+            lo = int(np.searchsorted(self._codes, code))
+        else:
+            lo, hi = 0, self._n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _ENTRY.unpack_from(self._table, mid * _ENTRY.size)[0] < code:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        if lo < self._n:
+            found, count, off = _ENTRY.unpack_from(self._table, lo * _ENTRY.size)
+            if found == code:
+                return count, off
+        return None
+
+    def _ids(self, alternative: list[int], fh, within):
+        """Doc ids containing every code of ``alternative`` (and in ``within``)."""
+        entries = []
+        for code in alternative:
+            entry = self._entry(code)
+            if entry is None:
+                return None
+            entries.append(entry)
+        ids = within
+        # Shortest lists first so the intersection shrinks fast.
+        for count, off in sorted(entries):
+            fh.seek(off)
+            raw = fh.read(4 * count)
+            if np is not None:
+                found = np.frombuffer(raw, dtype="<u4")
+                ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+            else:
+                found_set = set(struct.unpack(f"<{count}I", raw))
+                ids = found_set if ids is None else ids & found_set
+            if len(ids) == 0:
+                return ids
+        return ids
+
+    def match(self, clauses: list[Clause]) -> set[str]:
+        ids = None
+        with open(self.path, "rb") as fh:
+            for clause in clauses:
+                clause_ids = None
+                for alternative in clause:
+                    hit = self._ids(alternative, fh, ids)
+                    if hit is None:
+                        continue
+                    if clause_ids is None:
+                        clause_ids = hit
+                    elif np is not None:
+                        clause_ids = np.union1d(clause_ids, hit)
+                    else:
+                        clause_ids = clause_ids | hit
+                if clause_ids is None or len(clause_ids) == 0:
+                    return set()
+                ids = clause_ids
+        if ids is None:
+            return set(self.names)
+        return {self.names[int(i)] for i in ids}
+
+    def pairs(self):
+        """All (codes, ids) postings, expanded — used for compaction."""
+        with open(self.path, "rb") as fh:
+            fh.seek(self._body_off)
+            body = fh.read(self._body_len)
+        table = np.frombuffer(self._table, dtype=_NP_ENTRY)
+        codes = np.repeat(table["code"], table["count"].astype(np.int64))
+        return codes, np.frombuffer(body, dtype="<u4")
+
+    def inverted(self) -> dict[int, list[int]]:
+        out: dict[int, list[int]] = {}
+        with open(self.path, "rb") as fh:
+            for i in range(self._n):
+                code, count, off = _ENTRY.unpack_from(self._table, i * _ENTRY.size)
+                fh.seek(off)
+                out[code] = list(struct.unpack(f"<{count}I", fh.read(4 * count)))
+        return out
+
+
+_SEGMENT_CACHE: dict[str, _Segment] = {}
+_SEGMENT_CACHE_LOCK = threading.Lock()
+
+
+def _open_segment(path: Path) -> _Segment:
+    st = path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    key = str(path)
+    with _SEGMENT_CACHE_LOCK:
+        seg = _SEGMENT_CACHE.get(key)
+        if seg is not None and seg.sig == sig:
+            return seg
+    seg = _Segment(path, sig)
+    with _SEGMENT_CACHE_LOCK:
+        _SEGMENT_CACHE[key] = seg
+    return seg
+
+
+class TrigramIndex:
+    """The segment set for one session."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @classmethod
+    def for_session(cls, scope: P.Scope, owner: str, session: str) -> TrigramIndex:
+        return cls(index_dir(scope, owner, session))
+
+    def exists(self) -> bool:
+        return self.directory.is_dir()
+
+    def _segment_paths(self) -> list[Path]:
+        try:
+            entries = sorted(e.name for e in os.scandir(self.directory) if _SEGMENT_RE.match(e.name))
+        except FileNotFoundError:
+            return []
+        return [self.directory / name for name in entries]
+
+    def segments(self) -> list[_Segment]:
+        return [_open_segment(p) for p in self._segment_paths()]
+
+    def indexed_names(self) -> set[str]:
+        names: set[str] = set()
+        for seg in self.segments():
+            names.update(seg.names)
+        return names
+
+    def add(self, files: list[tuple[str, Path]]) -> None:
+        """Index ``files`` = [(name, path)] as a new segment.
+
+        Caller holds the session lock. Unreadable files are skipped — rg
+        would not find anything in them either. An empty segment is still
+        written for a session with none, marking it as indexed.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        names: list[str] = []
+        code_lists: list = []
+        for name, path in files:
+            try:
+                code_lists.append(file_trigrams(path.read_bytes()))
+            except OSError as exc:
+                logger.debug("memory_tools: cannot index %s: %s", path, exc)
+                continue
+            names.append(name)
+        existing = self._segment_paths()
+        if not names and existing:
+            return
+        _write_segment(self._next_segment_path(existing), names, *_invert(code_lists))
+        if len(existing) + 1 > MAX_SEGMENTS:
+            self.compact()
+
+    def _next_segment_path(self, existing: list[Path]) -> Path:
+        last = int(_SEGMENT_RE.match(existing[-1].name).group(1)) if existing else 0
+        return self.directory / f"seg-{last + 1:06d}.tri"
+
+    def compact(self) -> None:
+        """Merge all segments into one. Caller holds the session lock."""
+        paths = self._segment_paths()
+        if len(paths) <= 1:
+            return
+        segments = [_open_segment(p) for p in paths]
+        names = [name for seg in segments for name in seg.names]
+        if np is not None:
+            all_codes, all_ids, base = [], [], 0
+            for seg in segments:
+                codes, ids = seg.pairs()
+                all_codes.append(codes)
+                all_ids.append(ids.astype(np.uint32) + np.uint32(base))
+                base += len(seg.names)
+            inverted = _invert_pairs(np.concatenate(all_codes), np.concatenate(all_ids))
+        else:
+            postings: dict[int, list[int]] = {}
+            base = 0
+            for seg in segments:
+                for code, ids in seg.inverted().items():
+                    postings.setdefault(code, []).extend(i + base for i in ids)
+                base += len(seg.names)
+            keys = sorted(postings)
+            flat = [i for k in keys for i in postings[k]]
+            inverted = (keys, [len(postings[k]) for k in keys], struct.pack(f"<{len(flat)}I", *flat))
+        _write_segment(self._next_segment_path(paths), names, *inverted)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def candidates(self, clauses: list[Clause]) -> set[str]:
+        """Names of indexed files that may match."""
+        out: set[str] = set()
+        for seg in self.segments():
+            out |= seg.match(clauses)
+        return out
+
+
+__all__ = [
+    "DATA_PREFIX",
+    "EVENTS_PREFIX",
+    "MAX_SEGMENTS",
+    "TrigramIndex",
+    "file_trigrams",
+    "index_dir",
+    "required_trigrams",
+]
@@ -9,14 +9,24 @@
 Thread-safe via a single lock — readers and writers can come from
 different threads (a pump thread fills it, the MCP request thread
 drains it).
+
+A ring can be given a ``spill_factory``: the first time it would drop
+bytes it opens a ``SpillLog`` at its floor and tees every write to it
+from then on, so streams that fit in memory never touch disk. Reads
+below the in-memory floor are then served from the spill at the same
+offsets, and ``search`` covers the whole spilled stream.
 """
 
 from __future__ import annotations
 
+import re
 import threading
 from collections import deque
+from collections.abc import Callable
 from dataclasses import dataclass
 
+from terminal_tools.common.spill_log import SearchResult, SpillLog, search_bytes
+
 
 @dataclass(slots=True)
 class ReadResult:
@@ -34,7 +44,11 @@ class RingBuffer:
     once total_written exceeds capacity_bytes.
     """
 
-    def __init__(self, capacity_bytes: int = 4 * 1024 * 1024):
+    def __init__(
+        self,
+        capacity_bytes: int = 4 * 1024 * 1024,
+        spill_factory: Callable[[int], SpillLog | None] | None = None,
+    ):
         if capacity_bytes <= 0:
             raise ValueError("capacity_bytes must be positive")
         self._capacity = capacity_bytes
@@ -43,6 +57,8 @@ def __init__(self, capacity_bytes: int = 4 * 1024 * 1024):
         self._floor = 0  # absolute offset of the oldest byte still in buffer
         self._total_written = 0
         self._eof = False
+        self._spill: SpillLog | None = None
+        self._spill_factory = spill_factory
         self._lock = threading.Lock()
 
     # ── Writer side ───────────────────────────────────────────────
@@ -54,8 +70,35 @@ def write(self, data: bytes) -> None:
             self._chunks.append(data)
             self._buffered_bytes += len(data)
             self._total_written += len(data)
+            if self._spill is not None:
+                self._spill.append(data)
+            elif self._spill_factory is not None and self._buffered_bytes > self._capacity:
+                self._open_spill_locked()
             self._evict_locked()
 
+    def set_spill_factory(self, factory: Callable[[int], SpillLog | None] | None) -> None:
+        """Spill to ``factory(floor)`` once the ring overflows (for
+        buffers created before their owner knew where to spill)."""
+        with self._lock:
+            if self._spill is None:
+                self._spill_factory = factory
+
+    def _open_spill_locked(self) -> None:
+        factory, self._spill_factory = self._spill_factory, None
+        try:
+            spill = factory(self._floor)
+        except OSError:
+            return
+        if spill is None:
+            return
+        for chunk in self._chunks:
+            spill.append(chunk)
+        self._spill = spill
+
+    @property
+    def spill(self) -> SpillLog | None:
+        return self._spill
+
     def close(self) -> None:
         """Mark the stream as ended. Subsequent reads will see eof=True
         once they catch up to total_written."""
@@ -102,8 +145,17 @@ def read(self, since_offset: int, max_bytes: int) -> ReadResult:
           starts from the floor.
         """
         max_bytes = max(0, int(max_bytes))
+        since = max(0, int(since_offset))
+        spill = self._spill
+        if spill is not None and since < self.floor and max_bytes:
+            on_disk = spill.total_written
+            if since < on_disk:
+                dropped = max(0, spill.floor - since)
+                since += dropped
+                data = spill.read(since, min(max_bytes, on_disk - since))
+                if data or dropped:
+                    return ReadResult(data=data, offset=since, next_offset=since + len(data), truncated_bytes_dropped=dropped)
         with self._lock:
-            since = max(0, int(since_offset))
             dropped = 0
             if since < self._floor:
                 dropped = self._floor - since
@@ -148,8 +200,37 @@ def read(self, since_offset: int, max_bytes: int) -> ReadResult:
     def tail(self, max_bytes: int) -> ReadResult:
         """Read the last ``max_bytes`` (or as much as is buffered)."""
         with self._lock:
-            start = max(self._floor, self._total_written - max(0, int(max_bytes)))
+            floor = self._floor
+            if self._spill is not None and not self._spill.failed:
+                floor = min(floor, self._spill.floor)
+            start = max(floor, self._total_written - max(0, int(max_bytes)))
         return self.read(start, max_bytes)
 
+    def search(
+        self,
+        pattern: re.Pattern[bytes],
+        *,
+        since_offset: int = 0,
+        max_matches: int = 100,
+        tail: bool = False,
+    ) -> SearchResult:
+        """Lines matching ``pattern`` from ``since_offset`` on; see
+        ``SpillLog.search``. Without a spill only the in-memory window
+        is searched and anything below it is reported as dropped."""
+        spill = self._spill
+        if spill is not None and not spill.failed:
+            return spill.search(pattern, since_offset=since_offset, max_matches=max_matches, tail=tail)
+        with self._lock:
+            data, floor = b"".join(self._chunks), self._floor
+        return search_bytes(
+            data,
+            floor,
+            pattern,
+            since_offset=since_offset,
+            max_matches=max_matches,
+            tail=tail,
+            count_lines=floor == 0,
+        )
+
 
 __all__ = ["RingBuffer", "ReadResult"]
@@ -0,0 +1,557 @@
+"""Segmented on-disk spill behind a job's ``RingBuffer``.
+
+The ring keeps the last few MB of a stream in memory. A ``SpillLog``
+keeps everything the stream wrote (up to a per-stream cap) on disk at
+the same absolute offsets, so a read below the ring floor is served
+from disk instead of being reported as dropped, and the agent can
+search a long build log without re-running it.
+
+Layout under ``root``::
+
+    seg-<start offset>.log    raw bytes of a segment still being written
+    seg-<start offset>.zz     a rotated segment: independent zlib blocks
+
+Segments roll over at ``segment_bytes``. ``finalize()`` (called when the
+job exits) compresses every segment in ``_BLOCK_BYTES`` blocks, so a
+read or search later decompresses only the blocks it touches, one at a
+time.
+
+A sparse line index -- one checkpoint per ``_INDEX_STRIDE`` bytes of
+output, holding the absolute offset and the number of newlines before
+it -- turns an offset into a line number by counting at most one
+stride of bytes.
+
+``search()`` runs a bytes regex line by line. Raw segments are mmap'd
+and scanned in place and compressed ones block by block, so memory use
+is a block plus the longest line, whatever the size of the log.
+
+A ``SpillBudget`` shared by several logs caps their disk use in total:
+past it, the oldest logs lose their oldest segments first.
+
+Thread-safe: the job's pump thread appends while MCP request threads
+read and search.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import shutil
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_SEGMENT_BYTES = 64 * 1024 * 1024
+_BLOCK_BYTES = 1024 * 1024
+_INDEX_STRIDE = 64 * 1024
+_COMPRESS_LEVEL = 1  # build logs compress ~10x even at level 1; favour speed
+_MAX_LINE_BYTES = 2000  # of each matching line returned
+
+
+@dataclass(slots=True)
+class LineMatch:
+    offset: int  # absolute offset of the line start
+    line: int | None  # 1-based line number; None when unknown
+    text: str
+
+    def to_dict(self) -> dict:
+        return {"offset": self.offset, "line": self.line, "text": self.text}
+
+
+@dataclass(slots=True)
+class SearchResult:
+    matches: list[LineMatch]
+    offset: int  # where the search started
+    next_offset: int  # where a forward search should resume
+    truncated: bool  # stopped at max_matches before the end
+    truncated_bytes_dropped: int = 0  # requested bytes no longer on disk or in memory
+
+
+@dataclass(slots=True)
+class _Segment:
+    start: int
+    path: Path
+    size: int = 0
+    # Compressed-file offset of each block, plus the file end; None while raw.
+    blocks: array | None = None
+
+    @property
+    def end(self) -> int:
+        return self.start + self.size
+
+
+@dataclass(slots=True)
+class _Window:
+    """``buf[lo:hi]`` holds absolute offsets ``[base + lo, base + hi)``."""
+
+    buf: bytes | mmap.mmap
+    lo: int
+    hi: int
+    base: int
+
+
+class SpillBudget:
+    """Disk cap shared by several ``SpillLog``s, e.g. every job of a manager.
+
+    Logs charge the bytes they put on disk and release what they delete.
+    Once the total passes ``max_bytes``, logs give up their oldest
+    segments, oldest log first, until it fits again; a log still being
+    written keeps its newest segment.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._used = 0
+        self._logs: dict[int, SpillLog] = {}  # by id(); insertion order is age
+        # Never held while taking a log's lock, so logs may charge while
+        # holding theirs.
+        self._count_lock = threading.Lock()
+        self._reclaim_lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        """Bytes the logs currently hold on disk."""
+        return self._used
+
+    def _register(self, log: SpillLog) -> None:
+        with self._count_lock:
+            self._logs[id(log)] = log
+
+    def _forget(self, log: SpillLog, freed: int) -> None:
+        with self._count_lock:
+            self._logs.pop(id(log), None)
+            self._used -= freed
+
+    def _charge(self, delta: int) -> None:
+        with self._count_lock:
+            self._used += delta
+
+    def _reclaim(self) -> None:
+        """Trim the oldest logs until under the cap. Call without any log lock held."""
+        if self._used <= self.max_bytes or not self._reclaim_lock.acquire(blocking=False):
+            return  # within the cap, or another thread is already trimming
+        try:
+            with self._count_lock:
+                logs = list(self._logs.values())
+            for log in logs:
+                while self._used > self.max_bytes and log._drop_oldest():
+                    pass
+                if self._used <= self.max_bytes:
+                    break
+        finally:
+            self._reclaim_lock.release()
+
+
+@dataclass
+class SpillLog:
+    root: Path
+    base_offset: int = 0
+    segment_bytes: int = _SEGMENT_BYTES
+    max_bytes: int | None = None  # oldest segments are dropped past this
+    budget: SpillBudget | None = None  # cap shared with other logs
+
+    _segments: list[_Segment] = field(default_factory=list, init=False, repr=False)
+    _file: object = field(default=None, init=False, repr=False)
+    _total: int = field(default=0, init=False)
+    _floor: int = field(default=0, init=False)
+    _newlines: int = field(default=0, init=False)
+    _ckpt_offsets: array = field(default_factory=lambda: array("q"), init=False, repr=False)
+    _ckpt_lines: array = field(default_factory=lambda: array("q"), init=False, repr=False)
+    _block_cache: tuple[int, int, bytes] | None = field(default=None, init=False, repr=False)
+    _failed: bool = field(default=False, init=False)
+    _finalized: bool = field(default=False, init=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._total = self._floor = self.base_offset
+        self._ckpt_offsets.append(self.base_offset)
+        self._ckpt_lines.append(0)
+        if self.budget is not None:
+            self.budget._register(self)
+
+    # ── Writer side ───────────────────────────────────────────────
+
+    @property
+    def total_written(self) -> int:
+        with self._lock:
+            return self._total
+
+    @property
+    def floor(self) -> int:
+        with self._lock:
+            return self._floor
+
+    @property
+    def failed(self) -> bool:
+        """True once a write failed; the log stays readable up to
+        ``total_written`` but takes no more data."""
+        return self._failed
+
+    def append(self, data: bytes) -> None:
+        if not data:
+            return
+        try:
+            self._append(data)
+        finally:
+            if self.budget is not None:
+                self.budget._reclaim()
+
+    def _append(self, data: bytes) -> None:
+        with self._lock:
+            if self._failed or self._finalized:
+                return
+            view = memoryview(data)
+            try:
+                while view:
+                    segment = self._segments[-1] if self._segments and self._file is not None else None
+                    if segment is None or segment.size >= self.segment_bytes:
+                        segment = self._roll_locked()
+                    piece = view[: self.segment_bytes - segment.size]
+                    self._file.write(piece)
+                    segment.size += len(piece)
+                    self._charge(len(piece))
+                    view = view[len(piece) :]
+            except OSError:
+                # Disk full or gone: keep what made it, stop spilling.
+                self._failed = True
+                self._close_file_locked()
+                self._total = self._segments[-1].end if self._segments else self._total
+                return
+            self._total += len(data)
+            self._newlines += data.count(b"\n")
+            if self._total - self._ckpt_offsets[-1] >= _INDEX_STRIDE:
+                self._ckpt_offsets.append(self._total)
+                self._ckpt_lines.append(self._newlines)
+            self._enforce_cap_locked()
+
+    def _charge(self, delta: int) -> None:
+        if self.budget is not None:
+            self.budget._charge(delta)
+
+    def _roll_locked(self) -> _Segment:
+        self._close_file_locked()
+        start = self._segments[-1].end if self._segments else self._total
+        segment = _Segment(start=start, path=self.root / f"seg-{start:016d}.log")
+        self._file = open(segment.path, "wb")  # noqa: SIM115 - held open across appends
+        self._segments.append(segment)
+        return segment
+
+    def _close_file_locked(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _enforce_cap_locked(self) -> None:
+        if self.max_bytes is None:
+            return
+        while len(self._segments) > 1 and self._total - self._segments[0].end >= self.max_bytes:
+            self._drop_oldest_locked()
+
+    def _drop_oldest(self) -> bool:
+        """Drop the oldest segment for the shared budget; False when there
+        is nothing this log can give up."""
+        with self._lock:
+            if not self._segments or (len(self._segments) == 1 and not self._finalized):
+                return False
+            self._drop_oldest_locked()
+            return True
+
+    def _drop_oldest_locked(self) -> None:
+        dropped = self._segments.pop(0)
+        self._floor = self._segments[0].start if self._segments else self._total
+        if self._block_cache is not None and self._block_cache[0] == dropped.start:
+            self._block_cache = None
+        _unlink(dropped.path)
+        self._charge(-_disk_size(dropped))
+
+    def finalize(self) -> None:
+        """Close the log and compress every segment. Reads and searches
+        keep working throughout; further appends are ignored."""
+        with self._lock:
+            if self._finalized:
+                return
+            self._finalized = True
+            self._close_file_locked()
+            pending = [s for s in self._segments if s.blocks is None and s.size]
+        for segment in pending:
+            self._compress(segment)
+
+    def _compress(self, segment: _Segment) -> None:
+        target = segment.path.with_suffix(".zz")
+        offsets = array("q", [0])
+        try:
+            with open(segment.path, "rb") as src, open(target, "wb") as dst:
+                while block := src.read(_BLOCK_BYTES):
+                    offsets.append(offsets[-1] + dst.write(zlib.compress(block, _COMPRESS_LEVEL)))
+        except OSError:
+            _unlink(target)
+            return
+        with self._lock:
+            if segment not in self._segments:  # dropped by the cap meanwhile
+                _unlink(target)
+                return
+            raw, segment.path, segment.blocks = segment.path, target, offsets
+            self._charge(offsets[-1] - segment.size)
+        _unlink(raw)
+
+    def discard(self) -> None:
+        """Delete the log from disk."""
+        with self._lock:
+            self._finalized = True
+            self._close_file_locked()
+            freed = sum(_disk_size(s) for s in self._segments)
+            self._segments.clear()
+            self._floor = self._total
+            self._block_cache = None
+        if self.budget is not None:
+            self.budget._forget(self, freed)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # ── Reader side ───────────────────────────────────────────────
+
+    def read(self, since_offset: int, max_bytes: int) -> bytes:
+        """Bytes ``[since_offset, since_offset + max_bytes)`` that are on disk."""
+        end = min(self.total_written, since_offset + max(0, max_bytes))
+        return b"".join(bytes(w.buf[w.lo : w.hi]) for w in self._windows(max(since_offset, self.floor), end))
+
+    def line_number(self, offset: int) -> int:
+        """1-based number of the line containing ``offset``."""
+        with self._lock:
+            i = bisect_right(self._ckpt_offsets, offset) - 1
+            start, lines = self._ckpt_offsets[i], self._ckpt_lines[i]
+        return lines + self._count_newlines(max(start, self.floor), offset) + 1
+
+    def _count_newlines(self, start: int, end: int) -> int:
+        return sum(_count(w.buf, w.lo, w.hi) for w in self._windows(start, end))
+
+    def _windows(self, start: int, end: int) -> Iterator[_Window]:
+        """Yield the on-disk bytes of ``[start, end)`` in order, one raw
+        segment (mmap'd) or one decompressed block at a time."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            segments = [s for s in self._segments if s.end > start and s.start < end]
+        for segment in segments:
+            lo, hi = max(start, segment.start), min(end, segment.end)
+            if segment.blocks is None:
+                try:
+                    with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        yield _Window(mm, lo - segment.start, hi - segment.start, segment.start)
+                        continue
+                except (OSError, ValueError):
+                    # Compressed (or dropped) under us; fall back on its new state.
+                    if segment.blocks is None:
+                        continue
+            first, last = (lo - segment.start) // _BLOCK_BYTES, (hi - 1 - segment.start) // _BLOCK_BYTES
+            for index in range(first, last + 1):
+                block = self._block(segment, index)
+                if block is None:
+                    break
+                base = segment.start + index * _BLOCK_BYTES
+                yield _Window(block, max(lo, base) - base, min(hi, base + len(block)) - base, base)
+
+    def _block(self, segment: _Segment, index: int) -> bytes | None:
+        cached = self._block_cache
+        if cached is not None and cached[0] == segment.start and cached[1] == index:
+            return cached[2]
+        try:
+            with open(segment.path, "rb") as f:
+                f.seek(segment.blocks[index])
+                block = zlib.decompress(f.read(segment.blocks[index + 1] - segment.blocks[index]))
+        except (OSError, zlib.error):
+            return None
+        self._block_cache = (segment.start, index, block)
+        return block
+
+    def _next_line_start(self, offset: int, end: int) -> int:
+        """First line start at or after ``offset`` (``end`` if none)."""
+        if offset <= self.floor:
+            return offset
+        for w in self._windows(offset - 1, end):
+            nl = w.buf.find(b"\n", w.lo, w.hi)
+            if nl != -1:
+                return w.base + nl + 1
+        return end
+
+    # ── Search ────────────────────────────────────────────────────
+
+    def search(
+        self,
+        pattern: re.Pattern[bytes],
+        *,
+        since_offset: int = 0,
+        until_offset: int | None = None,
+        max_matches: int = 100,
+        tail: bool = False,
+    ) -> SearchResult:
+        """Lines in ``[since_offset, until_offset)`` that ``pattern`` matches.
+
+        Forward searches return the first ``max_matches`` lines and a
+        ``next_offset`` to resume from; ``tail=True`` returns the last
+        ``max_matches``, scanning segments newest first and stopping as
+        soon as it has enough.
+        """
+        floor, total = self.floor, self.total_written
+        end = total if until_offset is None else min(total, until_offset)
+        start = max(since_offset, floor)
+        dropped = max(0, floor - since_offset)
+        max_matches = max(1, max_matches)
+
+        if not tail:
+            found: list[tuple[int, bytes]] = []
+            next_offset = _scan(self._line_windows(start, end), pattern, found, max_matches, start)
+            truncated = next_offset < end
+            return SearchResult(self._numbered(found), start, next_offset if truncated else max(end, start), truncated, dropped)
+
+        with self._lock:
+            bounds = [s.start for s in self._segments if start < s.start < end]
+        found = []
+        hi = end
+        for boundary in [*reversed(bounds), start]:
+            lo = self._next_line_start(boundary, hi) if boundary > start else start
+            tail_found: deque[tuple[int, bytes]] = deque(maxlen=max_matches - len(found))
+            _scan(self._line_windows(lo, hi), pattern, tail_found, None, lo)
+            found[:0] = tail_found
+            if len(found) >= max_matches:
+                break
+            hi = lo
+        return SearchResult(self._numbered(found), start, max(end, start), False, dropped)
+
+    def _line_windows(self, start: int, end: int) -> Iterator[_Window]:
+        """Like ``_windows`` but every window ends on a line boundary: a
+        line split across segments or blocks is stitched into a small
+        window of its own."""
+        carry = b""
+        carry_base = start
+        for w in self._windows(start, end):
+            lo = w.lo
+            if carry:
+                nl = w.buf.find(b"\n", lo, w.hi)
+                if nl == -1 and len(carry) < _BLOCK_BYTES:
+                    carry += w.buf[lo : w.hi]
+                    continue
+                head_end = w.hi if nl == -1 else nl + 1
+                stitched = carry + w.buf[lo:head_end]
+                yield _Window(stitched, 0, len(stitched), carry_base)
+                carry, lo = b"", head_end
+            last = w.buf.rfind(b"\n", lo, w.hi)
+            if last == -1:
+                carry, carry_base = w.buf[lo : w.hi], w.base + lo
+                continue
+            yield _Window(w.buf, lo, last + 1, w.base)
+            if last + 1 < w.hi:
+                carry, carry_base = w.buf[last + 1 : w.hi], w.base + last + 1
+        if carry:
+            yield _Window(carry, 0, len(carry), carry_base)
+
+    def _numbered(self, found: list[tuple[int, bytes]] | deque) -> list[LineMatch]:
+        out: list[LineMatch] = []
+        prev_offset = prev_line = None
+        for offset, text in found:
+            with self._lock:
+                i = bisect_right(self._ckpt_offsets, offset) - 1
+                ckpt, ckpt_lines = self._ckpt_offsets[i], self._ckpt_lines[i]
+            if prev_offset is not None and prev_offset >= ckpt:
+                line = prev_line + self._count_newlines(prev_offset, offset)
+            else:
+                line = ckpt_lines + self._count_newlines(max(ckpt, self.floor), offset) + 1
+            out.append(LineMatch(offset, line, _decode(text)))
+            prev_offset, prev_line = offset, line
+        return out
+
+
+def search_bytes(
+    data: bytes,
+    base: int,
+    pattern: re.Pattern[bytes],
+    *,
+    since_offset: int = 0,
+    max_matches: int = 100,
+    tail: bool = False,
+    count_lines: bool = False,
+) -> SearchResult:
+    """``SpillLog.search`` over an in-memory buffer starting at absolute
+    offset ``base`` (a ring buffer without a spill). Line numbers are
+    only known when ``count_lines`` (the buffer starts the stream)."""
+    start = max(since_offset, base)
+    end = base + len(data)
+    dropped = max(0, base - since_offset)
+    sink: list[tuple[int, bytes]] | deque = deque(maxlen=max(1, max_matches)) if tail else []
+    windows = iter([_Window(data, start - base, len(data), base)]) if start < end else iter(())
+    next_offset = _scan(windows, pattern, sink, None if tail else max(1, max_matches), start)
+    truncated = not tail and next_offset < end
+    matches: list[LineMatch] = []
+    counted, line = 0, 1
+    for offset, text in sink:
+        if count_lines:
+            line += data.count(b"\n", counted, offset - base)
+            counted = offset - base
+        matches.append(LineMatch(offset, line if count_lines else None, _decode(text)))
+    return SearchResult(matches, start, next_offset if truncated else max(end, start), truncated, dropped)
+
+
+def compile_pattern(pattern: str, *, ignore_case: bool = False) -> re.Pattern[bytes]:
+    """Compile a user regex for ``search``; raises ``re.error``."""
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(pattern.encode("utf-8"), flags)
+
+
+def _scan(windows: Iterator[_Window], pattern: re.Pattern[bytes], sink, limit: int | None, start: int) -> int:
+    """Append ``(line offset, line bytes)`` for each matching line to
+    ``sink``; returns the offset after the last line scanned (``start``
+    when there was nothing to scan), which is where a search stopped by
+    ``limit`` resumes."""
+    next_offset = start
+    for w in windows:
+        pos = w.lo
+        while True:
+            m = pattern.search(w.buf, pos, w.hi)
+            if m is None:
+                break
+            line_start = w.buf.rfind(b"\n", w.lo, m.start()) + 1 if m.start() > w.lo else w.lo
+            line_start = max(line_start, w.lo)
+            line_end = w.buf.find(b"\n", m.start(), w.hi)
+            line_end = w.hi if line_end == -1 else line_end
+            sink.append((w.base + line_start, bytes(w.buf[line_start : min(line_end, line_start + _MAX_LINE_BYTES)])))
+            pos = line_end + 1
+            if limit is not None and len(sink) >= limit:
+                return w.base + min(pos, w.hi)
+            if pos >= w.hi:
+                break
+        next_offset = w.base + w.hi
+    return next_offset
+
+
+def _disk_size(segment: _Segment) -> int:
+    return segment.size if segment.blocks is None else segment.blocks[-1]
+
+
+def _count(buf: bytes | mmap.mmap, lo: int, hi: int) -> int:
+    if isinstance(buf, bytes):
+        return buf.count(b"\n", lo, hi)
+    return buf[lo:hi].count(b"\n")
+
+
+def _decode(text: bytes) -> str:
+    return text.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+__all__ = ["LineMatch", "SearchResult", "SpillBudget", "SpillLog", "compile_pattern", "search_bytes"]
@@ -17,25 +17,42 @@
   - On server shutdown the lifespan hook calls ``shutdown_all()``
     which TERMs every child, waits 2s, then KILLs. Eliminates
     orphans.
+  - Output past the ring spills to disk (``SpillLog``) once a ring
+    overflows, in a per-process directory under
+    ``TERMINAL_TOOLS_JOB_SPILL_DIR`` (default:
+    ``<HIVE_HOME>/cache/terminal-jobs``; not the system temp dir,
+    which is often tmpfs, i.e. RAM). Spill is capped per stream at
+    ``TERMINAL_TOOLS_JOB_SPILL_MAX_MB`` (default 1024) and across
+    all jobs at ``TERMINAL_TOOLS_JOB_SPILL_TOTAL_MB`` (default 4096),
+    past which the oldest jobs lose their oldest output first.
+    Segments are compressed when the job exits and deleted with the
+    job record or at shutdown; directories left by a server that
+    died are removed by the next one. ``TERMINAL_TOOLS_JOB_SPILL=0``
+    keeps everything in memory, as before.
 """
 
 from __future__ import annotations
 
 import os
 import secrets
+import shutil
 import signal
 import subprocess
 import threading
 import time
 from collections.abc import Sequence
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
 from terminal_tools.common.ring_buffer import RingBuffer
+from terminal_tools.common.spill_log import SpillBudget, SpillLog
 
 _MAX_JOBS_DEFAULT = 32
 _DEFAULT_RING_BYTES = 4 * 1024 * 1024
 _RECENT_EXIT_KEEP = 50  # exited jobs we still surface to ``terminal_job_manage(action="list")``
+_SPILL_MAX_MB_DEFAULT = 1024
+_SPILL_TOTAL_MB_DEFAULT = 4096
 
 
 @dataclass(slots=True)
@@ -57,6 +74,10 @@ class JobRecord:
     # and was promoted past the auto-background budget.
     adopted: bool = False
 
+    @property
+    def buffers(self) -> list[RingBuffer]:
+        return [b for b in (self.stdout_buf, self.stderr_buf) if b is not None]
+
     @property
     def status(self) -> str:
         return "exited" if self.exited_at is not None else "running"
@@ -79,6 +100,7 @@ def to_summary(self) -> dict[str, Any]:
             "stdout_bytes": (self.stdout_buf.total_written if self.stdout_buf else 0),
             "stderr_bytes": (self.stderr_buf.total_written if self.stderr_buf else 0),
             "adopted": self.adopted,
+            "spilled": any(b.spill is not None for b in self.buffers),
         }
 
 
@@ -87,9 +109,21 @@ class JobLimitExceeded(RuntimeError):
 
 
 class JobManager:
-    def __init__(self, max_jobs: int | None = None, ring_bytes: int = _DEFAULT_RING_BYTES):
+    def __init__(
+        self,
+        max_jobs: int | None = None,
+        ring_bytes: int = _DEFAULT_RING_BYTES,
+        spill_dir: str | os.PathLike | None = None,
+        spill_max_bytes: int | None = None,
+        spill_total_bytes: int | None = None,
+    ):
         self._max_jobs = max_jobs or int(os.getenv("TERMINAL_TOOLS_MAX_JOBS", str(_MAX_JOBS_DEFAULT)))
         self._ring_bytes = ring_bytes
+        self._spill_root = _resolve_spill_root(spill_dir)
+        self._spill_max_bytes = spill_max_bytes or int(os.getenv("TERMINAL_TOOLS_JOB_SPILL_MAX_MB", str(_SPILL_MAX_MB_DEFAULT))) * 1024 * 1024
+        self._spill_budget = SpillBudget(
+            spill_total_bytes or int(os.getenv("TERMINAL_TOOLS_JOB_SPILL_TOTAL_MB", str(_SPILL_TOTAL_MB_DEFAULT))) * 1024 * 1024
+        )
         self._jobs: dict[str, JobRecord] = {}
         # FIFO of recently-exited job_ids so list/inspect can still
         # find them for a while after exit.
@@ -156,6 +190,7 @@ def adopt_running(
             pumps=existing_pumps,
             adopted=True,
         )
+        self._enable_spill(record)
         with self._lock:
             self._jobs[record.job_id] = record
         # Watcher only — pumps already running.
@@ -248,6 +283,8 @@ def shutdown_all(self, grace_sec: float = 2.0) -> None:
                     record.proc.kill()
                 except Exception:
                     pass
+        if self._spill_root is not None:
+            shutil.rmtree(self._spill_root, ignore_errors=True)
 
     # ── Internals ─────────────────────────────────────────────────
 
@@ -314,6 +351,7 @@ def _adopt(
         stderr_buf = None if merged else RingBuffer(self._ring_bytes)
 
         record = self._wrap(proc, command, name=name, merged=merged, stdout_buf=stdout_buf, stderr_buf=stderr_buf)
+        self._enable_spill(record)
         with self._lock:
             self._jobs[record.job_id] = record
 
@@ -365,27 +403,49 @@ def _wrap(
             adopted=adopted,
         )
 
+    def _enable_spill(self, record: JobRecord) -> None:
+        if self._spill_root is None:
+            return
+        for stream, buf in (("stdout", record.stdout_buf), ("stderr", record.stderr_buf)):
+            if buf is not None:
+                root = self._spill_root / record.job_id / stream
+                buf.set_spill_factory(
+                    lambda floor, root=root: SpillLog(root, base_offset=floor, max_bytes=self._spill_max_bytes, budget=self._spill_budget)
+                )
+
     def _watch_for_exit(self, record: JobRecord) -> None:
         rc = record.proc.wait()
         # Drain any final bytes — pump threads exit on EOF, so this is
         # mostly a join; we don't need to actively pull.
         for pump in record.pumps:
             pump.join(timeout=2.0)
-        if record.stdout_buf is not None:
-            record.stdout_buf.close()
-        if record.stderr_buf is not None:
-            record.stderr_buf.close()
+        for buf in record.buffers:
+            buf.close()
         with self._lock:
             record.exited_at = time.monotonic()
             record.exit_code = rc
             record.signaled = rc < 0 or (rc != 0 and abs(rc) in _SIGNAL_NUMBERS)
             self._exited_order.append(record.job_id)
-            self._evict_old_exits_locked()
-
-    def _evict_old_exits_locked(self) -> None:
+            evicted = self._evict_old_exits_locked()
+        # Compress after the exit is visible, so waiters aren't held up.
+        for buf in record.buffers:
+            if buf.spill is not None:
+                buf.spill.finalize()
+        for old in evicted:
+            for buf in old.buffers:
+                if buf.spill is not None:
+                    buf.spill.discard()
+            if self._spill_root is not None:
+                shutil.rmtree(self._spill_root / old.job_id, ignore_errors=True)
+
+    def _evict_old_exits_locked(self) -> list[JobRecord]:
+        evicted = []
         while len(self._exited_order) > _RECENT_EXIT_KEEP:
             old_id = self._exited_order.pop(0)
-            self._jobs.pop(old_id, None)
+            old = self._jobs.pop(old_id, None)
+            if old is not None:
+                evicted.append(old)
+        return evicted
 
 
 def _pump_stream(stream, ring: RingBuffer) -> None:
@@ -406,6 +466,44 @@ def _pump_stream(stream, ring: RingBuffer) -> None:
         ring.close()
 
 
+def _resolve_spill_root(spill_dir: str | os.PathLike | None) -> Path | None:
+    if os.getenv("TERMINAL_TOOLS_JOB_SPILL", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    base = Path(spill_dir or os.getenv("TERMINAL_TOOLS_JOB_SPILL_DIR") or _default_spill_base())
+    _remove_dead_spill_dirs(base)
+    # Per-process subdirectory: two servers sharing a spill dir never
+    # touch each other's jobs, and shutdown removes only its own.
+    return base / f"{os.getpid()}-{secrets.token_hex(4)}"
+
+
+def _default_spill_base() -> Path:
+    """``<HIVE_HOME>/cache/terminal-jobs``: disk-backed, unlike a tmpfs /tmp."""
+    hive_home = os.environ.get("HIVE_HOME")
+    base = Path(hive_home).expanduser() if hive_home else Path.home() / ".hive"
+    return base / "cache" / "terminal-jobs"
+
+
+def _remove_dead_spill_dirs(base: Path) -> None:
+    """Delete per-process spill dirs whose server is gone (killed before
+    ``shutdown_all`` could clean up)."""
+    if os.name != "posix":
+        return  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        entries = list(base.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        pid = entry.name.split("-", 1)[0]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            shutil.rmtree(entry, ignore_errors=True)
+        except OSError:
+            pass  # alive under another user
+
+
 def _default_name(command: str | Sequence[str]) -> str:
     if isinstance(command, (list, tuple)):
         return command[0] if command else "job"
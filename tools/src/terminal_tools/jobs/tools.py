@@ -9,11 +9,13 @@
 
 from __future__ import annotations
 
+import re
 import signal
 from typing import TYPE_CHECKING, Any
 
 from terminal_tools.common.command_guard import check_command
 from terminal_tools.common.limits import coerce_limits, make_preexec_fn, sanitized_env
+from terminal_tools.common.spill_log import compile_pattern
 from terminal_tools.jobs.manager import JobLimitExceeded, get_manager
 
 if TYPE_CHECKING:
@@ -128,6 +130,9 @@ def terminal_job_logs(
         wait_until_exit: bool = False,
         wait_timeout_sec: float = 30.0,
         tail: bool = False,
+        pattern: str | None = None,
+        ignore_case: bool = False,
+        max_matches: int = 200,
     ) -> dict:
         """Read job output at an offset. Combined read + status + wait primitive.
 
@@ -135,6 +140,12 @@ def terminal_job_logs(
         wait_until_exit=True, blocks server-side until the job exits or
         wait_timeout_sec elapses, then returns logs and final status.
 
+        With pattern set, searches instead of reading: returns the lines
+        matching the regex (searched server-side over the whole retained
+        output, including what spilled to disk past the in-memory window)
+        rather than the raw bytes. Cheap on multi-GB build logs — prefer it
+        to paging through data looking for an error.
+
         Args:
             job_id: From terminal_job_start (or auto-promoted from terminal_exec).
             stream: "stdout" | "stderr" | "merged". Use "merged" only when the
@@ -144,9 +155,15 @@ def terminal_job_logs(
             max_bytes: Max bytes of decoded output to return inline.
             wait_until_exit: When True, blocks until the job exits before reading.
             wait_timeout_sec: Cap on the wait. Returns whatever's accumulated.
-            tail: When True, ignores since_offset and returns the last max_bytes.
+            tail: When True, ignores since_offset and returns the last max_bytes
+                (with pattern: the last max_matches matching lines).
+            pattern: Python regex; return matching lines instead of data.
+            ignore_case: Case-insensitive pattern.
+            max_matches: Cap on matching lines returned. Resume a search from
+                next_offset when truncated=True.
 
         Returns: {data, offset, next_offset, status, exit_code, eof, truncated_bytes_dropped}
+        With pattern: {matches: [{offset, line, text}], truncated, ...} in place of data.
         """
         record = manager.get(job_id)
         if record is None:
@@ -169,6 +186,24 @@ def terminal_job_logs(
                 "error": f"stream={stream!r} not available (merge_stderr={record.merged})",
             }
 
+        if pattern:
+            try:
+                regex = compile_pattern(pattern, ignore_case=ignore_case)
+            except re.error as exc:
+                return {"error": f"invalid pattern: {exc}"}
+            found = buf.search(regex, since_offset=since_offset, max_matches=max_matches, tail=tail)
+            return {
+                "matches": [m.to_dict() for m in found.matches],
+                "truncated": found.truncated,
+                "offset": found.offset,
+                "next_offset": found.next_offset,
+                "truncated_bytes_dropped": found.truncated_bytes_dropped,
+                "eof": buf.eof and found.next_offset >= buf.total_written,
+                "status": record.status,
+                "exit_code": record.exit_code,
+                "runtime_ms": record.runtime_ms(),
+            }
+
         result = buf.tail(max_bytes) if tail else buf.read(since_offset, max_bytes)
         return {
             "data": result.data.decode("utf-8", errors="replace"),
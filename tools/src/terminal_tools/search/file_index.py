@@ -0,0 +1,671 @@
+"""In-memory file-name index behind ``terminal_glob`` and ``terminal_rg``.
+
+Without it every glob pays a full directory traversal (``rg --files`` or
+the ``os.walk`` fallback), which in a large monorepo is seconds per call
+even though the tree barely changes between calls. A ``FileIndex`` walks
+a root once and then keeps its listing current:
+
+  - On Linux an inotify watch per directory (via ctypes, no extra
+    dependency) queues create/delete/rename events in the kernel; each
+    query drains the queue and rescans only the directories named in it.
+  - Elsewhere, or once the inotify watch budget runs out, each query
+    stats every indexed directory and rescans those whose mtime moved --
+    one ``stat`` per directory instead of a listing per directory.
+
+The index applies the same filters ``rg --files`` does by default: hidden
+entries are skipped, and ``.gitignore`` (inside a git work tree),
+``.ignore`` and ``.rgignore`` rules are honoured, including those in
+parent directories up to the repository root. ``_SKIP_DIRS`` are pruned
+as in the walk fallback; ``rg --files`` does not prune them, so where one
+is not ignored (``prunes()``) a glob with rg installed goes to rg. Queries
+that want ignored or hidden files go to the old path.
+
+Glob queries are answered from a newline-joined blob of relative paths,
+searched with ``str.find`` on the glob's longest literal and/or one
+multiline regex, so no Python-level loop runs per indexed file.
+
+Indexes live in a small per-process registry (``lookup``/``ensure``):
+``TERMINAL_TOOLS_FILE_INDEX=0`` disables them,
+``TERMINAL_TOOLS_FILE_INDEX_MAX_FILES`` (default 1,000,000) bounds a root,
+``TERMINAL_TOOLS_FILE_INDEX_ROOTS`` (default 4) bounds how many roots
+are kept, and ``TERMINAL_TOOLS_FILE_INDEX_WATCH=poll`` forces polling.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+_SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules", ".venv", ".tox", ".mypy_cache", ".ruff_cache"})
+_IGNORE_FILES = (".gitignore", ".ignore", ".rgignore")
+_MAX_FILES_DEFAULT = 1_000_000
+_MAX_ROOTS_DEFAULT = 4
+# A directory modified this close to when it was listed may change again
+# within the same mtime tick; re-list it on the next poll.
+_RACY_NS = 1_000_000_000
+# Roots never worth indexing (or watching).
+_UNINDEXABLE = frozenset({"/", "/proc", "/sys", "/dev", "/run"})
+
+
+class IndexTooLarge(RuntimeError):
+    """Raised when a root holds more files than the index will keep."""
+
+
+# ── Globs ─────────────────────────────────────────────────────────
+
+
+def glob_to_regex(glob: str, *, braces: bool = True) -> str:
+    """Translate a path glob to a regex body (no capturing groups) that
+    never matches across ``/`` or a newline except through ``**``.
+
+    ``*`` and ``?`` stay within one path segment, ``**/`` spans zero or
+    more directories, ``[...]`` is a character class and, with
+    ``braces``, ``{a,b}`` is an alternation (rg globs support it;
+    gitignore patterns don't).
+    """
+    out: list[str] = []
+    i, n, depth = 0, len(glob), 0
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:[^\n]*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            out.append("[^\n]*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/\n]*")
+        elif c == "?":
+            out.append("[^/\n]")
+        elif c == "[":
+            j = i + 1
+            if j < n and glob[j] in "!^":
+                j += 1
+            if j < n and glob[j] == "]":
+                j += 1
+            j = glob.find("]", j)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1 : j].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^/\n" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 1
+        elif braces and c == "{":
+            out.append("(?:")
+            depth += 1
+        elif braces and c == "}" and depth:
+            out.append(")")
+            depth -= 1
+        elif braces and c == "," and depth:
+            out.append("|")
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out) + ")" * depth
+
+
+def _required_literal(glob: str) -> str | None:
+    """Longest run of plain characters every match must contain, used to
+    find candidate lines with ``str.find`` before running the regex."""
+    if any(c in glob for c in "{}\\"):
+        return None
+    runs = re.split(r"\*+|\?|\[[^\]]*\]|/", glob)
+    best = max(runs, key=len, default="")
+    return best if len(best) >= 2 else None
+
+
+# ── Ignore rules ──────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class _Rules:
+    """The rules of one ignore file (or several in one directory).
+
+    One alternation per entry kind, listed last rule first, so the first
+    alternative to match is the rule that wins (gitignore's "last match
+    wins"); ``negated[k]`` says whether alternative ``k`` re-includes.
+    """
+
+    files: re.Pattern[str] | None
+    files_negated: list[bool]
+    dirs: re.Pattern[str] | None
+    dirs_negated: list[bool]
+
+    def verdict(self, rel: str, is_dir: bool) -> bool | None:
+        """True (ignored), False (re-included) or None (no rule matched)."""
+        regex, negated = (self.dirs, self.dirs_negated) if is_dir else (self.files, self.files_negated)
+        if regex is None:
+            return None
+        m = regex.match(rel)
+        if m is None:
+            return None
+        return not negated[m.lastindex - 1]
+
+
+def _parse_rules(texts: list[str]) -> _Rules | None:
+    rules: list[tuple[str, bool, bool]] = []
+    for text in texts:
+        for line in text.splitlines():
+            line = line.rstrip("\r")
+            if not line or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = glob_to_regex(line.lstrip("/"), braces=False)
+            rules.append((body if anchored else "(?:[^\n]*/)?" + body, negated, dir_only))
+    if not rules:
+        return None
+
+    def compile_kind(kind: list[tuple[str, bool, bool]]) -> tuple[re.Pattern[str] | None, list[bool]]:
+        if not kind:
+            return None, []
+        kind = kind[::-1]
+        return re.compile("|".join(f"({body})$" for body, _, _ in kind)), [neg for _, neg, _ in kind]
+
+    files, files_negated = compile_kind([r for r in rules if not r[2]])
+    dirs, dirs_negated = compile_kind(rules)
+    return _Rules(files, files_negated, dirs, dirs_negated)
+
+
+def _read_rules(abs_dir: str, use_gitignore: bool) -> tuple[_Rules | None, tuple]:
+    texts, signature = [], []
+    for name in _IGNORE_FILES:
+        if name == ".gitignore" and not use_gitignore:
+            continue
+        path = os.path.join(abs_dir, name)
+        try:
+            st = os.stat(path)
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+        except OSError:
+            continue
+        signature.append((name, st.st_mtime_ns, st.st_size))
+    return _parse_rules(texts), tuple(signature)
+
+
+# ── inotify ───────────────────────────────────────────────────────
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR | _IN_DONT_FOLLOW
+)
+_CHANGE_MASK = _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal non-blocking inotify handle over libc."""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, path: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def events(self) -> Iterator[tuple[int, int, str]]:
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+                pos += length
+                yield wd, mask, name
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+# ── Index ─────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class _Dir:
+    mtime_ns: int
+    files: list[str]
+    subdirs: list[str]
+    rules: _Rules | None
+    ignore_sig: tuple
+    wd: int | None = None
+    racy: bool = False
+    # ``_SKIP_DIRS`` left out although no ignore rule covers them.
+    pruned: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FileIndex:
+    """Names of the non-ignored files under ``root`` (absolute), kept
+    current by inotify or polling. Thread-safe; ``build()`` once, then
+    query with ``glob()`` / ``candidates()``."""
+
+    root: str
+    max_files: int = _MAX_FILES_DEFAULT
+    watch: bool = True
+
+    ready: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    failed: str | None = field(default=None, init=False)
+    _dirs: dict[str, _Dir] = field(default_factory=dict, init=False, repr=False)
+    _parent_rules: list[tuple[str, _Rules]] = field(default_factory=list, init=False, repr=False)
+    _use_gitignore: bool = field(default=False, init=False)
+    _file_count: int = field(default=0, init=False)
+    _blob: str | None = field(default=None, init=False, repr=False)
+    _inotify: _Inotify | None = field(default=None, init=False, repr=False)
+    _wds: dict[int, str] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    # ── Building ──────────────────────────────────────────────────
+
+    def build(self) -> None:
+        """Walk the root. Raises ``IndexTooLarge`` or ``OSError``; either
+        way ``ready`` is set and ``failed`` says why."""
+        with self._lock:
+            try:
+                self._load_parent_rules()
+                if self.watch and sys.platform.startswith("linux"):
+                    try:
+                        self._inotify = _Inotify()
+                    except (OSError, AttributeError):
+                        self._inotify = None
+                self._scan_tree("")
+            except (OSError, IndexTooLarge) as exc:
+                self.failed = str(exc) or type(exc).__name__
+                self.close()
+                raise
+            finally:
+                self.ready.set()
+
+    def _load_parent_rules(self) -> None:
+        """Ignore files in the root's ancestors (up to the git root) apply
+        inside it too, as they do for rg."""
+        chain, path = [], self.root
+        while True:
+            if os.path.exists(os.path.join(path, ".git")):
+                self._use_gitignore = True
+                break
+            parent = os.path.dirname(path)
+            if parent == path:
+                chain = []  # not in a git work tree: only the root's own rules
+                break
+            path = parent
+            chain.append(path)
+        for ancestor in chain:
+            rules, _ = _read_rules(ancestor, self._use_gitignore)
+            if rules is not None:
+                self._parent_rules.append((os.path.relpath(self.root, ancestor).replace(os.sep, "/") + "/", rules))
+
+    def _scan_tree(self, rel: str) -> None:
+        pending = [rel]
+        while pending:
+            pending.extend(self._scan_dir(pending.pop()))
+
+    def _scan_dir(self, rel: str) -> list[str]:
+        """List one directory into the index; returns subdirectories not
+        yet indexed (new ones, on a rescan)."""
+        abs_dir = self._abs(rel)
+        old = self._dirs.get(rel)
+        wd = old.wd if old is not None else None
+        if self._inotify is not None and wd is None:
+            # Watch before listing, so nothing created in between is missed.
+            try:
+                wd = self._inotify.add(abs_dir)
+                self._wds[wd] = rel
+            except OSError as exc:
+                if exc.errno != errno.ENOENT:
+                    self._stop_watching()
+        mtime = os.stat(abs_dir).st_mtime_ns
+        rules, signature = _read_rules(abs_dir, self._use_gitignore)
+        self._dirs[rel] = _Dir(mtime, [], [], rules, signature, wd, racy=time.time_ns() - mtime < _RACY_NS)
+        record = self._dirs[rel]
+        files, subdirs, pruned = [], [], []
+        with os.scandir(abs_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(".") or "\n" in name:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self._ignored(f"{rel}/{name}" if rel else name, is_dir):
+                    continue
+                if is_dir and name in _SKIP_DIRS:
+                    pruned.append(name)
+                    continue
+                (subdirs if is_dir else files).append(name)
+        files.sort()
+        subdirs.sort()
+        record.pruned = pruned
+        self._file_count += len(files) - (len(old.files) if old is not None else 0)
+        if self._file_count > self.max_files:
+            raise IndexTooLarge(f"{self.root} holds more than {self.max_files} files")
+        record.files, record.subdirs = files, subdirs
+        self._blob = None
+        known = set(old.subdirs) if old is not None else set()
+        for gone in known - set(subdirs):
+            self._drop_tree(f"{rel}/{gone}" if rel else gone)
+        children = [f"{rel}/{name}" if rel else name for name in subdirs]
+        return [child for child in children if child not in self._dirs]
+
+    def _ignored(self, rel: str, is_dir: bool) -> bool:
+        # Deepest ignore file first: the first one with a matching rule decides.
+        parts = rel.split("/")
+        for depth in range(len(parts) - 1, -1, -1):
+            base = "/".join(parts[:depth])
+            record = self._dirs.get(base)
+            if record is not None and record.rules is not None:
+                verdict = record.rules.verdict("/".join(parts[depth:]), is_dir)
+                if verdict is not None:
+                    return verdict
+        for prefix, rules in self._parent_rules:
+            verdict = rules.verdict(prefix + rel, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def _drop_tree(self, rel: str) -> None:
+        prefix = rel + "/"
+        for key in [k for k in self._dirs if not rel or k == rel or k.startswith(prefix)]:
+            record = self._dirs.pop(key)
+            self._file_count -= len(record.files)
+            if record.wd is not None and self._wds.get(record.wd) == key:
+                del self._wds[record.wd]
+                if self._inotify is not None:
+                    self._inotify.remove(record.wd)
+        self._blob = None
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _stop_watching(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._wds.clear()
+            for record in self._dirs.values():
+                record.wd = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_watching()
+
+    @property
+    def watching(self) -> bool:
+        return self._inotify is not None
+
+    @property
+    def file_count(self) -> int:
+        return self._file_count
+
+    # ── Keeping current ───────────────────────────────────────────
+
+    def refresh(self) -> None:
+        """Apply changes since the last call: drain inotify events, or
+        stat every directory when polling. Raises ``IndexTooLarge`` (and
+        marks the index failed) if the tree outgrew ``max_files``."""
+        with self._lock:
+            try:
+                self._refresh_locked()
+            except (OSError, IndexTooLarge) as exc:
+                self.failed = str(exc) or type(exc).__name__
+                self._stop_watching()
+                raise
+
+    def _refresh_locked(self) -> None:
+        if self.failed is not None:
+            raise IndexTooLarge(self.failed)
+        dirty: set[str] = set()
+        reload: set[str] = set()
+        if self._inotify is not None:
+            overflow = False
+            for wd, mask, name in self._inotify.events():
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                rel = self._wds.get(wd)
+                if mask & _IN_IGNORED:
+                    self._wds.pop(wd, None)
+                if rel is None:
+                    continue
+                if name in _IGNORE_FILES:
+                    reload.add(rel)
+                elif mask & _CHANGE_MASK:
+                    dirty.add(rel)
+                elif mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                    dirty.add(rel.rpartition("/")[0] if "/" in rel else "")
+            if overflow:
+                self._poll(dirty, reload)
+                self._stop_watching()
+        else:
+            self._poll(dirty, reload)
+        self._apply(dirty, reload)
+
+    def _poll(self, dirty: set[str], reload: set[str]) -> None:
+        for rel, record in list(self._dirs.items()):
+            try:
+                mtime = os.stat(self._abs(rel)).st_mtime_ns
+            except OSError:
+                dirty.add(rel.rpartition("/")[0] if "/" in rel else "")
+                continue
+            changed = mtime != record.mtime_ns
+            if changed or record.racy:
+                dirty.add(rel)
+            # An ignore file appearing or going away changes the mtime;
+            # one edited in place only shows in its own signature.
+            if (changed or record.ignore_sig) and _read_rules(self._abs(rel), self._use_gitignore)[1] != record.ignore_sig:
+                reload.add(rel)
+
+    def _apply(self, dirty: set[str], reload: set[str]) -> None:
+        for rel in sorted(reload, key=len):
+            if rel in self._dirs:
+                # New rules can hide or reveal anything below: re-walk it.
+                self._drop_tree(rel)
+                self._scan_tree(rel)
+        for rel in sorted(dirty, key=len):
+            if rel in self._dirs:
+                try:
+                    for sub in self._scan_dir(rel):
+                        self._scan_tree(sub)
+                except FileNotFoundError:
+                    self._drop_tree(rel)
+
+    # ── Queries ───────────────────────────────────────────────────
+
+    def _paths_blob(self) -> str:
+        if self._blob is None:
+            self._blob = "\n".join(f"{d}/{f}" if d else f for d, record in self._dirs.items() for f in record.files)
+        return self._blob
+
+    def _iter_matches(self, regex: re.Pattern[str], literal: str | None, prefix: str) -> Iterator[str]:
+        blob = self._paths_blob()
+        if literal is None:
+            for m in regex.finditer(blob):
+                yield m.group(0)
+            return
+        pos = 0
+        while (hit := blob.find(literal, pos)) != -1:
+            start = blob.rfind("\n", 0, hit) + 1
+            end = blob.find("\n", hit)
+            end = len(blob) if end == -1 else end
+            line = blob[start:end]
+            if line.startswith(prefix) and regex.fullmatch(line):
+                yield line
+            pos = end + 1
+
+    def glob(self, pattern: str, sub: str = "", max_results: int = 1000) -> tuple[list[str], bool]:
+        """Paths (relative to ``sub``, itself relative to the root) whose
+        path under ``sub`` matches ``pattern``; ``(paths, truncated)``."""
+        self.refresh()
+        prefix = f"{sub}/" if sub else ""
+        body = glob_to_regex(pattern)
+        with self._lock:
+            regex = re.compile(f"^{re.escape(prefix)}(?:{body})$", re.MULTILINE)
+            out: list[str] = []
+            for line in self._iter_matches(regex, _required_literal(pattern), prefix):
+                if len(out) >= max_results:
+                    return out, True
+                out.append(line[len(prefix) :])
+            return out, False
+
+    def prunes(self, sub: str = "") -> bool:
+        """Whether a ``_SKIP_DIRS`` directory that no ignore rule covers
+        sits under ``sub``. ``rg --files`` lists what is inside it, so
+        with rg installed such a tree is not the index's to answer."""
+        prefix = f"{sub}/" if sub else ""
+        with self._lock:
+            return any(record.pruned for rel, record in self._dirs.items() if not sub or rel == sub or rel.startswith(prefix))
+
+    def candidates(
+        self,
+        sub: str = "",
+        *,
+        glob: str | None = None,
+        exts: tuple[str, ...] | None = None,
+        max_depth: int | None = None,
+        limit: int = 4096,
+    ) -> list[str] | None:
+        """Files under ``sub`` (relative to it) passing rg-style ``-g
+        glob`` / type / ``--max-depth`` filters, or None if there are more
+        than ``limit`` (too many to hand over as arguments)."""
+        self.refresh()
+        prefix = f"{sub}/" if sub else ""
+        pattern = glob if glob and "/" in glob else f"**/{glob or '*'}"
+        with self._lock:
+            regex = re.compile(f"^{re.escape(prefix)}(?:{glob_to_regex(pattern)})$", re.MULTILINE)
+            out: list[str] = []
+            for line in self._iter_matches(regex, _required_literal(pattern), prefix):
+                if exts and not line.endswith(exts):
+                    continue
+                if max_depth is not None and line.count("/") - prefix.count("/") >= max_depth:
+                    continue
+                out.append(line[len(prefix) :])
+                if len(out) > limit:
+                    return None
+            return out
+
+
+# ── Registry ──────────────────────────────────────────────────────
+
+_INDEXES: OrderedDict[str, FileIndex] = OrderedDict()
+_TOO_LARGE: set[str] = set()
+_REGISTRY_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("TERMINAL_TOOLS_FILE_INDEX", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def lookup(path: str) -> tuple[FileIndex, str] | None:
+    """A built index covering ``path`` and ``path``'s location inside it."""
+    if not enabled():
+        return None
+    target = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        for root, index in reversed(_INDEXES.items()):
+            if index.ready.is_set() and index.failed is None and (target == root or target.startswith(root.rstrip(os.sep) + os.sep)):
+                _INDEXES.move_to_end(root)
+                return index, "" if target == root else os.path.relpath(target, root).replace(os.sep, "/")
+    return None
+
+
+def ensure(path: str, *, wait: bool) -> tuple[FileIndex, str] | None:
+    """``lookup``, else start indexing ``path``. With ``wait`` the build
+    runs here; otherwise in the background and this returns None."""
+    found = lookup(path)
+    if found is not None or not enabled():
+        return found
+    root = os.path.abspath(path)
+    if root in _UNINDEXABLE or not os.path.isdir(root):
+        return None
+    with _REGISTRY_LOCK:
+        if root in _TOO_LARGE:
+            return None
+        index = _INDEXES.get(root)
+        if index is None:
+            index = FileIndex(
+                root,
+                max_files=int(os.getenv("TERMINAL_TOOLS_FILE_INDEX_MAX_FILES", str(_MAX_FILES_DEFAULT))),
+                watch=os.getenv("TERMINAL_TOOLS_FILE_INDEX_WATCH", "inotify").strip().lower() != "poll",
+            )
+            _INDEXES[root] = index
+            while len(_INDEXES) > int(os.getenv("TERMINAL_TOOLS_FILE_INDEX_ROOTS", str(_MAX_ROOTS_DEFAULT))):
+                _INDEXES.popitem(last=False)[1].close()
+            builder = threading.Thread(target=_build, args=(index,), daemon=True, name=f"file-index-{os.path.basename(root)}")
+            builder.start()
+    if not wait:
+        return None
+    index.ready.wait()
+    return (index, "") if index.failed is None else None
+
+
+def _build(index: FileIndex) -> None:
+    try:
+        index.build()
+    except (OSError, IndexTooLarge) as exc:
+        with _REGISTRY_LOCK:
+            if _INDEXES.get(index.root) is index:
+                del _INDEXES[index.root]
+            if isinstance(exc, IndexTooLarge):
+                _TOO_LARGE.add(index.root)
+
+
+def reset() -> None:
+    """Drop every index (tests, or after a config change)."""
+    with _REGISTRY_LOCK:
+        for index in _INDEXES.values():
+            index.close()
+        _INDEXES.clear()
+        _TOO_LARGE.clear()
+
+
+__all__ = ["FileIndex", "IndexTooLarge", "ensure", "glob_to_regex", "lookup", "reset"]
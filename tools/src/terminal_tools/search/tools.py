@@ -7,6 +7,11 @@
 
 ``terminal_glob`` lists files by name/glob. For mtime/size/type predicate
 queries (find's specialty) the skill steers agents to ``terminal_exec("find ...")``.
+
+Both consult the per-root file index (``file_index``): globs that respect
+ignore files are answered from memory once a root is indexed, and on
+hosts without rg a content search narrowed by ``glob``/``type_filter``
+scans just the matching files instead of walking the tree again.
 """
 
 from __future__ import annotations
@@ -20,6 +25,8 @@
 import time
 from typing import TYPE_CHECKING
 
+from terminal_tools.search import file_index
+
 if TYPE_CHECKING:
     from fastmcp import FastMCP
 
@@ -169,6 +176,10 @@ def _walk_paths(pattern: str, path: str, max_results: int, include_ignored: bool
     return paths, False
 
 
+# Above this many candidate files the walk fallback walks the tree itself
+# rather than hold the whole list.
+_MAX_INDEX_CANDIDATES = 4096
+
 # Minimal rg filetype -> extension map for the os.walk content fallback.
 # Covers the shortcuts agents commonly pass; an unknown type_filter falls
 # through to "all files" since the fallback can't know rg's full type table.
@@ -203,6 +214,7 @@ def _walk_grep(
     max_depth: int | None,
     hidden: bool,
     no_ignore: bool,
+    files: list[str] | None = None,
 ) -> dict:
     """Python regex-over-os.walk fallback for ``terminal_rg`` on hosts
     without ripgrep, so content search degrades gracefully instead of
@@ -214,6 +226,9 @@ def _walk_grep(
     hidden, no_ignore) and returns the same shape as the rg path — one
     matched line per hit. ``context`` / ``extra_args`` are rg-only and not
     reflected here (the rg path's parser drops context events too).
+
+    ``files``, when given, is the already-filtered list to scan (from the
+    file index) in place of the walk.
     """
     try:
         compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
@@ -259,7 +274,11 @@ def _scan(fpath: str) -> bool:
                 break
         return True
 
-    if os.path.isfile(path):
+    if files is not None:
+        for fpath in files:
+            if not _scan(fpath):
+                break
+    elif os.path.isfile(path):
         _scan(path)
     elif os.path.isdir(path):
         base_depth = path.rstrip(os.sep).count(os.sep)
@@ -290,6 +309,44 @@ def _scan(fpath: str) -> bool:
     }
 
 
+def _index_candidates(
+    path: str,
+    *,
+    glob: str | None,
+    type_filter: str | None,
+    max_depth: int | None,
+    hidden: bool,
+    no_ignore: bool,
+    extra_args: list[str] | None,
+) -> list[str] | None:
+    """Files the ``_walk_grep`` fallback should scan, from the file index,
+    when the filters pin them down and the index can answer; else None.
+
+    Only for hosts without rg: rg's own type table and ignore handling are
+    authoritative when it is installed, so its searches never go through
+    the index.
+    """
+    if not (glob or type_filter) or hidden or no_ignore or extra_args or not os.path.isdir(path):
+        return None
+    if (glob and glob.startswith("!")) or (type_filter and type_filter not in _TYPE_FILTER_EXTS):
+        return None
+    indexed = file_index.ensure(path, wait=True)
+    if indexed is None:
+        return None
+    index, sub = indexed
+    try:
+        rels = index.candidates(
+            sub,
+            glob=glob,
+            exts=_TYPE_FILTER_EXTS.get(type_filter) if type_filter else None,
+            max_depth=max_depth,
+            limit=_MAX_INDEX_CANDIDATES,
+        )
+    except (OSError, file_index.IndexTooLarge):
+        return None
+    return None if rels is None else [os.path.join(path, rel) for rel in rels]
+
+
 def register_search_tools(mcp: FastMCP) -> None:
     @mcp.tool()
     def terminal_rg(
@@ -332,9 +389,18 @@ def terminal_rg(
         # the framework-injected session workdir.
         if session_cwd and not os.path.isabs(path):
             path = os.path.join(session_cwd, path)
-        rg_bin = _resolve_rg()
-        if not rg_bin:
-            return _walk_grep(
+
+        def _fallback() -> dict:
+            candidates = _index_candidates(
+                path,
+                glob=glob,
+                type_filter=type_filter,
+                max_depth=max_depth,
+                hidden=hidden,
+                no_ignore=no_ignore,
+                extra_args=extra_args,
+            )
+            result = _walk_grep(
                 pattern,
                 path,
                 glob=glob,
@@ -344,7 +410,15 @@ def terminal_rg(
                 max_depth=max_depth,
                 hidden=hidden,
                 no_ignore=no_ignore,
+                files=candidates,
             )
+            if candidates is not None and "error" not in result:
+                result["indexed_candidates"] = len(candidates)
+            return result
+
+        rg_bin = _resolve_rg()
+        if not rg_bin:
+            return _fallback()
 
         argv = [rg_bin, "--json", "--no-heading"]
         if ignore_case:
@@ -378,17 +452,7 @@ def terminal_rg(
             return {"error": "ripgrep timed out", "command": argv}
         except FileNotFoundError:
             # rg vanished between the which() check and exec — fall back.
-            return _walk_grep(
-                pattern,
-                path,
-                glob=glob,
-                type_filter=type_filter,
-                ignore_case=ignore_case,
-                max_count=max_count,
-                max_depth=max_depth,
-                hidden=hidden,
-                no_ignore=no_ignore,
-            )
+            return _fallback()
 
         # Parse JSON-line output: only "match" events are interesting for the
         # default surface. Errors land in stderr.
@@ -461,6 +525,29 @@ def terminal_glob(
         expanded = _expand_glob_pattern(pattern)
 
         rg_bin = _resolve_rg()
+        if not include_ignored and os.path.isdir(path):
+            # Without rg the first call builds the index (it costs about what
+            # the walk fallback would); with rg it builds in the background.
+            indexed = file_index.ensure(path, wait=not rg_bin)
+            if indexed is not None:
+                index, sub = indexed
+                try:
+                    rels, truncated = index.glob(expanded, sub, max_results)
+                except (OSError, file_index.IndexTooLarge):
+                    pass
+                else:
+                    # rg lists node_modules & co. unless they are ignored;
+                    # the index (like the walk fallback) leaves them out.
+                    if not (rg_bin and index.prunes(sub)):
+                        return {
+                            "paths": [os.path.join(path, rel) for rel in rels],
+                            "count": len(rels),
+                            "truncated": truncated,
+                            "timed_out": False,
+                            "expanded_pattern": expanded,
+                            "command": ["file-index", index.root, expanded],
+                        }
+
         if not rg_bin:
             # No ripgrep — best-effort os.walk (no .gitignore awareness).
             paths, truncated = _walk_paths(expanded, path, max_results, include_ignored)
@@ -0,0 +1,592 @@
+"""Tests for the per-tab AX tree cache behind ``BeelineBridge.snapshot``.
+
+Most tests drive :class:`AXTreeCache` against ``FakePage``, an in-memory
+DOM that answers the handful of CDP methods the cache uses and emits the
+mutation events Chrome would. Every incremental refresh is checked against
+a fresh full fetch of the same page.
+
+``test_headless_chromium_static_page`` runs the bridge against a real
+headless Chromium over the DevTools websocket, on a static HTML file
+written to ``tmp_path``. It is skipped when no Chromium/Chrome binary is
+on PATH (or ``HIVE_TEST_CHROME`` does not point at one).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import time
+import urllib.request
+from unittest.mock import AsyncMock
+
+import pytest
+
+from gcu.browser import ax_cache
+from gcu.browser.ax_cache import NO_CHANGES, AXTreeCache, diff_trees
+from gcu.browser.bridge import BeelineBridge, _Connection
+
+
+class FakePage:
+    """Tiny DOM + AX model speaking the CDP subset the cache uses."""
+
+    def __init__(self) -> None:
+        self._next_backend = 1
+        self.nodes: dict[int, dict] = {}
+        self.root = self.add(None, "RootWebArea", "Page")
+        self.events: list[tuple[str, dict]] = []
+        self.calls: list[str] = []
+        self._node_ids: dict[int, int] = {}
+        self._next_node_id = 1
+
+    # ── page mutation ─────────────────────────────────────────────────
+
+    def add(self, parent: int | None, role: str, name: str = "", *, emit: bool = False) -> int:
+        backend = self._next_backend
+        self._next_backend += 1
+        self.nodes[backend] = {"role": role, "name": name, "children": [], "parent": parent}
+        if parent is not None:
+            self.nodes[parent]["children"].append(backend)
+            if emit and parent in self._node_ids:
+                node = self._dom(backend, depth=0)
+                self.events.append(("DOM.childNodeInserted", {"parentNodeId": self._node_ids[parent], "previousNodeId": 0, "node": node}))
+        return backend
+
+    def rename(self, backend: int, name: str) -> None:
+        self.nodes[backend]["name"] = name
+        if backend in self._node_ids:
+            self.events.append(("DOM.attributeModified", {"nodeId": self._node_ids[backend], "name": "aria-label", "value": name}))
+
+    def remove(self, backend: int) -> None:
+        parent = self.nodes[backend]["parent"]
+        self.nodes[parent]["children"].remove(backend)
+        stack = [backend]
+        while stack:
+            b = stack.pop()
+            stack.extend(self.nodes.pop(b)["children"])
+        if parent in self._node_ids:
+            self.events.append(("DOM.childNodeRemoved", {"parentNodeId": self._node_ids[parent], "nodeId": self._node_ids.pop(backend, 0)}))
+
+    def drain(self, cache: AXTreeCache) -> None:
+        events, self.events = self.events, []
+        for method, params in events:
+            cache.apply_event(method, params)
+
+    # ── CDP ───────────────────────────────────────────────────────────
+
+    def _node_id(self, backend: int) -> int:
+        if backend not in self._node_ids:
+            self._node_ids[backend] = self._next_node_id
+            self._next_node_id += 1
+        return self._node_ids[backend]
+
+    def _dom(self, backend: int, depth: int) -> dict:
+        node = self.nodes[backend]
+        out = {"nodeId": self._node_id(backend), "backendNodeId": backend, "childNodeCount": len(node["children"])}
+        if depth != 0 and node["children"]:
+            out["children"] = [self._dom(c, depth - 1) for c in node["children"]]
+        return out
+
+    def _ax(self, backend: int) -> dict:
+        node = self.nodes[backend]
+        return {
+            "nodeId": str(backend),
+            "backendDOMNodeId": backend,
+            "ignored": False,
+            "role": {"type": "role", "value": node["role"]},
+            "name": {"type": "computedString", "value": node["name"]},
+            "childIds": [str(c) for c in node["children"]],
+        }
+
+    def _preorder(self, backend: int) -> list[int]:
+        out, stack = [], [backend]
+        while stack:
+            b = stack.pop()
+            out.append(b)
+            stack.extend(reversed(self.nodes[b]["children"]))
+        return out
+
+    async def cdp(self, method: str, params: dict | None = None) -> dict:
+        params = params or {}
+        self.calls.append(method)
+        if method == "DOM.getDocument":
+            self._node_ids.clear()
+            return {"root": self._dom(self.root, params.get("depth", 1))}
+        if method == "DOM.requestChildNodes":
+            backend = next(b for b, nid in self._node_ids.items() if nid == params["nodeId"])
+            children = [self._dom(c, -1) for c in self.nodes[backend]["children"]]
+            self.events.append(("DOM.setChildNodes", {"parentId": params["nodeId"], "nodes": children}))
+            return {}
+        if method == "Accessibility.getFullAXTree":
+            return {"nodes": [self._ax(b) for b in self._preorder(self.root)]}
+        if method == "Accessibility.getPartialAXTree":
+            backend = params["backendNodeId"]
+            out, current = [], self.nodes[backend]["parent"]
+            while current is not None:
+                out.append(self._ax(current))
+                out.extend(self._ax(s) for s in self.nodes[current]["children"])
+                current = self.nodes[current]["parent"]
+            out.append(self._ax(backend))
+            out.extend(self._ax(c) for c in self.nodes[backend]["children"])
+            return {"nodes": out}
+        if method == "Accessibility.getChildAXNodes":
+            return {"nodes": [self._ax(c) for c in self.nodes[int(params["id"])]["children"]]}
+        raise AssertionError(f"unexpected CDP call {method}")
+
+
+def _render(nodes: list[dict]) -> str:
+    bridge = BeelineBridge()
+    return bridge._format_ax_tree(bridge._clean_inline_text_boxes(nodes))
+
+
+async def _assert_matches_full(page: FakePage, cache: AXTreeCache) -> None:
+    full = await page.cdp("Accessibility.getFullAXTree")
+    page.calls.pop()
+    assert _render(cache.nodes()) == _render(full["nodes"])
+
+
+def _page() -> tuple[FakePage, dict[str, int]]:
+    page = FakePage()
+    ids = {"nav": page.add(page.root, "navigation", "Main")}
+    ids["home"] = page.add(ids["nav"], "link", "Home")
+    ids["main"] = page.add(page.root, "main")
+    ids["list"] = page.add(ids["main"], "list", "Inbox")
+    for i in range(20):
+        page.add(page.add(ids["list"], "listitem"), "button", f"Message {i}")
+    ids["save"] = page.add(ids["main"], "button", "Save")
+    return page, ids
+
+
+@pytest.mark.asyncio
+async def test_first_sync_is_full_then_hit_without_cdp() -> None:
+    page, _ = _page()
+    cache = AXTreeCache()
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+    assert page.calls == ["DOM.getDocument", "Accessibility.getFullAXTree"]
+    page.calls.clear()
+    generation = cache.generation
+    assert await cache.sync(page.cdp, track_dom=True) == "hit"
+    assert page.calls == []
+    assert cache.generation == generation
+
+
+@pytest.mark.asyncio
+async def test_attribute_change_refetches_only_that_subtree() -> None:
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+    page.calls.clear()
+
+    page.rename(ids["save"], "Save draft")
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "incremental"
+    assert "Accessibility.getFullAXTree" not in page.calls
+    assert len(page.calls) <= 2
+    assert 'button [ref=e25] "Save draft"' in _render(cache.nodes())
+    await _assert_matches_full(page, cache)
+
+
+@pytest.mark.asyncio
+async def test_inserted_subtree_is_tracked_for_later_mutations() -> None:
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+
+    dialog = page.add(ids["main"], "dialog", "Compose", emit=False)
+    form = page.add(dialog, "form")
+    send = page.add(form, "button", "Send")
+    # Chrome reports an inserted subtree shallowly: only the top node.
+    page.events.append(("DOM.childNodeInserted", {"parentNodeId": page._node_ids[ids["main"]], "previousNodeId": 0, "node": page._dom(dialog, 0)}))
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "incremental"
+    assert "DOM.requestChildNodes" in page.calls
+    await _assert_matches_full(page, cache)
+
+    # The subscription's setChildNodes indexes the deeper nodes, so a
+    # change inside the dialog stays incremental.
+    page.drain(cache)
+    page.calls.clear()
+    page.rename(send, "Send now")
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "incremental"
+    assert "Accessibility.getFullAXTree" not in page.calls
+    await _assert_matches_full(page, cache)
+
+
+@pytest.mark.asyncio
+async def test_removal_and_insert_stay_consistent() -> None:
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+    items = list(page.nodes[ids["list"]]["children"])
+
+    page.remove(items[3])
+    page.remove(ids["home"])
+    page.add(ids["list"], "listitem", "New", emit=True)
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "incremental"
+    await _assert_matches_full(page, cache)
+    assert not any(n["nodeId"] == str(items[3]) for n in cache.nodes())
+
+
+@pytest.mark.asyncio
+async def test_document_updated_and_unknown_nodes_force_full() -> None:
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+
+    cache.apply_event("DOM.documentUpdated", {})
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+
+    cache.apply_event("DOM.attributeModified", {"nodeId": 99_999, "name": "class", "value": "x"})
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+
+    # Someone else's DOM.getDocument rebinds every node id.
+    cache.bindings_reset()
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+    page.rename(ids["save"], "Saved")
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "incremental"
+
+
+@pytest.mark.asyncio
+async def test_fetch_budget_falls_back_to_full(monkeypatch) -> None:
+    monkeypatch.setattr(ax_cache, "MAX_INCREMENTAL_FETCHES", 3)
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+
+    page.rename(ids["list"], "Archive")
+    page.drain(cache)
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+    await _assert_matches_full(page, cache)
+
+
+@pytest.mark.asyncio
+async def test_failed_sync_leaves_cache_stale() -> None:
+    page, ids = _page()
+    cache = AXTreeCache()
+    await cache.sync(page.cdp, track_dom=True)
+    page.rename(ids["save"], "x")
+    page.drain(cache)
+
+    async def broken(method, params=None):
+        raise RuntimeError("tab crashed")
+
+    with pytest.raises(RuntimeError):
+        await cache.sync(broken, track_dom=True)
+    assert cache.stale
+    assert await cache.sync(page.cdp, track_dom=True) == "full"
+
+
+@pytest.mark.asyncio
+async def test_untracked_connections_always_fetch_full() -> None:
+    page, _ = _page()
+    cache = AXTreeCache()
+    assert await cache.sync(page.cdp, track_dom=False) == "full"
+    assert await cache.sync(page.cdp, track_dom=False) == "full"
+    assert "DOM.getDocument" not in page.calls
+
+
+def test_diff_ignores_ref_renumbering() -> None:
+    old = '- main\n  - button [ref=e1] "A"\n  - button [ref=e2] "B"\n  - button [ref=e3] "C"'
+    new = '- main\n  - button [ref=e1] "New"\n  - button [ref=e2] "A"\n  - button [ref=e3] "B"\n  - button [ref=e4] "C"'
+    assert diff_trees(old, new) == '@@\n  - main\n+   - button [ref=e1] "New"\n    - button [ref=e2] "A"'
+    assert diff_trees(new, new) == NO_CHANGES
+
+
+# ── bridge integration ────────────────────────────────────────────────
+
+
+class _FakeWS:
+    async def send(self, _msg):
+        return None
+
+
+def _bridge_for(page: FakePage, proto: int = 7) -> BeelineBridge:
+    bridge = BeelineBridge()
+    conn = _Connection(_FakeWS(), label="default")
+    conn.protocol_version = proto
+    bridge._conns["default"] = conn
+    bridge._tab_to_conn[1] = "default"
+    bridge.cdp_attach = AsyncMock(return_value={"ok": True})
+    bridge._try_enable_domain = AsyncMock()
+    bridge._collect_link_hrefs = AsyncMock(return_value={})
+
+    async def fake_cdp(tab_id, method, params=None, *, timeout=None):
+        if method == "DOM.getDocument" and tab_id in bridge._ax_caches:
+            bridge._ax_caches[tab_id].bindings_reset()
+        if method == "Runtime.evaluate":
+            page.calls.append(method)
+            return {"result": {"value": "file:///page.html"}}
+        return await page.cdp(method, params)
+
+    bridge._cdp = fake_cdp
+    return bridge
+
+
+@pytest.mark.asyncio
+async def test_bridge_snapshot_uses_cache_and_diff_mode() -> None:
+    page, ids = _page()
+    bridge = _bridge_for(page)
+
+    first = await bridge.snapshot(1, diff=True)
+    assert first["ok"] and first["cache"] == "full" and first["diff"] is False
+    assert '"Save"' in first["tree"]
+
+    page.calls.clear()
+    again = await bridge.snapshot(1, diff=True)
+    assert again["cache"] == "hit" and again["changed"] is False and again["tree"] == NO_CHANGES
+    assert page.calls == []
+    assert bridge._collect_link_hrefs.await_count == 1
+
+    page.rename(ids["save"], "Save draft")
+    for method, params in page.events:
+        bridge._handle_cdp_event(1, method, params)
+    page.events.clear()
+    changed = await bridge.snapshot(1, diff=True)
+    assert changed["cache"] == "incremental" and changed["changed"] is True
+    assert [ln for ln in changed["tree"].splitlines() if ln[:1] in "+-"] == [
+        '-     - button [ref=e25] "Save"',
+        '+     - button [ref=e25] "Save draft"',
+    ]
+
+    # Main-frame navigation drops the cache.
+    bridge._handle_cdp_event(1, "Page.frameNavigated", {"frame": {"id": "main", "url": "file:///other.html"}})
+    assert 1 not in bridge._ax_caches
+    assert (await bridge.snapshot(1))["cache"] == "full"
+
+
+@pytest.mark.asyncio
+async def test_bridge_cache_hit_makes_no_cdp_calls() -> None:
+    page, _ = _page()
+    bridge = _bridge_for(page)
+    del bridge._try_enable_domain  # the real one, through the fake session below
+    page_cdp = bridge._cdp
+    session: list[str] = []
+
+    async def fake_session(tab_id, method, params=None, *, timeout=None):
+        session.append(method)
+        if method.endswith(".enable"):
+            return {}
+        return await page_cdp(tab_id, method, params, timeout=timeout)
+
+    bridge._cdp = fake_session
+    assert (await bridge.snapshot(1))["cache"] == "full"
+    assert {"Accessibility.enable", "DOM.enable", "Runtime.enable", "Accessibility.getFullAXTree"} <= set(session)
+
+    session.clear()
+    assert (await bridge.snapshot(1))["cache"] == "hit"
+    assert session == []
+
+    # Once the cache stops tracking, the domains are enabled again.
+    bridge._ax_caches[1].invalidate()
+    assert (await bridge.snapshot(1))["cache"] == "full"
+    assert "DOM.enable" in session
+
+
+@pytest.mark.asyncio
+async def test_typing_refreshes_state_the_dom_does_not_report() -> None:
+    # Chrome shows an input's value as static text under the textbox;
+    # typing changes it without any DOM mutation event.
+    page, ids = _page()
+    box = page.add(ids["main"], "textbox", "Subject")
+    shown = page.add(box, "StaticText", "")
+    bridge = _bridge_for(page)
+    bridge.evaluate = AsyncMock(return_value={"ok": True, "result": None})
+    page_cdp = bridge._cdp
+
+    async def with_input(tab_id, method, params=None, *, timeout=None):
+        if method == "Input.insertText":
+            page.nodes[shown]["name"] += params["text"]
+            return {}
+        return await page_cdp(tab_id, method, params, timeout=timeout)
+
+    bridge._cdp = with_input
+    assert (await bridge.snapshot(1))["cache"] == "full"
+    assert (await bridge.snapshot(1))["cache"] == "hit"
+
+    assert (await bridge.type_text(1, None, "Quarterly report", clear_first=False, delay_ms=0))["ok"]
+    assert page.events == []
+    page.calls.clear()
+    snap = await bridge.snapshot(1)
+    assert snap["cache"] == "ax" and '"Quarterly report"' in snap["tree"]
+    assert "DOM.getDocument" not in page.calls
+    assert (await bridge.snapshot(1))["cache"] == "hit"
+
+    # The DOM bindings survived the refresh: mutations are still tracked.
+    page.rename(ids["save"], "Send")
+    for method, params in page.events:
+        bridge._handle_cdp_event(1, method, params)
+    assert (await bridge.snapshot(1))["cache"] == "incremental"
+
+
+@pytest.mark.asyncio
+async def test_bridge_old_extension_fetches_full_every_time() -> None:
+    page, _ = _page()
+    bridge = _bridge_for(page, proto=6)
+    assert (await bridge.snapshot(1))["cache"] == "full"
+    assert (await bridge.snapshot(1))["cache"] == "full"
+    assert "DOM.getDocument" not in page.calls
+
+
+@pytest.mark.asyncio
+async def test_foreign_get_document_forces_full() -> None:
+    page, ids = _page()
+    bridge = _bridge_for(page)
+    await bridge.snapshot(1)
+    await bridge._cdp(1, "DOM.getDocument")
+    page.rename(ids["save"], "Saved")
+    assert (await bridge.snapshot(1))["cache"] == "full"
+
+
+# ── headless Chromium ─────────────────────────────────────────────────
+
+_PAGE_HTML = """<!doctype html>
+<html><head><title>AX cache</title></head>
+<body>
+  <nav aria-label="Main"><a href="#home">Home</a> <a href="#about">About</a></nav>
+  <main>
+    <h1>Inbox</h1>
+    <ul id="list">%s</ul>
+    <button id="save">Save</button>
+    <div id="slot"></div>
+  </main>
+</body></html>
+"""
+
+
+def _chrome_binary() -> str | None:
+    explicit = os.environ.get("HIVE_TEST_CHROME")
+    if explicit:
+        return explicit if os.path.exists(explicit) else None
+    for name in ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable", "chrome"):
+        found = shutil.which(name)
+        if found:
+            return found
+    return None
+
+
+class _DevTools:
+    """Minimal CDP client over the page target's websocket."""
+
+    def __init__(self, ws, on_event) -> None:
+        self._ws = ws
+        self._on_event = on_event
+        self._next_id = 0
+        self._pending: dict[int, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        async for raw in self._ws:
+            msg = json.loads(raw)
+            if "id" in msg:
+                fut = self._pending.pop(msg["id"], None)
+                if fut is not None and not fut.done():
+                    if "error" in msg:
+                        fut.set_exception(RuntimeError(msg["error"].get("message")))
+                    else:
+                        fut.set_result(msg.get("result", {}))
+            else:
+                self._on_event(msg["method"], msg.get("params", {}))
+
+    async def send(self, method: str, params: dict | None = None) -> dict:
+        self._next_id += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = fut
+        await self._ws.send(json.dumps({"id": self._next_id, "method": method, "params": params or {}}))
+        return await asyncio.wait_for(fut, 30)
+
+    async def close(self) -> None:
+        self._reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await self._reader
+        await self._ws.close()
+
+
+@pytest.mark.asyncio
+async def test_headless_chromium_static_page(tmp_path) -> None:
+    binary = _chrome_binary()
+    if binary is None:
+        pytest.skip("no Chromium/Chrome binary on PATH")
+    websockets = pytest.importorskip("websockets")
+
+    html = tmp_path / "page.html"
+    html.write_text(_PAGE_HTML % "".join(f"<li><button>Message {i}</button></li>" for i in range(200)))
+    profile = tmp_path / "profile"
+    proc = subprocess.Popen(
+        [binary, "--headless=new", "--no-sandbox", "--disable-gpu", "--remote-debugging-port=0", f"--user-data-dir={profile}", html.as_uri()],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    devtools = None
+    try:
+        port_file = profile / "DevToolsActivePort"
+        deadline = time.monotonic() + 20
+        while not port_file.exists() or not port_file.read_text().strip():
+            if time.monotonic() > deadline:
+                pytest.skip("Chromium did not expose a DevTools port")
+            await asyncio.sleep(0.1)
+        port = int(port_file.read_text().split()[0])
+        targets = json.loads(urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=10).read())
+        target = next(t for t in targets if t.get("type") == "page")
+
+        bridge = BeelineBridge()
+        conn = _Connection(_FakeWS(), label="default")
+        conn.protocol_version = 7
+        bridge._conns["default"] = conn
+        bridge._tab_to_conn[1] = "default"
+        bridge.cdp_attach = AsyncMock(return_value={"ok": True})
+        ws = await websockets.connect(target["webSocketDebuggerUrl"], max_size=None)
+        devtools = _DevTools(ws, lambda method, params: bridge._handle_cdp_event(1, method, params))
+
+        async def real_cdp(tab_id, method, params=None, *, timeout=None):
+            if method == "DOM.getDocument" and tab_id in bridge._ax_caches:
+                bridge._ax_caches[tab_id].bindings_reset()
+            return await devtools.send(method, params)
+
+        bridge._cdp = real_cdp
+        await devtools.send("Page.enable")
+
+        async def run(js: str) -> None:
+            await devtools.send("Runtime.evaluate", {"expression": js, "awaitPromise": True})
+            # Let the accessibility tree catch up with the DOM change.
+            await devtools.send("Runtime.evaluate", {"expression": "new Promise(r => requestAnimationFrame(() => r(1)))", "awaitPromise": True})
+
+        async def fresh_tree() -> str:
+            cache = bridge._ax_caches.pop(1)
+            try:
+                full = await bridge.snapshot(1)
+            finally:
+                bridge._ax_caches[1] = cache
+            return full["tree"]
+
+        first = await bridge.snapshot(1)
+        assert first["ok"] and first["cache"] == "full", first
+        assert '"Save"' in first["tree"]
+        assert (await bridge.snapshot(1, diff=True))["cache"] == "hit"
+
+        await run("document.getElementById('save').textContent = 'Save draft'")
+        step = await bridge.snapshot(1, diff=True)
+        assert step["cache"] in ("incremental", "full")
+        assert step["changed"] and "+ " in step["tree"] and "Save draft" in step["tree"]
+        expected = await fresh_tree()
+        assert (await bridge.snapshot(1))["tree"] == expected
+
+        await run(
+            "const d = document.createElement('div'); d.setAttribute('role', 'dialog'); d.setAttribute('aria-label', 'Compose');"
+            "d.innerHTML = '<form><button>Send</button></form>'; document.getElementById('slot').appendChild(d);"
+            "document.querySelector('#list li').remove();"
+        )
+        snap = await bridge.snapshot(1)
+        assert snap["tree"] == await fresh_tree()
+        assert "dialog" in snap["tree"] and '"Send"' in snap["tree"]
+    finally:
+        if devtools is not None:
+            await devtools.close()
+        proc.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            proc.wait(timeout=10)
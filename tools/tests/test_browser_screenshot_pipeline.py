@@ -0,0 +1,277 @@
+"""Tests for the screenshot capture / encode pipeline (``gcu.browser.imaging``).
+
+The benchmark at the bottom renders synthetic app-like pages at 2x DPR
+(no browser needed) and compares the PNG-capture pipeline with the
+JPEG-capture one on capture bytes, event-loop time, worker time, output
+bytes and model image tokens, including deduplication over a session of
+repeated screenshots. It is opt-in: run with ``-m benchmark -s`` for the
+table.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import random
+import struct
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from gcu.browser import imaging
+from gcu.browser.bridge import BeelineBridge
+from gcu.browser.imaging import capture_scale, frame_signature, image_size
+from gcu.browser.tools import inspection
+from gcu.browser.tools.inspection import _render_frame, clear_tab_state, render_screenshot
+
+
+def _page(width: int, height: int, *, seed: int = 0, scale: float = 1.0, checked: bool = False) -> Image.Image:
+    """An app-like page: top bar, sidebar, cards of text, thumbnails and buttons."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (248, 249, 251))
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=max(8, int(14 * scale)))
+    s = scale
+    draw.rectangle([0, 0, width, 56 * s], fill=(32, 41, 64))
+    draw.text((24 * s, 18 * s), "Inbox — Acme Workspace", fill=(255, 255, 255), font=font)
+    draw.rectangle([0, 56 * s, 220 * s, height], fill=(236, 239, 244))
+    for i in range(12):
+        draw.text((24 * s, (80 + 34 * i) * s), f"Folder {i}", fill=(60, 60, 70), font=font)
+    y = 80 * s
+    while y < height - 140 * s:
+        draw.rounded_rectangle([250 * s, y, width - 30 * s, y + 120 * s], radius=8 * s, fill=(255, 255, 255), outline=(220, 223, 230))
+        for line in range(3):
+            words = " ".join(rng.choice(["update", "invoice", "meeting", "draft", "review", "ship", "ticket", "customer"]) for _ in range(10))
+            draw.text((270 * s, y + (14 + 24 * line) * s), words, fill=(40, 40, 48), font=font)
+        # Thumbnail / avatar: photographic content, as on most real pages.
+        photo = Image.effect_noise((int(96 * s), int(96 * s)), 40).convert("RGB")
+        photo = Image.blend(photo, Image.linear_gradient("L").resize(photo.size).convert("RGB"), 0.6)
+        img.paste(photo, (int(width - 300 * s), int(y + 12 * s)))
+        draw.rounded_rectangle([width - 150 * s, y + 80 * s, width - 50 * s, y + 108 * s], radius=6 * s, fill=(59, 130, 246))
+        draw.text((width - 135 * s, y + 86 * s), "Reply", fill=(255, 255, 255), font=font)
+        y += 140 * s
+    box = [262 * s, 64 * s, 276 * s, 78 * s]
+    draw.rectangle(box, outline=(80, 80, 90), width=max(1, int(s)), fill=(59, 130, 246) if checked else (255, 255, 255))
+    return img
+
+
+def _encode(img: Image.Image, fmt: str, quality: int = 90) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "png":
+        img.save(buf, format="PNG")
+    elif fmt == "webp":
+        img.save(buf, format="WEBP", quality=quality)
+    else:
+        img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+@pytest.mark.parametrize("fmt", ["png", "jpeg", "webp"])
+def test_image_size_reads_only_the_header(fmt) -> None:
+    data = _b64(_encode(_page(1280, 800), fmt))
+    assert image_size(data) == (fmt, 1280, 800)
+    # The header alone is enough: a truncated payload parses the same.
+    assert image_size(data[:4096]) == (fmt, 1280, 800)
+    assert image_size("") == ("unknown", 0, 0)
+    assert image_size("not base64 at all!") == ("unknown", 0, 0)
+
+
+def test_capture_scale_targets_width_within_limits() -> None:
+    assert capture_scale(1600, 900, 800) == 0.5
+    assert capture_scale(100, 40, 800) == 4.0  # small element: render crisper, capped
+    tall = capture_scale(1280, 60_000, 800)
+    assert 1280 * tall <= 800 and 60_000 * tall <= 16_000
+    assert capture_scale(0, 10, 800) == 1.0
+
+
+class _Recorder:
+    def __init__(self, data: str, layout: dict | None = None) -> None:
+        self.data = data
+        self.layout = layout or {"contentSize": {"width": 1280, "height": 6000}}
+        self.captures: list[dict] = []
+
+    async def __call__(self, tab_id, method, params=None, *, timeout=None):
+        if method == "Page.captureScreenshot":
+            self.captures.append(params)
+            return {"data": self.data}
+        if method == "Page.getLayoutMetrics":
+            return self.layout
+        if method == "Runtime.evaluate":
+            return {"result": {"value": {"url": "file:///page.html", "dpr": 2, "cssWidth": 1280, "cssHeight": 800}}}
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_bridge_negotiates_format_quality_and_clip_scale() -> None:
+    bridge = BeelineBridge()
+    bridge.cdp_attach = AsyncMock()
+    rec = _Recorder(_b64(_encode(_page(2560, 1600), "jpeg")))
+    bridge._cdp = rec
+
+    shot = await bridge.screenshot(1, image_format="jpeg", target_width=800)
+    assert shot["mimeType"] == "image/jpeg" and (shot["pngWidth"], shot["pngHeight"]) == (2560, 1600)
+    # A viewport capture still needs a resize, so it asks for headroom quality.
+    assert rec.captures[-1] == {"format": "jpeg", "quality": imaging.INTERMEDIATE_QUALITY}
+
+    await bridge.screenshot(1, full_page=True, image_format="jpeg", target_width=800)
+    full = rec.captures[-1]
+    assert full["clip"]["scale"] == 0.625 and full["quality"] == imaging.OUTPUT_QUALITY
+
+    await bridge.screenshot(1)
+    assert rec.captures[-1] == {"format": "png"}
+
+    await bridge.screenshot_region(1, 0, 0, 0.5, 0.5, scale=1.25, image_format="webp")
+    assert rec.captures[-1]["format"] == "webp" and rec.captures[-1]["quality"] == imaging.INTERMEDIATE_QUALITY
+
+
+def test_render_frame_resizes_passes_through_and_transcodes() -> None:
+    hi_dpr = _b64(_encode(_page(2560, 1600, scale=2), "jpeg"))
+    frame = _render_frame(hi_dpr, 1280, 2.0)
+    assert frame.fmt == "jpeg" and image_size(frame.data) == ("jpeg", 800, 500)
+    assert frame.physical_scale == 3.2
+
+    at_width = _b64(_encode(_page(800, 500), "jpeg", 75))
+    assert _render_frame(at_width, 1280).data == at_width
+    # Annotation forces a re-encode even at the right size.
+    annotated = _render_frame(at_width, 1280, highlights=[{"x": 100, "y": 100, "w": 50, "h": 20, "label": "x"}])
+    assert annotated.data != at_width
+
+    webp = _render_frame(hi_dpr, 1280, 2.0, fmt="webp")
+    assert webp.mime == "image/webp" and image_size(webp.data)[0] == "webp"
+
+
+def test_signature_ignores_encoding_noise_but_sees_small_changes() -> None:
+    page = _page(800, 500)
+    a = frame_signature(page)
+    assert a.matches(frame_signature(Image.open(io.BytesIO(_encode(page, "jpeg", 60)))))
+    assert not a.matches(frame_signature(_page(800, 500, checked=True)))
+    assert not a.matches(frame_signature(_page(800, 520)))
+
+
+def _bridge_returning(*payloads: str) -> MagicMock:
+    bridge = MagicMock()
+    bridge.screenshot = AsyncMock(
+        side_effect=[{"ok": True, "data": p, "url": url, "cssWidth": 1280, "cssHeight": 800, "devicePixelRatio": 2.0} for p, url in payloads]
+    )
+    return bridge
+
+
+@pytest.mark.asyncio
+async def test_render_screenshot_skips_unchanged_frames() -> None:
+    clear_tab_state(7)
+    same = _b64(_encode(_page(2560, 1600, scale=2), "jpeg"))
+    again = _b64(_encode(_page(2560, 1600, scale=2), "jpeg", 85))
+    changed = _b64(_encode(_page(2560, 1600, scale=2, checked=True), "jpeg"))
+    url = "file:///inbox.html"
+    bridge = _bridge_returning(
+        (same, url), (again, url), (changed, url), (changed, "file:///other.html"), (changed, "file:///other.html"), (changed, "file:///other.html")
+    )
+
+    with patch("gcu.browser.tools.inspection.log_tool_call"):
+        first = await render_screenshot(bridge, 7)
+        second = await render_screenshot(bridge, 7, dedupe=True)
+        third = await render_screenshot(bridge, 7, dedupe=True)
+        moved = await render_screenshot(bridge, 7, dedupe=True)
+        default = await render_screenshot(bridge, 7)
+        opted_in = await render_screenshot(bridge, 7, dedupe=True)
+
+    # Dedupe is opt-in: without it an unchanged page still comes back with its image.
+    assert [len(r) for r in (first, second, third, moved, default, opted_in)] == [2, 1, 2, 2, 2, 1]
+    meta = json.loads(second[0].text)
+    assert meta["unchanged"] is True and "not resent" in meta["note"]
+    assert first[1].mimeType == "image/jpeg"
+    clear_tab_state(7)
+    assert 7 not in inspection._last_frames
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+def _png_pipeline(capture: str) -> tuple[str, float, float]:
+    """The previous pipeline: full decode on the loop for IHDR, then PNG
+    decode + resize + JPEG 75 in a worker."""
+    t0 = time.perf_counter()
+    raw = base64.b64decode(capture)
+    struct.unpack(">II", raw[16:24])
+    loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    img = Image.open(io.BytesIO(base64.b64decode(capture))).convert("RGBA")
+    img = img.resize((800, round(img.height * 800 / img.width)), Image.LANCZOS).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=75, optimize=True)
+    return _b64(buf.getvalue()), loop_s, time.perf_counter() - t0
+
+
+def _new_pipeline(capture: str, css_width: int) -> tuple[str, float, float]:
+    t0 = time.perf_counter()
+    image_size(capture)
+    loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    frame = _render_frame(capture, css_width, 2.0, fingerprint=True)
+    return frame.data, loop_s, time.perf_counter() - t0
+
+
+def _tokens(data: str) -> int:
+    _, w, h = image_size(data)
+    return round(w * h / 750)
+
+
+@pytest.mark.benchmark
+def test_benchmark_capture_pipeline_local_pages() -> None:
+    rows = []
+    for name, (w, h) in {"viewport 1280x800": (1280, 800), "viewport 1440x900": (1440, 900), "full page 1280x4000": (1280, 4000)}.items():
+        hi = _page(w * 2, h * 2, seed=len(name), scale=2)
+        old_capture = _b64(_encode(hi, "png"))
+        if name.startswith("full"):
+            # Full page: Chrome now renders the clip straight at 800 px wide
+            # and final quality; previously at scale 1 (the DPR-free bound).
+            old_capture = _b64(_encode(_page(w, h, seed=len(name)), "png"))
+            new_capture = _b64(_encode(_page(800, round(h * 800 / w), seed=len(name), scale=800 / w), "jpeg", imaging.OUTPUT_QUALITY))
+        else:
+            new_capture = _b64(_encode(hi, "jpeg", imaging.INTERMEDIATE_QUALITY))
+        old_runs = [_png_pipeline(old_capture) for _ in range(3)]
+        new_runs = [_new_pipeline(new_capture, w) for _ in range(3)]
+        old_out, old_loop, old_work = min(old_runs, key=lambda r: r[2])
+        new_out, new_loop, new_work = min(new_runs, key=lambda r: r[2])
+        rows.append((name, len(old_capture), len(new_capture), old_loop, new_loop, old_work, new_work, len(old_out), len(new_out), _tokens(new_out)))
+
+    # A session of 10 viewport screenshots, 6 of them of an unchanged page.
+    clear_tab_state(9)
+    frames = [_page(2560, 1600, scale=2, checked=c) for c in (False, False, False, True, True, True, True, False, False, False)]
+    captures = [(_b64(_encode(f, "jpeg", imaging.INTERMEDIATE_QUALITY)), "file:///inbox.html") for f in frames]
+    bridge = _bridge_returning(*captures)
+
+    async def session() -> list:
+        out = []
+        with patch("gcu.browser.tools.inspection.log_tool_call"):
+            for _ in captures:
+                out.append(await render_screenshot(bridge, 9, dedupe=True))
+        return out
+
+    import asyncio
+
+    results = asyncio.run(session())
+    sent = [r[1].data for r in results if len(r) == 2]
+    per_image = _tokens(sent[0])
+    clear_tab_state(9)
+
+    print("\npage                   capture KB (png→jpeg)  loop ms (png→jpeg)  worker ms (png→jpeg)  output KB  tokens/img")
+    for name, oc, nc, ol, nl, ow, nw, oo, no, tok in rows:
+        print(
+            f"{name:22} {oc / 1024:8.0f} → {nc / 1024:6.0f}   {ol * 1e3:7.2f} → {nl * 1e3:5.3f}   "
+            f"{ow * 1e3:8.1f} → {nw * 1e3:6.1f}   {oo / 1024:4.0f} → {no / 1024:3.0f}  {tok:6d}"
+        )
+    print(f"session of {len(captures)} screenshots: {len(sent)} images sent, image tokens {per_image * len(captures)} → {per_image * len(sent)}")
+
+    for _name, oc, nc, ol, nl, ow, nw, _oo, _no, _tok in rows:
+        assert nc < oc
+        assert nl < ol
+        assert nw < ow
+    assert len(sent) == 3
@@ -624,7 +624,9 @@ async def test_screenshot_full_page(self, mcp: FastMCP, mock_bridge: MagicMock):
 
         # browser_screenshot returns list of content blocks
         assert isinstance(result, list)
-        mock_bridge.screenshot.assert_awaited_once_with(100, full_page=True, selector=None, selector_timeout_ms=5000)
+        mock_bridge.screenshot.assert_awaited_once_with(
+            100, full_page=True, selector=None, selector_timeout_ms=5000, image_format="jpeg", target_width=800
+        )
 
 
 class TestAdvancedTools:
@@ -761,6 +763,7 @@ def _bridge_with_cdp_value(self, cdp_value) -> BeelineBridge:
         """Real BeelineBridge whose CDP touchpoints are mocked to return
         a Runtime.evaluate result carrying ``cdp_value``."""
         bridge = BeelineBridge.__new__(BeelineBridge)
+        bridge._ax_caches = {}
         bridge.cdp_attach = AsyncMock(return_value={"ok": True})
         bridge._try_enable_domain = AsyncMock(return_value={"ok": True})
         bridge._cdp = AsyncMock(return_value={"result": {"type": "string", "value": cdp_value}})
@@ -0,0 +1,206 @@
+"""Concurrent, cached credential health sweeps.
+
+Checkers are pointed at a local aiohttp server that impersonates provider
+endpoints with injected latency. Concurrency is asserted from the number
+of requests the server sees in flight at once, not from wall-clock time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import pytest
+from aiohttp import web
+
+from aden_tools.credentials import health_check
+from aden_tools.credentials.health_check import (
+    GitHubHealthChecker,
+    GoogleHealthChecker,
+    StripeHealthChecker,
+    acheck_credential_health,
+    acheck_credentials_health,
+    check_credential_health,
+    check_credentials_health,
+    invalidate_health_cache,
+)
+
+LATENCY = 0.3
+
+
+class _FakeProviders:
+    """aiohttp app on a background thread. ``/slow`` sleeps 2 s; every
+    other route sleeps ``LATENCY`` and accepts ``Bearer good-*`` tokens."""
+
+    def __init__(self) -> None:
+        self.hits: Counter[str] = Counter()
+        self.connections: set[int] = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        self.hits[path] += 1
+        self.connections.add(id(request.transport))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(2.0 if path == "slow" else LATENCY)
+        finally:
+            self.in_flight -= 1
+        token = request.headers.get("Authorization", "")
+        if not token.startswith("Bearer good"):
+            return web.json_response({"error": "bad token"}, status=401)
+        if path == "google/sheets":
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response({"login": "octocat", "email": "me@example.com"})
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{path}"
+
+    def start(self) -> _FakeProviders:
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    server = _FakeProviders().start()
+    monkeypatch.setattr(GitHubHealthChecker, "ENDPOINT", server.url("github/user"))
+    monkeypatch.setattr(StripeHealthChecker, "ENDPOINT", server.url("stripe/balance"))
+    monkeypatch.setattr(
+        GoogleHealthChecker,
+        "ENDPOINTS",
+        {scope: server.url(f"google/{scope}") for scope in ("gmail", "calendar", "sheets")},
+    )
+    invalidate_health_cache()
+    yield server
+    invalidate_health_cache()
+    server.stop()
+
+
+def _generic(server: _FakeProviders, i: int, token: str = "good") -> tuple[str, str, dict]:
+    """A credential with no dedicated checker, validated through the
+    spec-endpoint fallback — one distinct provider per ``i``."""
+    return (f"acme_{i}", f"{token}-{i}", {"health_check_endpoint": server.url(f"acme/{i}")})
+
+
+async def test_sweep_runs_checks_concurrently_in_order(providers) -> None:
+    checks = [("github", "good-gh"), ("stripe", "bad-key"), *(_generic(providers, i) for i in range(10))]
+
+    results = await acheck_credentials_health(checks, concurrency=4)
+
+    assert [r.valid for r in results] == [True, False] + [True] * 10
+    assert results[0].details == {"username": "octocat"}
+    assert results[1].details == {"status_code": 401}
+    # Checks overlap, but never more than the sweep's concurrency.
+    assert 1 < providers.peak_in_flight <= 4
+
+
+async def test_google_scopes_are_checked_in_parallel(providers) -> None:
+    good, expired = await acheck_credentials_health([("google", "good-token"), ("google", "expired")], concurrency=1)
+
+    assert good.valid and "Sheets" in good.message
+    assert not expired.valid and expired.details == {"status_code": 401}
+    # One credential at a time, yet its three scope requests overlapped.
+    assert providers.peak_in_flight == 3
+    # Sequential semantics outside a sweep: a 401 stops at the first scope.
+    before = providers.hits["google/calendar"]
+    assert check_credential_health("google", "expired").details == {"status_code": 401}
+    assert providers.hits["google/calendar"] == before
+
+
+async def test_results_are_cached_by_credential_value(providers) -> None:
+    await acheck_credentials_health([("github", "good-1")])
+    assert (await acheck_credential_health("github", "good-1")).valid
+    assert providers.hits["github/user"] == 1
+
+    # A changed credential is a different key.
+    assert not (await acheck_credential_health("github", "bad-2")).valid
+    assert providers.hits["github/user"] == 2
+
+    invalidate_health_cache("github")
+    await acheck_credential_health("github", "good-1")
+    assert providers.hits["github/user"] == 3
+
+    await acheck_credentials_health([("github", "good-1")], use_cache=False)
+    assert providers.hits["github/user"] == 4
+
+
+async def test_slow_provider_hits_its_own_timeout_and_is_not_cached(providers, monkeypatch) -> None:
+    monkeypatch.setattr(GitHubHealthChecker, "ENDPOINT", providers.url("slow"))
+    monkeypatch.setattr(GitHubHealthChecker, "TIMEOUT", 0.2)
+
+    t0 = time.perf_counter()
+    slow, fast = await acheck_credentials_health([("github", "good-x"), ("stripe", "good-x")])
+
+    assert time.perf_counter() - t0 < 1.5
+    assert not slow.valid and slow.details == {"error": "timeout"}
+    assert fast.valid
+    assert "github" not in health_check._cache and "stripe" in health_check._cache
+
+
+async def test_deadline_abandons_a_hung_checker(providers, monkeypatch) -> None:
+    release = threading.Event()
+    monkeypatch.setattr(GitHubHealthChecker, "check", lambda self, token: release.wait(5))
+    monkeypatch.setattr(GitHubHealthChecker, "TIMEOUT", 0.1)
+    monkeypatch.setattr(health_check, "_DEADLINE_SLACK", 0.1)
+
+    (result,) = await acheck_credentials_health([("github", "good")])
+    release.set()
+
+    assert result.details == {"error": "timeout"}
+
+
+def test_sync_sweep_and_exceptions(providers, monkeypatch) -> None:
+    def boom(self, key):
+        raise RuntimeError("checker bug")
+
+    monkeypatch.setattr(StripeHealthChecker, "check", boom)
+    checks = [("github", "good-s"), ("stripe", "good-s"), ("no_such_service", "x")]
+
+    results = check_credentials_health(checks, return_exceptions=True)
+
+    assert results[0].valid
+    assert isinstance(results[1], RuntimeError)
+    assert results[2].details == {"no_checker": True}
+    with pytest.raises(RuntimeError, match="checker bug"):
+        check_credentials_health(checks, use_cache=False)
+
+
+async def test_sweep_reuses_connections_and_serves_repeats_from_cache(providers) -> None:
+    checks = [("github", "good-b"), ("google", "good-b"), *(_generic(providers, i, "good-b") for i in range(22))]
+    requests = len(checks) + 2  # Google checks three scopes
+
+    swept = await acheck_credentials_health(checks)
+    assert all(r.valid for r in swept)
+    assert sum(providers.hits.values()) == requests
+    # Pooled connections: one per concurrent request at most, not one per request.
+    assert len(providers.connections) <= providers.peak_in_flight < requests
+
+    again = await acheck_credentials_health(checks)
+    assert again == swept
+    assert sum(providers.hits.values()) == requests, "the repeat sweep is answered from the cache"
@@ -0,0 +1,209 @@
+"""Tests for the memory_tools trigram index (``memory_tools.trigram``).
+
+Covers literal extraction from patterns, incremental segments written by
+sync, compaction, backfill of pre-index caches, and that narrowed locate
+results equal a full sweep. The benchmark at the bottom reports p50/p99
+locate latency; it runs on a 16 MB corpus by default — set
+``MEMORY_TOOLS_BENCH_MB=1024`` for the 1 GB run. It is opt-in, run with
+``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+from memory_tools import index, locate as locate_mod, trigram
+
+QUEEN = "queen_x"
+SESSION = "session_20260501_100000_aaaa"
+
+
+@pytest.fixture
+def hive_home(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv("HIVE_HOME", str(tmp_path))
+    return tmp_path
+
+
+def _user(content: str) -> dict:
+    return {"type": "client_input_received", "data": {"content": content}}
+
+
+def _tool(result: str) -> dict:
+    return {"type": "tool_call_completed", "data": {"tool_use_id": "c", "tool_name": "bash", "result": result}}
+
+
+def _session_dir(hive_home: Path, session: str = SESSION) -> Path:
+    return hive_home / "agents" / "queens" / QUEEN / "sessions" / session
+
+
+def _append(hive_home: Path, events: list[dict], session: str = SESSION) -> Path:
+    sdir = _session_dir(hive_home, session)
+    sdir.mkdir(parents=True, exist_ok=True)
+    with (sdir / "events.jsonl").open("a", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+    return sdir
+
+
+def _locate(pattern: str) -> list[tuple[str, int]]:
+    hits, _engine = locate_mod.locate(
+        "queens",
+        QUEEN,
+        pattern,
+        session_filter=None,
+        role_filter="all",
+        match_source="all",
+        ignore_case=False,
+        multiline=False,
+        dotall=False,
+    )
+    return sorted((h.session, h.ordinal) for h in hits)
+
+
+def _full_sweep(monkeypatch, pattern: str) -> list[tuple[str, int]]:
+    with monkeypatch.context() as m:
+        m.setattr(trigram, "required_trigrams", lambda _p: None)
+        return _locate(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern,clauses",
+    [
+        ("AAPL", 1),
+        ("hello.*world", 2),
+        ("(deadline|due date)", 1),
+        ("(?i)Stock", 1),
+    ],
+)
+def test_required_trigrams_extracts_literals(pattern: str, clauses: int) -> None:
+    assert len(trigram.required_trigrams(pattern)) == clauses
+
+
+@pytest.mark.parametrize("pattern", ["ab", ".*", r"\d+", "(abc|x)", "[[:alpha:]]+foo", r"\p{L}foo", "x{2}yz"])
+def test_required_trigrams_declines_when_unsure(pattern: str) -> None:
+    assert trigram.required_trigrams(pattern) is None
+
+
+def test_sync_appends_one_segment_per_sync_and_compacts(hive_home: Path, monkeypatch) -> None:
+    monkeypatch.setattr(trigram, "MAX_SEGMENTS", 3)
+    seg_dir = trigram.index_dir("queens", QUEEN, SESSION)
+    for i in range(3):
+        _append(hive_home, [_user(f"message number {i} about zebra{i}")])
+        index.sync_scope("queens", QUEEN)
+        assert len(list(seg_dir.glob("seg-*.tri"))) == i + 1
+
+    # No new cache files → no new segment.
+    index.sync_scope("queens", QUEEN)
+    assert len(list(seg_dir.glob("seg-*.tri"))) == 3
+
+    _append(hive_home, [_user("the fourth one, zebra3")])
+    index.sync_scope("queens", QUEEN)
+    assert len(list(seg_dir.glob("seg-*.tri"))) == 1
+    assert _locate("zebra1") == [(SESSION, 1)]
+    assert _locate("zebra3") == [(SESSION, 3)]
+    assert _locate("zebra9") == []
+
+
+def test_narrowed_results_match_full_sweep(hive_home: Path, monkeypatch) -> None:
+    spill = "Tool `bash` returned 9,999 characters. Full result saved at: {path}"
+    sdir = _append(hive_home, [_user("deploy the payments service"), _user("Deadline is Friday")])
+    data = sdir / "data"
+    data.mkdir()
+    (data / "bash_1.txt").write_text("kubectl rollout status deploy/payments\n" * 50)
+    _append(hive_home, [_tool(spill.format(path=data / "bash_1.txt")), _user("ok thanks")])
+    _append(hive_home, [_user("unrelated chatter about lunch")], session="session_20260502_100000_bbbb")
+    index.sync_scope("queens", QUEEN)
+
+    for pattern in ["payments", "(?i)deadline", "rollout.*payments", "(lunch|friday)", "(?i)(lunch|friday)", "zzz_nothing", ".+"]:
+        assert _locate(pattern) == _full_sweep(monkeypatch, pattern), pattern
+
+
+def test_case_folded_non_ascii_is_still_found(hive_home: Path) -> None:
+    _append(hive_home, [_user("temperature in Kelvin units")])
+    index.sync_scope("queens", QUEEN)
+    assert _locate("(?i)kelvin") == [(SESSION, 0)]
+
+
+def test_missing_index_is_backfilled_and_swept_meanwhile(hive_home: Path) -> None:
+    import shutil
+
+    _append(hive_home, [_user("alpha bravo charlie")])
+    index.sync_scope("queens", QUEEN)
+    seg_dir = trigram.index_dir("queens", QUEEN, SESSION)
+    shutil.rmtree(seg_dir)
+
+    # No index: locate sweeps the session directory in full.
+    assert _locate("bravo") == [(SESSION, 0)]
+    index.sync_scope("queens", QUEEN)
+    assert trigram.TrigramIndex(seg_dir).indexed_names() == {"events/000000.user.txt"}
+
+
+def test_wipe_resets_index(hive_home: Path) -> None:
+    sdir = _append(hive_home, [_user("original words here")])
+    index.sync_scope("queens", QUEEN)
+    (sdir / "events.jsonl").write_text(json.dumps(_user("replacement text")) + "\n", encoding="utf-8")
+    index.sync_scope("queens", QUEEN)
+    assert _locate("original") == []
+    assert _locate("replacement") == [(SESSION, 0)]
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@pytest.mark.benchmark
+def test_benchmark_locate_latency(hive_home: Path, monkeypatch) -> None:
+    corpus_mb = int(os.environ.get("MEMORY_TOOLS_BENCH_MB", "16"))
+    rng = random.Random(7)
+    vocab = [f"{a}{b}{c}" for a in "bcdfghjklm" for b in "aeiou" for c in "nprstvz"]
+    message_bytes = 2048
+    sessions = 20
+    per_session = max(1, corpus_mb * 1024 * 1024 // message_bytes // sessions)
+    needles = [f"needle{i:04d}" for i in range(40)]
+    for s in range(sessions):
+        session = f"session_20260501_{s:06d}_bench"
+        events = []
+        for _ in range(per_session):
+            words = rng.choices(vocab, k=message_bytes // 6)
+            if rng.random() < 0.01:
+                words[rng.randrange(len(words))] = rng.choice(needles)
+            events.append(_user(" ".join(words)))
+        _append(hive_home, events, session=session)
+    t0 = time.perf_counter()
+    index.sync_scope("queens", QUEEN)
+    build_s = time.perf_counter() - t0
+
+    queries = [rng.choice(needles) for _ in range(20)] + [f"{rng.choice(vocab)} {rng.choice(vocab)}" for _ in range(10)]
+
+    def measure() -> list[float]:
+        out = []
+        for q in queries:
+            t = time.perf_counter()
+            _locate(q)
+            out.append(time.perf_counter() - t)
+        return out
+
+    indexed = measure()
+    with monkeypatch.context() as m:
+        m.setattr(trigram, "required_trigrams", lambda _p: None)
+        full = measure()
+
+    print(
+        f"\n{corpus_mb} MB corpus ({sessions * per_session} messages), sync+index {build_s:.1f}s, engine={locate_mod._engine_available()}\n"
+        f"  indexed   p50 {_percentile(indexed, 50) * 1e3:.1f} ms  p99 {_percentile(indexed, 99) * 1e3:.1f} ms\n"
+        f"  full scan p50 {_percentile(full, 50) * 1e3:.1f} ms  p99 {_percentile(full, 99) * 1e3:.1f} ms"
+    )
+    for q in queries[:3]:
+        assert _locate(q) == _full_sweep(monkeypatch, q)
+    assert statistics.median(indexed) < statistics.median(full)
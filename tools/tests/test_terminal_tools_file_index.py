@@ -0,0 +1,291 @@
+"""File index behind terminal_glob / terminal_rg: ignore rules, live updates.
+
+The benchmark at the bottom builds a synthetic 500k-file tree
+(``TERMINAL_TOOLS_BENCH_INDEX_FILES`` to resize) and compares repeated
+glob latency from the index, kept current by inotify and by polling,
+with the walk the tools did on every call; it is opt-in, run with
+``-m benchmark -s``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import statistics
+import sys
+import time
+
+import pytest
+
+from terminal_tools.search import file_index
+from terminal_tools.search.file_index import FileIndex, IndexTooLarge, glob_to_regex
+
+WATCH_MODES = [pytest.param(True, id="inotify"), pytest.param(False, id="poll")]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    file_index.reset()
+    yield
+    file_index.reset()
+
+
+@pytest.fixture
+def search_tools(mcp, monkeypatch):
+    import terminal_tools.search.tools as st
+
+    monkeypatch.setattr(st, "_resolve_rg", lambda: None)
+    st.register_search_tools(mcp)
+    return {
+        "rg": mcp._tool_manager._tools["terminal_rg"].fn,
+        "glob": mcp._tool_manager._tools["terminal_glob"].fn,
+    }
+
+
+def _touch(root, *rels: str) -> None:
+    for rel in rels:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x\n")
+
+
+def _names(index: FileIndex, pattern: str = "**", sub: str = "") -> list[str]:
+    return sorted(index.glob(pattern, sub, 10_000)[0])
+
+
+def test_glob_to_regex() -> None:
+    def matches(glob: str, path: str) -> bool:
+        return re.fullmatch(glob_to_regex(glob), path) is not None
+
+    assert matches("**/*.py", "a.py") and matches("**/*.py", "a/b/c.py") and not matches("**/*.py", "a.pyc")
+    assert matches("src/**/*.py", "src/a.py") and matches("src/**/*.py", "src/x/y/a.py")
+    assert not matches("src/*.py", "src/x/a.py")
+    assert matches("**/*.{ts,tsx}", "web/app.tsx") and not matches("**/*.{ts,tsx}", "web/app.js")
+    assert matches("**/file[0-9].txt", "d/file7.txt") and not matches("**/file[!0-9].txt", "d/file7.txt")
+    assert not matches("*", "a\nb") and not matches("**", "a\nb")
+
+
+def test_index_honours_ignore_files_like_rg(tmp_path) -> None:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n/top.txt\n!keep.log\n")
+    (tmp_path / "pkg" / ".ignore").parent.mkdir()
+    (tmp_path / "pkg" / ".ignore").write_text("generated_*\n")
+    _touch(
+        tmp_path,
+        "top.txt",
+        "pkg/top.txt",
+        "a.log",
+        "pkg/keep.log",
+        "build/out.o",
+        "pkg/build/x",
+        "pkg/generated_1.py",
+        "pkg/mod.py",
+        ".hidden/file",
+        "node_modules/dep/index.js",
+        "pkg/__pycache__/mod.pyc",
+    )
+    index = FileIndex(str(tmp_path))
+    index.build()
+    assert _names(index) == ["pkg/keep.log", "pkg/mod.py", "pkg/top.txt"]
+    assert _names(index, "**/*.py", sub="pkg") == ["mod.py"]
+
+    # Rules in the root's ancestors (up to the repo root) apply too.
+    sub_index = FileIndex(str(tmp_path / "pkg"))
+    sub_index.build()
+    assert _names(sub_index) == ["keep.log", "mod.py", "top.txt"]
+
+    # A .gitignore outside a git work tree is not applied (rg's default);
+    # .ignore always is.
+    shutil.rmtree(tmp_path / ".git")
+    outside = FileIndex(str(tmp_path / "pkg"))
+    outside.build()
+    assert _names(outside) == ["build/x", "keep.log", "mod.py", "top.txt"]
+
+
+@pytest.mark.parametrize("watch", WATCH_MODES)
+def test_index_follows_changes(tmp_path, watch) -> None:
+    (tmp_path / ".git").mkdir()
+    _touch(tmp_path, "src/a.py", "src/util/b.py", "docs/readme.md")
+    index = FileIndex(str(tmp_path), watch=watch)
+    index.build()
+    assert index.watching is (watch and sys.platform.startswith("linux"))
+    assert _names(index, "**/*.py") == ["src/a.py", "src/util/b.py"]
+
+    _touch(tmp_path, "src/new.py", "src/deep/er/c.py")
+    (tmp_path / "src" / "a.py").unlink()
+    (tmp_path / "src" / "util").rename(tmp_path / "lib")
+    assert _names(index, "**/*.py") == ["lib/b.py", "src/deep/er/c.py", "src/new.py"]
+
+    (tmp_path / ".gitignore").write_text("lib/\n")
+    assert _names(index, "**/*.py") == ["src/deep/er/c.py", "src/new.py"]
+    (tmp_path / ".gitignore").write_text("*.md\n")
+    assert _names(index) == ["lib/b.py", "src/deep/er/c.py", "src/new.py"]
+
+    shutil.rmtree(tmp_path / "src")
+    assert _names(index) == ["lib/b.py"]
+
+
+def test_index_gives_up_past_max_files(tmp_path) -> None:
+    _touch(tmp_path, *(f"f{i}" for i in range(20)))
+    with pytest.raises(IndexTooLarge):
+        FileIndex(str(tmp_path), max_files=10).build()
+
+    index = FileIndex(str(tmp_path), max_files=25, watch=False)
+    index.build()
+    _touch(tmp_path, *(f"g{i}" for i in range(10)))
+    with pytest.raises(IndexTooLarge):
+        index.glob("**")
+
+
+def test_glob_tool_answers_from_index(search_tools, tmp_path) -> None:
+    _touch(tmp_path, "scripts/lk_scan_post_reactors.py", "a/b/config.py", "notes.txt")
+    first = search_tools["glob"](pattern="lk_scan_post_reactors", path=str(tmp_path))
+    assert first["command"][0] == "file-index"
+    assert first["paths"] == [str(tmp_path / "scripts" / "lk_scan_post_reactors.py")]
+
+    # A subdirectory is served by the root's index, relative to itself.
+    sub = search_tools["glob"](pattern="b/*.py", path=str(tmp_path / "a"))
+    assert sub["command"][1] == str(tmp_path) and sub["paths"] == [str(tmp_path / "a" / "b" / "config.py")]
+
+    _touch(tmp_path, "a/b/settings.py")
+    capped = search_tools["glob"](pattern="*.py", path=str(tmp_path), max_results=2)
+    assert capped["count"] == 2 and capped["truncated"]
+
+    (tmp_path / ".hidden.py").write_text("x")
+    ignored = search_tools["glob"](pattern="*.py", path=str(tmp_path), include_ignored=True)
+    assert ignored["command"][0] == "os.walk" and ignored["count"] == 4
+
+
+def test_rg_fallback_scans_only_index_candidates(search_tools, tmp_path) -> None:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("vendor/\n")
+    (tmp_path / "app.py").write_text("needle\n")
+    (tmp_path / "app.js").write_text("needle\n")
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.py").write_text("needle\n")
+    (tmp_path / "pkg" / "deep").mkdir(parents=True)
+    (tmp_path / "pkg" / "deep" / "mod.py").write_text("needle\n")
+
+    typed = search_tools["rg"](pattern="needle", path=str(tmp_path), type_filter="py")
+    assert sorted(m["path"] for m in typed["matches"]) == [str(tmp_path / "app.py"), str(tmp_path / "pkg" / "deep" / "mod.py")]
+    shallow = search_tools["rg"](pattern="needle", path=str(tmp_path), glob="*.py", max_depth=1)
+    assert [m["path"] for m in shallow["matches"]] == [str(tmp_path / "app.py")]
+
+    none = search_tools["rg"](pattern="needle", path=str(tmp_path), glob="*.rs")
+    assert none["total"] == 0 and none["indexed_candidates"] == 0
+
+
+def test_rg_never_consults_the_index(mcp, monkeypatch, tmp_path) -> None:
+    import subprocess
+
+    import terminal_tools.search.tools as st
+
+    calls: list[list[str]] = []
+
+    def fake_run(argv, **kwargs):
+        calls.append(argv)
+        return subprocess.CompletedProcess(argv, 1, b"", b"")
+
+    monkeypatch.setattr(st, "_resolve_rg", lambda: "/usr/bin/rg")
+    monkeypatch.setattr(st.subprocess, "run", fake_run)
+    monkeypatch.setattr(file_index, "ensure", lambda *a, **kw: pytest.fail("rg search consulted the file index"))
+    st.register_search_tools(mcp)
+    rg = mcp._tool_manager._tools["terminal_rg"].fn
+
+    # "proto" is in rg's type table but not the fallback's: rg must still run.
+    result = rg(pattern="needle", path=str(tmp_path), type_filter="proto", glob="*.x")
+    assert "indexed_candidates" not in result
+    assert calls[0][-3:] == ["--", "needle", str(tmp_path)]
+    assert calls[0][calls[0].index("-t") + 1] == "proto"
+
+
+def test_glob_goes_to_rg_where_the_index_pruned_unignored_dirs(mcp, monkeypatch, tmp_path) -> None:
+    import terminal_tools.search.tools as st
+
+    calls: list[list[str]] = []
+
+    def fake_stream(argv, max_results):
+        calls.append(argv)
+        return [str(tmp_path / "node_modules" / "foo" / "index.js")], False, False, ""
+
+    monkeypatch.setattr(st, "_resolve_rg", lambda: "/usr/bin/rg")
+    monkeypatch.setattr(st, "_stream_paths", fake_stream)
+    st.register_search_tools(mcp)
+    glob = mcp._tool_manager._tools["terminal_glob"].fn
+    (tmp_path / ".git").mkdir()
+    _touch(tmp_path, "src/app.js", "node_modules/foo/index.js")
+    assert file_index.ensure(str(tmp_path), wait=True) is not None
+
+    # rg lists node_modules when nothing ignores it; the index never does.
+    result = glob(pattern="node_modules/foo/*.js", path=str(tmp_path))
+    assert result["command"][0] == "/usr/bin/rg" and result["count"] == 1
+    assert glob(pattern="*.js", path=str(tmp_path / "src"))["command"][0] == "file-index"
+
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+    result = glob(pattern="*.js", path=str(tmp_path))
+    assert result["command"][0] == "file-index" and result["paths"] == [str(tmp_path / "src" / "app.js")]
+    assert len(calls) == 1
+
+
+def test_index_can_be_disabled(search_tools, tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("TERMINAL_TOOLS_FILE_INDEX", "0")
+    _touch(tmp_path, "a.py")
+    result = search_tools["glob"](pattern="*.py", path=str(tmp_path))
+    assert result["command"][0] == "os.walk" and result["count"] == 1
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+def _synthetic_tree(root, total: int) -> None:
+    exts = (".py", ".ts", ".md", ".json", ".go", ".txt", ".yaml", ".rs")
+    per_dir = 50
+    for d in range(total // per_dir):
+        directory = root / f"pkg{d % 40}" / f"mod{d // 40 % 25}" / f"part{d // 1000}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for f in range(per_dir):
+            fd = os.open(directory / f"file_{d}_{f}{exts[f % len(exts)]}", os.O_CREAT | os.O_WRONLY, 0o644)
+            os.close(fd)
+
+
+@pytest.mark.benchmark
+def test_benchmark_repeated_glob_latency(tmp_path) -> None:
+    from terminal_tools.search.tools import _walk_paths
+
+    total = int(os.getenv("TERMINAL_TOOLS_BENCH_INDEX_FILES", "500000"))
+    t0 = time.perf_counter()
+    _synthetic_tree(tmp_path, total)
+    print(f"\n{total} files created in {time.perf_counter() - t0:.1f}s")
+    patterns = ["**/*file_1234_7*", "**/*.rs", "pkg7/**/*.go", "**/*no_such_name*"]
+
+    def p50(fn, reps: int) -> float:
+        samples = []
+        for _ in range(reps):
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        return statistics.median(samples)
+
+    rows = {}
+    walk = {p: _walk_paths(p, str(tmp_path), total, include_ignored=False)[0] for p in patterns}
+    rows["os.walk per call"] = p50(lambda: [_walk_paths(p, str(tmp_path), 1000, include_ignored=False) for p in patterns], 2) / len(patterns)
+    for watch in (True, False):
+        label = "inotify" if watch else "poll"
+        index = FileIndex(str(tmp_path), max_files=total + 1, watch=watch)
+        t = time.perf_counter()
+        index.build()
+        print(f"  index build ({label}): {time.perf_counter() - t:.1f}s, {index.file_count} files")
+        for p in patterns:
+            got = sorted(os.path.join(str(tmp_path), r) for r in index.glob(p, "", total)[0])
+            assert got == sorted(walk[p])
+        rows[f"index, {label}"] = p50(lambda index=index: [index.glob(p, "", 1000) for p in patterns], 10) / len(patterns)
+        _touch(tmp_path, "pkg3/fresh/file_1234_7_new.md")
+        assert any(r.endswith("file_1234_7_new.md") for r in index.glob("**/*file_1234_7*", "", 1000)[0])
+        (tmp_path / "pkg3" / "fresh" / "file_1234_7_new.md").unlink()
+        index.close()
+
+    for label, seconds in rows.items():
+        print(f"  {label:20} {seconds * 1000:9.1f} ms per glob (p50)")
+    assert rows["index, inotify"] * 20 < rows["os.walk per call"]
+    assert rows["index, poll"] < rows["os.walk per call"]
@@ -0,0 +1,263 @@
+"""Job output spilled to disk past the ring: offsets, search, rotation.
+
+The benchmark at the bottom searches ~1 GB of synthetic build output
+(``TERMINAL_TOOLS_BENCH_SPILL_MB`` to resize) while the segments are raw
+and again once they're compressed, against paging the same bytes
+through ``RingBuffer.read``; it is opt-in, run with ``-m benchmark -s``
+for the latencies and peak allocation.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from terminal_tools.common.ring_buffer import RingBuffer
+from terminal_tools.common.spill_log import SpillBudget, SpillLog, compile_pattern
+from terminal_tools.jobs import manager as manager_module
+from terminal_tools.jobs.manager import JobManager
+
+
+def _log(n: int) -> bytes:
+    return b"".join(b"ERROR step %d failed\n" % i if i % 97 == 0 else b"info step %d ok\n" % i for i in range(n))
+
+
+def _spilling_ring(root: Path, capacity: int = 4096, **kw) -> RingBuffer:
+    return RingBuffer(capacity, spill_factory=lambda floor: SpillLog(root, base_offset=floor, **kw))
+
+
+def _write(ring: RingBuffer, data: bytes, chunk: int = 333) -> None:
+    for i in range(0, len(data), chunk):
+        ring.write(data[i : i + chunk])
+
+
+def test_ring_spills_on_overflow_and_reads_below_floor(tmp_path) -> None:
+    data = _log(5000)
+    ring = _spilling_ring(tmp_path / "s", segment_bytes=10_000)
+    _write(ring, data[:2000])
+    assert ring.spill is None  # fits in memory: no disk at all
+    _write(ring, data[2000:])
+    assert ring.spill is not None and ring.floor > 0
+
+    out, offset = b"", 0
+    while offset < len(data):
+        result = ring.read(offset, 7000)
+        assert result.truncated_bytes_dropped == 0 and result.offset == offset
+        out += result.data
+        offset = result.next_offset
+    assert out == data
+    assert ring.tail(len(data)).data == data
+    assert len(list((tmp_path / "s").glob("seg-*.log"))) > 5
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_search_matches_lines_across_segment_and_block_edges(tmp_path, compressed) -> None:
+    data = _log(3000)
+    ring = _spilling_ring(tmp_path / "s", segment_bytes=1000)
+    _write(ring, data)
+    if compressed:
+        ring.spill.finalize()
+        assert not list((tmp_path / "s").glob("*.log")) and list((tmp_path / "s").glob("*.zz"))
+
+    lines = data.splitlines()
+    expected = [(i + 1, line.decode()) for i, line in enumerate(lines) if line.startswith(b"ERROR")]
+    found = ring.search(compile_pattern(r"^error step \d+", ignore_case=True), max_matches=1000)
+    assert [(m.line, m.text) for m in found.matches] == expected
+    assert all(data[m.offset :].startswith(m.text.encode()) for m in found.matches)
+    assert not found.truncated and found.next_offset == len(data)
+
+    # Paging with next_offset visits every match exactly once.
+    paged, offset = [], 0
+    while True:
+        page = ring.search(compile_pattern("ERROR"), since_offset=offset, max_matches=7)
+        paged += [m.line for m in page.matches]
+        offset = page.next_offset
+        if not page.truncated:
+            break
+    assert paged == [line for line, _ in expected]
+
+    last = ring.search(compile_pattern("ERROR"), max_matches=3, tail=True)
+    assert [(m.line, m.text) for m in last.matches] == expected[-3:]
+    assert ring.spill.line_number(len(data) - 1) == len(lines)
+
+
+def test_search_without_spill_covers_only_the_ring(tmp_path) -> None:
+    data = _log(3000)
+    ring = RingBuffer(4096)
+    _write(ring, data)
+    found = ring.search(compile_pattern("ERROR"), max_matches=1000)
+    assert found.truncated_bytes_dropped == ring.floor
+    assert found.matches and all(m.offset >= ring.floor and m.line is None for m in found.matches)
+
+    small = RingBuffer(1 << 20)
+    _write(small, data)
+    assert [m.line for m in small.search(compile_pattern("ERROR"), max_matches=1000).matches] == list(range(1, 3001, 97))
+
+
+@pytest.mark.parametrize("spilled", [False, True])
+def test_search_resumed_at_the_end_stays_there(tmp_path, spilled) -> None:
+    data = _log(3000) if spilled else _log(2)
+    ring = _spilling_ring(tmp_path / "s", segment_bytes=10_000)
+    _write(ring, data)
+    assert (ring.spill is not None) == spilled
+
+    # A poller resuming from next_offset at EOF must not be sent back to 0.
+    at_end = ring.search(compile_pattern("ERROR"), since_offset=len(data))
+    assert (at_end.matches, at_end.offset, at_end.next_offset, at_end.truncated) == ([], len(data), len(data), False)
+
+    _write(ring, b"ERROR late\n")
+    resumed = ring.search(compile_pattern("ERROR"), since_offset=at_end.next_offset)
+    assert [m.text for m in resumed.matches] == ["ERROR late"] and resumed.next_offset == len(data) + 11
+
+
+def test_spill_cap_drops_oldest_segments(tmp_path) -> None:
+    data = _log(5000)
+    ring = _spilling_ring(tmp_path / "s", segment_bytes=5000, max_bytes=20_000)
+    _write(ring, data)
+    spill = ring.spill
+    assert 0 < spill.floor <= len(data) - 20_000
+    result = ring.read(0, 100)
+    assert result.truncated_bytes_dropped == spill.floor and result.data == data[spill.floor : spill.floor + 100]
+    found = ring.search(compile_pattern("ERROR"), max_matches=1)
+    assert found.truncated_bytes_dropped == spill.floor and found.matches[0].offset >= spill.floor
+
+
+def test_shared_budget_trims_the_oldest_log_first(tmp_path) -> None:
+    budget = SpillBudget(60_000)
+    old = SpillLog(tmp_path / "old", segment_bytes=10_000, budget=budget)
+    new = SpillLog(tmp_path / "new", segment_bytes=10_000, budget=budget)
+    data = _log(3000)[:50_000]
+    old.append(data)
+    new.append(data)
+
+    on_disk = sum(p.stat().st_size for p in tmp_path.rglob("seg-*"))
+    assert budget.used == on_disk <= 60_000
+    assert old.floor == 40_000 and new.floor == 0, "the older log gives up its segments first"
+    assert new.read(0, 100) == data[:100]
+
+    old.finalize()
+    assert budget.used == sum(p.stat().st_size for p in tmp_path.rglob("seg-*")), "compression is accounted for"
+    new.append(data)
+    assert budget.used <= 60_000 and old.floor == old.total_written, "a finished log can be emptied"
+    assert len(list((tmp_path / "new").glob("seg-*"))) >= 1
+    new.discard()
+    assert budget.used == 0
+
+
+def test_default_spill_dir_is_under_hive_home_and_dead_servers_are_swept(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HIVE_HOME", str(tmp_path / "hive"))
+    monkeypatch.delenv("TERMINAL_TOOLS_JOB_SPILL_DIR", raising=False)
+    base = tmp_path / "hive" / "cache" / "terminal-jobs"
+    if os.name == "posix":
+        dead = base / "999999999-deadbeef"
+        dead.mkdir(parents=True)
+        (dead / "seg-0.log").write_bytes(b"x")
+    manager = JobManager(ring_bytes=4096)
+    assert manager._spill_root.parent == base
+    assert os.name != "posix" or not (base / "999999999-deadbeef").exists()
+    assert manager_module._resolve_spill_root(None).name.startswith(f"{os.getpid()}-")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell loop")
+def test_job_output_spills_compresses_on_exit_and_is_deleted_on_shutdown(tmp_path) -> None:
+    manager = JobManager(ring_bytes=4096, spill_dir=tmp_path)
+    script = "for i in $(seq 1 3000); do if [ $((i % 500)) -eq 0 ]; then echo FAIL $i; else echo ok $i; fi; done"
+    record = manager.start(script, shell=True)
+    manager.wait(record.job_id, timeout_sec=30)
+    assert record.to_summary()["spilled"]
+
+    data = record.stdout_buf.read(0, 1 << 20)
+    assert data.truncated_bytes_dropped == 0 and data.data.startswith(b"ok 1\nok 2\n")
+    found = record.stdout_buf.search(compile_pattern("FAIL"))
+    assert [(m.line, m.text) for m in found.matches] == [(i, f"FAIL {i}") for i in range(500, 3001, 500)]
+
+    deadline = time.monotonic() + 5
+    while list(tmp_path.rglob("*.log")) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert list(tmp_path.rglob("seg-*.zz")) and not list(tmp_path.rglob("*.log"))
+    manager.shutdown_all()
+    assert not list(tmp_path.rglob("seg-*"))
+
+
+def test_spill_can_be_disabled(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("TERMINAL_TOOLS_JOB_SPILL", "0")
+    manager = JobManager(ring_bytes=4096, spill_dir=tmp_path)
+    record = manager.start([sys.executable, "-c", "print('x' * 100_000)"])
+    manager.wait(record.job_id, timeout_sec=30)
+    assert not record.to_summary()["spilled"] and not list(tmp_path.iterdir())
+
+
+def test_job_logs_pattern_search(mcp) -> None:
+    from terminal_tools.jobs.tools import register_job_tools
+
+    register_job_tools(mcp)
+    start = mcp._tool_manager._tools["terminal_job_start"].fn
+    logs = mcp._tool_manager._tools["terminal_job_logs"].fn
+    job_id = start(command="echo build ok; echo 'Error: x'; echo done", shell=True)["job_id"]
+    result = logs(job_id=job_id, pattern="^error", ignore_case=True, wait_until_exit=True, wait_timeout_sec=10)
+    assert result["matches"] == [{"offset": 9, "line": 2, "text": "Error: x"}]
+    assert result["status"] == "exited" and not result["truncated"]
+    assert "invalid pattern" in logs(job_id=job_id, pattern="(")["error"]
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.benchmark
+def test_benchmark_search_latency_over_spilled_output(tmp_path) -> None:
+    total_mb = int(os.getenv("TERMINAL_TOOLS_BENCH_SPILL_MB", "1024"))
+    ring = _spilling_ring(tmp_path / "s", capacity=4 * 1024 * 1024)
+    chunk = b"".join(b"[%07d] cc -O2 -c src/module_%d.c -o build/module_%d.o\n" % (i, i, i) for i in range(2000))
+    needle = b"src/module_1234.c:88: error: expected ';' before '}' token\n"
+    t0 = time.perf_counter()
+    for i in range(total_mb * 1024 * 1024 // len(chunk)):
+        ring.write(chunk + needle if i % 100 == 99 else chunk)
+    write_s = time.perf_counter() - t0
+    print(f"\n{ring.total_written / 2**20:.0f} MiB of job output spilled in {write_s:.1f}s")
+
+    pattern = compile_pattern(r"error: expected")
+
+    def naive() -> int:
+        hits, offset = 0, 0
+        while offset < ring.total_written:
+            page = ring.read(offset, 4 * 1024 * 1024)
+            hits += len(pattern.findall(page.data))
+            offset = page.next_offset
+        return hits
+
+    def timed(fn):
+        t = time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t
+
+    expected, naive_s = timed(naive)
+    rows = {"page through read()": naive_s}
+    for label in ("raw segments", "compressed segments"):
+        if label == "compressed segments":
+            _, compress_s = timed(ring.spill.finalize)
+            on_disk = sum(p.stat().st_size for p in (tmp_path / "s").iterdir())
+            print(f"  compressed on exit in {compress_s:.1f}s to {on_disk / 2**20:.0f} MiB")
+        found, rows[f"search, {label}"] = timed(lambda: ring.search(pattern, max_matches=expected + 1))
+        assert len(found.matches) == expected and not found.truncated
+        last, rows[f"tail search, {label}"] = timed(lambda: ring.search(pattern, max_matches=5, tail=True))
+        assert [m.offset for m in last.matches] == [m.offset for m in found.matches[-5:]]
+    for label, seconds in rows.items():
+        print(f"  {label:32} {seconds * 1000:8.0f} ms")
+
+    def peak(fn) -> int:
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    naive_peak, search_peak = peak(naive), peak(lambda: ring.search(pattern, max_matches=expected + 1))
+    print(f"  peak Python allocation: paging {naive_peak / 2**20:.1f} MiB, search {search_peak / 2**20:.1f} MiB")
+    assert search_peak * 2 < naive_peak
+    assert rows["tail search, compressed segments"] < rows["search, compressed segments"]
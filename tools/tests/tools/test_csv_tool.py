@@ -889,3 +889,129 @@ def test_unicode_data(self, csv_tools, tmp_path):
         assert result["success"] is True
         assert result["row_count"] == 1
         assert result["rows"][0]["名前"] == "商品B"
+
+
+@pytest.mark.skipif(not duckdb_available, reason="duckdb not installed")
+class TestCsvSqlCache:
+    """Tests for the Parquet materialisation behind csv_sql."""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, monkeypatch) -> Path:
+        from aden_tools.tools.csv_tool import cache
+
+        directory = tmp_path / "cache"
+        monkeypatch.setenv("HIVE_CSV_CACHE_DIR", str(directory))
+        monkeypatch.setattr(cache, "_MIN_BYTES", 0)
+        return directory
+
+    def _sql(self, csv_tools, tmp_path, path, query):
+        with patch(
+            "aden_tools.tools.file_system_toolkits.security._ALLOWED_ROOTS",
+            (str(tmp_path),),
+        ):
+            return csv_tools["csv_sql"](path=str(path), query=query)
+
+    def test_materialises_once_and_reuses(self, csv_tools, tmp_path, cache_dir):
+        """The second query scans the existing Parquet file."""
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text("region,amount\nnorth,10\nsouth,5\nnorth,7\n", encoding="utf-8")
+
+        first = self._sql(csv_tools, tmp_path, csv_file, "SELECT region, SUM(amount) AS total FROM data GROUP BY region ORDER BY region")
+        entries = list(cache_dir.glob("*.parquet"))
+        inode = entries[0].stat().st_ino
+        second = self._sql(csv_tools, tmp_path, csv_file, "SELECT COUNT(*) AS n FROM data")
+
+        assert first["rows"] == [{"region": "north", "total": 17}, {"region": "south", "total": 5}]
+        assert second["rows"] == [{"n": 3}]
+        assert [e.stat().st_ino for e in cache_dir.glob("*.parquet")] == [inode]
+
+    def test_changed_file_replaces_entry(self, csv_tools, tmp_path, cache_dir):
+        """A modified CSV is re-materialised and the stale entry removed."""
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text("region,amount\nnorth,10\n", encoding="utf-8")
+        self._sql(csv_tools, tmp_path, csv_file, "SELECT * FROM data")
+        csv_file.write_text("region,amount\nnorth,10\nsouth,5\n", encoding="utf-8")
+
+        result = self._sql(csv_tools, tmp_path, csv_file, "SELECT COUNT(*) AS n FROM data")
+
+        assert result["rows"] == [{"n": 2}]
+        assert len(list(cache_dir.glob("*.parquet"))) == 1
+
+    def test_lru_eviction(self, csv_tools, tmp_path, cache_dir, monkeypatch):
+        """Over budget, older entries go first and the newest is kept."""
+        from aden_tools.tools.csv_tool import cache
+
+        monkeypatch.setattr(cache, "_MAX_BYTES", 1)
+        a = tmp_path / "a.csv"
+        b = tmp_path / "b.csv"
+        a.write_text("x\n1\n", encoding="utf-8")
+        b.write_text("y\n2\n", encoding="utf-8")
+
+        self._sql(csv_tools, tmp_path, a, "SELECT * FROM data")
+        result = self._sql(csv_tools, tmp_path, b, "SELECT * FROM data")
+
+        assert result["rows"] == [{"y": 2}]
+        assert [e.name for e in cache_dir.glob("*.parquet")] == [cache._entry_name(str(b), b.stat())]
+        # The evicted entry's build lock goes with it.
+        assert cache._entry_name(str(a), a.stat()) not in cache._build_locks
+        assert cache._entry_name(str(b), b.stat()) in cache._build_locks
+
+    def test_keyed_on_size_and_mtime(self, csv_tools, tmp_path, cache_dir):
+        """Same size and mtime is a hit; a new mtime rebuilds and drops the old entry."""
+        import os
+
+        from aden_tools.tools.csv_tool import cache
+
+        csv_file = tmp_path / "n.csv"
+        csv_file.write_text("n\n1\n", encoding="utf-8")
+        mtime = csv_file.stat().st_mtime_ns
+        assert self._sql(csv_tools, tmp_path, csv_file, "SELECT n FROM data")["rows"] == [{"n": 1}]
+        (entry,) = cache_dir.glob("*.parquet")
+        inode = entry.stat().st_ino
+
+        # Same size, mtime put back: indistinguishable, so served from the cache.
+        csv_file.write_text("n\n2\n", encoding="utf-8")
+        os.utime(csv_file, ns=(mtime, mtime))
+        assert self._sql(csv_tools, tmp_path, csv_file, "SELECT n FROM data")["rows"] == [{"n": 1}]
+        assert [e.stat().st_ino for e in cache_dir.glob("*.parquet")] == [inode]
+
+        os.utime(csv_file, ns=(mtime + 10**9, mtime + 10**9))
+        assert self._sql(csv_tools, tmp_path, csv_file, "SELECT n FROM data")["rows"] == [{"n": 2}]
+        assert [e.name for e in cache_dir.glob("*.parquet")] == [cache._entry_name(str(csv_file), csv_file.stat())]
+        assert entry.name not in cache._build_locks
+
+    def test_unusable_cache_dir_falls_back_to_csv(self, csv_tools, tmp_path, cache_dir, monkeypatch):
+        """If the cache cannot be written the query still runs."""
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("", encoding="utf-8")
+        monkeypatch.setenv("HIVE_CSV_CACHE_DIR", str(blocker / "csv"))
+        csv_file = tmp_path / "sales.csv"
+        csv_file.write_text("region,amount\nnorth,10\n", encoding="utf-8")
+
+        result = self._sql(csv_tools, tmp_path, csv_file, "SELECT amount FROM data")
+
+        assert result["rows"] == [{"amount": 10}]
+
+
+class TestCsvReadSinglePass:
+    """csv_read returns what csv.DictReader would, in one pass."""
+
+    @pytest.mark.parametrize("offset,limit", [(0, None), (0, 2), (2, 3), (4, 10), (50, 1)])
+    def test_matches_dictreader(self, csv_tools, tmp_path, offset, limit):
+        import csv
+        import io
+
+        text = 'a,b,c\n1,2,3\n\n4,5\n,,\n"multi\nline",x,y\n7,8,9,10\n11,12,13\n'
+        csv_file = tmp_path / "messy.csv"
+        csv_file.write_text(text, encoding="utf-8")
+        expected = list(csv.DictReader(io.StringIO(text, newline="")))
+
+        with patch(
+            "aden_tools.tools.file_system_toolkits.security._ALLOWED_ROOTS",
+            (str(tmp_path),),
+        ):
+            result = csv_tools["csv_read"](path=str(csv_file), offset=offset, limit=limit)
+
+        end = None if limit is None else offset + limit
+        assert result["rows"] == expected[offset:end]
+        assert result["total_rows"] == 5  # the all-empty ",," row is not counted
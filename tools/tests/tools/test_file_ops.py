@@ -406,3 +406,207 @@ def test_patch_unknown_mode(self, file_ops_mcp):
         result = edit_fn(mode="bogus")
         assert "Error" in result
         assert "unknown mode" in result.lower()
+
+
+# ── fuzzy matching engine ─────────────────────────────────────────────
+
+
+def _dp_levenshtein(a: str, b: str) -> int:
+    """Textbook O(m·n) edit distance, the reference for the bit-parallel one."""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def _reference_candidates(content: str, old_text: str):
+    """The sliding-window matcher ``_fuzzy_find_candidates`` replaced.
+    The indexed engine must yield exactly the same sequence."""
+    import re
+
+    from aden_tools.file_ops import _strip_indent, _unicode_normalize
+
+    def sim(a, b):
+        maxlen = max(len(a), len(b))
+        return 1.0 if maxlen == 0 else 1.0 - _dp_levenshtein(a, b) / maxlen
+
+    if old_text in content:
+        yield old_text
+    content_lines = content.split("\n")
+    search_lines = old_text.split("\n")
+    while search_lines and not search_lines[-1].strip():
+        search_lines = search_lines[:-1]
+    if not search_lines:
+        return
+    n = len(search_lines)
+    windows = [content_lines[i : i + n] for i in range(len(content_lines) - n + 1)]
+    for w in windows:
+        if all(cl.strip() == sl.strip() for cl, sl in zip(w, search_lines, strict=True)):
+            yield "\n".join(w)
+    normalized_search = re.sub(r"\s+", " ", old_text).strip()
+    for w in windows:
+        if re.sub(r"\s+", " ", "\n".join(w)).strip() == normalized_search:
+            yield "\n".join(w)
+    stripped_search = _strip_indent(search_lines)
+    for w in windows:
+        if _strip_indent(w) == stripped_search:
+            yield "\n".join(w)
+    if "\\n" in old_text or "\\t" in old_text or "\\r" in old_text:
+        unescaped = old_text.replace("\\n", "\n").replace("\\t", "\t").replace("\\r", "\r")
+        if unescaped != old_text and unescaped in content:
+            yield unescaped
+    trimmed = old_text.strip()
+    if trimmed != old_text and trimmed in content:
+        yield trimmed
+    norm_search = _unicode_normalize(old_text)
+    if norm_search != old_text:
+        norm_content = _unicode_normalize(content)
+        if norm_search in norm_content:
+            pos_map, np = [], 0
+            for ch in content:
+                pos_map.append(np)
+                np += len(_unicode_normalize(ch))
+            pos_map.append(np)
+            target = norm_content.find(norm_search)
+            try:
+                start = pos_map.index(target)
+                yield content[start : pos_map.index(target + len(norm_search), start)]
+            except ValueError:
+                pass
+    if n >= 3:
+        candidates = []
+        for i, line in enumerate(content_lines):
+            end = i + n
+            if line.strip() == search_lines[0].strip() and end <= len(content_lines) and content_lines[end - 1].strip() == search_lines[-1].strip():
+                block = content_lines[i:end]
+                candidates.append((sim("\n".join(block[1:-1]), "\n".join(search_lines[1:-1])), "\n".join(block)))
+        if candidates:
+            candidates.sort(key=lambda x: x[0], reverse=True)
+            if candidates[0][0] >= (0.50 if len(candidates) == 1 else 0.70):
+                yield candidates[0][1]
+    if n >= 2:
+        for w in windows:
+            sims = [sim(cl.strip(), sl.strip()) for cl, sl in zip(w, search_lines, strict=True)]
+            if min(sims) >= 0.50 and sum(sims) / len(sims) >= 0.65:
+                yield "\n".join(w)
+                break
+
+
+_VOCAB = [
+    "def handler(request):",
+    "    return response",
+    "if value is None:",
+    "    value = default",
+    "for item in items:",
+    "    total += item.price",
+    "",
+    "    # comment",
+    "raise ValueError(“bad input”)",
+    "x = compute(a, b)",
+    "}",
+    "    self.cache[key] = result",
+]
+
+
+def _mutate(rng, line: str) -> str:
+    choice = rng.randrange(6)
+    if choice == 0:
+        return "  " + line
+    if choice == 1:
+        return line.replace(" ", "  ", 1)
+    if choice == 2 and line:
+        i = rng.randrange(len(line))
+        return line[:i] + rng.choice("abcxyz_") + line[i + 1 :]
+    if choice == 3:
+        return line.replace("“", '"').replace("”", '"')
+    if choice == 4:
+        return line + "  "
+    return line
+
+
+class TestFuzzyEngine:
+    """Bit-parallel distance and the indexed candidate search."""
+
+    def test_levenshtein_matches_dynamic_programming(self):
+        import random
+
+        from aden_tools.file_ops import _levenshtein
+
+        rng = random.Random(1)
+        for _ in range(400):
+            a = "".join(rng.choice("abcd \n") for _ in range(rng.randrange(0, 90)))
+            b = "".join(rng.choice("abcd \n") for _ in range(rng.randrange(0, 90)))
+            expected = _dp_levenshtein(a, b)
+            assert _levenshtein(a, b) == expected
+            cutoff = rng.randrange(0, 40)
+            got = _levenshtein(a, b, cutoff)
+            assert got == expected if expected <= cutoff else got == cutoff + 1
+
+    def test_similarity_floor_is_exact_above_floor(self):
+        from aden_tools.file_ops import _similarity
+
+        pairs = [("abcdef", "abcxef"), ("abcd", "wxyz"), ("", ""), ("ab", "abcd"), ("return x", "return y")]
+        for a, b in pairs:
+            exact = _similarity(a, b)
+            floored = _similarity(a, b, floor=0.5)
+            assert floored == exact if exact >= 0.5 else floored < 0.5
+
+    @pytest.mark.parametrize("index_min_lines", [0, 2_000], ids=["indexed", "scanned"])
+    def test_indexed_search_yields_same_candidates_as_full_scan(self, index_min_lines, monkeypatch):
+        import random
+
+        from aden_tools import file_ops
+        from aden_tools.file_ops import _fuzzy_find_candidates
+
+        monkeypatch.setattr(file_ops, "_INDEX_MIN_LINES", index_min_lines)
+
+        rng = random.Random(7)
+        for _ in range(300):
+            lines = [rng.choice(_VOCAB) for _ in range(rng.randrange(5, 60))]
+            content = "\n".join(lines)
+            start = rng.randrange(len(lines))
+            block = lines[start : start + rng.randrange(1, 6)]
+            search = "\n".join(_mutate(rng, ln) for ln in block)
+            if rng.random() < 0.2:
+                search += "\n"
+            assert list(_fuzzy_find_candidates(content, search)) == list(_reference_candidates(content, search)), (content, search)
+
+    @pytest.mark.benchmark
+    def test_benchmark_large_file(self):
+        """Edit lookups on a 50k-line file, where the position map is built.
+
+        The indexed engine must find what the full scan finds (checked on
+        the first 1.5k lines; its context-aware pass alone takes minutes
+        at 50k) and the same block at 50k. Opt-in; time it with
+        ``-m benchmark --durations=0``.
+        """
+        import random
+
+        from aden_tools.file_ops import _fuzzy_find_candidates
+
+        rng = random.Random(3)
+        lines = []
+        for i in range(50_000):
+            indent = "    " * rng.randrange(3)
+            lines.append(f"{indent}{rng.choice(['value', 'item', 'result', 'node'])}_{i} = compute_{i % 97}(arg_{i % 13}, {i})")
+        content = "\n".join(lines)
+        at = 700
+        block = lines[at : at + 6]
+        cases = {
+            "indent shift": "\n".join("  " + ln for ln in block),
+            "drifted middle": "\n".join([block[0], block[1].replace("compute", "calc"), block[2][:-3], block[3], block[4] + "  # x", block[5]]),
+            "mangled lines": "\n".join(ln.replace("_", "-").replace("arg", "param") for ln in block),
+            "no match": "\n".join(f"totally_unrelated_{k} = nothing_here()" for k in range(6)),
+        }
+
+        def first(fn, text, search):
+            return next(iter(fn(text, search)), None)
+
+        small = "\n".join(lines[:1_500])
+        for name, search in cases.items():
+            found = first(_reference_candidates, small, search)
+            assert first(_fuzzy_find_candidates, small, search) == found, name
+            assert first(_fuzzy_find_candidates, content, search) == found, name